@@ -27,21 +27,17 @@ async def main():
     logging.getLogger("azure.core.pipeline.policies.http_logging_policy").setLevel(logging.WARNING)
     logging.getLogger("azure").setLevel(logging.WARNING)
     
-    # Suppress webserver middleware INFO logs
-    logging.getLogger("webserver.middleware.logging_middleware").setLevel(logging.WARNING)
+    # Suppress aiohttp access logs (requests are logged by the sampled logging middleware)
     logging.getLogger("aiohttp.access").setLevel(logging.WARNING)
     
     # Initialize router
     import core.router as router
     router.init()
     
-    # Initialize LLM providers
-    import core.llm as llm
-    llm.init()
-    
-    # Initialize retrieval clients
-    import core.retriever as retriever
-    retriever.init()
+    # Import and instantiate LLM, embedding and retrieval providers
+    # before accepting traffic; fails fast if a package is missing
+    from core.preload import preload_providers
+    preload_providers()
 
     print("Starting aiohttp server...")
     from webserver.aiohttp_server import AioHTTPServer
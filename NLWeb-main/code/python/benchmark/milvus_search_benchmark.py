@@ -0,0 +1,119 @@
+"""
+Microbenchmarks for the Milvus retrieval path.
+
+Compares, against Milvus Lite (a local .db file) or any Milvus server:
+- OR-chained string site filters vs. a parameterized `site in {values}` filter
+- N single-vector searches vs. one batched multi-vector search
+- Decoding every hit's JSON eagerly vs. passing the stored string through
+
+Usage (from the code/python directory):
+    python benchmark/milvus_search_benchmark.py
+    python benchmark/milvus_search_benchmark.py --uri http://localhost:19530 --docs 50000
+
+Milvus Lite requires `pip install "pymilvus[milvus-lite]"`.
+"""
+
+import argparse
+import json
+import os
+import statistics
+import tempfile
+import time
+
+import numpy as np
+from pymilvus import MilvusClient
+
+from retrieval_providers.milvus_client import OUTPUT_FIELDS, build_filter, format_hits, SUPPORTS_FILTER_PARAMS
+
+COLLECTION = "nlweb_benchmark"
+
+
+def timed(func, repeat):
+    """Run func repeat times and return the median wall time in milliseconds."""
+    times = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        func()
+        times.append((time.perf_counter() - start) * 1000)
+    return statistics.median(times)
+
+
+def populate(client, docs, dim, num_sites):
+    if client.has_collection(COLLECTION):
+        client.drop_collection(COLLECTION)
+    client.create_collection(collection_name=COLLECTION, dimension=dim)
+    rng = np.random.default_rng(0)
+    batch = 1000
+    for start in range(0, docs, batch):
+        vectors = rng.random((min(batch, docs - start), dim), dtype=np.float32)
+        rows = []
+        for offset, vector in enumerate(vectors):
+            i = start + offset
+            schema = {"@type": "Recipe", "name": f"Item {i}", "description": "x" * 400,
+                      "recipeIngredient": [f"ingredient {k}" for k in range(15)]}
+            rows.append({"id": i, "vector": vector.tolist(), "text": json.dumps(schema),
+                         "url": f"https://example.com/{i}", "name": f"Item {i}",
+                         "site": f"site{i % num_sites}"})
+        client.insert(collection_name=COLLECTION, data=rows)
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Milvus search path microbenchmarks")
+    parser.add_argument("--uri", default=None, help="Milvus URI (default: temporary Milvus Lite file)")
+    parser.add_argument("--token", default="")
+    parser.add_argument("--docs", type=int, default=20000)
+    parser.add_argument("--dim", type=int, default=256)
+    parser.add_argument("--sites", type=int, default=200, help="Number of distinct sites in the data")
+    parser.add_argument("--filter-sites", type=int, default=100, help="Sites in the multi-site filter")
+    parser.add_argument("--queries", type=int, default=8, help="Queries per batch")
+    parser.add_argument("--limit", type=int, default=50)
+    parser.add_argument("--repeat", type=int, default=20)
+    args = parser.parse_args()
+
+    uri = args.uri or os.path.join(tempfile.mkdtemp(), "milvus_benchmark.db")
+    client = MilvusClient(uri, args.token)
+    print(f"Populating {args.docs} docs (dim={args.dim}) at {uri}")
+    populate(client, args.docs, args.dim, args.sites)
+
+    rng = np.random.default_rng(1)
+    queries = rng.random((args.queries, args.dim), dtype=np.float32).tolist()
+    sites = [f"site{i}" for i in range(args.filter_sites)]
+
+    # Site filters
+    or_filter = " || ".join(f"site == '{s}'" for s in sites)
+    expr, params = build_filter("site", sites)
+    param_kwargs = {"filter": expr, "filter_params": params} if params else {"filter": expr}
+    print(f"\nSite filter with {len(sites)} sites (filter_params supported: {SUPPORTS_FILTER_PARAMS})")
+    print(f"  OR chain   ({len(or_filter):6d} chars): "
+          f"{timed(lambda: client.search(COLLECTION, data=queries[:1], filter=or_filter, limit=args.limit, output_fields=OUTPUT_FIELDS), args.repeat):8.2f} ms")
+    print(f"  in filter  ({len(expr):6d} chars): "
+          f"{timed(lambda: client.search(COLLECTION, data=queries[:1], limit=args.limit, output_fields=OUTPUT_FIELDS, **param_kwargs), args.repeat):8.2f} ms")
+
+    # Single vs batched search
+    def one_by_one():
+        for query in queries:
+            client.search(COLLECTION, data=[query], limit=args.limit, output_fields=OUTPUT_FIELDS, **param_kwargs)
+
+    def batched():
+        client.search(COLLECTION, data=queries, limit=args.limit, output_fields=OUTPUT_FIELDS, **param_kwargs)
+
+    print(f"\n{len(queries)} queries")
+    print(f"  sequential searches: {timed(one_by_one, args.repeat):8.2f} ms")
+    print(f"  one batched search:  {timed(batched, args.repeat):8.2f} ms")
+
+    # Payload decoding
+    hits = client.search(COLLECTION, data=queries[:1], limit=args.limit, output_fields=OUTPUT_FIELDS)[0]
+
+    def eager():
+        return [[h["entity"]["url"], json.loads(h["entity"]["text"]), h["entity"]["name"], h["entity"]["site"]]
+                for h in hits]
+
+    print(f"\nFormatting {len(hits)} hits")
+    print(f"  eager json.loads: {timed(eager, args.repeat * 10):8.3f} ms")
+    print(f"  lazy pass-through: {timed(lambda: format_hits(hits), args.repeat * 10):8.3f} ms")
+
+    client.drop_collection(COLLECTION)
+
+
+if __name__ == "__main__":
+    main()
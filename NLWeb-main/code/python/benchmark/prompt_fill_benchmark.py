@@ -0,0 +1,109 @@
+"""
+Microbenchmark for prompt assembly in core/prompts.py.
+
+Fills the ranking prompt from prompts.xml for one item, as Ranking does for
+every retrieved item, with:
+- the previous implementation: one str.replace over the whole prompt per variable
+- fill_prompt, which joins the precompiled segments of the template
+- find_prompt followed by fill_prompt, the full per-item path through the prompt index
+
+Usage (from the code/python directory):
+    python benchmark/prompt_fill_benchmark.py
+    python benchmark/prompt_fill_benchmark.py --prompt RankingPromptWithExplanation --site seriouseats
+"""
+
+import argparse
+import json
+import time
+import timeit
+from types import SimpleNamespace
+
+from core.prompts import fill_prompt, find_prompt, get_prompt_variables_from_prompt, init_prompts, logger
+from core.ranking import Ranking
+
+
+def legacy_variable_value(variable, handler):
+    """Variable lookup before resolvers were bound at compile time (if-chain with debug logging)."""
+    logger.debug(f"Getting value for variable: {variable}")
+    value = ""
+    if variable == "request.site":
+        if isinstance(handler.site, list):
+            value = handler.site
+    elif variable == "site.itemType":
+        value = handler.item_type.split("}")[1]
+    elif variable == "request.query":
+        if handler.state.is_decontextualization_done():
+            value = handler.decontextualized_query
+        elif len(handler.prev_queries) > 0:
+            value = handler.query + " previous queries: " + str(handler.prev_queries)
+        else:
+            value = handler.query
+    elif variable == "request.previousQueries":
+        value = str(handler.prev_queries)
+    elif variable == "request.itemType":
+        value = handler.item_type
+    elif variable == "request.rawQuery":
+        value = handler.query
+    logger.debug(f"Variable '{variable}' = '{str(value)[:100]}{'...' if len(str(value)) > 100 else ''}'")
+    return value
+
+
+def replace_fill(prompt_str, handler, pr_dict):
+    """fill_prompt before templates were compiled: one str.replace pass per variable."""
+    logger.debug(f"Filling prompt template (length: {len(prompt_str)})")
+    variables = get_prompt_variables_from_prompt(prompt_str)
+    logger.debug(f"Found {len(variables)} variables to fill")
+    for variable in variables:
+        value = pr_dict[variable] if variable in pr_dict else legacy_variable_value(variable, handler)
+        prompt_str = prompt_str.replace("{" + variable + "}", str(value))
+    logger.debug(f"Prompt filled successfully (final length: {len(prompt_str)})")
+    return prompt_str
+
+
+def make_handler(site):
+    state = SimpleNamespace(is_decontextualization_done=lambda: True)
+    return SimpleNamespace(site=site, query="spicy vegetarian dinner", prev_queries=["curry"],
+                           decontextualized_query="spicy vegetarian curry for dinner",
+                           item_type="{http://schema.org/}Recipe", state=state, context_url="",
+                           context_description="", last_answers=[], final_ranked_answers=[])
+
+
+def lookup_and_fill(site, handler, prompt_name, pr_dict):
+    prompt_str, _ = find_prompt(site, handler.item_type, prompt_name)
+    return fill_prompt(prompt_str, handler, pr_dict)
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Prompt fill microbenchmark")
+    parser.add_argument("--prompt", default=Ranking.RANKING_PROMPT_NAME)
+    parser.add_argument("--site", default="all")
+    parser.add_argument("--number", type=int, default=20000)
+    args = parser.parse_args()
+
+    handler = make_handler(args.site)
+    start = time.perf_counter()
+    index = init_prompts()
+    print(f"Indexed {len(index.prompts)} prompts in {(time.perf_counter() - start) * 1000:.1f} ms")
+    prompt_str, _ = find_prompt(args.site, handler.item_type, args.prompt)
+    if prompt_str is None:
+        prompt_str = Ranking.RANKING_PROMPT[0]
+        print(f"Prompt {args.prompt} not found, using the built-in ranking prompt")
+    description = json.dumps({"@type": "Recipe", "name": "Chana masala", "description": "x" * 1500})
+    pr_dict = {"item.description": description}
+
+    assert replace_fill(prompt_str, handler, pr_dict) == fill_prompt(prompt_str, handler, pr_dict)
+
+    print(f"Prompt {args.prompt}: {len(prompt_str)} chars, description {len(description)} chars")
+    variants = (
+        ("str.replace loop", lambda: replace_fill(prompt_str, handler, pr_dict)),
+        ("compiled template", lambda: fill_prompt(prompt_str, handler, pr_dict)),
+    )
+    if index.lookup(args.site, handler.item_type, args.prompt)[0] is not None:
+        variants += (("lookup and fill", lambda: lookup_and_fill(args.site, handler, args.prompt, pr_dict)),)
+    for label, func in variants:
+        seconds = min(timeit.repeat(func, number=args.number, repeat=3))
+        print(f"{label:<20}{seconds / args.number * 1e6:>8.2f} us/fill")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,112 @@
+"""
+Recall versus latency of int8 quantized search in the local vector index.
+
+Loads the same vectors into a float32 index and an int8 index, then for each
+oversampling factor reports recall@k of the int8 search (with float32
+rescoring) against the exact float32 results, the median search latency and
+the size of the vectors that are scanned.
+
+Vectors come from a binary embeddings container written by db_load
+(`--embeddings path/to/site`), or are synthetic clustered vectors by default.
+Queries are perturbed copies of random stored vectors.
+
+Usage (from the code/python directory):
+    python benchmark/quantization_eval.py
+    python benchmark/quantization_eval.py --embeddings ../data/embeddings/site --k 20
+"""
+
+import argparse
+import statistics
+import tempfile
+import time
+
+import numpy as np
+
+from data_loading.embedding_store import EmbeddingFileReader
+from retrieval_providers.utils.local_index import LocalVectorIndex
+
+
+def synthetic_vectors(count, dim, clusters=64, seed=0):
+    """Clustered vectors, closer to real embeddings than uniform noise."""
+    rng = np.random.default_rng(seed)
+    centers = rng.normal(size=(clusters, dim)).astype(np.float32)
+    return centers[rng.integers(clusters, size=count)] + 0.5 * rng.normal(size=(count, dim)).astype(np.float32)
+
+
+def load_vectors(args):
+    if args.embeddings:
+        reader = EmbeddingFileReader(args.embeddings)
+        vectors = np.asarray(reader.vectors[:args.docs] if args.docs else reader.vectors, dtype=np.float32)
+        print(f"Loaded {len(vectors)} x {reader.dimension} vectors from {reader.stem}")
+        return vectors
+    print(f"Generating {args.docs or 20000} synthetic {args.dim}-d vectors")
+    return synthetic_vectors(args.docs or 20000, args.dim)
+
+
+def build_index(path, vectors, num_sites, quantization=None):
+    index = LocalVectorIndex(path, quantization=quantization)
+    batch = 5000
+    for start in range(0, len(vectors), batch):
+        index.upsert([
+            {"url": f"https://example.com/{i}", "name": f"Item {i}", "site": f"site{i % num_sites}",
+             "schema_json": "{}", "embedding": vectors[i].tolist()}
+            for i in range(start, min(start + batch, len(vectors)))
+        ])
+    return index
+
+
+def timed_search(index, queries, k, sites, repeat):
+    """Median wall time per query in milliseconds, and the hits of the last run."""
+    times = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        hits = index.search(queries, k, sites)
+        times.append((time.perf_counter() - start) * 1000 / len(queries))
+    return statistics.median(times), hits
+
+
+def recall(expected, actual):
+    total = 0.0
+    for expected_hits, actual_hits in zip(expected, actual):
+        truth = {record["url"] for record, _score in expected_hits}
+        total += len(truth & {record["url"] for record, _score in actual_hits}) / max(len(truth), 1)
+    return total / len(expected)
+
+
+def main():
+    parser = argparse.ArgumentParser(description="int8 quantization recall/latency evaluation")
+    parser.add_argument("--embeddings", default=None, help="Binary embeddings container (default: synthetic data)")
+    parser.add_argument("--docs", type=int, default=0, help="Vectors to load (default: all, or 20000 synthetic)")
+    parser.add_argument("--dim", type=int, default=384, help="Dimension of synthetic vectors")
+    parser.add_argument("--sites", type=int, default=10, help="Number of distinct sites in the data")
+    parser.add_argument("--queries", type=int, default=32)
+    parser.add_argument("--k", type=int, default=50)
+    parser.add_argument("--oversampling", type=float, nargs="+", default=[1, 2, 4, 8])
+    parser.add_argument("--quantile", type=float, default=0.99)
+    parser.add_argument("--repeat", type=int, default=5)
+    args = parser.parse_args()
+
+    vectors = load_vectors(args)
+    rng = np.random.default_rng(1)
+    picks = rng.integers(len(vectors), size=args.queries)
+    queries = vectors[picks] + 0.1 * vectors.std() * rng.normal(size=(args.queries, vectors.shape[1]))
+
+    with tempfile.TemporaryDirectory() as directory:
+        exact_index = build_index(f"{directory}/float32", vectors, args.sites)
+        quantized_index = build_index(f"{directory}/int8", vectors, args.sites,
+                                      {"type": "int8", "quantile": args.quantile})
+        print(f"Scanned bytes: float32 {vectors.nbytes / 1e6:.1f} MB, int8 {vectors.size / 1e6:.1f} MB")
+
+        for label, sites in (("all sites", None), ("one site", ["site0"])):
+            exact_ms, expected = timed_search(exact_index, queries, args.k, sites, args.repeat)
+            print(f"\n=== {label}, k={args.k} ===")
+            print(f"{'variant':<22}{'recall@k':>10}{'ms/query':>10}")
+            print(f"{'float32 exact':<22}{1.0:>10.3f}{exact_ms:>10.2f}")
+            for oversampling in args.oversampling:
+                quantized_index.quantization["oversampling"] = oversampling
+                quantized_ms, actual = timed_search(quantized_index, queries, args.k, sites, args.repeat)
+                print(f"{f'int8 x{oversampling:g} rescore':<22}{recall(expected, actual):>10.3f}{quantized_ms:>10.2f}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,134 @@
+"""
+Counts JSON decodes of retrieval results on their way through one request.
+
+Two endpoints return overlapping results; they are aggregated, scored by the
+ranking prefilter, described for the ranking prompt, turned into ranked
+answers, and the top items are described again for the answer generator.
+The pipeline runs once with plain [url, json_str, name, site] lists and the
+previous per-stage parsing, and once with SearchResult records and the
+shared description cache. Each run reports json.loads calls per result item
+and the wall time.
+
+Usage (from the code/python directory):
+    python benchmark/result_parse_benchmark.py
+    python benchmark/result_parse_benchmark.py --results 50 --overlap 0.5 --requests 20
+"""
+
+import argparse
+import json
+import time
+
+import core.description_cache as description_cache
+from core.description_cache import DescriptionCache
+from core.keyword_index import schema_text
+from core.retriever import ResultAggregator
+from core.search_result import describe_result
+from core.utils.json_utils import merge_json_array, trim_json, trim_json_hard
+
+
+class CountingLoads:
+    def __init__(self):
+        self.calls = 0
+        self.loads = json.loads
+
+    def __call__(self, *args, **kwargs):
+        self.calls += 1
+        return self.loads(*args, **kwargs)
+
+
+def make_endpoint_rows(results, overlap):
+    """Two endpoints; the first `overlap` share of the second one's URLs are also in the first."""
+    def row(i, source):
+        schema = {"@type": "Recipe", "name": f"Dish {i}", "description": "Slow cooked " * 40,
+                  "recipeIngredient": [f"ingredient {n}" for n in range(15)], "image": f"{i}.jpg",
+                  "author": {"@type": "Person", "name": "Cook"}, "source": source}
+        return [f"https://example.com/{i}", json.dumps(schema), f"Dish {i}", "example"]
+
+    shared = int(results * overlap)
+    first = [row(i, "one") for i in range(results)]
+    second = [row(i, "two") for i in range(shared)] + [row(results + i, "two") for i in range(results - shared)]
+    return {"one": first, "two": second}
+
+
+def legacy_aggregate(endpoint_results, limit):
+    """ResultAggregator before records: merged rows are re-serialized and decoded again later."""
+    entries = {}
+    for results in endpoint_results.values():
+        for url, json_str, name, site in results:
+            entries.setdefault(url, [url, [], name, site])[1].append(json_str)
+    rows = []
+    for url, json_list, name, site in list(entries.values())[:limit]:
+        merged = json.dumps(merge_json_array(json_list)) if len(json_list) > 1 else json_list[0]
+        rows.append([url, merged, name, site])
+    return rows
+
+
+def legacy_pipeline(endpoint_results, limit, top):
+    rows = legacy_aggregate(endpoint_results, limit)
+    for url, json_str, name, site in rows:
+        schema_text(json_str)  # prefilter lexical overlap
+    answers = []
+    for url, json_str, name, site in rows:
+        str(trim_json(json_str))  # ranking prompt description
+        schema_object = json.loads(json_str)  # ranked answer
+        answers.append((url, json_str, schema_object))
+    for url, json_str, _ in answers[:top]:
+        str(trim_json_hard(json_str))  # answer generator prompt
+        json.loads(json_str)  # answer generator message
+
+
+def record_pipeline(endpoint_results, limit, top):
+    aggregator = ResultAggregator()
+    for name, results in endpoint_results.items():
+        aggregator.add(name, results)
+    rows = aggregator.results(limit)
+    for row in rows:
+        schema_text(describe_result(row).parsed)
+    answers = []
+    for row in rows:
+        item = describe_result(row)
+        item.description
+        answers.append((row, item.schema_object))
+    for row, _ in answers[:top]:
+        item = describe_result(row)
+        item.hard_description
+        item.parsed
+
+
+def run(pipeline, endpoint_results, args, counter):
+    description_cache._description_cache = DescriptionCache(max_items=args.cache_size)
+    counter.calls = 0
+    start = time.perf_counter()
+    for _ in range(args.requests):
+        pipeline(endpoint_results, args.results, args.top)
+    elapsed = (time.perf_counter() - start) * 1000 / args.requests
+    return counter.calls / args.requests, elapsed
+
+
+def main():
+    parser = argparse.ArgumentParser(description="JSON decodes per request, lists versus SearchResult records")
+    parser.add_argument("--results", type=int, default=50)
+    parser.add_argument("--overlap", type=float, default=0.3, help="Share of URLs returned by both endpoints")
+    parser.add_argument("--top", type=int, default=10, help="Items described again for the answer")
+    parser.add_argument("--requests", type=int, default=20)
+    parser.add_argument("--cache-size", type=int, default=5000)
+    args = parser.parse_args()
+
+    endpoint_results = make_endpoint_rows(args.results, args.overlap)
+    counter = CountingLoads()
+    json.loads = counter
+    try:
+        print(f"{args.results} results, {args.overlap:.0%} returned by both endpoints, {args.requests} requests")
+        print(f"{'pipeline':<22}{'loads/request':>15}{'loads/item':>12}{'ms/request':>12}")
+        for label, pipeline in (("lists, per-stage parse", legacy_pipeline), ("SearchResult records", record_pipeline)):
+            loads, ms = run(pipeline, endpoint_results, args, counter)
+            print(f"{label:<22}{loads:>15.1f}{loads / args.results:>12.2f}{ms:>12.2f}")
+        args.requests = 1
+        loads, ms = run(record_pipeline, endpoint_results, args, counter)
+        print(f"{'records, cold cache':<22}{loads:>15.1f}{loads / args.results:>12.2f}{ms:>12.2f}")
+    finally:
+        json.loads = counter.loads
+
+
+if __name__ == "__main__":
+    main()
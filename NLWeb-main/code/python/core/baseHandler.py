@@ -136,6 +136,8 @@ class NLWebHandler:
         self._send_lock = asyncio.Lock()
         
         self.fastTrackRanker = None
+        # The ranking in progress, which on_late_results adds items to
+        self.active_ranking = None
         self.headersSent = False  # Track if headers have been sent
         self.fastTrackWorked = False
         self.sites_in_embeddings_sent = False
@@ -409,7 +411,8 @@ class NLWebHandler:
                     self.decontextualized_query, 
                     self.site,
                     query_params=self.query_params,
-                    handler=self
+                    handler=self,
+                    late_results_callback=self.on_late_results
                 )
                 self.final_retrieved_items = items
                 logger.debug(f"Retrieved {len(items)} items from database")
@@ -417,6 +420,19 @@ class NLWebHandler:
         
         logger.info("Preparation phase completed")
 
+    def on_late_results(self, endpoint_name, rows):
+        """
+        Receive items from an endpoint that answered after a streaming search
+        returned. They are ranked by the ranking in progress, or by the next
+        one when ranking has not started yet.
+        """
+        if self.active_ranking is not None and self.active_ranking.add_items(rows):
+            logger.info(f"Ranking {len(rows)} late results from {endpoint_name}")
+        elif self.active_ranking is None:
+            self.final_retrieved_items.extend(rows)
+        else:
+            logger.info(f"Ignoring {len(rows)} late results from {endpoint_name}, results already sent")
+
     def decontextualizeQuery(self):
         logger.info("Determining decontextualization strategy")
         if (len(self.prev_queries) < 1):
@@ -56,6 +56,23 @@ class RetrievalProviderConfig:
     use_knn: Optional[bool] = None
     enabled: bool = False
     vector_type: Optional[Dict[str, Any]] = None
+    max_workers: Optional[int] = None  # Executor threads for providers with blocking SDKs
+    vector_index: Optional[Dict[str, Any]] = None  # ANN index settings (pgvector)
+    quantization: Optional[Dict[str, Any]] = None  # Quantized vector storage with full-precision rescoring
+
+@dataclass
+class RetrievalAggregationConfig:
+    mode: str = "gather"  # "gather" waits for every endpoint; "streaming" aggregates as endpoints finish
+    endpoint_deadline: Optional[float] = None  # Seconds after the first answer at which streaming returns what has arrived
+    min_endpoints: int = 1  # Endpoints that must answer before streaming may return early
+
+@dataclass
+class HybridSearchConfig:
+    enabled: bool = False  # Fuse BM25 keyword results with vector results
+    index_path: Optional[str] = None  # Keyword index file, maintained when documents are uploaded
+    rrf_k: int = 60  # Reciprocal rank fusion constant
+    keyword_results: int = 50  # Keyword hits fetched per query before fusion
+
 @dataclass
 class SSLConfig:
     enabled: bool = False
@@ -73,6 +90,15 @@ class StaticConfig:
     cache_max_age: int = 3600
     gzip_enabled: bool = True
 
+@dataclass
+class HTTPClientConfig:
+    limit: int = 100  # Total open connections across all hosts
+    limit_per_host: int = 20  # Open connections per host
+    keepalive_timeout: float = 30.0  # Seconds an idle pooled connection is kept
+    dns_cache_ttl: int = 300  # Seconds resolved addresses are cached
+    timeout: float = 30.0  # Default total request timeout
+    http2: bool = False  # Use HTTP/2 for httpx clients when the h2 package is installed
+
 @dataclass
 class ServerConfig:
     host: str = "localhost"
@@ -82,6 +108,7 @@ class ServerConfig:
     ssl: Optional[SSLConfig] = None
     logging: Optional[LoggingConfig] = None
     static: Optional[StaticConfig] = None
+    http_client: Optional[HTTPClientConfig] = None
 
 @dataclass
 class NLWebConfig:
@@ -98,6 +125,42 @@ class NLWebConfig:
     required_info_enabled: bool = True  # Enable or disable required info checking
     api_keys: Dict[str, str] = field(default_factory=dict)  # API keys for external services
 
+@dataclass
+class RankingPrefilterConfig:
+    enabled: bool = False  # Rank only the most promising retrieved items with the LLM
+    top_k: int = 25  # Most items forwarded to LLM ranking up front
+    min_forward: int = 10  # Fewest items forwarded, whatever the cutoff
+    cutoff_ratio: float = 0.5  # Adaptive cutoff as a fraction of the best prefilter score
+    lexical_weight: float = 0.3  # Weight of query/item word overlap against retrieval rank
+    min_items: int = 15  # Smaller result sets are ranked in full
+    tuning_log: Optional[str] = None  # JSONL file for per-site prefilter/LLM score pairs
+
+@dataclass
+class RankingCompletionConfig:
+    early_termination: bool = True  # Cancel outstanding ranking calls once the results are settled
+    settled_score: int = 90  # In summarize mode, sent results at or above this score are final
+    full_ranking_modes: List[str] = field(default_factory=list)  # generate_modes that always rank every item
+
+@dataclass
+class DescriptionCacheConfig:
+    enabled: bool = True  # Reuse parsed and trimmed item descriptions across requests
+    max_items: int = 5000  # Items kept, least recently used evicted first
+
+@dataclass
+class AnswerSynthesisConfig:
+    streaming: bool = True  # Stream the generate-mode answer when the LLM provider supports it
+    flush_interval: float = 0.05  # Seconds between answer delta messages sent to the client
+
+@dataclass
+class ToolRoutingConfig:
+    embedding_routing: bool = True  # Shortlist tools by embedding similarity before LLM scoring
+    shortlist_size: int = 3  # Tools scored by the LLM after shortlisting
+    min_similarity: float = 0.45  # Top similarity needed to route without the LLM
+    margin: float = 0.1  # Lead over the runner-up needed to route without the LLM
+    llm_free_tools: List[str] = field(default_factory=lambda: ["search"])  # Tools that need no extracted parameters
+    cache_ttl: float = 600  # Seconds a routing decision is reused (0 disables the cache)
+    cache_size: int = 2000
+
 @dataclass
 class ConversationStorageConfig:
     type: str  # "qdrant", "cosmos", "sqlite", "postgres", "mysql"
@@ -323,6 +386,23 @@ class AppConfig:
         # Get the write endpoint for database modifications
         self.write_endpoint: str = data.get("write_endpoint", None)
 
+        # How results from several enabled endpoints are combined
+        aggregation = data.get("aggregation") or {}
+        self.retrieval_aggregation = RetrievalAggregationConfig(
+            mode=aggregation.get("mode", "gather"),
+            endpoint_deadline=aggregation.get("endpoint_deadline"),
+            min_endpoints=aggregation.get("min_endpoints", 1)
+        )
+
+        # Keyword (BM25) index fused with vector results
+        hybrid = data.get("hybrid") or {}
+        self.retrieval_hybrid = HybridSearchConfig(
+            enabled=hybrid.get("enabled", False),
+            index_path=self._resolve_path(hybrid.get("index_path", "../data/keyword_index/index.json")),
+            rrf_k=hybrid.get("rrf_k", 60),
+            keyword_results=hybrid.get("keyword_results", 50)
+        )
+
         # Changed from providers to endpoints
         for name, cfg in data.get("endpoints", {}).items():
             # Use the new method for all configuration values
@@ -336,7 +416,10 @@ class AppConfig:
                 db_type=self._get_config_value(cfg.get("db_type")),  # Add db_type
                 enabled=cfg.get("enabled", False),  # Add enabled field
                 use_knn=cfg.get("use_knn"),
-                vector_type=cfg.get("vector_type")
+                vector_type=cfg.get("vector_type"),
+                max_workers=cfg.get("max_workers"),
+                vector_index=cfg.get("vector_index"),
+                quantization=cfg.get("quantization")
             )
     
     def load_webserver_config(self, path: str = "config_webserver.yaml"):
@@ -394,6 +477,17 @@ class AppConfig:
             gzip_enabled=self._get_config_value(static_data.get("gzip_enabled"), True)
         )
         
+        # Outgoing HTTP connection pool configuration
+        http_client_data = server_data.get("http_client", {}) or {}
+        http_client_config = HTTPClientConfig(
+            limit=self._get_config_value(http_client_data.get("limit"), 100),
+            limit_per_host=self._get_config_value(http_client_data.get("limit_per_host"), 20),
+            keepalive_timeout=self._get_config_value(http_client_data.get("keepalive_timeout"), 30.0),
+            dns_cache_ttl=self._get_config_value(http_client_data.get("dns_cache_ttl"), 300),
+            timeout=self._get_config_value(http_client_data.get("timeout"), 30.0),
+            http2=self._get_config_value(http_client_data.get("http2"), False)
+        )
+        
         # Create the server config
         self.server = ServerConfig(
             host=self._get_config_value(server_data.get("host"), "localhost"),
@@ -402,7 +496,8 @@ class AppConfig:
             timeout=self._get_config_value(server_data.get("timeout"), 30),
             ssl=ssl_config,
             logging=logging_config,
-            static=static_config
+            static=static_config,
+            http_client=http_client_config
         )
 
     def load_nlweb_config(self, path: str = "config_nlweb.yaml"):
@@ -502,6 +597,53 @@ class AppConfig:
             required_info_enabled=required_info_enabled,
             api_keys=api_keys
         )
+
+        # Cheap prefilter that decides which retrieved items are sent to LLM ranking
+        prefilter = data.get("ranking_prefilter") or {}
+        tuning_log = prefilter.get("tuning_log")
+        self.ranking_prefilter = RankingPrefilterConfig(
+            enabled=prefilter.get("enabled", False),
+            top_k=prefilter.get("top_k", 25),
+            min_forward=prefilter.get("min_forward", 10),
+            cutoff_ratio=prefilter.get("cutoff_ratio", 0.5),
+            lexical_weight=prefilter.get("lexical_weight", 0.3),
+            min_items=prefilter.get("min_items", 15),
+            tuning_log=self._resolve_path(tuning_log) if tuning_log else None
+        )
+
+        # When the ranking stage may stop outstanding LLM calls
+        completion = data.get("ranking_completion") or {}
+        self.ranking_completion = RankingCompletionConfig(
+            early_termination=completion.get("early_termination", True),
+            settled_score=completion.get("settled_score", 90),
+            full_ranking_modes=completion.get("full_ranking_modes") or []
+        )
+
+        # Parsed and trimmed item descriptions shared by the ranking prompts
+        description_cache = data.get("description_cache") or {}
+        self.description_cache = DescriptionCacheConfig(
+            enabled=description_cache.get("enabled", True),
+            max_items=description_cache.get("max_items", 5000)
+        )
+
+        # How generate mode delivers the synthesized answer
+        synthesis = data.get("answer_synthesis") or {}
+        self.answer_synthesis = AnswerSynthesisConfig(
+            streaming=synthesis.get("streaming", True),
+            flush_interval=synthesis.get("flush_interval", 0.05)
+        )
+
+        # Embedding shortlist and cache in front of the LLM tool selection
+        routing = data.get("tool_routing") or {}
+        self.tool_routing = ToolRoutingConfig(
+            embedding_routing=routing.get("embedding_routing", True),
+            shortlist_size=routing.get("shortlist_size", 3),
+            min_similarity=routing.get("min_similarity", 0.45),
+            margin=routing.get("margin", 0.1),
+            llm_free_tools=routing.get("llm_free_tools") or ["search"],
+            cache_ttl=routing.get("cache_ttl", 600),
+            cache_size=routing.get("cache_size", 2000)
+        )
     
     def get_chatbot_instructions(self, instruction_type: str = "search_results") -> str:
         """Get the chatbot instructions for a specific type."""
@@ -0,0 +1,129 @@
+# Copyright (c) 2025 Microsoft Corporation.
+# Licensed under the MIT License
+
+"""
+Process-wide cache of parsed and trimmed item descriptions.
+
+Every ranking call parses an item's schema JSON, trims it with trim_json and
+serializes the result into the prompt, and the same popular documents come
+back in many result sets. Entries are keyed by URL and a hash of the JSON
+string, so an item whose content changes in the index is parsed again.
+Cached objects are shared between requests and must not be modified.
+
+WARNING: This code is under development and may undergo changes in future releases.
+Backwards compatibility is not guaranteed at this time.
+"""
+
+import json
+import threading
+from collections import OrderedDict
+from typing import Any, Optional, Tuple
+
+from core.config import CONFIG, DescriptionCacheConfig
+from core.utils.json_utils import trim_json, trim_json_hard
+from misc.logger.logging_config_helper import get_configured_logger
+
+logger = get_configured_logger("ranking_engine")
+
+
+class ItemDescription:
+    """
+    The parsed schema JSON of an item, with its trimmed forms computed on
+    first use. description and hard_description are the text that goes into
+    prompts for trim_json and trim_json_hard respectively.
+    """
+    __slots__ = ("parsed", "_trimmed", "_description", "_hard_description")
+
+    def __init__(self, json_str: Any, parsed: Any = None):
+        if parsed is None:
+            parsed = json_str if isinstance(json_str, (dict, list)) else json.loads(json_str)
+        self.parsed = parsed
+        self._trimmed = None
+        self._description = None
+        self._hard_description = None
+
+    @property
+    def schema_object(self) -> Any:
+        """The parsed object, or its first element when the JSON is an array."""
+        if isinstance(self.parsed, list) and len(self.parsed) > 0:
+            return self.parsed[0]
+        return self.parsed
+
+    @property
+    def trimmed(self) -> Any:
+        if self._trimmed is None:
+            self._trimmed = trim_json(self.parsed)
+        return self._trimmed
+
+    @property
+    def description(self) -> str:
+        # fill_prompt inserts str(value), so store exactly that
+        if self._description is None:
+            self._description = str(self.trimmed)
+        return self._description
+
+    @property
+    def hard_description(self) -> str:
+        if self._hard_description is None:
+            self._hard_description = str(trim_json_hard(self.parsed))
+        return self._hard_description
+
+
+class DescriptionCache:
+    """Bounded LRU of ItemDescription by (url, hash of the JSON string)."""
+
+    def __init__(self, max_items: int):
+        self.max_items = max_items
+        self.hits = 0
+        self.misses = 0
+        self._entries: "OrderedDict[Tuple[str, int], ItemDescription]" = OrderedDict()
+        self._lock = threading.Lock()
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+    def get(self, url: str, json_str: Any, parsed: Any = None) -> ItemDescription:
+        """
+        The entry for an item, created on a miss. parsed, when the caller
+        already has the decoded JSON, saves parsing json_str.
+        """
+        if not isinstance(json_str, str) or self.max_items <= 0:
+            return ItemDescription(json_str, parsed)
+        key = (url, hash(json_str))
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is not None:
+                self._entries.move_to_end(key)
+                self.hits += 1
+                return entry
+            self.misses += 1
+        # Parse outside the lock; a concurrent miss on the same item only costs a second parse
+        entry = ItemDescription(json_str, parsed)
+        with self._lock:
+            self._entries[key] = entry
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.max_items:
+                self._entries.popitem(last=False)
+        return entry
+
+    def clear(self) -> None:
+        with self._lock:
+            self._entries.clear()
+            self.hits = self.misses = 0
+
+
+_description_cache: Optional[DescriptionCache] = None
+
+
+def get_description_cache() -> DescriptionCache:
+    global _description_cache
+    if _description_cache is None:
+        config = getattr(CONFIG, "description_cache", None) or DescriptionCacheConfig()
+        _description_cache = DescriptionCache(config.max_items if config.enabled else 0)
+        logger.info(f"Item description cache holds up to {_description_cache.max_items} items")
+    return _description_cache
+
+
+def describe_item(url: str, json_str: Any, parsed: Any = None) -> ItemDescription:
+    """The cached description of a retrieved item, parsing it on first use."""
+    return get_description_cache().get(url, json_str, parsed)
@@ -8,9 +8,12 @@ WARNING: This code is under development and may undergo changes in future releas
 Backwards compatibility is not guaranteed at this time.
 """
 
-from typing import Optional, List
+from typing import Optional, List, Dict, Any
 import asyncio
+import importlib
+import sys
 import threading
+import time
 
 from core.config import CONFIG
 from misc.logger.logging_config_helper import get_configured_logger, LogLevel
@@ -26,6 +29,94 @@ _provider_locks = {
     "elasticsearch": threading.Lock()
 }
 
+# Provider modules by embedding provider name, with the function that builds
+# the module's shared client (None for providers without a client object)
+_embedding_provider_modules = {
+    "openai": ("embedding_providers.openai_embedding", "get_async_client"),
+    "gemini": ("embedding_providers.gemini_embedding", "get_client"),
+    "azure_openai": ("embedding_providers.azure_oai_embedding", "get_azure_openai_client"),
+    "ollama": ("embedding_providers.ollama_embedding", "get_ollama_client"),
+    "snowflake": ("embedding_providers.snowflake_embedding", None),
+    "elasticsearch": ("embedding_providers.elasticsearch_embedding", "get_elasticsearch_embedding"),
+}
+
+# Mapping of embedding providers to the pip packages their modules import
+_embedding_provider_packages = {
+    "openai": "openai>=1.12.0",
+    "gemini": "google-genai>=0.7.1",
+    "azure_openai": "openai>=1.12.0",
+    "ollama": "ollama>=0.5.1",
+    "snowflake": "httpx>=0.28.1",
+    "elasticsearch": "elasticsearch[async]>=8,<9",
+}
+
+def preload() -> List[Dict[str, Any]]:
+    """
+    Import and instantiate every configured embedding provider.
+
+    A provider is configured if it is the preferred one or its API key or
+    endpoint is set, the same rule the LLM preload uses.
+
+    Returns:
+        One timing entry per provider with import and init times in seconds
+
+    Raises:
+        ValueError: Listing every provider whose module could not be imported
+    """
+    preferred = CONFIG.preferred_embedding_provider
+    providers = [name for name, cfg in CONFIG.embedding_providers.items()
+                 if name == preferred or cfg.api_key or cfg.endpoint]
+    if preferred not in providers:
+        providers.insert(0, preferred)
+
+    timings = []
+    errors = []
+    for provider in providers:
+        if provider not in _embedding_provider_modules:
+            if provider == preferred:
+                logger.warning(f"No embedding implementation to preload for provider '{provider}'")
+            continue
+        module_path, client_getter = _embedding_provider_modules[provider]
+
+        start = time.perf_counter()
+        try:
+            module = importlib.import_module(module_path)
+        except ImportError as e:
+            package = _embedding_provider_packages.get(provider, "")
+            error_msg = (f"Missing required package for {provider} embedding provider: {e}. "
+                         f"Install it with: pip install \"{package}\"")
+            logger.error(error_msg)
+            errors.append(error_msg)
+            continue
+        import_time = time.perf_counter() - start
+
+        start = time.perf_counter()
+        if client_getter:
+            try:
+                getattr(module, client_getter)()
+            except Exception as e:
+                logger.warning(f"Loaded {provider} embedding provider but could not create its client: {e}")
+        init_time = time.perf_counter() - start
+
+        logger.info(f"Preloaded {provider} embedding provider in {import_time + init_time:.3f}s")
+        timings.append({
+            "kind": "embedding",
+            "name": provider,
+            "type": provider,
+            "import_seconds": import_time,
+            "init_seconds": init_time,
+        })
+
+    if errors:
+        raise ValueError("\n    ".join(errors))
+    return timings
+
+async def close():
+    """Close long-lived embedding clients that hold their own connections."""
+    module = sys.modules.get("embedding_providers.elasticsearch_embedding")
+    if module is not None:
+        await module.close_elasticsearch_embeddings()
+
 async def get_embedding(
     text: str,
     provider: Optional[str] = None,
@@ -146,18 +237,15 @@ async def get_embedding(
 
         if provider == "elasticsearch":
             # Use Elasticsearch's embedding API
-            global elasticsearch_embedding
             logger.debug("Getting Elasticsearch embeddings")
-            from embedding_providers.elasticsearch_embedding import ElasticsearchEmbedding
-
-            elasticsearch_embedding = ElasticsearchEmbedding()
+            from embedding_providers.elasticsearch_embedding import get_elasticsearch_embedding
 
+            elasticsearch_embedding = get_elasticsearch_embedding(provider)
             result = await elasticsearch_embedding.get_embeddings(
                 text,
                 model=model_id,
                 timeout=timeout
             )
-            await elasticsearch_embedding.close()  # Ensure cleanup
 
             logger.debug(f"Elasticsearch embeddings received, count: {len(result)}")
             return result
@@ -188,7 +276,8 @@ async def batch_get_embeddings(
     texts: List[str],
     provider: Optional[str] = None,
     model: Optional[str] = None,
-    timeout: int = 60
+    timeout: int = 60,
+    query_params: Optional[dict] = None
 ) -> List[List[float]]:
     """
     Get embeddings for a batch of texts.
@@ -198,10 +287,18 @@ async def batch_get_embeddings(
         provider: Optional provider name, defaults to preferred_embedding_provider
         model: Optional model name, defaults to the provider's configured model
         timeout: Maximum time to wait for batch embedding response in seconds
+        query_params: Optional query parameters from HTTP request
         
     Returns:
         List of embedding vectors, each a list of floats
     """
+    # Same development mode override as get_embedding, so batched query
+    # vectors match the ones a single search would use
+    if CONFIG.is_development_mode() and query_params:
+        if 'embedding_provider' in query_params:
+            provider = query_params['embedding_provider']
+            logger.debug(f"Overriding embedding provider to: {provider}")
+    
     provider = provider or CONFIG.preferred_embedding_provider
     
     # Truncate texts to 20k characters to avoid token limit issues
@@ -293,16 +390,14 @@ async def batch_get_embeddings(
         if provider == "elasticsearch":
             # Use Elasticsearch's batch embedding API
             logger.debug("Getting Elasticsearch batch embeddings")
-            from embedding_providers.elasticsearch_embedding import ElasticsearchEmbedding
-    
-            elasticsearch_embedding = ElasticsearchEmbedding()
+            from embedding_providers.elasticsearch_embedding import get_elasticsearch_embedding
 
+            elasticsearch_embedding = get_elasticsearch_embedding(provider)
             result = await elasticsearch_embedding.get_batch_embeddings(
                 texts,
                 model=model_id,
                 timeout=timeout
             )
-            await elasticsearch_embedding.close()  # Ensure cleanup
 
             logger.debug(f"Elasticsearch batch embeddings received, count: {len(result)}")
             return result
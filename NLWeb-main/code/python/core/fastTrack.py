@@ -39,6 +39,11 @@ class FastTrack:
         logger.info("Query is eligible for fast track")
         return True
         
+    def on_late_results(self, endpoint_name, rows):
+        """Late items for the raw query are dropped once fast track has been aborted."""
+        if not self.handler.abort_fast_track_event.is_set():
+            self.handler.on_late_results(endpoint_name, rows)
+
     async def do(self):
         """Execute fast track processing"""
         if (not self.is_fastTrack_eligible()):
@@ -55,7 +60,8 @@ class FastTrack:
                 self.handler.query, 
                 self.handler.site,
                 query_params=self.handler.query_params,
-                handler=self.handler
+                handler=self.handler,
+                late_results_callback=self.on_late_results
             )
             self.handler.final_retrieved_items = items
             logger.info(f"Fast track retrieved {len(items)} items")
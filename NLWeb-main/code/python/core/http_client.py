@@ -0,0 +1,158 @@
+# Copyright (c) 2025 Microsoft Corporation.
+# Licensed under the MIT License
+
+"""
+Process-wide pool of outgoing HTTP connections.
+
+LLM, embedding and retrieval providers that talk HTTP directly get their
+aiohttp session or httpx client from here instead of opening one per call,
+so connections (and their TLS handshakes) are reused across requests.
+Pool limits, DNS caching and HTTP/2 come from the server.http_client section
+of config_webserver.yaml. The web server starts and closes the manager with
+its own lifecycle; other entry points get clients created lazily on first use
+and should call close_http_clients() before exiting. Sessions and their lock
+belong to the event loop they were created on, so they are rebuilt when the
+manager is used from a different loop (e.g. successive asyncio.run() calls).
+
+WARNING: This code is under development and may undergo changes in future releases.
+Backwards compatibility is not guaranteed at this time.
+"""
+
+import asyncio
+import importlib.util
+from typing import Optional
+
+from core.config import CONFIG, HTTPClientConfig
+from misc.logger.logging_config_helper import get_configured_logger
+
+logger = get_configured_logger("http_client")
+
+
+class HTTPClientManager:
+    """Owns the shared aiohttp session and httpx client for the process."""
+
+    def __init__(self, config: Optional[HTTPClientConfig] = None):
+        self._config = config
+        self._aiohttp_session = None
+        self._httpx_client = None
+        self._lock = None
+        # Event loop the lock and clients belong to, bound on first use
+        self._loop = None
+
+    @property
+    def config(self) -> HTTPClientConfig:
+        if self._config is None:
+            server_config = getattr(CONFIG, 'server', None)
+            self._config = getattr(server_config, 'http_client', None) or HTTPClientConfig()
+        return self._config
+
+    async def start(self):
+        """Create the shared clients eagerly (called on server startup)."""
+        await self.get_aiohttp_session()
+        await self.get_httpx_client()
+        logger.info(f"HTTP client pools started (limit={self.config.limit}, "
+                    f"limit_per_host={self.config.limit_per_host}, http2={self._http2_enabled()})")
+
+    def _bind_loop(self):
+        """Bind to the running loop, dropping clients created on another one."""
+        loop = asyncio.get_running_loop()
+        if self._loop is loop:
+            return
+        stale_loop = self._loop
+        stale_clients = (self._aiohttp_session, self._httpx_client)
+        self._loop = loop
+        self._lock = asyncio.Lock()
+        self._aiohttp_session = None
+        self._httpx_client = None
+        if stale_loop is not None and stale_loop.is_running():
+            # Release the old connections on the loop that owns them
+            asyncio.run_coroutine_threadsafe(self._close_clients(*stale_clients), stale_loop)
+
+    async def get_aiohttp_session(self):
+        """Return the shared aiohttp ClientSession, creating it if needed."""
+        self._bind_loop()
+        if self._aiohttp_session is not None and not self._aiohttp_session.closed:
+            return self._aiohttp_session
+        async with self._lock:
+            if self._aiohttp_session is None or self._aiohttp_session.closed:
+                import aiohttp
+                connector = aiohttp.TCPConnector(
+                    limit=self.config.limit,
+                    limit_per_host=self.config.limit_per_host,
+                    ttl_dns_cache=self.config.dns_cache_ttl,
+                    keepalive_timeout=self.config.keepalive_timeout,
+                    enable_cleanup_closed=True
+                )
+                self._aiohttp_session = aiohttp.ClientSession(
+                    connector=connector,
+                    timeout=aiohttp.ClientTimeout(total=self.config.timeout)
+                )
+        return self._aiohttp_session
+
+    async def get_httpx_client(self):
+        """Return the shared httpx AsyncClient, creating it if needed."""
+        self._bind_loop()
+        if self._httpx_client is not None and not self._httpx_client.is_closed:
+            return self._httpx_client
+        async with self._lock:
+            if self._httpx_client is None or self._httpx_client.is_closed:
+                import httpx
+                limits = httpx.Limits(
+                    max_connections=self.config.limit,
+                    max_keepalive_connections=self.config.limit_per_host,
+                    keepalive_expiry=self.config.keepalive_timeout
+                )
+                self._httpx_client = httpx.AsyncClient(
+                    limits=limits,
+                    timeout=self.config.timeout,
+                    http2=self._http2_enabled()
+                )
+        return self._httpx_client
+
+    def _http2_enabled(self) -> bool:
+        """HTTP/2 is only used if configured and the h2 package is installed."""
+        if not self.config.http2:
+            return False
+        if importlib.util.find_spec("h2") is None:
+            logger.warning("http2 is enabled for HTTP clients but the h2 package is not installed; using HTTP/1.1")
+            return False
+        return True
+
+    @staticmethod
+    async def _close_clients(aiohttp_session, httpx_client):
+        if aiohttp_session is not None and not aiohttp_session.closed:
+            await aiohttp_session.close()
+        if httpx_client is not None and not httpx_client.is_closed:
+            await httpx_client.aclose()
+
+    async def close(self):
+        """Close both clients and release their pooled connections."""
+        if self._loop is asyncio.get_running_loop():
+            await self._close_clients(self._aiohttp_session, self._httpx_client)
+        self._aiohttp_session = None
+        self._httpx_client = None
+        self._lock = None
+        self._loop = None
+        logger.info("HTTP client pools closed")
+
+
+# Process-wide manager
+_manager = HTTPClientManager()
+
+
+def get_http_client_manager() -> HTTPClientManager:
+    return _manager
+
+
+async def get_aiohttp_session():
+    """Shared aiohttp ClientSession for provider requests."""
+    return await _manager.get_aiohttp_session()
+
+
+async def get_httpx_client():
+    """Shared httpx AsyncClient for provider requests."""
+    return await _manager.get_httpx_client()
+
+
+async def close_http_clients():
+    await _manager.close()
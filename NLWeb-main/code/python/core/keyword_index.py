@@ -0,0 +1,283 @@
+# Copyright (c) 2025 Microsoft Corporation.
+# Licensed under the MIT License
+
+"""
+Local inverted index with BM25 scoring, used for hybrid retrieval.
+
+Vector search is weak at exact-name matches (titles, SKUs, organisation
+names). This index covers the name and the trimmed schema.org text of every
+uploaded document, so VectorDBClient can fuse its BM25 ranking with the
+vector results (see the hybrid section of config_retrieval.yaml).
+
+The index is updated whenever documents are uploaded or deleted through
+VectorDBClient, e.g. by data_loading/db_load.py, and is saved to a single
+JSON file. Other processes (the web server) reload it when the file changes.
+
+WARNING: This code is under development and may undergo changes in future releases.
+Backwards compatibility is not guaranteed at this time.
+"""
+
+import heapq
+import json
+import math
+import os
+import re
+import threading
+import time
+from collections import Counter
+from typing import Any, Dict, Iterable, List, Optional, Tuple
+
+from core.utils.json_utils import trim_json
+from misc.logger.logging_config_helper import get_configured_logger
+
+logger = get_configured_logger("keyword_index")
+
+# BM25 parameters
+K1 = 1.2
+B = 0.75
+
+# Name tokens are counted this many times, so title matches outweigh body text
+NAME_WEIGHT = 3
+
+# Minimum seconds between checks for a newer index file written by another process
+RELOAD_CHECK_INTERVAL = 2.0
+
+# Schema keys whose values are not useful search text
+_SKIPPED_KEYS = {"@context", "@id", "url", "image", "thumbnailUrl", "sameAs", "logo", "contentUrl", "embedUrl"}
+
+_TOKEN_RE = re.compile(r"\w+", re.UNICODE)
+
+
+def tokenize(text: str) -> List[str]:
+    """Lower-cased word tokens of a string."""
+    return _TOKEN_RE.findall(text.lower()) if text else []
+
+
+def schema_text(schema_json: Any) -> str:
+    """Concatenate the string values of a (trimmed) schema.org object."""
+    if isinstance(schema_json, str):
+        try:
+            schema_json = json.loads(schema_json)
+        except json.JSONDecodeError:
+            return schema_json
+    parts = []
+
+    def collect(value):
+        if isinstance(value, str):
+            if not value.startswith(("http://", "https://")):
+                parts.append(value)
+        elif isinstance(value, dict):
+            for key, item in value.items():
+                if key not in _SKIPPED_KEYS:
+                    collect(item)
+        elif isinstance(value, list):
+            for item in value:
+                collect(item)
+
+    collect(schema_json)
+    return " ".join(parts)
+
+
+def indexed_text(schema_json: Any) -> str:
+    """Search text of a document: schema_text of the trim_json form of each of its objects."""
+    if isinstance(schema_json, str):
+        try:
+            schema_json = json.loads(schema_json)
+        except json.JSONDecodeError:
+            return schema_json
+    objects = schema_json if isinstance(schema_json, list) else [schema_json]
+    return " ".join(schema_text(trim_json(obj) if isinstance(obj, dict) else obj) for obj in objects)
+
+
+class KeywordIndex:
+    """
+    Inverted index over documents keyed by URL, scored with BM25.
+
+    Each document keeps its [url, schema_json, name, site] row so keyword-only
+    hits can be returned without another database lookup.
+    """
+
+    def __init__(self, path: Optional[str] = None):
+        """
+        Args:
+            path: JSON file the index is saved to and loaded from (None for memory only)
+        """
+        self.path = path
+        self._lock = threading.RLock()
+        self._docs: Dict[str, Dict[str, Any]] = {}  # url -> {"row", "tf", "length"}
+        self._postings: Dict[str, Dict[str, int]] = {}  # term -> {url: term frequency}
+        self._site_urls: Dict[str, set] = {}
+        self._total_length = 0
+        self._dirty = False
+        self._loaded_mtime: Optional[float] = None
+        self._next_reload_check = 0.0
+        if path and os.path.exists(path):
+            self._load()
+
+    def __len__(self) -> int:
+        return len(self._docs)
+
+    def _add(self, url: str, row: List[str], tf: Dict[str, int]) -> None:
+        self._remove(url)
+        length = sum(tf.values())
+        self._docs[url] = {"row": row, "tf": tf, "length": length}
+        self._total_length += length
+        for term, count in tf.items():
+            self._postings.setdefault(term, {})[url] = count
+        self._site_urls.setdefault(row[3], set()).add(url)
+
+    def _remove(self, url: str) -> bool:
+        doc = self._docs.pop(url, None)
+        if doc is None:
+            return False
+        self._total_length -= doc["length"]
+        for term in doc["tf"]:
+            postings = self._postings.get(term)
+            if postings is not None:
+                postings.pop(url, None)
+                if not postings:
+                    del self._postings[term]
+        site_urls = self._site_urls.get(doc["row"][3])
+        if site_urls is not None:
+            site_urls.discard(url)
+            if not site_urls:
+                del self._site_urls[doc["row"][3]]
+        return True
+
+    def add_documents(self, documents: Iterable[Dict[str, Any]]) -> int:
+        """
+        Index uploaded documents (dicts with url, name, site and schema_json),
+        replacing earlier versions of the same URLs.
+
+        Returns:
+            Number of documents indexed
+        """
+        count = 0
+        with self._lock:
+            for doc in documents:
+                url = doc.get("url")
+                if not url:
+                    continue
+                name = doc.get("name") or ""
+                schema_json = doc.get("schema_json") or ""
+                tf = Counter(tokenize(indexed_text(schema_json)))
+                for token in tokenize(name):
+                    tf[token] += NAME_WEIGHT
+                self._add(url, [url, schema_json, name, doc.get("site") or ""], dict(tf))
+                count += 1
+            self._dirty = self._dirty or count > 0
+        return count
+
+    def delete_site(self, site: str) -> int:
+        """Remove every document for a site. Returns the number removed."""
+        with self._lock:
+            urls = list(self._site_urls.get(site, ()))
+            for url in urls:
+                self._remove(url)
+            self._dirty = self._dirty or bool(urls)
+            return len(urls)
+
+    def search(self, query: str, num_results: int = 50,
+               sites: Optional[Iterable[str]] = None) -> List[Tuple[List[str], float]]:
+        """
+        BM25-ranked documents for a query, optionally limited to some sites.
+
+        Returns:
+            Up to num_results ([url, schema_json, name, site], score) pairs, best first
+        """
+        with self._lock:
+            self.reload_if_changed()
+            if not self._docs:
+                return []
+            allowed = None
+            if sites is not None:
+                allowed = set()
+                for site in sites:
+                    allowed |= self._site_urls.get(site, set())
+                if not allowed:
+                    return []
+
+            doc_count = len(self._docs)
+            avg_length = self._total_length / doc_count or 1.0
+            scores: Dict[str, float] = {}
+            for term in set(tokenize(query)):
+                postings = self._postings.get(term)
+                if not postings:
+                    continue
+                idf = math.log(1 + (doc_count - len(postings) + 0.5) / (len(postings) + 0.5))
+                for url, tf in postings.items():
+                    if allowed is not None and url not in allowed:
+                        continue
+                    length = self._docs[url]["length"]
+                    norm = tf + K1 * (1 - B + B * length / avg_length)
+                    scores[url] = scores.get(url, 0.0) + idf * tf * (K1 + 1) / norm
+
+            best = heapq.nlargest(num_results, scores.items(), key=lambda item: item[1])
+            return [(self._docs[url]["row"], score) for url, score in best]
+
+    def save(self) -> None:
+        """Write the index to its file if it changed since the last save."""
+        with self._lock:
+            if not self.path or not self._dirty:
+                return
+            directory = os.path.dirname(self.path)
+            if directory:
+                os.makedirs(directory, exist_ok=True)
+            data = {"documents": [[doc["row"], doc["tf"]] for doc in self._docs.values()]}
+            tmp_path = self.path + ".tmp"
+            with open(tmp_path, "w", encoding="utf-8") as f:
+                json.dump(data, f)
+            os.replace(tmp_path, self.path)
+            self._dirty = False
+            self._loaded_mtime = os.path.getmtime(self.path)
+            logger.info(f"Saved keyword index with {len(self._docs)} documents to {self.path}")
+
+    def _load(self) -> None:
+        with open(self.path, "r", encoding="utf-8") as f:
+            data = json.load(f)
+        self._docs, self._postings, self._site_urls, self._total_length = {}, {}, {}, 0
+        for row, tf in data.get("documents", []):
+            self._add(row[0], row, tf)
+        self._dirty = False
+        self._loaded_mtime = os.path.getmtime(self.path)
+        logger.info(f"Loaded keyword index with {len(self._docs)} documents from {self.path}")
+
+    def reload_if_changed(self) -> None:
+        """
+        Pick up a newer file written by another process (unsaved local changes
+        win). The file is checked at most every RELOAD_CHECK_INTERVAL seconds.
+        """
+        if not self.path or self._dirty:
+            return
+        now = time.monotonic()
+        if now < self._next_reload_check:
+            return
+        self._next_reload_check = now + RELOAD_CHECK_INTERVAL
+        try:
+            mtime = os.path.getmtime(self.path)
+        except OSError:
+            return
+        if mtime != self._loaded_mtime:
+            with self._lock:
+                self._load()
+
+
+# Indexes by file path, shared within the process
+_indexes: Dict[str, KeywordIndex] = {}
+_indexes_lock = threading.Lock()
+
+
+def get_keyword_index(path: str) -> KeywordIndex:
+    """The shared KeywordIndex stored at path."""
+    with _indexes_lock:
+        if path not in _indexes:
+            _indexes[path] = KeywordIndex(path)
+        return _indexes[path]
+
+
+def save_keyword_indexes() -> None:
+    """Save every keyword index with unsaved changes (call before a loader exits)."""
+    with _indexes_lock:
+        indexes = list(_indexes.values())
+    for index in indexes:
+        index.save()
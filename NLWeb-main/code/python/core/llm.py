@@ -9,12 +9,11 @@ Backwards compatibility is not guaranteed at this time.
 
 """
 
-from typing import Optional, Dict, Any
+from typing import Optional, Dict, Any, List, Tuple, AsyncIterator
 from core.config import CONFIG
 import asyncio
-import threading
-import subprocess
-import sys
+import importlib
+import time
 
 
 from misc.logger.logging_config_helper import get_configured_logger, LogLevel
@@ -25,16 +24,65 @@ _loaded_providers = {}
 
 def init():
     """Initialize LLM providers based on configuration."""
-    # Get all configured LLM endpoints
+    preload()
+
+
+def preload() -> List[Dict[str, Any]]:
+    """
+    Import and instantiate the LLM provider of every configured endpoint.
+
+    An endpoint is configured if it is the preferred one or its API key or
+    endpoint is set; config_llm.yaml lists every supported provider, and
+    those without credentials cannot serve requests anyway. Runs at startup
+    so that no request pays for module imports or client construction.
+    Missing packages raise instead of being installed in the middle of a
+    request, after every endpoint has been tried.
+
+    Returns:
+        One timing entry per provider with import and init times in seconds
+
+    Raises:
+        ValueError: Listing every endpoint whose provider failed to load
+    """
+    timings = []
+    errors = []
     for endpoint_name, endpoint_config in CONFIG.llm_endpoints.items():
         llm_type = endpoint_config.llm_type
-        if llm_type and endpoint_name == CONFIG.preferred_llm_endpoint:
-            try:
-                # Use _get_provider which will load and cache the provider
-                _get_provider(llm_type)
-                logger.info(f"Successfully loaded {llm_type} provider")
-            except Exception as e:
-                logger.warning(f"Failed to load {llm_type} provider: {e}")
+        if not llm_type or llm_type in _loaded_providers:
+            continue
+        if endpoint_name != CONFIG.preferred_llm_endpoint \
+                and not (endpoint_config.api_key or endpoint_config.endpoint):
+            continue
+
+        start = time.perf_counter()
+        try:
+            provider_instance = _get_provider(llm_type)
+        except ValueError as e:
+            errors.append(f"{endpoint_name}: {e}")
+            continue
+        import_time = time.perf_counter() - start
+
+        start = time.perf_counter()
+        try:
+            provider_instance.get_client()
+        except Exception as e:
+            # A missing API key should not stop the server; the provider is
+            # still loaded and will report the problem on first use.
+            logger.warning(f"Loaded {llm_type} provider but could not create its client: {e}")
+        init_time = time.perf_counter() - start
+
+        timings.append({
+            "kind": "llm",
+            "name": endpoint_name,
+            "type": llm_type,
+            "import_seconds": import_time,
+            "init_seconds": init_time,
+        })
+        logger.info(f"Preloaded {llm_type} provider in {import_time + init_time:.3f}s")
+
+    if errors:
+        raise ValueError("\n    ".join(errors))
+    return timings
 
 # Mapping of LLM types to their required pip packages
 _llm_type_packages = {
@@ -50,6 +98,25 @@ _llm_type_packages = {
     "ollama": ["ollama>=0.5.1"],
 }
 
+# Import names for packages whose module name differs from the pip name
+_package_import_names = {
+    "google-cloud-aiplatform": "vertexai",
+}
+
+# Provider modules by LLM type; each module exposes a `provider` instance
+_llm_type_modules = {
+    "openai": "llm_providers.openai",
+    "anthropic": "llm_providers.anthropic",
+    "gemini": "llm_providers.gemini",
+    "azure_openai": "llm_providers.azure_oai",
+    "llama_azure": "llm_providers.azure_llama",
+    "deepseek_azure": "llm_providers.azure_deepseek",
+    "inception": "llm_providers.inception",
+    "snowflake": "llm_providers.snowflake",
+    "huggingface": "llm_providers.huggingface",
+    "ollama": "llm_providers.ollama",
+}
+
 # Cache for installed packages
 _installed_packages = set()
 
@@ -57,8 +124,14 @@ def _ensure_package_installed(llm_type: str):
     """
     Ensure the required packages for an LLM type are installed.
     
+    Packages are never installed at runtime; a missing package is reported
+    with the pip command needed to fix it.
+    
     Args:
         llm_type: The type of LLM provider
+        
+    Raises:
+        ValueError: If a required package cannot be imported
     """
     if llm_type not in _llm_type_packages:
         return
@@ -72,27 +145,14 @@ def _ensure_package_installed(llm_type: str):
             continue
             
         try:
-            # Try to import the package first
-            if package_name == "google-cloud-aiplatform":
-                __import__("vertexai")
-            elif package_name == "huggingface_hub":
-                __import__("huggingface_hub")
-            else:
-                __import__(package_name)
+            __import__(_package_import_names.get(package_name, package_name))
             _installed_packages.add(package_name)
             logger.debug(f"Package {package_name} is already installed")
         except ImportError:
-            # Package not installed, install it
-            logger.info(f"Installing {package} for {llm_type} provider...")
-            try:
-                subprocess.check_call([
-                    sys.executable, "-m", "pip", "install", package, "--quiet"
-                ])
-                _installed_packages.add(package_name)
-                logger.info(f"Successfully installed {package}")
-            except subprocess.CalledProcessError as e:
-                logger.error(f"Failed to install {package}: {e}")
-                raise ValueError(f"Failed to install required package {package} for {llm_type}")
+            error_msg = (f"Missing required package {package} for {llm_type} provider. "
+                         f"Install it with: pip install \"{package}\"")
+            logger.error(error_msg)
+            raise ValueError(error_msg)
 
 def _get_provider(llm_type: str):
     """
@@ -114,73 +174,26 @@ def _get_provider(llm_type: str):
     # Ensure required packages are installed
     _ensure_package_installed(llm_type)
     
-    # Import the appropriate provider module if not already loaded
+    if llm_type not in _llm_type_modules:
+        raise ValueError(f"Unknown LLM type: {llm_type}")
+    
+    # Import the provider module; only happens for providers not preloaded at startup
     try:
-        if llm_type == "openai":
-            from llm_providers.openai import provider as openai_provider
-            _loaded_providers[llm_type] = openai_provider
-        elif llm_type == "anthropic":
-            from llm_providers.anthropic import provider as anthropic_provider
-            _loaded_providers[llm_type] = anthropic_provider
-        elif llm_type == "gemini":
-            from llm_providers.gemini import provider as gemini_provider
-            _loaded_providers[llm_type] = gemini_provider
-        elif llm_type == "azure_openai":
-            from llm_providers.azure_oai import provider as azure_openai_provider
-            _loaded_providers[llm_type] = azure_openai_provider
-        elif llm_type == "llama_azure":
-            from llm_providers.azure_llama import provider as llama_provider
-            _loaded_providers[llm_type] = llama_provider
-        elif llm_type == "deepseek_azure":
-            from llm_providers.azure_deepseek import provider as deepseek_provider
-            _loaded_providers[llm_type] = deepseek_provider
-        elif llm_type == "inception":
-            from llm_providers.inception import provider as inception_provider
-            _loaded_providers[llm_type] = inception_provider
-        elif llm_type == "snowflake":
-            from llm_providers.snowflake import provider as snowflake_provider
-            _loaded_providers[llm_type] = snowflake_provider
-        elif llm_type == "huggingface":
-            from llm_providers.huggingface import provider as huggingface_provider
-            _loaded_providers[llm_type] = huggingface_provider
-        elif llm_type == "ollama":
-            from llm_providers.ollama import provider as ollama_provider
-            _loaded_providers[llm_type] = ollama_provider
-        else:
-            raise ValueError(f"Unknown LLM type: {llm_type}")
-            
+        module = importlib.import_module(_llm_type_modules[llm_type])
+        _loaded_providers[llm_type] = module.provider
         return _loaded_providers[llm_type]
     except ImportError as e:
         logger.error(f"Failed to import provider for {llm_type}: {e}")
         raise ValueError(f"Failed to load provider for {llm_type}: {e}")
 
-async def ask_llm(
-    prompt: str,
-    schema: Dict[str, Any],
-    provider: Optional[str] = None,
-    level: str = "low",
-    timeout: int = 8,
-    query_params: Optional[Dict[str, Any]] = None,
-    max_length: int = 512
-) -> Dict[str, Any]:
+def _resolve_llm_endpoint(
+    provider: Optional[str],
+    level: str,
+    query_params: Optional[Dict[str, Any]]
+) -> Optional[Tuple[str, str, str]]:
     """
-    Route an LLM request to the specified endpoint, with dispatch based on llm_type.
-    
-    Args:
-        prompt: The text prompt to send to the LLM
-        schema: JSON schema that the response should conform to
-        provider: The LLM endpoint to use (if None, use preferred endpoint from config)
-        level: The model tier to use ('low' or 'high')
-        timeout: Request timeout in seconds
-        query_params: Optional query parameters for development mode provider override
-        max_length: Maximum length of the response in tokens (default: 512)
-        
-    Returns:
-        Parsed JSON response from the LLM
-        
-    Raises:
-        ValueError: If the endpoint is unknown or response cannot be parsed
-        TimeoutError: If the request times out
+    The (endpoint name, llm_type, model id) a request goes to, or None if the
+    endpoint is not configured.
     """
     # Determine provider, with development mode override support
     provider_name = provider or CONFIG.preferred_llm_endpoint
@@ -199,20 +212,18 @@ async def ask_llm(
             level = override_level
             logger.debug(f"Development mode: LLM level overridden to {level}")
     logger.debug(f"Initiating LLM request with provider: {provider_name}, level: {level}")
-    logger.debug(f"Prompt preview: {prompt[:100]}...")
-    logger.debug(f"Schema: {schema}")
     
     if provider_name not in CONFIG.llm_endpoints:
         error_msg = f"Unknown provider '{provider_name}'"
         logger.error(error_msg)
-        return {}
+        return None
 
     # Get provider config using the helper method
     provider_config = CONFIG.get_llm_provider(provider_name)
     if not provider_config or not provider_config.models:
         error_msg = f"Missing model configuration for provider '{provider_name}'"
         logger.error(error_msg)
-        return {}
+        return None
 
     # Get llm_type for dispatch
     llm_type = provider_config.llm_type
@@ -220,6 +231,42 @@ async def ask_llm(
 
     model_id = getattr(provider_config.models, level)
     logger.debug(f"Using model: {model_id}")
+    return provider_name, llm_type, model_id
+
+async def ask_llm(
+    prompt: str,
+    schema: Dict[str, Any],
+    provider: Optional[str] = None,
+    level: str = "low",
+    timeout: int = 8,
+    query_params: Optional[Dict[str, Any]] = None,
+    max_length: int = 512
+) -> Dict[str, Any]:
+    """
+    Route an LLM request to the specified endpoint, with dispatch based on llm_type.
+    
+    Args:
+        prompt: The text prompt to send to the LLM
+        schema: JSON schema that the response should conform to
+        provider: The LLM endpoint to use (if None, use preferred endpoint from config)
+        level: The model tier to use ('low' or 'high')
+        timeout: Request timeout in seconds
+        query_params: Optional query parameters for development mode provider override
+        max_length: Maximum length of the response in tokens (default: 512)
+        
+    Returns:
+        Parsed JSON response from the LLM
+        
+    Raises:
+        ValueError: If the endpoint is unknown or response cannot be parsed
+        TimeoutError: If the request times out
+    """
+    resolved = _resolve_llm_endpoint(provider, level, query_params)
+    if resolved is None:
+        return {}
+    provider_name, llm_type, model_id = resolved
+    logger.debug(f"Prompt preview: {prompt[:100]}...")
+    logger.debug(f"Schema: {schema}")
     
     # Initialize variables for exception handling
     llm_type_for_error = llm_type
@@ -267,6 +314,78 @@ async def ask_llm(
         return {}
 
 
+def supports_streaming(provider: Optional[str] = None, level: str = "high",
+                       query_params: Optional[Dict[str, Any]] = None) -> bool:
+    """Whether stream_llm can be used with the endpoint a request would go to."""
+    resolved = _resolve_llm_endpoint(provider, level, query_params)
+    if resolved is None:
+        return False
+    try:
+        provider_instance = _get_provider(resolved[1])
+    except ValueError:
+        return False
+    return getattr(provider_instance, "supports_streaming", False)
+
+
+async def stream_llm(
+    prompt: str,
+    provider: Optional[str] = None,
+    level: str = "high",
+    timeout: int = 100,
+    query_params: Optional[Dict[str, Any]] = None,
+    max_length: int = 2048
+) -> AsyncIterator[str]:
+    """
+    Stream a plain-text completion as text deltas, in the order the model produces them.
+    
+    Unlike ask_llm, failures raise instead of returning an empty result,
+    because the caller may already have forwarded part of the output.
+    
+    Args:
+        prompt: The text prompt to send to the LLM
+        provider: The LLM endpoint to use (if None, use preferred endpoint from config)
+        level: The model tier to use ('low' or 'high')
+        timeout: Time in seconds for the whole stream
+        query_params: Optional query parameters for development mode provider override
+        max_length: Maximum length of the response in tokens
+        
+    Yields:
+        Non-empty text deltas
+        
+    Raises:
+        ValueError: If the endpoint is unknown or its provider cannot stream
+        asyncio.TimeoutError: If the stream does not finish within timeout
+    """
+    resolved = _resolve_llm_endpoint(provider, level, query_params)
+    if resolved is None:
+        raise ValueError(f"No LLM endpoint configured for provider '{provider or CONFIG.preferred_llm_endpoint}'")
+    provider_name, llm_type, model_id = resolved
+    provider_instance = _get_provider(llm_type)
+    if not getattr(provider_instance, "supports_streaming", False):
+        raise ValueError(f"LLM type {llm_type} does not support streaming")
+
+    loop = asyncio.get_running_loop()
+    deadline = loop.time() + timeout
+    stream = provider_instance.stream_completion(prompt, model=model_id, timeout=timeout, max_tokens=max_length)
+    logger.debug(f"Streaming completion from {provider_name} ({llm_type}, {model_id})")
+    try:
+        while True:
+            remaining = deadline - loop.time()
+            if remaining <= 0:
+                raise asyncio.TimeoutError()
+            try:
+                delta = await asyncio.wait_for(stream.__anext__(), remaining)
+            except StopAsyncIteration:
+                break
+            if delta:
+                yield delta
+    except asyncio.TimeoutError:
+        logger.error(f"LLM stream timed out after {timeout}s with provider {provider_name}")
+        raise
+    finally:
+        await stream.aclose()
+
+
 def get_available_providers() -> list:
     """
     Get a list of LLM providers that have their required API keys available.
@@ -0,0 +1,67 @@
+# Copyright (c) 2025 Microsoft Corporation.
+# Licensed under the MIT License
+
+"""
+Startup preload phase for LLM, embedding and retrieval providers.
+
+Everything a request needs from a provider (module imports, SDK clients,
+retrieval client instances) is created here, before the server accepts
+traffic. A provider whose packages are missing stops startup with the pip
+command that fixes it, instead of installing packages during a live request.
+
+WARNING: This code is under development and may undergo changes in future releases.
+Backwards compatibility is not guaranteed at this time.
+"""
+
+import time
+from typing import List, Dict, Any
+
+import core.llm as llm
+import core.embedding as embedding
+import core.retriever as retriever
+from misc.logger.logging_config_helper import get_configured_logger
+
+logger = get_configured_logger("preload")
+
+
+class ProviderPreloadError(RuntimeError):
+    """Raised when one or more configured providers cannot be loaded."""
+    pass
+
+
+def preload_providers() -> List[Dict[str, Any]]:
+    """
+    Preload every configured LLM, embedding and retrieval provider.
+
+    All three phases run even if one fails, so that a single startup reports
+    every missing package at once.
+
+    Returns:
+        Timing entries for each preloaded provider
+
+    Raises:
+        ProviderPreloadError: If any provider failed to load
+    """
+    timings = []
+    errors = []
+    start = time.perf_counter()
+
+    for phase_name, phase in (("llm", llm.preload),
+                              ("embedding", embedding.preload),
+                              ("retrieval", retriever.preload)):
+        try:
+            timings.extend(phase())
+        except Exception as e:
+            errors.append(f"{phase_name}: {e}")
+
+    total = time.perf_counter() - start
+    for entry in timings:
+        logger.info(
+            f"{entry['kind']:<10} {entry['name']:<25} {entry['type']:<25} "
+            f"import {entry['import_seconds'] * 1000:8.1f}ms  init {entry['init_seconds'] * 1000:8.1f}ms"
+        )
+    logger.info(f"Preloaded {len(timings)} providers in {total:.3f}s")
+
+    if errors:
+        raise ProviderPreloadError("Failed to preload providers:\n  " + "\n  ".join(errors))
+    return timings
@@ -12,6 +12,8 @@ Backwards compatibility is not guaranteed at this time.
 from xml.etree import ElementTree as ET
 import json 
 import os  # Add this import
+import threading
+import time
 from misc.logger.logging_config_helper import get_configured_logger
 from core.llm import ask_llm
 from core.config import CONFIG
@@ -27,23 +29,6 @@ BASE_NS = "http://nlweb.ai/base"
 # Also deals with filling in the prompt.
 # #Yet to do the subclass check.
 
-prompt_roots = []
-def init_prompts(files=["prompts.xml"]):
-    global prompt_roots
-    logger.info(f"Initializing prompts from files: {files}")
-    
-    for file in files:
-        # Create full path by joining the config directory with the filename
-        file_path = os.path.join(CONFIG.config_directory, file)
-        try:
-            logger.debug(f"Loading prompt file: {file_path}")
-            prompt_roots.append(ET.parse(file_path).getroot())
-            logger.debug(f"Successfully loaded prompt file: {file}")
-        except Exception as e:
-            logger.error(f"Failed to load prompt file '{file}': {str(e)}")
-            raise
-
-
 def super_class_of(child_class, parent_class):
     if parent_class == child_class:
         logger.debug(f"Class match: {child_class} == {parent_class}")
@@ -91,166 +76,271 @@ def extract_variables_from_prompt(prompt):
     logger.debug(f"Extracted variables: {variables}")
     return variables
 
-def get_prompt_variable_value(variable, handler):
-    logger.debug(f"Getting value for variable: {variable}")
-    
+def _request_site(handler):
     site = handler.site
-    query = handler.query
-    prev_queries = handler.prev_queries
-    value = ""
-
-    if variable == "request.site":
-        if (isinstance(site, list)):
-            value = site
-    elif variable == "site.itemType":
-        item_type = handler.item_type
-        value = item_type.split("}")[1]
-    elif variable == "request.query":
-        if (handler.state.is_decontextualization_done()):
-            value = handler.decontextualized_query
-        elif (len(prev_queries) > 0):
-            value = query + " previous queries: " + str(prev_queries)
-        else:
-            value = query
-    elif variable == "request.previousQueries":
-        value = str(prev_queries)
-    elif variable == "request.contextUrl":
-        value = handler.context_url
-    elif variable == "request.itemType":
-        value = handler.item_type
-    elif variable == "request.contextDescription":
-        value = handler.context_description
-    elif variable == "request.rawQuery":
-        value = query
-    elif variable == "request.prevAnswers":
-        # Get previous answers from handler - the attribute is named 'last_answers'
-        last_answers = getattr(handler, 'last_answers', [])
-        if last_answers:
-            value = str(last_answers)
-        else:
-            value = ""
-    elif variable == "request.answers":
-        value = str(handler.final_ranked_answers)
-    elif variable == "tool.description":
-        value = getattr(handler.tool, 'description', '')
-    elif variable == "tools.description":
-        value = getattr(handler.tools, 'description', '')
-    elif variable == "request.top_k":
-        value = str(getattr(handler, 'top_k', 3))
-    elif variable == "request.item_name":
-        value = getattr(handler, 'item_name', '')
-    elif variable == "request.details_requested":
-        value = getattr(handler, 'details_requested', '')
-    else:
+    return site if isinstance(site, list) else ""
+
+def _request_query(handler):
+    if (handler.state.is_decontextualization_done()):
+        return handler.decontextualized_query
+    elif (len(handler.prev_queries) > 0):
+        return handler.query + " previous queries: " + str(handler.prev_queries)
+    return handler.query
+
+# Resolvers for the variables a prompt can use, by variable name
+PROMPT_VARIABLE_RESOLVERS = {
+    "request.site": _request_site,
+    "site.itemType": lambda handler: handler.item_type.split("}")[1],
+    "request.query": _request_query,
+    "request.previousQueries": lambda handler: str(handler.prev_queries),
+    "request.contextUrl": lambda handler: handler.context_url,
+    "request.itemType": lambda handler: handler.item_type,
+    "request.contextDescription": lambda handler: handler.context_description,
+    "request.rawQuery": lambda handler: handler.query,
+    # Previous answers from handler - the attribute is named 'last_answers'
+    "request.prevAnswers": lambda handler: str(getattr(handler, 'last_answers', [])) if getattr(handler, 'last_answers', []) else "",
+    "request.answers": lambda handler: str(handler.final_ranked_answers),
+    "tool.description": lambda handler: getattr(handler.tool, 'description', ''),
+    "tools.description": lambda handler: getattr(handler.tools, 'description', ''),
+    "request.top_k": lambda handler: str(getattr(handler, 'top_k', 3)),
+    "request.item_name": lambda handler: getattr(handler, 'item_name', ''),
+    "request.details_requested": lambda handler: getattr(handler, 'details_requested', ''),
+}
+
+def _unknown_variable(variable):
+    def resolve(handler):
         logger.warning(f"Unknown variable: {variable}")
-        value = ""
-    
-    logger.debug(f"Variable '{variable}' = '{str(value)[:100]}{'...' if len(str(value)) > 100 else ''}'")
-    
-    
-    return value
+        return ""
+    return resolve
+
+def get_prompt_variable_value(variable, handler):
+    resolver = PROMPT_VARIABLE_RESOLVERS.get(variable) or _unknown_variable(variable)
+    return resolver(handler)
+
+class CompiledPrompt:
+    """
+    A prompt template split once into literal text and variable slots, so
+    filling it is a single join. literals has one more entry than slots:
+    literals[0] slots[0] literals[1] slots[1] ... literals[-1].
+    """
+    __slots__ = ("template", "literals", "slots", "resolvers", "variables")
+
+    def __init__(self, template):
+        self.template = template
+        self.literals = []
+        self.slots = []
+        # Same scan as extract_variables_from_prompt: from each '{' to the next '}'
+        literal_start = 0
+        start = 0
+        while True:
+            start = template.find('{', start)
+            if start == -1:
+                break
+            end = template.find('}', start)
+            if end == -1:
+                break
+            raw = template[start+1:end]
+            var = raw.strip()
+            # Only "{var}" without surrounding whitespace is substituted
+            if raw == var:
+                self.literals.append(template[literal_start:start])
+                self.slots.append(var)
+                literal_start = end + 1
+            start = end + 1
+        self.literals.append(template[literal_start:])
+        self.variables = set(self.slots)
+        self.resolvers = [PROMPT_VARIABLE_RESOLVERS.get(var) or _unknown_variable(var) for var in self.slots]
+
+    def fill(self, handler, pr_dict):
+        """Substitute every slot, computing each variable's value once and only if used."""
+        literals = self.literals
+        if not self.slots:
+            return literals[0]
+        values = {}
+        parts = [literals[0]]
+        for i, var in enumerate(self.slots):
+            value = values.get(var)
+            if value is None:
+                if var in pr_dict:
+                    value = pr_dict[var]
+                else:
+                    value = self.resolvers[i](handler)
+                # Ensure value is a string
+                if not isinstance(value, str):
+                    value = str(value)
+                values[var] = value
+            parts.append(value)
+            parts.append(literals[i + 1])
+        return "".join(parts)
+
+
+# Compiled templates by prompt text, filled by find_prompt and on first use
+compiled_prompts = {}
+def compile_prompt(prompt_str):
+    compiled = compiled_prompts.get(prompt_str)
+    if compiled is None:
+        compiled = CompiledPrompt(prompt_str)
+        compiled_prompts[prompt_str] = compiled
+    return compiled
 
 def fill_prompt(prompt_str, handler, pr_dict={}):
-    logger.debug(f"Filling prompt template (length: {len(prompt_str)})")
     try:
-        variables = get_prompt_variables_from_prompt(prompt_str)
-        logger.debug(f"Found {len(variables)} variables to fill")
-        for variable in variables:
-            if (variable in pr_dict):
-                value = pr_dict[variable]
-            else:
-                value = get_prompt_variable_value(variable, handler)
-            # Ensure value is a string
-            if not isinstance(value, str):
-                value = str(value)
-                
-            prompt_str = prompt_str.replace("{" + variable + "}", value)
-        
-        logger.debug(f"Prompt filled successfully (final length: {len(prompt_str)})")
-        return prompt_str
+        return compile_prompt(prompt_str).fill(handler, pr_dict)
     except Exception as e:
         logger.error(f"Error filling prompt: {str(e)}")
         logger.debug("Error details:", exc_info=True)
         raise
 
 
-cached_prompts = {}
-def get_cached_values(site, item_type, prompt_name):
-    cache_key = (site, item_type, prompt_name)
-    if cache_key in cached_prompts:
-        logger.debug(f"Cache hit for prompt: {cache_key}")
-        return cached_prompts[cache_key]
-    logger.debug(f"Cache miss for prompt: {cache_key}")
-    return None
-
-def find_prompt(site, item_type, prompt_name):  
-    if (site):
-        site = site[0]
-    if (prompt_roots == []):
-        logger.debug("Prompt roots not initialized, initializing now")
-        init_prompts()
-    
-    cached_values = get_cached_values(site, item_type, prompt_name)
-    if cached_values is not None:
-        logger.debug(f"Returning cached prompt for '{prompt_name}'")
-        return cached_values
-
-    BASE_NS = "http://nlweb.ai/base"
-    SITE_TAG = "{" + BASE_NS + "}Site"
-    PROMPT_TAG = "{" + BASE_NS + "}Prompt"
-    PROMPT_STRING_TAG = "{" + BASE_NS + "}promptString"
-    RETURN_STRUC_TAG = "{" + BASE_NS + "}returnStruc"
-    
-    # First, try to find a Site element matching the site parameter
-    site_element = None
-    prompt_element = None
-    
-    logger.debug(f"Searching for site element with ref='{site}'")
-    for root_element in prompt_roots:
-        for site_element in root_element.findall(SITE_TAG):
-            if site_element.get("ref") == site:
+SITE_TAG = "{" + BASE_NS + "}Site"
+ITEM_TAG = "{" + BASE_NS + "}Item"
+PROMPT_TAG = "{" + BASE_NS + "}Prompt"
+PROMPT_STRING_TAG = "{" + BASE_NS + "}promptString"
+RETURN_STRUC_TAG = "{" + BASE_NS + "}returnStruc"
+
+# Seconds between checks of the prompt files' modification times
+PROMPT_RELOAD_INTERVAL = 2.0
+
+
+def _parse_return_struc(prompt_element):
+    return_struc_element = prompt_element.find(RETURN_STRUC_TAG)
+    if return_struc_element is None or not return_struc_element.text:
+        return None
+    return_struc_text = return_struc_element.text.strip()
+    if return_struc_text == "":
+        return None
+    try:
+        return json.loads(return_struc_text)
+    except json.JSONDecodeError as e:
+        logger.error(f"Failed to parse return structure JSON for prompt '{prompt_element.get('ref')}': {e}")
+        return None
+
+
+def normalize_prompt_site(site):
+    """The site whose prompts apply: the first of a list of sites, or None."""
+    if isinstance(site, (list, tuple)):
+        site = site[0] if site else None
+    return site or None
+
+
+class PromptIndex:
+    """
+    Every prompt in the prompt files by (site, type, prompt name), with site
+    None for prompts that are not inside a Site element. Lookups follow the
+    fallback chain site and type, site and Item, type, Item; the result of
+    each lookup is cached. The index is rebuilt when a prompt file changes.
+    """
+
+    def __init__(self, files=["prompts.xml"], reload_interval=PROMPT_RELOAD_INTERVAL):
+        self.files = list(files)
+        self.reload_interval = reload_interval
+        self.roots = []
+        self.prompts = {}
+        self.resolved = {}
+        self.mtimes = {}
+        self._next_check = 0.0
+        self._lock = threading.Lock()
+        self.load()
+
+    def _paths(self):
+        return [os.path.join(CONFIG.config_directory, file) for file in self.files]
+
+    def load(self):
+        """Parse the prompt files and replace the index. Raises if a file cannot be parsed."""
+        roots, prompts, mtimes = [], {}, {}
+        for file_path in self._paths():
+            logger.debug(f"Loading prompt file: {file_path}")
+            mtimes[file_path] = os.path.getmtime(file_path)
+            root = ET.parse(file_path).getroot()
+            roots.append(root)
+            for child in root:
+                if child.tag == SITE_TAG:
+                    for type_element in child:
+                        self._add(prompts, child.get("ref"), type_element)
+                else:
+                    self._add(prompts, None, child)
+        # Swap in the new index in one step so concurrent lookups see either version
+        self.roots, self.prompts, self.resolved, self.mtimes = roots, prompts, {}, mtimes
+        logger.info(f"Indexed {len(prompts)} prompts from {self.files}")
+
+    @staticmethod
+    def _add(prompts, site, type_element):
+        # Later definitions of the same (site, type, name) replace earlier ones
+        for prompt_element in type_element.findall(PROMPT_TAG):
+            prompt_text = prompt_element.find(PROMPT_STRING_TAG).text
+            if prompt_text:
+                compile_prompt(prompt_text)
+            prompts[(site, type_element.tag, prompt_element.get("ref"))] = (prompt_text, _parse_return_struc(prompt_element))
+
+    def reload_if_changed(self):
+        """Rebuild the index if a prompt file was modified, at most once per reload_interval."""
+        now = time.monotonic()
+        if now < self._next_check:
+            return False
+        with self._lock:
+            if now < self._next_check:
+                return False
+            self._next_check = now + self.reload_interval
+            try:
+                changed = any(os.path.getmtime(path) != self.mtimes.get(path) for path in self._paths())
+            except OSError as e:
+                logger.warning(f"Could not check prompt files for changes: {e}")
+                return False
+            if not changed:
+                return False
+            logger.info("Prompt files changed, reloading")
+            try:
+                self.load()
+            except Exception as e:
+                logger.error(f"Failed to reload prompt files, keeping the previous prompts: {e}")
+                return False
+            return True
+
+    def lookup(self, site, item_type, prompt_name):
+        key = (site, item_type, prompt_name)
+        found = self.resolved.get(key)
+        if found is not None:
+            return found
+        prompts = self.prompts
+        chain = [(None, item_type), (None, ITEM_TAG)]
+        if site is not None:
+            chain = [(site, item_type), (site, ITEM_TAG)] + chain
+        found = (None, None)
+        for chain_site, chain_type in chain:
+            entry = prompts.get((chain_site, chain_type, prompt_name))
+            if entry is not None:
+                found = entry
                 break
-    
-    candidate_roots = []
-    if site_element is not None:
-        candidate_roots.append(site_element)
-    else:
-        candidate_roots = prompt_roots
-    
-    # If site element found, search for matching Type element within it
-    for candidate_root in candidate_roots:
-        for child in candidate_root:
-            if (super_class_of(item_type, child.tag)):
-                children = child.findall(PROMPT_TAG)
-                
-                for pe in children:
-                    if pe.get("ref") == prompt_name:
-                        prompt_element = pe
-                        break
-    
-    if prompt_element is not None:
-        prompt_text = prompt_element.find(PROMPT_STRING_TAG).text
-        return_struc_element = prompt_element.find(RETURN_STRUC_TAG)
-        
-        if return_struc_element is not None and return_struc_element.text:
-            return_struc_text = return_struc_element.text.strip()
-            if return_struc_text == "":
-                return_struc = None
-            else:
-                try:
-                    return_struc = json.loads(return_struc_text)
-                except json.JSONDecodeError as e:
-                    logger.error(f"Failed to parse return structure JSON: {e}")
-                    return_struc = None
         else:
-            return_struc = None
-        
-        cached_prompts[(site, item_type, prompt_name)] = (prompt_text, return_struc)
-        return prompt_text, return_struc
-    else:
-        logger.warning(f"Prompt '{prompt_name}' not found for site='{site}', item_type='{item_type}'")
-        cached_prompts[(site, item_type, prompt_name)] = (None, None)
-        return None, None
+            logger.warning(f"Prompt '{prompt_name}' not found for site='{site}', item_type='{item_type}'")
+        self.resolved[key] = found
+        return found
+
+
+prompt_index = None
+prompt_roots = []
+def init_prompts(files=["prompts.xml"]):
+    global prompt_index, prompt_roots
+    logger.info(f"Initializing prompts from files: {files}")
+    try:
+        prompt_index = PromptIndex(files)
+    except Exception as e:
+        logger.error(f"Failed to load prompt files {files}: {str(e)}")
+        raise
+    prompt_roots = prompt_index.roots
+    return prompt_index
+
+
+def find_prompt(site, item_type, prompt_name):
+    """The (prompt text, return structure) for a prompt, or (None, None) if there is none."""
+    index = prompt_index
+    if index is None:
+        logger.debug("Prompt index not initialized, initializing now")
+        index = init_prompts()
+    elif index.reload_if_changed():
+        global prompt_roots
+        prompt_roots = index.roots
+    return index.lookup(normalize_prompt_site(site), item_type, prompt_name)
 
 
 def get_prompt_variables_from_file(xml_file_path):
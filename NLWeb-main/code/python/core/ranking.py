@@ -8,12 +8,13 @@ WARNING: This code is under development and may undergo changes in future releas
 Backwards compatibility is not guaranteed at this time.
 """
 
-from core.utils.utils import log
+from core.utils.utils import log, get_param
+from core.config import CONFIG
 from core.llm import ask_llm
 import asyncio
-import json
-from core.utils.json_utils import trim_json
+from core.description_cache import describe_item
 from core.prompts import find_prompt, fill_prompt
+from core.ranking_prefilter import RankingPrefilter
 from misc.logger.logging_config_helper import get_configured_logger
 
 logger = get_configured_logger("ranking_engine")
@@ -61,6 +62,54 @@ The user's question is: {request.query}. The item's description is {item.descrip
         self.rankedAnswers = []
         self.ranking_type = ranking_type
         self._results_lock = asyncio.Lock()  # Add lock for thread-safe operations
+        self.prefilter = RankingPrefilter()
+        self.early_termination = self._early_termination_enabled()
+        self._tasks = []
+        self._prompt_tokens = {}  # url -> estimated prompt tokens
+        self.ranking_settled = False
+        self.cancelled_calls = 0
+        self.tokens_saved = 0
+        # Items from endpoints that answered after retrieval returned (add_items)
+        self._late_tasks = []
+        self.accepting_items = True
+
+    def _early_termination_enabled(self):
+        """Early termination applies unless disabled in config or for this mode/request."""
+        completion = CONFIG.ranking_completion
+        if not completion.early_termination:
+            return False
+        if get_param(self.handler.query_params, "full_ranking", bool, "false"):
+            return False
+        return getattr(self.handler, "generate_mode", "none") not in completion.full_ranking_modes
+
+    def isSettled(self):
+        """
+        True once no outstanding item can change the outcome. In list mode the
+        sent set is final when NUM_RESULTS_TO_SEND results are sent. In summarize
+        mode the summary uses the top NUM_RESULTS_TO_SEND answers, which are
+        treated as final once that many score at least settled_score.
+        """
+        if getattr(self.handler, "generate_mode", "none") == "summarize":
+            settled_score = CONFIG.ranking_completion.settled_score
+            settled = [r for r in self.rankedAnswers if r["ranking"]["score"] >= settled_score]
+            return len(settled) >= self.NUM_RESULTS_TO_SEND
+        return self.num_results_sent >= self.NUM_RESULTS_TO_SEND
+
+    def cancelOutstandingRanking(self):
+        """Cancel the ranking calls that have not finished once the results are settled."""
+        if not self.early_termination or self.ranking_settled or not self.isSettled():
+            return
+        self.ranking_settled = True
+        current = asyncio.current_task()
+        for task, (url, json_str) in self._tasks:
+            if task is current or task.done():
+                continue
+            task.cancel()
+            self.cancelled_calls += 1
+            self.tokens_saved += self._prompt_tokens.get(url, len(json_str) // 4)
+        if self.cancelled_calls:
+            logger.info(f"Results settled with {len(self.rankedAnswers)} items ranked, cancelled {self.cancelled_calls} "
+                        f"ranking calls (~{self.tokens_saved} prompt tokens saved)")
 
     async def rankItem(self, url, json_str, name, site):
         if not self.handler.connection_alive_event.is_set():
@@ -73,20 +122,17 @@ The user's question is: {request.query}. The item's description is {item.descrip
         try:
             logger.debug(f"Ranking item: {name} from {site}")
             prompt_str, ans_struc = self.get_ranking_prompt()
-            description = trim_json(json_str)
-            prompt = fill_prompt(prompt_str, self.handler, {"item.description": description})
+            item = describe_item(url, json_str)
+            prompt = fill_prompt(prompt_str, self.handler, {"item.description": item.description})
+            self._prompt_tokens[url] = len(prompt) // 4
             
             logger.debug(f"Sending ranking request to LLM for item: {name}")
             ranking = await ask_llm(prompt, ans_struc, level="low", query_params=self.handler.query_params)
             logger.debug(f"Received ranking score: {ranking.get('score', 'N/A')} for item: {name}")
             
             
-            # Handle both string and dictionary inputs for json_str
-            schema_object = json_str if isinstance(json_str, dict) else json.loads(json_str)
-            
-            # If schema_object is an array, set it to the first item
-            if isinstance(schema_object, list) and len(schema_object) > 0:
-                schema_object = schema_object[0]
+            # Parsed once per item and shared through the description cache
+            schema_object = item.schema_object
             
             ansr = {
                 'url': url,
@@ -116,6 +162,7 @@ The user's question is: {request.query}. The item's description is {item.descrip
             async with self._results_lock:  # Use lock when modifying shared state
                 self.rankedAnswers.append(ansr)
             logger.debug(f"Item {name} added to ranked answers")
+            self.cancelOutstandingRanking()
         
         except Exception as e:
             logger.error(f"Error in rankItem for {name}: {str(e)}")
@@ -230,14 +277,42 @@ The user's question is: {request.query}. The item's description is {item.descrip
                 logger.warning("Client disconnected when sending sites message")
                 self.handler.connection_alive_event.clear()
     
-    async def do(self):
-        logger.info(f"Starting ranking process with {len(self.items)} items")
+    def rankItems(self, items):
+        """Start one ranking task per item."""
         tasks = []
-        for url, json_str, name, site in self.items:
+        for url, json_str, name, site in items:
+            if self.ranking_settled:
+                break
             if self.handler.connection_alive_event.is_set():  # Only add new tasks if connection is still alive
-                tasks.append(asyncio.create_task(self.rankItem(url, json_str, name, site)))
+                task = asyncio.create_task(self.rankItem(url, json_str, name, site))
+                self._tasks.append((task, (url, json_str)))
+                tasks.append(task)
             else:
                 logger.warning("Connection lost, not creating new ranking tasks")
+        return tasks
+
+    def add_items(self, items) -> bool:
+        """
+        Rank items that arrived after ranking started, e.g. from a retrieval
+        endpoint that answered after the streaming deadline. Returns False once
+        the final results are being sent, when the items are no longer ranked.
+        """
+        if not self.accepting_items or self.ranking_settled:
+            return False
+        self._late_tasks.extend(self.rankItems(items))
+        return True
+
+    async def _rank_late_items(self):
+        while self._late_tasks:
+            tasks, self._late_tasks = self._late_tasks, []
+            await asyncio.gather(*tasks, return_exceptions=True)
+
+    async def do(self):
+        logger.info(f"Starting ranking process with {len(self.items)} items")
+        self.handler.active_ranking = self
+        query = self.handler.decontextualized_query or self.handler.query
+        forwarded, reserve, prefilter_scores = self.prefilter.split(query, self.items)
+        tasks = self.rankItems(forwarded)
        
         await self.sendMessageOnSitesBeingAsked(self.items)
 
@@ -247,6 +322,23 @@ The user's question is: {request.query}. The item's description is {item.descrip
         except Exception as e:
             logger.error(f"Error during ranking tasks: {str(e)}")
             log(f"Error during ranking tasks: {str(e)}")
+        await self._rank_late_items()
+
+        # Rank the prefilter reserve only if too few items passed the threshold
+        reserve_used = False
+        num_good = len([r for r in self.rankedAnswers if r['ranking']['score'] > 51])
+        if reserve and num_good < self.NUM_RESULTS_TO_SEND and not self.ranking_settled \
+                and self.handler.connection_alive_event.is_set():
+            logger.info(f"Only {num_good} items scored above 51, ranking {len(reserve)} reserve items")
+            reserve_used = True
+            try:
+                await asyncio.gather(*self.rankItems(reserve), return_exceptions=True)
+            except Exception as e:
+                logger.error(f"Error during reserve ranking tasks: {str(e)}")
+        await self._rank_late_items()
+        self.accepting_items = False
+        self.prefilter.record(self.handler.site, query, self.ranking_type_str, prefilter_scores,
+                              forwarded, self.rankedAnswers, reserve_used)
 
         if not self.handler.connection_alive_event.is_set():
             logger.warning("Connection lost during ranking, skipping sending results")
@@ -0,0 +1,144 @@
+# Copyright (c) 2025 Microsoft Corporation.
+# Licensed under the MIT License
+
+"""
+Cheap relevance prefilter for the ranking stage.
+
+Retrieval returns about 50 items and most of the lower half never reaches the
+final score threshold, yet each one costs an LLM call. The prefilter scores
+items from their retrieval position and their word overlap with the query,
+forwards the most promising ones to LLM ranking and keeps the rest as a
+reserve that Ranking only ranks when too few items pass the threshold.
+
+WARNING: This code is under development and may undergo changes in future releases.
+Backwards compatibility is not guaranteed at this time.
+"""
+
+import json
+import os
+import threading
+import time
+from typing import Any, Dict, List, Optional, Sequence, Tuple
+
+from core.config import CONFIG, RankingPrefilterConfig
+from core.keyword_index import schema_text, tokenize
+from core.search_result import describe_result
+from misc.logger.logging_config_helper import get_configured_logger
+
+logger = get_configured_logger("ranking_engine")
+
+# Query words that carry no signal for overlap scoring
+_STOPWORDS = {
+    "a", "an", "and", "are", "at", "be", "by", "can", "for", "from", "have", "how", "i", "in",
+    "is", "it", "me", "my", "of", "on", "or", "some", "that", "the", "to", "what", "which",
+    "with", "you", "any", "find", "show", "give", "want", "looking", "need", "good", "best",
+}
+
+_tuning_lock = threading.Lock()
+
+
+def lexical_overlap(query_terms: set, name: str, json_str: Any) -> float:
+    """
+    Share of query terms found in an item, between 0 and 1. A term in the
+    item's name counts fully, a term only in the schema text counts half.
+    """
+    if not query_terms:
+        return 0.0
+    name_terms = set(tokenize(name))
+    missing = query_terms - name_terms
+    body_hits = len(missing & set(tokenize(schema_text(json_str)))) if missing else 0
+    return (len(query_terms) - len(missing) + 0.5 * body_hits) / len(query_terms)
+
+
+def _decoded_schema(item: Sequence[Any]) -> Any:
+    # Decoded through the description cache, so ranking does not parse the item again
+    try:
+        return describe_result(item).parsed
+    except ValueError:
+        return item[1]
+
+
+class RankingPrefilter:
+    """Splits retrieved items into those ranked up front and a reserve."""
+
+    def __init__(self, config: Optional[RankingPrefilterConfig] = None):
+        self.config = config or getattr(CONFIG, "ranking_prefilter", None) or RankingPrefilterConfig()
+
+    @property
+    def enabled(self) -> bool:
+        return self.config.enabled
+
+    def scores(self, query: str, items: Sequence[Sequence[Any]]) -> List[float]:
+        """
+        Prefilter score of each item, in item order. Retrieval order stands in
+        for the vector similarity, which the retrieval clients do not return.
+        """
+        count = len(items)
+        weight = self.config.lexical_weight
+        query_terms = {term for term in tokenize(query) if term not in _STOPWORDS}
+        scores = []
+        for position, item in enumerate(items):
+            rank_score = 1.0 - position / count
+            if weight and query_terms:
+                overlap = lexical_overlap(query_terms, item[2], _decoded_schema(item))
+                scores.append((1 - weight) * rank_score + weight * overlap)
+            else:
+                scores.append(rank_score)
+        return scores
+
+    def split(self, query: str, items: Sequence[Sequence[Any]]) -> Tuple[list, list, Dict[str, float]]:
+        """
+        Choose the items for LLM ranking.
+
+        Returns:
+            (forwarded items, reserve items, prefilter score by URL); both lists
+            are ordered best first
+        """
+        if not self.config.enabled or len(items) < self.config.min_items:
+            return list(items), [], {}
+
+        scores = self.scores(query, items)
+        order = sorted(range(len(items)), key=lambda i: scores[i], reverse=True)
+        cutoff = scores[order[0]] * self.config.cutoff_ratio
+        above_cutoff = sum(1 for i in order if scores[i] >= cutoff)
+        forward_count = max(self.config.min_forward, min(self.config.top_k, above_cutoff))
+
+        forwarded = [items[i] for i in order[:forward_count]]
+        reserve = [items[i] for i in order[forward_count:]]
+        score_by_url = {items[i][0]: scores[i] for i in order}
+        logger.info(f"Prefilter forwarding {len(forwarded)} of {len(items)} items to LLM ranking "
+                    f"(cutoff {cutoff:.3f}, reserve {len(reserve)})")
+        return forwarded, reserve, score_by_url
+
+    def record(self, site: Any, query: str, ranking_type: str, score_by_url: Dict[str, float],
+               forwarded: Sequence[Sequence[Any]], ranked_answers: Sequence[Dict[str, Any]],
+               reserve_used: bool) -> None:
+        """
+        Append one line of calibration data: the prefilter score, the LLM score
+        (None when the item was never ranked) and the stage of every item.
+        """
+        path = self.config.tuning_log
+        if not path or not score_by_url:
+            return
+        llm_scores = {answer["url"]: answer["ranking"].get("score") for answer in ranked_answers}
+        forwarded_urls = {item[0] for item in forwarded}
+        entry = {
+            "time": time.time(),
+            "site": site,
+            "query": query,
+            "ranking_type": ranking_type,
+            "reserve_used": reserve_used,
+            "items": [
+                [round(score, 4), llm_scores.get(url), "forwarded" if url in forwarded_urls else "reserve"]
+                for url, score in score_by_url.items()
+            ],
+        }
+        try:
+            with _tuning_lock:
+                directory = os.path.dirname(path)
+                if directory:
+                    os.makedirs(directory, exist_ok=True)
+                with open(path, "a", encoding="utf-8") as f:
+                    f.write(json.dumps(entry) + "\n")
+        except OSError as e:
+            logger.warning(f"Could not write ranking prefilter tuning data to {path}: {e}")
@@ -9,8 +9,7 @@ This module provides abstract base classes and concrete implementations for data
 import os
 import time
 import asyncio
-import subprocess
-import sys
+import importlib
 from abc import ABC, abstractmethod
 from typing import List, Dict, Any, Optional, Union, Tuple, Type
 import json
@@ -20,6 +19,9 @@ from core.utils.utils import get_param
 from misc.logger.logging_config_helper import get_configured_logger
 from misc.logger.logger import LogLevel
 from core.utils.json_utils import merge_json_array
+from core.description_cache import describe_item
+from core.search_result import SearchResult, as_search_results
+from core.keyword_index import get_keyword_index
 
 logger = get_configured_logger("retriever")
 
@@ -27,53 +29,126 @@ logger = get_configured_logger("retriever")
 _client_cache = {}
 _client_cache_lock = asyncio.Lock()
 
-# Preloaded client modules
+# Preloaded client classes by db_type
 _preloaded_modules = {}
 
+# Client classes by database type, as (module path, class name)
+_db_type_clients = {
+    "azure_ai_search": ("retrieval_providers.azure_search_client", "AzureSearchClient"),
+    "milvus": ("retrieval_providers.milvus_client", "MilvusVectorClient"),
+    "opensearch": ("retrieval_providers.opensearch_client", "OpenSearchClient"),
+    "qdrant": ("retrieval_providers.qdrant", "QdrantVectorClient"),
+    "snowflake_cortex_search": ("retrieval_providers.snowflake_client", "SnowflakeCortexSearchClient"),
+    "elasticsearch": ("retrieval_providers.elasticsearch_client", "ElasticsearchClient"),
+    "postgres": ("retrieval_providers.postgres_client", "PgVectorClient"),
+    "shopify_mcp": ("retrieval_providers.shopify_mcp", "ShopifyMCPClient"),
+    "cloudflare_autorag": ("retrieval_providers.cf_autorag_client", "CloudflareAutoRAGClient"),
+    "local_index": ("retrieval_providers.local_index_client", "LocalIndexClient"),
+}
+
 def init():
     """Initialize retrieval clients based on configuration."""
-    # Preload modules for enabled endpoints
-    for endpoint_name, endpoint_config in CONFIG.retrieval_endpoints.items():
-        if endpoint_config.enabled and endpoint_config.db_type:
-            db_type = endpoint_config.db_type
-            try:
-                # Ensure packages are installed
-                _ensure_package_installed(db_type)
-                
-                # Preload the module
-                if db_type == "azure_ai_search":
-                    from retrieval_providers.azure_search_client import AzureSearchClient
-                    _preloaded_modules[db_type] = AzureSearchClient
-                elif db_type == "milvus":
-                    from retrieval_providers.milvus_client import MilvusVectorClient
-                    _preloaded_modules[db_type] = MilvusVectorClient
-                elif db_type == "opensearch":
-                    from retrieval_providers.opensearch_client import OpenSearchClient
-                    _preloaded_modules[db_type] = OpenSearchClient
-                elif db_type == "qdrant":
-                    from retrieval_providers.qdrant import QdrantVectorClient
-                    _preloaded_modules[db_type] = QdrantVectorClient
-                elif db_type == "snowflake_cortex_search":
-                    from retrieval_providers.snowflake_client import SnowflakeCortexSearchClient
-                    _preloaded_modules[db_type] = SnowflakeCortexSearchClient
-                elif db_type == "elasticsearch":
-                    from retrieval_providers.elasticsearch_client import ElasticsearchClient
-                    _preloaded_modules[db_type] = ElasticsearchClient
-                elif db_type == "postgres":
-                    from retrieval_providers.postgres_client import PgVectorClient
-                    _preloaded_modules[db_type] = PgVectorClient
-                elif db_type == "shopify_mcp":
-                    from retrieval_providers.shopify_mcp import ShopifyMCPClient
-                    _preloaded_modules[db_type] = ShopifyMCPClient
-                elif db_type == "cloudflare_autorag":
-                    from code.python.retrieval_providers.cf_autorag_client import (
-                        CloudflareAutoRAGClient,
-                    )
+    preload()
 
-                    _preloaded_modules[db_type] = CloudflareAutoRAGClient
 
-            except Exception as e:
-                logger.warning(f"Failed to preload {db_type} client module: {e}")
+def _load_client_class(db_type: str) -> Type:
+    """
+    Return the client class for a database type, importing it on first use.
+    
+    Raises:
+        ValueError: If the type is unknown or its packages are missing
+    """
+    if db_type in _preloaded_modules:
+        return _preloaded_modules[db_type]
+    if db_type not in _db_type_clients:
+        raise ValueError(f"Unsupported database type: {db_type}")
+    
+    _ensure_package_installed(db_type)
+    module_path, class_name = _db_type_clients[db_type]
+    try:
+        module = importlib.import_module(module_path)
+    except ImportError as e:
+        logger.error(f"Failed to import client for {db_type}: {e}")
+        raise ValueError(f"Failed to load client for {db_type}: {e}")
+    _preloaded_modules[db_type] = getattr(module, class_name)
+    return _preloaded_modules[db_type]
+
+
+def preload() -> List[Dict[str, Any]]:
+    """
+    Import and instantiate a client for every enabled retrieval endpoint.
+    
+    Clients are stored in the shared client cache, so request handling only
+    does a dictionary lookup. The write endpoint is preloaded as well.
+    
+    Returns:
+        One timing entry per endpoint with import and init times in seconds
+        
+    Raises:
+        ValueError: Listing every endpoint whose packages are missing or whose
+            client class cannot be imported
+    """
+    timings = []
+    errors = []
+    endpoint_names = [name for name, cfg in CONFIG.retrieval_endpoints.items() if cfg.enabled]
+    if CONFIG.write_endpoint and CONFIG.write_endpoint not in endpoint_names \
+            and CONFIG.write_endpoint in CONFIG.retrieval_endpoints:
+        endpoint_names.append(CONFIG.write_endpoint)
+    
+    for endpoint_name in endpoint_names:
+        db_type = CONFIG.retrieval_endpoints[endpoint_name].db_type
+        if not db_type:
+            continue
+        cache_key = f"{db_type}_{endpoint_name}"
+        if cache_key in _client_cache:
+            continue
+        
+        start = time.perf_counter()
+        try:
+            client_class = _load_client_class(db_type)
+        except ValueError as e:
+            errors.append(f"{endpoint_name}: {e}")
+            continue
+        import_time = time.perf_counter() - start
+        
+        start = time.perf_counter()
+        try:
+            _client_cache[cache_key] = client_class(endpoint_name)
+        except Exception as e:
+            # Missing credentials or an unreachable backend should not block
+            # startup; get_client will retry when the endpoint is used.
+            logger.warning(f"Loaded {db_type} client class but could not create client for {endpoint_name}: {e}")
+        init_time = time.perf_counter() - start
+        
+        timings.append({
+            "kind": "retrieval",
+            "name": endpoint_name,
+            "type": db_type,
+            "import_seconds": import_time,
+            "init_seconds": init_time,
+        })
+        logger.info(f"Preloaded {db_type} client for {endpoint_name} in {import_time + init_time:.3f}s")
+    
+    if errors:
+        raise ValueError("\n    ".join(errors))
+    return timings
+
+async def prepare_vector_indexes() -> None:
+    """
+    Create or verify the ANN indexes of the retrieval clients that manage
+    their own (those with a prepare_vector_index method, e.g. postgres).
+    
+    Runs after preload at server startup and at the end of db_load, so that
+    index builds and query plan checks never run inside a search request.
+    Failures are logged by the clients and do not stop startup.
+    """
+    for cache_key, client in list(_client_cache.items()):
+        prepare = getattr(client, "prepare_vector_index", None)
+        if prepare is None:
+            continue
+        start = time.perf_counter()
+        await prepare()
+        logger.info(f"Prepared vector index for {cache_key} in {time.perf_counter() - start:.1f}s")
 
 # Mapping of database types to their required pip packages
 _db_type_packages = {
@@ -86,6 +161,15 @@ _db_type_packages = {
     "postgres": ["psycopg", "psycopg[binary]>=3.1.12", "psycopg[pool]>=3.2.0", "pgvector>=0.4.0"],
     "shopify_mcp": ["aiohttp>=3.8.0"],
     "cloudflare_autorag": ['cloudflare>=4.3.1', "httpx>=0.28.1", "zon>=3.0.0", "markdown>=3.8.2", "beautifulsoup4>=4.13.4"],
+    "local_index": ["numpy"],
+}
+
+# Import names for packages whose module name differs from the pip name
+_package_import_names = {
+    "azure-core": "azure.core",
+    "azure-search-documents": "azure.search.documents",
+    "qdrant-client": "qdrant_client",
+    "beautifulsoup4": "bs4",
 }
 
 # Cache for installed packages
@@ -95,8 +179,14 @@ def _ensure_package_installed(db_type: str):
     """
     Ensure the required packages for a database type are installed.
     
+    Packages are never installed at runtime; a missing package is reported
+    with the pip command needed to fix it.
+    
     Args:
         db_type: The type of database backend
+        
+    Raises:
+        ValueError: If a required package cannot be imported
     """
     if db_type not in _db_type_packages:
         return
@@ -110,33 +200,14 @@ def _ensure_package_installed(db_type: str):
             continue
             
         try:
-            # Try to import the package first
-            if package_name == "azure-core":
-                __import__("azure.core")
-            elif package_name == "azure-search-documents":
-                __import__("azure.search.documents")
-            elif package_name == "qdrant-client":
-                __import__("qdrant_client")
-            elif package_name == "elasticsearch":
-                __import__("elasticsearch")
-            elif package_name == "psycopg":
-                __import__("psycopg")
-            else:
-                __import__(package_name)
+            __import__(_package_import_names.get(package_name, package_name))
             _installed_packages.add(package_name)
             logger.debug(f"Package {package_name} is already installed")
         except ImportError:
-            # Package not installed, install it
-            logger.info(f"Installing {package} for {db_type} backend...")
-            try:
-                subprocess.check_call([
-                    sys.executable, "-m", "pip", "install", package, "--quiet"
-                ])
-                _installed_packages.add(package_name)
-                logger.info(f"Successfully installed {package}")
-            except subprocess.CalledProcessError as e:
-                logger.error(f"Failed to install {package}: {e}")
-                raise ValueError(f"Failed to install required package {package} for {db_type}")
+            error_msg = (f"Missing required package {package} for {db_type} backend. "
+                         f"Install it with: pip install \"{package}\"")
+            logger.error(error_msg)
+            raise ValueError(error_msg)
 
 
 class VectorDBClientInterface(ABC):
@@ -236,6 +307,116 @@ class VectorDBClientInterface(ABC):
         return None
 
 
+def reciprocal_rank_fusion(ranked_lists: List[List[List[str]]], k: int = 60,
+                           limit: Optional[int] = None) -> List[List[str]]:
+    """
+    Fuse several ranked result lists by reciprocal rank (sum of 1 / (k + rank)).
+    
+    Rows are identified by URL; the row from the earliest list containing a
+    URL is the one returned.
+    """
+    scores: Dict[str, float] = {}
+    rows: Dict[str, List[str]] = {}
+    for results in ranked_lists:
+        for rank, row in enumerate(results, start=1):
+            url = row[0]
+            scores[url] = scores.get(url, 0.0) + 1.0 / (k + rank)
+            rows.setdefault(url, row)
+    ordered = sorted(scores, key=scores.get, reverse=True)
+    return [rows[url] for url in ordered[:limit]]
+
+
+class ResultAggregator:
+    """
+    Collects search results from several endpoints, deduplicated by URL.
+    
+    Endpoint result lists can be added one at a time as they arrive. Rows are
+    produced by interleaving the endpoints in arrival order so each endpoint's
+    relevance ordering is preserved. When a URL comes back from more than one
+    endpoint its JSON is merged, but only for rows that are actually returned,
+    so results past the requested limit never pay for the merge.
+    """
+    
+    def __init__(self):
+        self._endpoint_results: Dict[str, List[List[str]]] = {}
+        # {url: {"url", "json_list", "name", "site", "merged", "parsed"}}
+        self._entries: Dict[str, Dict[str, Any]] = {}
+    
+    @property
+    def unique_count(self) -> int:
+        return len(self._entries)
+    
+    def add(self, endpoint_name: str, results: Optional[List[List[str]]]) -> List[str]:
+        """
+        Add one endpoint's results.
+        
+        Returns:
+            URLs that had not been seen from any earlier endpoint
+        """
+        results = results or []
+        self._endpoint_results.setdefault(endpoint_name, []).extend(results)
+        new_urls = []
+        for result in results:
+            if len(result) < 4:  # Ensure we have [url, json, name, site]
+                continue
+            url, json_data, name, site = result[0], result[1], result[2], result[3]
+            entry = self._entries.get(url)
+            if entry is None:
+                self._entries[url] = {
+                    "url": url,
+                    "json_list": [json_data] if json_data else [],
+                    "name": name,
+                    "site": site,
+                    "merged": None,
+                    "parsed": None
+                }
+                new_urls.append(url)
+            elif json_data:
+                entry["json_list"].append(json_data)
+                entry["merged"] = None
+        return new_urls
+    
+    def row(self, url: str) -> SearchResult:
+        """The [url, json_str, name, site] row for a URL, merging its JSON if needed."""
+        entry = self._entries[url]
+        if entry["merged"] is None:
+            json_list = entry["json_list"]
+            entry["parsed"] = None
+            if len(json_list) > 1:
+                merged = merge_json_array(json_list)
+                entry["merged"] = json.dumps(merged)
+                entry["parsed"] = merged
+                # Register the merged object so nothing downstream decodes the new string again
+                describe_item(url, entry["merged"], merged)
+            else:
+                entry["merged"] = json_list[0] if json_list else "{}"
+        return SearchResult(entry["url"], entry["merged"], entry["name"], entry["site"], entry["parsed"])
+    
+    def results(self, limit: Optional[int] = None) -> List[List[str]]:
+        """Interleaved, deduplicated rows, at most limit of them."""
+        final_results = []
+        seen_urls = set()
+        iterators = [iter(results) for results in self._endpoint_results.values() if results]
+        
+        while iterators and (limit is None or len(final_results) < limit):
+            exhausted = []
+            for iterator in iterators:
+                result = next(iterator, None)
+                if result is None:
+                    exhausted.append(iterator)
+                    continue
+                url = result[0] if len(result) >= 1 else None
+                if url and url not in seen_urls and url in self._entries:
+                    seen_urls.add(url)
+                    final_results.append(self.row(url))
+                    if limit is not None and len(final_results) >= limit:
+                        break
+            for iterator in exhausted:
+                iterators.remove(iterator)
+        
+        return final_results
+
+
 class VectorDBClient:
     """
     Unified client for vector database operations. This class routes operations to the appropriate
@@ -336,6 +517,9 @@ class VectorDBClient:
         
         self._retrieval_lock = asyncio.Lock()
         
+        # Searches still running after a streaming search returned early
+        self._late_tasks = set()
+        
         # Cache for endpoint sites - will be populated lazily
         self._endpoint_sites_cache: Dict[str, Optional[List[str]]] = {}
         
@@ -442,6 +626,9 @@ class VectorDBClient:
             return True
         elif db_type == "cloudflare_autorag":
             return bool(config.api_key)
+        elif db_type == "local_index":
+            # In-process index stored under database_path, no service to connect to
+            return True
         else:
             logger.warning(f"Unknown database type {db_type} for endpoint {name}")
             return False
@@ -471,54 +658,11 @@ class VectorDBClient:
             if cache_key in _client_cache:
                 return _client_cache[cache_key]
             
-            # Ensure required packages are installed
-            _ensure_package_installed(db_type)
-            
-            # Create the appropriate client with dynamic imports
+            # Normally the client was created by preload() at startup; this
+            # path covers endpoints selected per request in development mode
             logger.debug(f"Creating new client for {db_type} with endpoint {endpoint_name}")
-            
-            try:
-                # Use preloaded module if available, otherwise load on demand
-                if db_type in _preloaded_modules:
-                    client_class = _preloaded_modules[db_type]
-                    client = client_class(endpoint_name)
-                elif db_type == "azure_ai_search":
-                    from retrieval_providers.azure_search_client import AzureSearchClient
-                    client = AzureSearchClient(endpoint_name)
-                elif db_type == "milvus":
-                    from retrieval_providers.milvus_client import MilvusVectorClient
-                    client = MilvusVectorClient(endpoint_name)
-                elif db_type == "opensearch":
-                    from retrieval_providers.opensearch_client import OpenSearchClient
-                    client = OpenSearchClient(endpoint_name)
-                elif db_type == "qdrant":
-                    from retrieval_providers.qdrant import QdrantVectorClient
-                    client = QdrantVectorClient(endpoint_name)
-                elif db_type == "snowflake_cortex_search":
-                    from retrieval_providers.snowflake_client import SnowflakeCortexSearchClient
-                    client = SnowflakeCortexSearchClient(endpoint_name)
-                elif db_type == "cloudflare_autorag":
-                    from retrieval_providers.cf_autorag_client import (
-                        CloudflareAutoRAGClient,
-                    )
-
-                    client = CloudflareAutoRAGClient(endpoint_name)
-                elif db_type == "elasticsearch":
-                    from retrieval_providers.elasticsearch_client import ElasticsearchClient
-                    client = ElasticsearchClient(endpoint_name)
-                elif db_type == "postgres":
-                    from retrieval_providers.postgres_client import PgVectorClient
-                    client = PgVectorClient(endpoint_name)
-                elif db_type == "shopify_mcp":
-                    from retrieval_providers.shopify_mcp import ShopifyMCPClient
-                    client = ShopifyMCPClient(endpoint_name)
-                else:
-                    error_msg = f"Unsupported database type: {db_type}"
-                    logger.error(error_msg)
-                    raise ValueError(error_msg)
-            except ImportError as e:
-                logger.error(f"Failed to import client for {db_type}: {e}")
-                raise ValueError(f"Failed to load client for {db_type}: {e}")
+            client_class = _load_client_class(db_type)
+            client = client_class(endpoint_name)
             
             # Store in cache and return
             _client_cache[cache_key] = client
@@ -549,7 +693,8 @@ class VectorDBClient:
         # Return deduplicated results
         return list(url_to_result.values())
     
-    def _aggregate_results(self, endpoint_results: Dict[str, List[List[str]]]) -> List[List[str]]:
+    def _aggregate_results(self, endpoint_results: Dict[str, List[List[str]]],
+                           limit: Optional[int] = None) -> List[List[str]]:
         """
         Aggregate results from multiple endpoints, merging JSON data for duplicate URLs.
         
@@ -558,97 +703,139 @@ class VectorDBClient:
         
         Args:
             endpoint_results: Dictionary mapping endpoint names to their results
+            limit: Optional maximum number of results; JSON is only merged for these
             
         Returns:
             Aggregated results with merged JSON for duplicate URLs
         """
-        # Dictionary to store aggregated data by URL
-        # Format: {url: {"result": [url, json_array, name, site], "sources": [json1, json2...]}}
-        url_to_data = {}
-        
-        # First pass: collect all results and group by URL
+        aggregator = ResultAggregator()
         for endpoint_name, results in endpoint_results.items():
             if results:
                 logger.debug(f"Got {len(results)} results from {endpoint_name}")
-                
-                for result in results:
-                    if len(result) >= 4:  # Ensure we have [url, json, name, site]
-                        url = result[0]
-                        json_data = result[1]
-                        name = result[2]
-                        site = result[3]
-                        
-                        if url not in url_to_data:
-                            # First occurrence of this URL
-                            url_to_data[url] = {
-                                "url": url,
-                                "json_list": [json_data] if json_data else [],
-                                "name": name,
-                                "site": site,
-                                "first_endpoint": endpoint_name
-                            }
-                        else:
-                            # URL already seen, append JSON data
-                            if json_data:
-                                url_to_data[url]["json_list"].append(json_data)
-        
-        # Second pass: build final results maintaining order from first endpoint
-        # We'll interleave to preserve relevance ordering
-        final_results = []
-        seen_urls = set()
-        
-        # Create iterators for each endpoint's results
-        iterators = {}
-        for endpoint_name, results in endpoint_results.items():
-            if results:
-                iterators[endpoint_name] = iter(results)
+            aggregator.add(endpoint_name, results)
         
-        # Interleave results to maintain relevance ordering
-        while iterators:
-            endpoints_to_remove = []
-            
-            for endpoint_name, iterator in iterators.items():
-                try:
-                    result = next(iterator)
-                    if len(result) >= 1:
-                        url = result[0]
-                        if url and url not in seen_urls:
-                            seen_urls.add(url)
-                            # Get the aggregated data for this URL
-                            data = url_to_data.get(url)
-                            if data:
-                                # Merge JSON data if multiple sources
-                                json_list = data["json_list"]
-                                if len(json_list) > 1:
-                                    # Multiple sources - merge them
-                                    merged_json = merge_json_array(json_list)
-                                    # Convert back to JSON string
-                                    merged_json_str = json.dumps(merged_json)
-                                else:
-                                    # Single source - use as is
-                                    merged_json_str = json_list[0] if json_list else "{}"
-                                
-                                # Create result with merged JSON
-                                merged_result = [
-                                    data["url"],
-                                    merged_json_str,  # Single merged JSON string
-                                    data["name"],
-                                    data["site"]
-                                ]
-                                final_results.append(merged_result)
-                except StopIteration:
-                    endpoints_to_remove.append(endpoint_name)
-            
-            # Remove exhausted iterators
-            for endpoint in endpoints_to_remove:
-                del iterators[endpoint]
+        final_results = aggregator.results(limit)
         
         # Calculate total results safely
         total_results = sum(len(r) for r in endpoint_results.values() if r is not None)
-        logger.info(f"Aggregated {total_results} total results into {len(final_results)} unique URLs")
+        logger.info(f"Aggregated {total_results} total results into {aggregator.unique_count} unique URLs")
         
         return final_results
     
+    def _task_results(self, endpoint_name: str, task: asyncio.Task) -> Optional[List[List[str]]]:
+        """Results of a finished endpoint search task, or None if it failed."""
+        if task.cancelled():
+            logger.warning(f"Search was cancelled for endpoint {endpoint_name}")
+            return None
+        error = task.exception()
+        if error is not None:
+            logger.warning(f"Search failed for endpoint {endpoint_name}: {error}")
+            return None
+        result = task.result()
+        if result is None:
+            logger.warning(f"Endpoint {endpoint_name} returned None, treating as empty results")
+            return []
+        return result
+    
+    async def _search_streaming(self, tasks: List[asyncio.Task], endpoint_names: List[str],
+                                num_results: int, late_results_callback=None) -> Tuple[List[List[str]], int]:
+        """
+        Aggregate endpoint searches as they complete instead of waiting for all of them.
+        
+        Returns as soon as num_results unique URLs have arrived from at least
+        min_endpoints endpoints, or endpoint_deadline seconds after the first
+        endpoint answered. Searches still running at that point are left to
+        finish; their results are merged into the same aggregator and, if
+        late_results_callback is given, the newly seen rows are passed to it as
+        late_results_callback(endpoint_name, rows). The handlers pass their
+        on_late_results, which ranks the rows with the ranking in progress.
+        
+        Returns:
+            Tuple of (results, number of endpoints that answered in time)
+        """
+        settings = CONFIG.retrieval_aggregation
+        loop = asyncio.get_running_loop()
+        # Set when the first endpoint answers
+        deadline = None
+        
+        aggregator = ResultAggregator()
+        pending = dict(zip(tasks, endpoint_names))
+        successful_endpoints = 0
+        
+        while pending:
+            timeout = None
+            if deadline is not None:
+                timeout = max(0.0, deadline - loop.time())
+            done, _ = await asyncio.wait(pending.keys(), timeout=timeout,
+                                         return_when=asyncio.FIRST_COMPLETED)
+            if not done:
+                logger.info(f"Endpoint deadline passed, not waiting for: {list(pending.values())}")
+                break
+            for task in done:
+                endpoint_name = pending.pop(task)
+                results = self._task_results(endpoint_name, task)
+                if results is not None:
+                    aggregator.add(endpoint_name, results)
+                    successful_endpoints += 1
+            if deadline is None and successful_endpoints > 0 and settings.endpoint_deadline:
+                deadline = loop.time() + settings.endpoint_deadline
+            if (successful_endpoints >= settings.min_endpoints
+                    and aggregator.unique_count >= num_results):
+                break
+        
+        if successful_endpoints == 0:
+            return [], 0
+        
+        final_results = aggregator.results(num_results)
+        
+        def _merge_late(task: asyncio.Task, endpoint_name: str):
+            self._late_tasks.discard(task)
+            results = self._task_results(endpoint_name, task)
+            if not results:
+                return
+            new_urls = aggregator.add(endpoint_name, results)
+            logger.info(f"Merged {len(results)} late results from {endpoint_name} ({len(new_urls)} new URLs)")
+            if late_results_callback and new_urls:
+                try:
+                    late_results_callback(endpoint_name, [aggregator.row(url) for url in new_urls])
+                except Exception as e:
+                    logger.warning(f"Late results callback failed for endpoint {endpoint_name}: {e}")
+        
+        for task, endpoint_name in pending.items():
+            self._late_tasks.add(task)
+            task.add_done_callback(lambda t, name=endpoint_name: _merge_late(t, name))
+        
+        return final_results, successful_endpoints
+    
+    def _keyword_index(self):
+        """The BM25 keyword index, or None when hybrid retrieval is disabled."""
+        hybrid = CONFIG.retrieval_hybrid
+        if not hybrid.enabled:
+            return None
+        return get_keyword_index(hybrid.index_path)
+    
+    async def _fuse_keyword_results(self, query: str, site: Union[str, List[str]],
+                                    vector_results: List[List[str]], num_results: int) -> List[List[str]]:
+        """Fuse vector results with BM25 keyword hits for the same query and site(s)."""
+        keyword_index = self._keyword_index()
+        if keyword_index is None:
+            return vector_results
+        sites = None if site == "all" else (site if isinstance(site, list) else [site])
+        try:
+            # BM25 scoring (and an occasional reload of the index file) runs off the event loop
+            keyword_hits = await asyncio.to_thread(
+                keyword_index.search, query, CONFIG.retrieval_hybrid.keyword_results, sites)
+        except Exception as e:
+            logger.warning(f"Keyword search failed, using vector results only: {e}")
+            return vector_results
+        keyword_results = [row for row, _score in keyword_hits]
+        fused = as_search_results(reciprocal_rank_fusion([vector_results, keyword_results],
+                                                         CONFIG.retrieval_hybrid.rrf_k, num_results))
+        vector_urls = {row[0] for row in vector_results}
+        logger.info(f"Hybrid search fused {len(vector_results)} vector and {len(keyword_results)} keyword results "
+                    f"({sum(1 for row in fused if row[0] not in vector_urls)} keyword-only in the top {len(fused)})")
+        return fused
+    
     async def delete_documents_by_site(self, site: str, **kwargs) -> int:
         """
         Delete all documents matching the specified site.
@@ -670,6 +857,9 @@ class VectorDBClient:
                 client = await self.get_client(self.write_endpoint)
                 count = await client.delete_documents_by_site(site, **kwargs)
                 logger.info(f"Successfully deleted {count} documents for site: {site}")
+                keyword_index = self._keyword_index()
+                if keyword_index is not None:
+                    keyword_index.delete_site(site)
                 return count
             except Exception as e:
                 logger.exception(f"Error deleting documents for site {site}: {e}")
@@ -706,6 +896,9 @@ class VectorDBClient:
                 client = await self.get_client(self.write_endpoint)
                 count = await client.upload_documents(documents, **kwargs)
                 logger.info(f"Successfully uploaded {count} documents")
+                keyword_index = self._keyword_index()
+                if keyword_index is not None:
+                    keyword_index.add_documents(documents)
                 return count
             except Exception as e:
                 logger.exception(f"Error uploading documents: {e}")
@@ -757,6 +950,9 @@ class VectorDBClient:
         elif isinstance(site, str):
             site = site.replace(" ", "_")
 
+        # Receives rows from endpoints that answer after a streaming search returned
+        late_results_callback = kwargs.pop('late_results_callback', None)
+        
         async with self._retrieval_lock:
             logger.info(f"Searching for '{query[:50]}...' in site: {site}, num_results: {num_results}")
             logger.info(f"Querying {len(self.enabled_endpoints)} enabled endpoints in parallel")
@@ -805,44 +1001,161 @@ class VectorDBClient:
             if not tasks:
                 raise ValueError("No valid endpoints available for search")
             
-            # Execute all searches in parallel and collect results
+            if CONFIG.retrieval_aggregation.mode == "streaming" and len(tasks) > 1:
+                # Aggregate endpoints as they finish and return early when possible
+                final_results, successful_endpoints = await self._search_streaming(
+                    tasks, endpoint_names, num_results, late_results_callback)
+                if successful_endpoints == 0:
+                    raise ValueError("All endpoint searches failed")
+            else:
+                # Execute all searches in parallel and collect results
+                results = await asyncio.gather(*tasks, return_exceptions=True)
+                
+                # Process results and handle failures gracefully
+                endpoint_results = {}
+                successful_endpoints = 0
+                
+                for endpoint_name, result in zip(endpoint_names, results):
+                    if isinstance(result, Exception):
+                        logger.warning(f"Search failed for endpoint {endpoint_name}: {result}")
+                    elif result is None:
+                        logger.warning(f"Endpoint {endpoint_name} returned None, treating as empty results")
+                        endpoint_results[endpoint_name] = []
+                    else:
+                        endpoint_results[endpoint_name] = result
+                        successful_endpoints += 1
+                
+                if successful_endpoints == 0:
+                    raise ValueError("All endpoint searches failed")
+                
+                # Aggregate and deduplicate results, limited to the requested number
+                # Results are already in relevance order from aggregation
+                final_results = self._aggregate_results(endpoint_results, num_results)
+            
+            final_results = await self._fuse_keyword_results(query, site, final_results, num_results)
+            
+            end_time = time.time()
+            search_duration = end_time - start_time
+            
+            logger.log_with_context(
+                LogLevel.INFO,
+                "Parallel search completed",
+                {
+                    "duration": f"{search_duration:.2f}s",
+                    "endpoints_queried": len(tasks),
+                    "endpoints_succeeded": successful_endpoints,
+                    "total_results": len(final_results),
+                    "site": site
+                }
+            )
+            
+            return final_results
+    
+    async def search_batch(self, queries: List[str], site: Union[str, List[str]],
+                           num_results: int = 50, endpoint_name: Optional[str] = None,
+                           **kwargs) -> List[List[List[str]]]:
+        """
+        Run several queries against the same site(s) and return one result list per query.
+        
+        Backends with a native multi-query search (e.g. Qdrant's batch search)
+        get all queries in one call; others are searched once per query in
+        parallel. Each query's results are aggregated across endpoints the
+        same way as in search().
+        
+        Args:
+            queries: Search query strings
+            site: Site identifier or list of sites
+            num_results: Maximum number of results per query
+            endpoint_name: Optional endpoint name override
+            **kwargs: Additional parameters
+            
+        Returns:
+            List of search results per query, in query order
+        """
+        if not queries:
+            return []
+        
+        # Handle configured sites
+        if site == "all":
+            sites = CONFIG.nlweb.sites
+            if sites and sites != "all":
+                site = sites
+        
+        if endpoint_name:
+            if endpoint_name not in CONFIG.retrieval_endpoints:
+                raise ValueError(f"Invalid endpoint: {endpoint_name}")
+            temp_client = VectorDBClient(endpoint_name=endpoint_name)
+            return await temp_client.search_batch(queries, site, num_results, **kwargs)
+        
+        # Process site parameter for consistency
+        if isinstance(site, str) and ',' in site:
+            site = site.replace('[', '').replace(']', '')
+            site = [s.strip() for s in site.split(',')]
+        elif isinstance(site, str):
+            site = site.replace(" ", "_")
+        
+        search_kwargs = kwargs.copy()
+        search_kwargs.pop('handler', None)
+        
+        async def _endpoint_batch(client) -> List[List[List[str]]]:
+            if hasattr(client, 'search_batch'):
+                return await client.search_batch(queries, site, num_results, **search_kwargs)
+            if site == "all":
+                searches = [client.search_all_sites(query, num_results, **search_kwargs) for query in queries]
+            else:
+                searches = [client.search(query, site, num_results, **search_kwargs) for query in queries]
+            per_query = await asyncio.gather(*searches, return_exceptions=True)
+            return [[] if isinstance(result, Exception) or result is None else result for result in per_query]
+        
+        async with self._retrieval_lock:
+            logger.info(f"Batch searching {len(queries)} queries in site: {site}, num_results: {num_results}")
+            start_time = time.time()
+            
+            tasks = []
+            endpoint_names = []
+            for endpoint_name in self.enabled_endpoints:
+                try:
+                    if not await self._endpoint_has_site(endpoint_name, site):
+                        continue
+                    client = await self.get_client(endpoint_name)
+                    tasks.append(asyncio.create_task(_endpoint_batch(client)))
+                    endpoint_names.append(endpoint_name)
+                except Exception as e:
+                    logger.warning(f"Failed to create batch search task for endpoint {endpoint_name}: {e}")
+            
+            if not tasks:
+                raise ValueError("No valid endpoints available for search")
+            
             results = await asyncio.gather(*tasks, return_exceptions=True)
             
-            # Process results and handle failures gracefully
             endpoint_results = {}
-            successful_endpoints = 0
-            
             for endpoint_name, result in zip(endpoint_names, results):
                 if isinstance(result, Exception):
-                    logger.warning(f"Search failed for endpoint {endpoint_name}: {result}")
-                elif result is None:
-                    logger.warning(f"Endpoint {endpoint_name} returned None, treating as empty results")
-                    endpoint_results[endpoint_name] = []
+                    logger.warning(f"Batch search failed for endpoint {endpoint_name}: {result}")
                 else:
                     endpoint_results[endpoint_name] = result
-                    successful_endpoints += 1
             
-            if successful_endpoints == 0:
+            if not endpoint_results:
                 raise ValueError("All endpoint searches failed")
             
-            # Aggregate and deduplicate results
-            final_results = self._aggregate_results(endpoint_results)
-            
-            # Limit to requested number of results
-            # Results are already in relevance order from aggregation
-            final_results = final_results[:num_results]
-            
-            end_time = time.time()
-            search_duration = end_time - start_time
+            fusions = []
+            for query_idx in range(len(queries)):
+                per_endpoint = {
+                    name: batch[query_idx] if query_idx < len(batch) else []
+                    for name, batch in endpoint_results.items()
+                }
+                aggregated = self._aggregate_results(per_endpoint, num_results)
+                fusions.append(self._fuse_keyword_results(queries[query_idx], site, aggregated, num_results))
+            final_results = list(await asyncio.gather(*fusions))
             
             logger.log_with_context(
                 LogLevel.INFO,
-                "Parallel search completed",
+                "Parallel batch search completed",
                 {
-                    "duration": f"{search_duration:.2f}s",
+                    "duration": f"{time.time() - start_time:.2f}s",
                     "endpoints_queried": len(tasks),
-                    "endpoints_succeeded": successful_endpoints,
-                    "total_results": len(final_results),
+                    "endpoints_succeeded": len(endpoint_results),
+                    "query_count": len(queries),
                     "site": site
                 }
             )
@@ -1148,6 +1461,30 @@ async def search(query: str,
     return results
 
 
+async def search_batch(queries: List[str],
+                       site: str = "all",
+                       num_results: int = 50,
+                       endpoint_name: Optional[str] = None,
+                       query_params: Optional[Dict[str, Any]] = None,
+                       **kwargs) -> List[List[List[str]]]:
+    """
+    Simplified batch search interface: run several queries in one call.
+    
+    Args:
+        queries: The search queries
+        site: Site to search in (default: "all")
+        num_results: Number of results to return per query
+        endpoint_name: Optional name of the endpoint to use
+        query_params: Optional query parameters for overriding endpoint
+        **kwargs: Additional parameters passed to the search method
+        
+    Returns:
+        List of search results per query, in query order
+    """
+    client = get_vector_db_client(endpoint_name=endpoint_name, query_params=query_params)
+    return await client.search_batch(queries, site, num_results, query_params=query_params, **kwargs)
+
+
 async def search_all_sites(query: str,
                           top_n: int = 10,
                           endpoint_name: Optional[str] = None,
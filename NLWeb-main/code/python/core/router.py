@@ -18,7 +18,9 @@ import time
 from misc.logger.logging_config_helper import get_configured_logger
 from core.llm import ask_llm
 from core.config import CONFIG
+from core.embedding import get_embedding
 from core.prompts import fill_prompt
+from core.tool_routing import RoutingCache, ToolEmbeddingIndex
 logger = get_configured_logger("tool_selector")
 
 @dataclass
@@ -119,6 +121,33 @@ def _load_tools_from_file(tools_xml_path: str) -> List[Tool]:
 # Global cache for tools - loaded once and shared
 _tools_cache: Dict[str, List['Tool']] = {}
 
+# Embeddings of the tools' descriptions and examples, and recent routing decisions
+_tool_index = ToolEmbeddingIndex()
+_routing_cache: Optional[RoutingCache] = None
+
+async def embed_tools() -> None:
+    """
+    Embed the descriptions and examples of every loaded tool.
+    
+    Called at server startup so the first routed query does not wait for
+    the embedding call; routing still embeds any tool missing from the index.
+    """
+    if not CONFIG.tool_routing.embedding_routing:
+        return
+    tools = [tool for tools in _tools_cache.values() for tool in tools]
+    if not tools:
+        return
+    try:
+        await _tool_index.ensure(tools)
+    except Exception as e:
+        logger.warning(f"Could not embed tools at startup, they will be embedded on first use: {e}")
+
+def _get_routing_cache() -> RoutingCache:
+    global _routing_cache
+    if _routing_cache is None:
+        _routing_cache = RoutingCache(CONFIG.tool_routing.cache_ttl, CONFIG.tool_routing.cache_size)
+    return _routing_cache
+
 from typing import TYPE_CHECKING
 if TYPE_CHECKING:
     from typing import List, Dict
@@ -128,6 +157,7 @@ class ToolSelector:
     
     STEP_NAME = "ToolSelector"
     MIN_TOOL_SCORE_THRESHOLD = 70  # Minimum score required to select a tool
+    EMBEDDING_ROUTE_SCORE = 90  # Score reported for tools chosen by embedding similarity alone
     
     # Type hierarchy for schema.org types
     # TODO: This is a placeholder for now. We need to have a proper type hierarchy from schema.org
@@ -312,8 +342,16 @@ class ToolSelector:
             # Get tools for this type
             tools = self.get_tools_by_type(schema_type)
             
-            # Evaluate tools with early termination strategy
-            tool_results = await self._evaluate_tools_with_early_termination(query, tools, threshold=90)
+            # Reuse a recent decision for the same query, otherwise route it
+            routing_cache = _get_routing_cache()
+            cached_results = routing_cache.get(query, schema_type)
+            if cached_results is not None:
+                logger.info(f"Using cached tool routing for: {query}")
+                tool_results = list(cached_results)
+            else:
+                tool_results = await self._route(query, tools)
+                if tool_results and not any(r.get("error") for r in tool_results):
+                    routing_cache.put(query, schema_type, list(tool_results))
             
             # Sort by score
             tool_results.sort(key=lambda x: x["score"], reverse=True)
@@ -395,6 +433,42 @@ class ToolSelector:
             
             await self.handler.state.precheck_step_done(self.STEP_NAME)
     
+    async def _route(self, query: str, tools: List[Tool]) -> List[dict]:
+        """
+        Score tools for the query. The query embedding is compared with the
+        tools' descriptions and examples: an LLM-free tool that wins by the
+        configured margin is selected without any LLM call, otherwise only the
+        most similar tools are scored by the LLM.
+        """
+        routing = CONFIG.tool_routing
+        if not routing.embedding_routing or len(tools) <= 1:
+            return await self._evaluate_tools_with_early_termination(query, tools, threshold=90)
+        
+        try:
+            await _tool_index.ensure(tools)
+            query_embedding = await get_embedding(query, query_params=self.handler.query_params)
+        except Exception as e:
+            logger.warning(f"Embedding tool routing unavailable, scoring all tools with the LLM: {e}")
+            return await self._evaluate_tools_with_early_termination(query, tools, threshold=90)
+        
+        similarities = _tool_index.similarities(query_embedding, tools)
+        top_tool, top_similarity = similarities[0]
+        runner_up = similarities[1][1]
+        logger.info(f"Tool similarities for '{query}': "
+                    f"{[(tool.name, round(similarity, 3)) for tool, similarity in similarities]}")
+        
+        if (top_tool.name in routing.llm_free_tools and top_similarity >= routing.min_similarity
+                and top_similarity - runner_up >= routing.margin):
+            logger.info(f"Routed to '{top_tool.name}' by embedding similarity {top_similarity:.3f} "
+                        f"(runner-up {runner_up:.3f}), skipping LLM tool scoring")
+            result = {"score": self.EMBEDDING_ROUTE_SCORE,
+                      "justification": f"Embedding routing (similarity {top_similarity:.2f})"}
+            return [{"tool": top_tool, "result": result, "score": self.EMBEDDING_ROUTE_SCORE}]
+        
+        shortlist = [tool for tool, _similarity in similarities[:routing.shortlist_size]]
+        logger.info(f"Scoring shortlisted tools with the LLM: {[tool.name for tool in shortlist]}")
+        return await self._evaluate_tools_with_early_termination(query, shortlist, threshold=90)
+    
     async def _evaluate_tool(self, query: str, tool: Tool) -> dict:
         """Evaluate a single tool for the query."""
         if not tool.prompt:
@@ -426,7 +500,7 @@ class ToolSelector:
             # print(f"Error: {str(e)}")
             # print("-" * 40)
             logger.error(f"Tool evaluation error for {tool.name}: {str(e)}")
-            return {"tool": tool, "score": 0, "result": {"score": 0, "justification": f"Error: {str(e)}"}}
+            return {"tool": tool, "score": 0, "result": {"score": 0, "justification": f"Error: {str(e)}"}, "error": True}
     
     async def _send_message(self, tool_scores, query, schema_type):
         """Send tool selection results as message."""
@@ -0,0 +1,85 @@
+# Copyright (c) 2025 Microsoft Corporation.
+# Licensed under the MIT License
+
+"""
+Result record passed from retrieval to ranking and the answer generators.
+
+Retrieval results have always been [url, json_str, name, site] lists, and a
+lot of code indexes or unpacks them. SearchResult is still such a list, so
+that code and json.dumps keep working, but it also carries the decoded
+schema JSON, which is parsed at most once and shared through the item
+description cache.
+
+WARNING: This code is under development and may undergo changes in future releases.
+Backwards compatibility is not guaranteed at this time.
+"""
+
+from typing import Any, Iterable, List, Optional
+
+from core.description_cache import ItemDescription, describe_item
+
+
+class SearchResult(list):
+    """A [url, json_str, name, site] row that decodes its JSON lazily."""
+    __slots__ = ("_parsed", "_item")
+
+    def __init__(self, url: str, json_str: str, name: str, site: str, parsed: Any = None):
+        super().__init__((url, json_str, name, site))
+        # Decoded JSON known when the row was built, e.g. after merging duplicates
+        self._parsed = parsed
+        self._item: Optional[ItemDescription] = None
+
+    @classmethod
+    def from_row(cls, row: Any) -> Any:
+        """Wrap a [url, json_str, name, site] list; anything else is returned unchanged."""
+        if isinstance(row, cls) or not isinstance(row, (list, tuple)) or len(row) != 4:
+            return row
+        return cls(row[0], row[1], row[2], row[3])
+
+    @property
+    def url(self) -> str:
+        return self[0]
+
+    @property
+    def json_str(self) -> str:
+        return self[1]
+
+    @property
+    def name(self) -> str:
+        return self[2]
+
+    @property
+    def site(self) -> str:
+        return self[3]
+
+    @property
+    def item(self) -> ItemDescription:
+        if self._item is None:
+            self._item = describe_item(self[0], self[1], self._parsed)
+        return self._item
+
+    @property
+    def schema(self) -> Any:
+        """The decoded JSON, an object or an array of objects."""
+        return self.item.parsed
+
+    @property
+    def schema_object(self) -> Any:
+        """The decoded JSON, or its first element when it is an array."""
+        return self.item.schema_object
+
+    @property
+    def description(self) -> str:
+        """The trim_json form of the item as it is inserted into prompts."""
+        return self.item.description
+
+
+def as_search_results(rows: Iterable[Any]) -> List[Any]:
+    return [SearchResult.from_row(row) for row in rows]
+
+
+def describe_result(row: Any) -> ItemDescription:
+    """The description of a result row, whether or not it is a SearchResult."""
+    if isinstance(row, SearchResult):
+        return row.item
+    return describe_item(row[0], row[1])
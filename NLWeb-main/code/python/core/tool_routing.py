@@ -0,0 +1,137 @@
+# Copyright (c) 2025 Microsoft Corporation.
+# Licensed under the MIT License
+
+"""
+Embedding-based shortlisting and caching for tool selection.
+
+ToolSelector used to ask the LLM to score every tool for every query. The
+descriptions and examples of the tools in tools.xml are embedded once; each
+query is then compared to them so that only a shortlist of tools is scored
+by the LLM, or none when one tool wins by a wide margin. Routing decisions
+are cached per normalized query and schema type.
+
+WARNING: This code is under development and may undergo changes in future releases.
+Backwards compatibility is not guaranteed at this time.
+"""
+
+import asyncio
+import math
+import re
+import threading
+import time
+from collections import OrderedDict
+from typing import Any, Dict, List, Optional, Sequence, Tuple
+
+from core.embedding import batch_get_embeddings
+from misc.logger.logging_config_helper import get_configured_logger
+
+logger = get_configured_logger("tool_selector")
+
+_PLACEHOLDER_RE = re.compile(r"\{[^{}]*\}")
+_SPACE_RE = re.compile(r"\s+")
+
+
+def normalize_query(query: str) -> str:
+    """Lower-cased query with collapsed whitespace and no trailing punctuation."""
+    return _SPACE_RE.sub(" ", query.lower()).strip().rstrip("?.!")
+
+
+def tool_key(tool) -> Tuple[str, str]:
+    """Tools with the same name exist for several schema types."""
+    return (tool.schema_type, tool.name)
+
+
+def tool_texts(tool) -> List[str]:
+    """The texts embedded for a tool: its prompt without placeholders, and each example."""
+    texts = list(tool.examples)
+    description = _SPACE_RE.sub(" ", _PLACEHOLDER_RE.sub("", tool.prompt)).strip()
+    if description:
+        texts.append(description)
+    return texts
+
+
+def _unit(vector: Sequence[float]) -> List[float]:
+    norm = math.sqrt(sum(x * x for x in vector)) or 1.0
+    return [x / norm for x in vector]
+
+
+class ToolEmbeddingIndex:
+    """Unit-length embeddings of every tool's texts, computed once per tool set."""
+
+    def __init__(self):
+        self._vectors: Dict[Tuple[str, str], List[List[float]]] = {}
+        self._lock = asyncio.Lock()
+
+    def __len__(self) -> int:
+        return len(self._vectors)
+
+    async def ensure(self, tools: Sequence[Any]) -> None:
+        """Embed the tools that have not been embedded yet (one batch call)."""
+        missing = [tool for tool in tools if tool_key(tool) not in self._vectors]
+        if not missing:
+            return
+        async with self._lock:
+            missing = [tool for tool in missing if tool_key(tool) not in self._vectors]
+            if not missing:
+                return
+            texts, owners = [], []
+            for tool in missing:
+                for text in tool_texts(tool):
+                    texts.append(text)
+                    owners.append(tool_key(tool))
+            embeddings = await batch_get_embeddings(texts) if texts else []
+            vectors: Dict[Tuple[str, str], List[List[float]]] = {tool_key(tool): [] for tool in missing}
+            for owner, embedding in zip(owners, embeddings):
+                vectors[owner].append(_unit(embedding))
+            self._vectors.update(vectors)
+            logger.info(f"Embedded {len(texts)} descriptions and examples for {len(missing)} tools")
+
+    def similarities(self, query_embedding: Sequence[float], tools: Sequence[Any]) -> List[Tuple[Any, float]]:
+        """(tool, best cosine similarity to any of its texts), most similar first."""
+        query = _unit(query_embedding)
+        scored = []
+        for tool in tools:
+            vectors = self._vectors.get(tool_key(tool)) or []
+            best = max((sum(q * v for q, v in zip(query, vector)) for vector in vectors), default=0.0)
+            scored.append((tool, best))
+        scored.sort(key=lambda item: item[1], reverse=True)
+        return scored
+
+    def clear(self) -> None:
+        self._vectors.clear()
+
+
+class RoutingCache:
+    """LRU cache of routing decisions with a time-to-live."""
+
+    def __init__(self, ttl: float, max_size: int):
+        self.ttl = ttl
+        self.max_size = max_size
+        self._entries: "OrderedDict[Tuple[str, str], Tuple[float, Any]]" = OrderedDict()
+        self._lock = threading.Lock()
+
+    def get(self, query: str, schema_type: str) -> Optional[Any]:
+        key = (normalize_query(query), schema_type)
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None:
+                return None
+            if time.monotonic() - entry[0] > self.ttl:
+                del self._entries[key]
+                return None
+            self._entries.move_to_end(key)
+            return entry[1]
+
+    def put(self, query: str, schema_type: str, value: Any) -> None:
+        if self.ttl <= 0 or self.max_size <= 0:
+            return
+        key = (normalize_query(query), schema_type)
+        with self._lock:
+            self._entries[key] = (time.monotonic(), value)
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.max_size:
+                self._entries.popitem(last=False)
+
+    def clear(self) -> None:
+        with self._lock:
+            self._entries.clear()
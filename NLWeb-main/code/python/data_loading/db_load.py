@@ -24,7 +24,9 @@ from data_loading.db_load_utils import (
     read_file_lines,
     prepare_documents_from_json,
     documents_from_csv_line,
+    documents_from_embedding,
 )
+from data_loading.embedding_store import EmbeddingFileReader, EmbeddingFileWriter, binary_embeddings_stem
 
 # Import vector database client directly
 from core.retriever import get_vector_db_client, upload_documents, delete_documents_by_site
@@ -617,6 +619,11 @@ async def loadJsonWithEmbeddingsToDB(file_path: str, site: str, batch_size: int
                         # If still not found, use the standard embeddings path (which might not exist)
                         resolved_path = embeddings_path
         
+        # Binary embedding containers are read directly
+        binary_stem = binary_embeddings_stem(file_path) or binary_embeddings_stem(resolved_path)
+        if binary_stem:
+            return await loadBinaryEmbeddingsToDB(binary_stem, site, batch_size, delete_existing, database)
+        
         # Use specified database or fall back to preferred endpoint
         endpoint_name = database or CONFIG.write_endpoint
         
@@ -680,7 +687,45 @@ async def loadJsonWithEmbeddingsToDB(file_path: str, site: str, batch_size: int
             except Exception:
                 pass
 
-async def loadJsonToDB(file_path: str, site: str, batch_size: int = 100, delete_existing: bool = False, force_recompute: bool = False, database: str = None):
+async def loadBinaryEmbeddingsToDB(stem: str, site: str, batch_size: int = 100, delete_existing: bool = False, database: str = None):
+    """
+    Load a binary embeddings container (see data_loading/embedding_store.py) into the database.
+    
+    Args:
+        stem: Path stem of the container
+        site: Site identifier
+        batch_size: Number of documents to process and upload in each batch
+        delete_existing: Whether to delete existing entries for this site before loading
+        database: Specific database endpoint to use (if None, uses preferred endpoint)
+    """
+    endpoint_name = database or CONFIG.write_endpoint
+    
+    # Checksums are validated before anything is deleted or uploaded
+    reader = EmbeddingFileReader(stem)
+    print(f"Loading {reader.count} embeddings ({reader.dimension} x {reader.dtype.name}) from {reader.stem} "
+          f"for site {site} using database endpoint '{endpoint_name}'")
+    
+    if delete_existing:
+        await delete_site_from_database(site, endpoint_name)
+    
+    # Use query_params for development mode override
+    query_params = {"db": database} if database else None
+    
+    total_documents = 0
+    total_batches = (reader.count + batch_size - 1) // batch_size
+    for batch_idx, rows in enumerate(reader.iter_batches(batch_size)):
+        batch_documents = []
+        for url, json_data, embedding in rows:
+            batch_documents.extend(documents_from_embedding(url, json_data, embedding, site))
+        if batch_documents:
+            print(f"Uploading batch {batch_idx+1} of {total_batches} ({len(batch_documents)} documents)")
+            await upload_documents(batch_documents, query_params=query_params)
+            total_documents += len(batch_documents)
+    
+    print(f"Loading completed. Added {total_documents} documents to the database.")
+    return total_documents
+
+async def loadJsonToDB(file_path: str, site: str, batch_size: int = 100, delete_existing: bool = False, force_recompute: bool = False, database: str = None, embeddings_format: str = "tsv"):
     """
     Load data from a file, compute embeddings, and store in the database.
     
@@ -698,6 +743,8 @@ async def loadJsonToDB(file_path: str, site: str, batch_size: int = 100, delete_
         delete_existing: Whether to delete existing entries for this site before loading
         force_recompute: Whether to force recomputation of embeddings
         database: Specific database endpoint to use (if None, uses preferred endpoint)
+        embeddings_format: "tsv" for the URL/JSON/embedding text file, "binary" for an
+            embedding_store container
     """
     # Check if this is a URL
     is_url_path = await is_url(file_path)
@@ -742,19 +789,22 @@ async def loadJsonToDB(file_path: str, site: str, batch_size: int = 100, delete_
         # Check for existing embeddings file if not forcing recomputation
         embeddings_path = get_embeddings_file_path(os.path.basename(original_path))
         
-        if os.path.exists(embeddings_path) and not force_recompute:
+        existing_embeddings = binary_embeddings_stem(embeddings_path) or (
+            embeddings_path if os.path.exists(embeddings_path) else None)
+        
+        if existing_embeddings and not force_recompute:
             # In interactive mode, ask the user what to do
             if sys.stdin.isatty():
-                response = input(f"A file with embeddings already exists at {embeddings_path}. Use it? (y/n): ")
+                response = input(f"A file with embeddings already exists at {existing_embeddings}. Use it? (y/n): ")
                 use_existing = response.lower() in ('y', 'yes')
             else:
                 # In non-interactive mode, default to using the existing file
                 use_existing = True
-                print(f"Using existing file with embeddings at {embeddings_path}")
+                print(f"Using existing file with embeddings at {existing_embeddings}")
             
             if use_existing:
                 # Use the existing file with embeddings
-                return await loadJsonWithEmbeddingsToDB(embeddings_path, site, batch_size, delete_existing, endpoint_name)
+                return await loadJsonWithEmbeddingsToDB(existing_embeddings, site, batch_size, delete_existing, endpoint_name)
             else:
                 print(f"Proceeding to compute new embeddings for {original_path}")
         
@@ -840,7 +890,11 @@ async def loadJsonToDB(file_path: str, site: str, batch_size: int = 100, delete_
             os.makedirs(os.path.dirname(embeddings_path), exist_ok=True)
             
             # Open file to write documents with embeddings
-            with open(embeddings_path, 'w', encoding='utf-8') as embed_file:
+            if embeddings_format == "binary":
+                embed_file = EmbeddingFileWriter(embeddings_path)
+            else:
+                embed_file = open(embeddings_path, 'w', encoding='utf-8')
+            with embed_file:
                 # Extract texts for embedding
                 texts = [doc["schema_json"] for doc in all_documents]
                 
@@ -868,14 +922,16 @@ async def loadJsonToDB(file_path: str, site: str, batch_size: int = 100, delete_
                                     # Add embedding to document
                                     doc["embedding"] = embedding
                                     
-                                    # Format embedding as string - ensure no newlines
-                                    embedding_str = str(embedding).replace(' ', '').replace('\n', '')
-                                    
                                     # Ensure JSON has no newlines
                                     doc_json = doc['schema_json'].replace('\n', ' ')
                                     
                                     # Write to embeddings file
-                                    embed_file.write(f"{doc['url']}\t{doc_json}\t{embedding_str}\n")
+                                    if embeddings_format == "binary":
+                                        embed_file.write(doc['url'], doc_json, embedding)
+                                    else:
+                                        # Format embedding as string - ensure no newlines
+                                        embedding_str = str(embedding).replace(' ', '').replace('\n', '')
+                                        embed_file.write(f"{doc['url']}\t{doc_json}\t{embedding_str}\n")
                                     
                                     docs_with_embeddings.append(doc)
                             
@@ -1074,7 +1130,14 @@ async def delete_site(site: str, database: str = None):
     count = await delete_site_from_database(site, database)
     print(f"Deleted {count} entries for site '{site}'")
 
-async def process_normal_path(input_file_path: str, site: str, batch_size: int = 100, delete_site: bool = False, force_recompute: bool = False, database: str = None):
+async def process_normal_path(input_file_path: str, site: str, batch_size: int = 100, delete_site: bool = False, force_recompute: bool = False, database: str = None, embeddings_format: str = "tsv"):
+    # Binary embedding containers are named by their path stem
+    binary_stem = binary_embeddings_stem(input_file_path)
+    if binary_stem and not force_recompute:
+        print("Input is a binary embeddings container, loading directly...")
+        await loadBinaryEmbeddingsToDB(binary_stem, site, batch_size, delete_site, database)
+        return
+    
     # Check if file exists at the specified path
     if not await is_url(input_file_path) and not os.path.exists(input_file_path):
         print(f"Warning: File not found at '{input_file_path}'. Will try to resolve or download it.")
@@ -1102,7 +1165,7 @@ async def process_normal_path(input_file_path: str, site: str, batch_size: int =
                 await loadJsonWithEmbeddingsToDB(file_path, site, batch_size, delete_site, database)
             else:
                 print("Computing embeddings for file...")
-                await loadJsonToDB(file_path, site, batch_size, delete_site, force_recompute, database)
+                await loadJsonToDB(file_path, site, batch_size, delete_site, force_recompute, database, embeddings_format)
         else:
             print(f"Error: File not found at '{file_path}'")
             sys.exit(1)
@@ -1129,6 +1192,8 @@ async def main():
         python db_loader.py --force-recompute file.txt site_name
         python db_loader.py --url-list urls.txt site_name
         python db_loader.py --url-list https://example.com/feed_list.txt site_name
+        python db_loader.py --embeddings-format binary file.txt site_name
+        python db_loader.py data/json_with_embeddings/file site_name   (binary container stem)
     """
     import argparse
     
@@ -1149,6 +1214,9 @@ async def main():
                         help="Batch size for processing and uploading")
     parser.add_argument("--database", type=str, default=None,
                         help="Specific database endpoint to use (from config_retrieval.yaml)")
+    parser.add_argument("--embeddings-format", choices=["tsv", "binary"], default="tsv",
+                        help="Format for newly computed embedding files: the URL/JSON/embedding text file "
+                             "or a binary container (see data_loading/embedding_store.py)")
     
     args = parser.parse_args()
     
@@ -1190,11 +1258,35 @@ async def main():
             if os.path.isfile(file_path):
                 # The downside of this approach is that we aren't taking advantage of the batch functionality
                 print(f"Processing file: {file_path}")
-                await process_normal_path(file_path, args.site, args.batch_size, args.delete_site, args.force_recompute, args.database)
+                await process_normal_path(file_path, args.site, args.batch_size, args.delete_site, args.force_recompute, args.database, args.embeddings_format)
         return
     
     # Normal processing mode
-    await process_normal_path(args.file_path, args.site, args.batch_size, args.delete_site, args.force_recompute, args.database)
+    await process_normal_path(args.file_path, args.site, args.batch_size, args.delete_site, args.force_recompute, args.database, args.embeddings_format)
+
+async def _run_main():
+    """Run main() and release shared provider connections before the loop closes."""
+    from core.embedding import close as close_embedding_clients
+    from core.http_client import close_http_clients
+    from core.keyword_index import save_keyword_indexes
+    try:
+        from retrieval_providers.local_index_client import flush_local_indexes
+    except ImportError:
+        # numpy is not installed, so no local index was written
+        flush_local_indexes = None
+    from core.retriever import prepare_vector_indexes
+    try:
+        await main()
+        # Build or verify ANN indexes once the data is in, rather than on the first search
+        await prepare_vector_indexes()
+    finally:
+        # Persist the hybrid search keyword index built while uploading
+        save_keyword_indexes()
+        # Save local index graphs and compact once, rather than after every batch
+        if flush_local_indexes is not None:
+            flush_local_indexes()
+        await close_embedding_clients()
+        await close_http_clients()
 
 if __name__ == "__main__":
-    asyncio.run(main())
\ No newline at end of file
+    asyncio.run(_run_main())
\ No newline at end of file
@@ -221,6 +221,28 @@ def documents_from_csv_line(line, site):
         url, json_data, embedding_str = line.strip().split('\t')
         embedding_str = embedding_str.replace("[", "").replace("]", "") 
         embedding = [float(x) for x in embedding_str.split(',')]
+    except Exception as e:
+        print(f"Error processing line: {str(e)}")
+        return []
+    
+    return documents_from_embedding(url, json_data, embedding, site)
+
+def documents_from_embedding(url, json_data, embedding, site):
+    """
+    Build document objects from a URL, its JSON and a precomputed embedding.
+    
+    Args:
+        url: URL for the item
+        json_data: JSON data for the item
+        embedding: Embedding as a list of floats (or a numpy vector)
+        site: Site identifier
+        
+    Returns:
+        List of document objects
+    """
+    if isinstance(embedding, np.ndarray):
+        embedding = embedding.astype(np.float32).tolist()
+    try:
         js = json.loads(json_data)
         js = trim_schema_json(js, site)
     except Exception as e:
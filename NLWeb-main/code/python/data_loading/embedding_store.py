@@ -0,0 +1,280 @@
+# Copyright (c) 2025 Microsoft Corporation.
+# Licensed under the MIT License
+
+"""
+Binary container for precomputed embeddings, an alternative to the
+URL<TAB>JSON<TAB>[floats] text files written by db_load.
+
+A container is three files sharing a path stem:
+    <stem>.vec        raw float32 or float16 vectors, one row per item
+    <stem>.idx        one line per row: URL, byte offset of the row in .vec, JSON
+    <stem>.meta.json  dtype, dimension, row count and SHA-256 checksums
+
+The vectors are read through a memory map, so reloading a site is bound by
+I/O instead of float parsing. The manifest is written last; a container
+without one is incomplete and is not loaded.
+
+Convert existing files with:
+    python -m data_loading.embedding_store to-binary site.txt site [--dtype float16]
+    python -m data_loading.embedding_store to-tsv site site.txt
+"""
+
+import argparse
+import hashlib
+import json
+import os
+from typing import Iterator, List, Optional, Sequence, Tuple
+
+import numpy as np
+
+FORMAT_NAME = "nlweb-embeddings"
+FORMAT_VERSION = 1
+SUPPORTED_DTYPES = ("float32", "float16")
+
+VECTORS_SUFFIX = ".vec"
+INDEX_SUFFIX = ".idx"
+MANIFEST_SUFFIX = ".meta.json"
+
+_HASH_CHUNK = 1 << 20
+
+
+class EmbeddingFileError(ValueError):
+    """Raised for missing, incomplete or corrupt embedding containers."""
+    pass
+
+
+def binary_embeddings_stem(path: str) -> Optional[str]:
+    """
+    The container stem for a path if it names a binary embeddings container
+    (the stem itself or any of its three files), otherwise None.
+    """
+    for suffix in (MANIFEST_SUFFIX, VECTORS_SUFFIX, INDEX_SUFFIX):
+        if path.endswith(suffix):
+            path = path[:-len(suffix)]
+            break
+    return path if os.path.exists(path + MANIFEST_SUFFIX) else None
+
+
+class EmbeddingFileWriter:
+    """
+    Streams (url, json, embedding) rows into a container.
+
+    Use as a context manager; the manifest is only written when the block
+    exits without an exception.
+    """
+
+    def __init__(self, stem: str, dtype: str = "float32"):
+        if dtype not in SUPPORTED_DTYPES:
+            raise ValueError(f"Unsupported embedding dtype '{dtype}' (expected one of {SUPPORTED_DTYPES})")
+        self.stem = stem
+        self.dtype = np.dtype(dtype).newbyteorder("<")
+        self.dimension: Optional[int] = None
+        self.count = 0
+        directory = os.path.dirname(stem)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+        # Drop any old manifest first so a half-written container is never loaded
+        if os.path.exists(stem + MANIFEST_SUFFIX):
+            os.remove(stem + MANIFEST_SUFFIX)
+        self._vectors = open(stem + VECTORS_SUFFIX, "wb")
+        self._index = open(stem + INDEX_SUFFIX, "wb")
+        self._vectors_hash = hashlib.sha256()
+        self._index_hash = hashlib.sha256()
+
+    def write(self, url: str, schema_json: str, embedding: Sequence[float]) -> None:
+        """Append one row."""
+        vector = np.asarray(embedding, dtype=self.dtype)
+        if vector.ndim != 1:
+            raise ValueError(f"Embedding for {url} is not a flat vector")
+        if self.dimension is None:
+            self.dimension = len(vector)
+        elif len(vector) != self.dimension:
+            raise ValueError(f"Embedding for {url} has dimension {len(vector)}, expected {self.dimension}")
+
+        data = vector.tobytes()
+        offset = self.count * len(data)
+        line = f"{url}\t{offset}\t{schema_json.replace(chr(10), ' ')}\n".encode("utf-8")
+        self._vectors.write(data)
+        self._index.write(line)
+        self._vectors_hash.update(data)
+        self._index_hash.update(line)
+        self.count += 1
+
+    def write_many(self, rows: Sequence[Tuple[str, str, Sequence[float]]]) -> None:
+        for url, schema_json, embedding in rows:
+            self.write(url, schema_json, embedding)
+
+    def close(self) -> None:
+        """Finish the files and write the manifest."""
+        self._vectors.close()
+        self._index.close()
+        manifest = {
+            "format": FORMAT_NAME,
+            "version": FORMAT_VERSION,
+            "dtype": self.dtype.name,
+            "dimension": self.dimension or 0,
+            "count": self.count,
+            "vectors_sha256": self._vectors_hash.hexdigest(),
+            "index_sha256": self._index_hash.hexdigest(),
+        }
+        tmp_path = self.stem + MANIFEST_SUFFIX + ".tmp"
+        with open(tmp_path, "w", encoding="utf-8") as f:
+            json.dump(manifest, f, indent=2)
+        os.replace(tmp_path, self.stem + MANIFEST_SUFFIX)
+
+    def abort(self) -> None:
+        """Close the files without writing a manifest."""
+        self._vectors.close()
+        self._index.close()
+
+    def __enter__(self) -> "EmbeddingFileWriter":
+        return self
+
+    def __exit__(self, exc_type, exc, tb) -> None:
+        if exc_type is None:
+            self.close()
+        else:
+            self.abort()
+
+
+class EmbeddingFileReader:
+    """Reads a container, with the vectors memory-mapped."""
+
+    def __init__(self, stem: str, verify: bool = True):
+        """
+        Args:
+            stem: Container path stem (or the path of one of its files)
+            verify: Check both files against the manifest checksums before reading
+
+        Raises:
+            EmbeddingFileError: If the container is incomplete or does not match its manifest
+        """
+        resolved = binary_embeddings_stem(stem)
+        if resolved is None:
+            raise EmbeddingFileError(f"No embeddings container (missing {stem}{MANIFEST_SUFFIX})")
+        self.stem = resolved
+        with open(self.stem + MANIFEST_SUFFIX, "r", encoding="utf-8") as f:
+            self.manifest = json.load(f)
+        if self.manifest.get("format") != FORMAT_NAME or self.manifest.get("version") != FORMAT_VERSION:
+            raise EmbeddingFileError(f"{self.stem}{MANIFEST_SUFFIX} is not a version {FORMAT_VERSION} "
+                                     f"{FORMAT_NAME} manifest")
+        self.dtype = np.dtype(self.manifest["dtype"]).newbyteorder("<")
+        self.dimension = self.manifest["dimension"]
+        self.count = self.manifest["count"]
+
+        expected_size = self.count * self.dimension * self.dtype.itemsize
+        actual_size = os.path.getsize(self.stem + VECTORS_SUFFIX)
+        if actual_size != expected_size:
+            raise EmbeddingFileError(f"{self.stem}{VECTORS_SUFFIX} is {actual_size} bytes, "
+                                     f"expected {expected_size}")
+        if verify:
+            self.verify()
+
+        if self.count:
+            self.vectors = np.memmap(self.stem + VECTORS_SUFFIX, dtype=self.dtype, mode="r",
+                                     shape=(self.count, self.dimension))
+        else:
+            self.vectors = np.zeros((0, self.dimension), dtype=self.dtype)
+
+    def verify(self) -> None:
+        """Raise EmbeddingFileError if either file does not match its checksum."""
+        for suffix, key in ((VECTORS_SUFFIX, "vectors_sha256"), (INDEX_SUFFIX, "index_sha256")):
+            digest = hashlib.sha256()
+            with open(self.stem + suffix, "rb") as f:
+                for chunk in iter(lambda: f.read(_HASH_CHUNK), b""):
+                    digest.update(chunk)
+            if digest.hexdigest() != self.manifest[key]:
+                raise EmbeddingFileError(f"Checksum mismatch for {self.stem}{suffix}")
+
+    def __len__(self) -> int:
+        return self.count
+
+    def __iter__(self) -> Iterator[Tuple[str, str, np.ndarray]]:
+        """Yield (url, json, vector) rows in file order."""
+        row_bytes = self.dimension * self.dtype.itemsize
+        with open(self.stem + INDEX_SUFFIX, "r", encoding="utf-8") as f:
+            for row, line in enumerate(f):
+                url, offset, schema_json = line.rstrip("\n").split("\t", 2)
+                if int(offset) != row * row_bytes:
+                    raise EmbeddingFileError(f"Row {row} of {self.stem}{INDEX_SUFFIX} has offset {offset}, "
+                                             f"expected {row * row_bytes}")
+                yield url, schema_json, self.vectors[row]
+
+    def iter_batches(self, batch_size: int) -> Iterator[List[Tuple[str, str, np.ndarray]]]:
+        """Rows in lists of at most batch_size."""
+        batch = []
+        for row in self:
+            batch.append(row)
+            if len(batch) >= batch_size:
+                yield batch
+                batch = []
+        if batch:
+            yield batch
+
+
+def convert_tsv_to_binary(tsv_path: str, stem: str, dtype: str = "float32") -> int:
+    """
+    Convert a URL<TAB>JSON<TAB>embedding text file to a binary container.
+
+    Returns:
+        Number of rows written
+    """
+    with EmbeddingFileWriter(stem, dtype) as writer, open(tsv_path, "r", encoding="utf-8") as f:
+        for line_number, line in enumerate(f, start=1):
+            if not line.strip():
+                continue
+            try:
+                url, schema_json, embedding_str = line.rstrip("\n").split("\t")
+                embedding = np.array(embedding_str.strip().strip("[]").split(","), dtype=np.float32)
+            except ValueError as e:
+                raise EmbeddingFileError(f"Line {line_number} of {tsv_path} is not URL, JSON, embedding: {e}")
+            writer.write(url, schema_json, embedding)
+        return writer.count
+
+
+def convert_binary_to_tsv(stem: str, tsv_path: str) -> int:
+    """
+    Convert a binary container back to the text format.
+
+    Returns:
+        Number of rows written
+    """
+    reader = EmbeddingFileReader(stem)
+    with open(tsv_path, "w", encoding="utf-8") as f:
+        for url, schema_json, vector in reader:
+            embedding_str = "[" + ",".join(repr(float(x)) for x in vector) + "]"
+            f.write(f"{url}\t{schema_json}\t{embedding_str}\n")
+    return reader.count
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Convert between text and binary embedding files")
+    subparsers = parser.add_subparsers(dest="command", required=True)
+
+    to_binary = subparsers.add_parser("to-binary", help="Convert a URL/JSON/embedding text file to a binary container")
+    to_binary.add_argument("tsv_path", help="Text file with embeddings")
+    to_binary.add_argument("stem", help="Path stem for the container files")
+    to_binary.add_argument("--dtype", choices=SUPPORTED_DTYPES, default="float32",
+                           help="Storage type for the vectors (float16 halves the size)")
+
+    to_tsv = subparsers.add_parser("to-tsv", help="Convert a binary container to a text file")
+    to_tsv.add_argument("stem", help="Path stem of the container")
+    to_tsv.add_argument("tsv_path", help="Text file to write")
+
+    verify = subparsers.add_parser("verify", help="Check a container against its checksums")
+    verify.add_argument("stem", help="Path stem of the container")
+
+    args = parser.parse_args()
+    if args.command == "to-binary":
+        count = convert_tsv_to_binary(args.tsv_path, args.stem, args.dtype)
+        print(f"Wrote {count} embeddings to {args.stem}{VECTORS_SUFFIX}")
+    elif args.command == "to-tsv":
+        count = convert_binary_to_tsv(args.stem, args.tsv_path)
+        print(f"Wrote {count} embeddings to {args.tsv_path}")
+    else:
+        reader = EmbeddingFileReader(args.stem)
+        print(f"{reader.stem}: {reader.count} x {reader.dimension} {reader.dtype.name}, checksums OK")
+
+
+if __name__ == "__main__":
+    main()
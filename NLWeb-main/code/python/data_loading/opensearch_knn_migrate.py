@@ -0,0 +1,53 @@
+# Copyright (c) 2025 Microsoft Corporation.
+# Licensed under the MIT License
+
+"""
+Reindex an OpenSearch index that uses the script_score layout (embedding
+stored as a float array) into a new index with a knn_vector field, so that
+searches can use the native k-NN query path.
+
+Example usage (from the code/python directory):
+    python -m data_loading.opensearch_knn_migrate --database opensearch_knn
+    python -m data_loading.opensearch_knn_migrate --database opensearch_knn --source embeddings --target embeddings_knn
+
+Afterwards set index_name for the endpoint in config_retrieval.yaml to the
+target index (or move an alias to it) and enable use_knn.
+"""
+
+import argparse
+import asyncio
+
+from core.config import CONFIG
+from core.http_client import close_http_clients
+from retrieval_providers.opensearch_client import OpenSearchClient
+
+
+async def main():
+    parser = argparse.ArgumentParser(description="Reindex an OpenSearch index into the k-NN layout")
+    parser.add_argument("--database", type=str, required=True,
+                        help="OpenSearch endpoint to migrate (from config_retrieval.yaml)")
+    parser.add_argument("--source", type=str, default=None,
+                        help="Index to copy from (defaults to the endpoint's index_name)")
+    parser.add_argument("--target", type=str, default=None,
+                        help="Index to create (defaults to <source>_knn)")
+    parser.add_argument("--dimension", type=int, default=None,
+                        help="Embedding dimension (detected from the data if omitted)")
+    args = parser.parse_args()
+
+    endpoint_config = CONFIG.retrieval_endpoints.get(args.database)
+    if endpoint_config is None or endpoint_config.db_type != "opensearch":
+        parser.error(f"'{args.database}' is not an OpenSearch endpoint in config_retrieval.yaml")
+
+    client = OpenSearchClient(args.database)
+    try:
+        summary = await client.migrate_to_knn(args.source, args.target, args.dimension)
+    finally:
+        await close_http_clients()
+
+    print(f"Reindexed {summary['created']} documents from {summary['source_index']} "
+          f"into {summary['target_index']} in {summary['took_seconds']}s ({summary['failures']} failures)")
+    print(f"Set index_name: {summary['target_index']} and use_knn: true for '{args.database}' to use it.")
+
+
+if __name__ == "__main__":
+    asyncio.run(main())
@@ -8,6 +8,8 @@ WARNING: This code is under development and may undergo changes in future releas
 Backwards compatibility is not guaranteed at this time.
 """
 
+import asyncio
+import threading
 from typing import List, Optional, Union, Dict
 
 from elasticsearch import AsyncElasticsearch, NotFoundError
@@ -16,6 +18,14 @@ from core.config import CONFIG
 from misc.logger.logging_config_helper import get_configured_logger, LogLevel
 logger = get_configured_logger("elasticsearch_embedding")
 
+# Texts sent per inference request, and inference requests in flight, for batches
+DEFAULT_BATCH_SIZE = 32
+DEFAULT_BATCH_CONCURRENCY = 4
+
+# Long-lived clients, one per embedding endpoint name
+_client_lock = threading.Lock()
+_embedding_clients: Dict[str, "ElasticsearchEmbedding"] = {}
+
 class ElasticsearchEmbedding:
     def __init__(self,  endpoint_name: Optional[str] = None):
         self.endpoint_name = endpoint_name or CONFIG.preferred_embedding_provider
@@ -46,6 +56,13 @@ class ElasticsearchEmbedding:
         if embedding_config.endpoint is None:
             raise ValueError("The ELASTICSEARCH_URL environment variable is empty")
         
+        # Batch chunking (optional config.batch_size / config.batch_concurrency)
+        self._batch_size = max(1, int(self._config.get("batch_size") or DEFAULT_BATCH_SIZE))
+        self._batch_concurrency = max(1, int(self._config.get("batch_concurrency") or DEFAULT_BATCH_CONCURRENCY))
+        
+        # Event loop the client's connections belong to, bound on first use
+        self._loop = None
+        
         self._client = self._initialize_client(embedding_config.endpoint, embedding_config.api_key)
         
     def _initialize_client(self, endpoint:str, api_key:str)-> AsyncElasticsearch:
@@ -156,10 +173,13 @@ class ElasticsearchEmbedding:
         """
         Generate embeddings for multiple texts using Elasticsearch Inference API.
         
+        Texts are sent batch_size at a time, with up to batch_concurrency
+        inference requests in flight.
+        
         Args:
             texts: List of texts to embed
             model: Optional model ID to use, defaults to provider's configured model
-            timeout: Maximum time to wait for the batch embedding response in seconds
+            timeout: Maximum time to wait for each inference request in seconds
             
         Returns:
             List of embedding vectors, each a list of floats
@@ -171,22 +191,71 @@ class ElasticsearchEmbedding:
         if not texts:
             raise ValueError("Texts list cannot be empty")
         
-            
+        task_type = await self.get_model_task_type()
+        chunks = [texts[i:i + self._batch_size] for i in range(0, len(texts), self._batch_size)]
+        semaphore = asyncio.Semaphore(self._batch_concurrency)
+        
+        async def embed_chunk(chunk: List[str]) -> List[Union[List[float], Dict[str,float]]]:
+            async with semaphore:
+                response = await self._client.options(
+                    request_timeout=timeout
+                ).inference.inference(
+                    inference_id=model or self._model,
+                    task_type=task_type,
+                    body={
+                        "input": chunk
+                    }
+                )
+                return [each_embedding['embedding'] for each_embedding in response[task_type]]
+        
         try:
-            task_type = await self.get_model_task_type()
-            response = await self._client.options(
-                request_timeout=timeout
-            ).inference.inference(
-                inference_id=model or self._model,
-                task_type=task_type,
-                body={
-                    "input": texts
-                }
-            )
-            embeddings = []
-            for each_embedding in response[task_type]:
-                embeddings.append(each_embedding['embedding'])
-            return embeddings
+            results = await asyncio.gather(*(embed_chunk(chunk) for chunk in chunks))
         except Exception as e:
             logger.exception(f"Failed to get batch embeddings: {str(e)}")
             raise
+        
+        # gather keeps chunk order, so flattening preserves the input order
+        embeddings = []
+        for chunk_embeddings in results:
+            embeddings.extend(chunk_embeddings)
+        return embeddings
+
+
+def get_elasticsearch_embedding(endpoint_name: Optional[str] = None) -> ElasticsearchEmbedding:
+    """
+    Return the shared ElasticsearchEmbedding for an endpoint, creating it on first use.
+    
+    The underlying connections belong to the event loop they were first used
+    on, so a client is replaced if it is requested from a different loop
+    (e.g. successive asyncio.run() calls in the data loading tools).
+    """
+    endpoint_name = endpoint_name or CONFIG.preferred_embedding_provider
+    try:
+        loop = asyncio.get_running_loop()
+    except RuntimeError:
+        loop = None
+    
+    stale = None
+    with _client_lock:
+        client = _embedding_clients.get(endpoint_name)
+        if client is not None and loop is not None and client._loop is not None and client._loop is not loop:
+            stale, client = client, None
+        if client is None or client._client is None:
+            client = ElasticsearchEmbedding(endpoint_name)
+            _embedding_clients[endpoint_name] = client
+        if client._loop is None:
+            client._loop = loop
+    
+    if stale is not None and stale._loop.is_running():
+        # Release the old connections on the loop that owns them
+        asyncio.run_coroutine_threadsafe(stale.close(), stale._loop)
+    return client
+
+
+async def close_elasticsearch_embeddings():
+    """Close every shared Elasticsearch embedding client."""
+    with _client_lock:
+        clients = list(_embedding_clients.values())
+        _embedding_clients.clear()
+    for client in clients:
+        await client.close()
@@ -14,10 +14,10 @@ Backwards compatibility is not guaranteed at this time.
 """
 
 import logging
-import httpx
 from typing import List
 
 from core.config import CONFIG
+from core.http_client import get_httpx_client
 from retrieval_providers.utils import snowflake
 
 logger = logging.getLogger(__name__)
@@ -30,23 +30,23 @@ async def cortex_embed(text: str, model: str|None = None) -> List[float]:
     See: https://docs.snowflake.com/en/user-guide/snowflake-cortex/cortex-llm-rest-api#label-cortex-llm-embed-function
     """
     cfg = CONFIG.get_embedding_provider("snowflake")
-    async with httpx.AsyncClient() as client:
-        response = await client.post(
-            snowflake.get_account_url(cfg) + "/api/v2/cortex/inference:embed",
-            json={
-                "text": [text], 
-                "model": model or "snowflake-arctic-embed-m-v1.5"
-            },
-            headers={
-                    "Authorization": f"Bearer {snowflake.get_pat(cfg)}",
-                    "Content-Type": "application/json",
-                    "Accept": "application/json",
-            },
-        )
-        if response.status_code == 400:
-            raise Exception(response.json())
-        response.raise_for_status()
-        return response.json().get("data")[0].get("embedding")[0]
+    client = await get_httpx_client()
+    response = await client.post(
+        snowflake.get_account_url(cfg) + "/api/v2/cortex/inference:embed",
+        json={
+            "text": [text], 
+            "model": model or "snowflake-arctic-embed-m-v1.5"
+        },
+        headers={
+                "Authorization": f"Bearer {snowflake.get_pat(cfg)}",
+                "Content-Type": "application/json",
+                "Accept": "application/json",
+        },
+    )
+    if response.status_code == 400:
+        raise Exception(response.json())
+    response.raise_for_status()
+    return response.json().get("data")[0].get("embedding")[0]
 
 
 async def get_snowflake_batch_embeddings(texts: List[str], model: str|None = None) -> List[List[float]]:
@@ -61,27 +61,27 @@ async def get_snowflake_batch_embeddings(texts: List[str], model: str|None = Non
         List of embedding vectors, each a list of floats
     """
     cfg = CONFIG.get_embedding_provider("snowflake")
-    async with httpx.AsyncClient() as client:
-        response = await client.post(
-            snowflake.get_account_url(cfg) + "/api/v2/cortex/inference:embed",
-            json={
-                "text": texts, 
-                "model": model or "snowflake-arctic-embed-m-v1.5"
-            },
-            headers={
-                    "Authorization": f"Bearer {snowflake.get_pat(cfg)}",
-                    "Content-Type": "application/json",
-                    "Accept": "application/json",
-            },
-        )
-        if response.status_code == 400:
-            raise Exception(response.json())
-        response.raise_for_status()
+    client = await get_httpx_client()
+    response = await client.post(
+        snowflake.get_account_url(cfg) + "/api/v2/cortex/inference:embed",
+        json={
+            "text": texts, 
+            "model": model or "snowflake-arctic-embed-m-v1.5"
+        },
+        headers={
+                "Authorization": f"Bearer {snowflake.get_pat(cfg)}",
+                "Content-Type": "application/json",
+                "Accept": "application/json",
+        },
+    )
+    if response.status_code == 400:
+        raise Exception(response.json())
+    response.raise_for_status()
         
-        # Extract embeddings for all texts
-        embeddings = []
-        data = response.json().get("data")
-        for item in data:
-            embeddings.append(item.get("embedding")[0])
+    # Extract embeddings for all texts
+    embeddings = []
+    data = response.json().get("data")
+    for item in data:
+        embeddings.append(item.get("embedding")[0])
         
-        return embeddings
+    return embeddings
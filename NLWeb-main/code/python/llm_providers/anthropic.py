@@ -13,7 +13,7 @@ import json
 import re
 import logging
 import asyncio
-from typing import Dict, Any, List, Optional
+from typing import AsyncIterator, Dict, Any, List, Optional
 
 from anthropic import AsyncAnthropic
 from core.config import CONFIG
@@ -34,6 +34,7 @@ class AnthropicProvider(LLMProvider):
     
     _client_lock = threading.Lock()
     _client = None
+    supports_streaming = True
     
     @classmethod
     def get_api_key(cls) -> str:
@@ -128,6 +129,32 @@ class AnthropicProvider(LLMProvider):
         content = response.content[0].text
         return self.clean_response(content)
 
+    async def stream_completion(
+        self,
+        prompt: str,
+        model: Optional[str] = None,
+        temperature: float = 1.0,
+        max_tokens: int = 2048,
+        timeout: float = 30.0,
+        **kwargs
+    ) -> AsyncIterator[str]:
+        """
+        Stream a plain-text message from Anthropic, yielding text deltas.
+        """
+        if model is None:
+            model = CONFIG.llm_endpoints["anthropic"].models.high
+
+        client = self.get_client()
+        async with client.messages.stream(
+            model=model,
+            messages=[{"role": "user", "content": prompt}],
+            max_tokens=max_tokens,
+            temperature=temperature,
+            timeout=timeout,
+        ) as stream:
+            async for text in stream.text_stream:
+                yield text
+
 
 # Create a singleton instance
 provider = AnthropicProvider()
@@ -13,7 +13,7 @@ from openai import AsyncAzureOpenAI
 from core.config import CONFIG
 import asyncio
 import threading
-from typing import Dict, Any, Optional
+from typing import AsyncIterator, Dict, Any, Optional
 
 from llm_providers.llm_provider import LLMProvider
 from misc.logger.logging_config_helper import get_configured_logger, LogLevel
@@ -26,6 +26,7 @@ class AzureOpenAIProvider(LLMProvider):
     # Global client with thread-safe initialization
     _client_lock = threading.Lock()
     _client = None
+    supports_streaming = True
 
 
     @classmethod
@@ -226,6 +227,42 @@ class AzureOpenAIProvider(LLMProvider):
             logger.error(f"Azure OpenAI completion failed: {type(e).__name__}: {str(e)}")
             raise
 
+    async def stream_completion(
+        self,
+        prompt: str,
+        model: Optional[str] = None,
+        temperature: float = 0.7,
+        max_tokens: int = 2048,
+        timeout: float = 30.0,
+        high_tier: bool = True,
+        **kwargs
+    ) -> AsyncIterator[str]:
+        """
+        Stream a plain-text completion from Azure OpenAI, yielding content deltas.
+        """
+        model_to_use = model if model else self.get_model_from_config(high_tier)
+        client = self.get_client()
+        
+        logger.debug(f"Sending streaming request to Azure OpenAI with model: {model_to_use}")
+        stream = await asyncio.wait_for(
+            client.chat.completions.create(
+                messages=[{"role": "user", "content": prompt}],
+                max_tokens=max_tokens,
+                temperature=temperature,
+                stream=True,
+                model=model_to_use
+            ),
+            timeout=timeout
+        )
+        try:
+            async for chunk in stream:
+                # Azure sends chunks without choices for content filter results
+                if chunk.choices and chunk.choices[0].delta and chunk.choices[0].delta.content:
+                    yield chunk.choices[0].delta.content
+        finally:
+            # Release the connection if the caller stops reading early
+            await stream.close()
+
 
 # Create a singleton instance
 provider = AzureOpenAIProvider()
@@ -18,6 +18,11 @@ class LLMProvider(ABC):
     to ensure consistent behavior across different implementations.
     """
     
+    # Providers that implement stream_completion(prompt, model=None,
+    # temperature=..., max_tokens=..., timeout=..., **kwargs), an async
+    # generator of text deltas, set this to True
+    supports_streaming = False
+    
     @abstractmethod
     async def get_completion(
         self,
@@ -77,4 +82,4 @@ class LLMProvider(ABC):
         Raises:
             ValueError: If the content doesn't contain valid JSON
         """
-        pass
\ No newline at end of file
+        pass
@@ -13,7 +13,7 @@ import json
 import re
 import logging
 import asyncio
-from typing import Dict, Any, List, Optional
+from typing import AsyncIterator, Dict, Any, List, Optional
 
 from openai import AsyncOpenAI
 from core.config import CONFIG
@@ -41,6 +41,7 @@ class OpenAIProvider(LLMProvider):
     
     _client_lock = threading.Lock()
     _client = None
+    supports_streaming = True
 
     @classmethod
     def get_api_key(cls) -> str:
@@ -134,6 +135,40 @@ class OpenAIProvider(LLMProvider):
             return {}
 
 
+    async def stream_completion(
+        self,
+        prompt: str,
+        model: Optional[str] = None,
+        temperature: float = 0.7,
+        max_tokens: int = 2048,
+        timeout: float = 30.0,
+        **kwargs
+    ) -> AsyncIterator[str]:
+        """
+        Stream a plain-text chat completion, yielding content deltas.
+        """
+        if model is None:
+            model = CONFIG.llm_endpoints["openai"].models.high
+
+        client = self.get_client()
+        stream = await asyncio.wait_for(
+            client.chat.completions.create(
+                model=model,
+                messages=[{"role": "user", "content": prompt}],
+                temperature=temperature,
+                max_tokens=max_tokens,
+                stream=True,
+            ),
+            timeout
+        )
+        try:
+            async for chunk in stream:
+                if chunk.choices and chunk.choices[0].delta.content:
+                    yield chunk.choices[0].delta.content
+        finally:
+            # Release the connection if the caller stops reading early
+            await stream.close()
+
 
 # Create a singleton instance
 provider = OpenAIProvider()
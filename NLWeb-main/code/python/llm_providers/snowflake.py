@@ -16,10 +16,10 @@ Backwards compatibility is not guaranteed at this time.
 import json
 import re
 import logging
-import httpx
 from typing import Dict, Any, List, Optional
 
 from core.config import CONFIG
+from core.http_client import get_httpx_client
 from llm_providers.llm_provider import LLMProvider
 from retrieval_providers.utils import snowflake
 
@@ -124,24 +124,24 @@ async def cortex_complete(
 
 async def post(api: str, request: dict, timeout: float) -> dict:
     cfg = CONFIG.llm_endpoints.get("snowflake")
-    async with httpx.AsyncClient() as client:
-        response =  await client.post(
-            snowflake.get_account_url(cfg) + api,
-            json=request,
-            headers={
-                    "Authorization": f"Bearer {snowflake.get_pat(cfg)}",
-                    "Content-Type": "application/json",
-                    "Accept": "application/json",
-            },
-            timeout=timeout,
-        )
-        if response.status_code == 400:
-            logger.error(f"Snowflake API error: {response.json()}")
-            return {}
-        try:
-            response.raise_for_status()
-        except Exception as e:
-            logger.error(f"Snowflake API request failed: {e}")
-            return {}
-        return response.json()
+    client = await get_httpx_client()
+    response =  await client.post(
+        snowflake.get_account_url(cfg) + api,
+        json=request,
+        headers={
+                "Authorization": f"Bearer {snowflake.get_pat(cfg)}",
+                "Content-Type": "application/json",
+                "Accept": "application/json",
+        },
+        timeout=timeout,
+    )
+    if response.status_code == 400:
+        logger.error(f"Snowflake API error: {response.json()}")
+        return {}
+    try:
+        response.raise_for_status()
+    except Exception as e:
+        logger.error(f"Snowflake API request failed: {e}")
+        return {}
+    return response.json()
 
@@ -1,7 +1,9 @@
 import asyncio
 import json
+import time
 from typing import List, Dict, Any, Optional
-from core.retriever import search
+from core.retriever import search, search_batch
+from core.search_result import describe_result
 from core.utils.trim import trim_json_hard
 from core.llm import ask_llm
 from core.prompts import find_prompt, fill_prompt
@@ -25,6 +27,8 @@ class EnsembleToolHandler:
         self.params = params
         self.queries = params.get('queries', [])
         self.ensemble_type = params.get('ensemble_type', 'general')
+        # Seconds spent in each stage of the ensemble
+        self.stage_timings = {}
         
     async def do(self):
         """
@@ -40,6 +44,7 @@ class EnsembleToolHandler:
                 self.queries, self.handler.query_params, original_query
             )
             
+            start = time.perf_counter()
             # Calculate number of results per query based on total desired and number of queries
             num_queries = len(self.queries)
             results_per_query = max(1, NUM_RESULTS_FOR_ENSEMBLE_BUILDING // num_queries)
@@ -64,7 +69,9 @@ class EnsembleToolHandler:
                         item_dict = {}
                 
                 try:
-                    trimmed_item = trim_json_hard(item_dict)
+                    # trim_json_hard can return item_dict itself, which is shared through
+                    # the description cache, so the keys below go on a copy
+                    trimmed_item = dict(trim_json_hard(item_dict))
                     # Add the full schema object to the trimmed item
                     trimmed_item['schema_object'] = item_dict
                     # Ensure URL is in the trimmed item for matching
@@ -97,6 +104,8 @@ class EnsembleToolHandler:
                     logger.warning(f"Failed to trim item: {name}, error: {e}")
                     continue
             
+            self.stage_timings["selection"] = time.perf_counter() - start
+            
             # Calculate total items for the message
             total_items = sum(len(results) for results in ranked_results_per_query)
             
@@ -115,12 +124,16 @@ class EnsembleToolHandler:
             })
             
             # Generate ensemble recommendations using LLM
+            start = time.perf_counter()
             ensemble_response = await self._generate_ensemble_recommendations(
                 trimmed_results, 
                 self.queries, 
                 self.ensemble_type,
                 original_query
             )
+            self.stage_timings["aggregation"] = time.perf_counter() - start
+            logger.info("Ensemble stage timings: " + ", ".join(
+                f"{stage} {seconds:.2f}s" for stage, seconds in self.stage_timings.items()))
             
             logger.info(f"LLM response type: {type(ensemble_response)}")
             if isinstance(ensemble_response, dict):
@@ -212,7 +225,8 @@ class EnsembleToolHandler:
                 "success": True,
                 "ensemble_type": self.ensemble_type,
                 "recommendations": cleaned_response,
-                "total_items_retrieved": total_items
+                "total_items_retrieved": total_items,
+                "stage_timings": {stage: round(seconds, 3) for stage, seconds in self.stage_timings.items()}
             }
             
             await self.handler.send_message({
@@ -233,133 +247,107 @@ class EnsembleToolHandler:
                 }
             })
     
-    async def _retrieve_and_rank_for_query(self, query: str, query_idx: int, queries_count: int, query_params: Dict[str, Any], original_query: str) -> List[Dict]:
-        """Retrieve and rank results for a single query."""
+    async def _retrieve_all(self, queries: List[str], query_params: Dict[str, Any]) -> List[List[list]]:
+        """Results for every query, from one multi-query retrieval call when the backend allows it."""
+        # Aim for ~60 total results across all queries
+        results_per_query = max(10, 60 // len(queries))
+        site = self.handler.site if hasattr(self, 'handler') and self.handler else query_params.get('site', 'all')
         try:
-            # Execute search with appropriate limit per query
-            # Aim for ~60 total results across all queries
-            results_per_query = max(10, 60 // queries_count)
-            
-            # Get site from handler or query_params
-            site = self.handler.site if hasattr(self, 'handler') and self.handler else query_params.get('site', 'all')
-            
-            # Send intermediate message for this query
+            return await search_batch(queries, site=site, num_results=results_per_query, query_params=query_params)
+        except Exception as e:
+            logger.warning(f"Batch retrieval failed, searching each query separately: {str(e)}")
+        results = await asyncio.gather(
+            *(search(query=query, site=site, num_results=results_per_query, query_params=query_params) for query in queries),
+            return_exceptions=True
+        )
+        return [[] if isinstance(result, Exception) or result is None else result for result in results]
+    
+    def _dedupe_across_queries(self, results_per_query: List[List[list]]):
+        """
+        Distinct items by URL, in first-seen order, and for each URL the
+        indices of the queries that retrieved it.
+        """
+        unique_items = {}
+        query_indices = {}
+        for query_idx, results in enumerate(results_per_query):
+            for result in results:
+                url = result[0]
+                if url not in unique_items:
+                    unique_items[url] = result
+                    query_indices[url] = []
+                if query_idx not in query_indices[url]:
+                    query_indices[url].append(query_idx)
+        return unique_items, query_indices
+    
+    async def _send_top_results(self, ranked_results: List[Dict]):
+        """Send the top 2 ranked results of a query as an intermediate message."""
+        top_items = []
+        for result in ranked_results[:2]:
+            url, json_str, name, site = result['item']
+            try:
+                schema_object = describe_result(result['item']).parsed if json_str else {}
+            except ValueError:
+                schema_object = {}
+            top_items.append({
+                "name": name,
+                "url": url,
+                "site": site,
+                "schema_object": schema_object
+            })
+        if top_items:
             await self.handler.send_message({
                 "message_type": "intermediate_message",
-                "message": f"Looking for {query}"
+                "results": top_items
             })
-            
-            # Use the search abstraction from retriever.py
-            results = await search(
-                query=query,
-                site=site,
-                num_results=results_per_query,
-                query_params=query_params
-            )
-            
-            # Immediately rank the results for this query
-            ranked_results = await self._rank_query_results(results, original_query, query, query_idx)
-            
-            # Send top 2 ranked results as intermediate message
-            if ranked_results and len(ranked_results) > 0:
-                top_results = ranked_results[:2]  # Get top 2 results
-                top_items = []
-                
-                for result in top_results:
-                    if isinstance(result, dict) and 'name' in result:
-                        # Result is already in the format we need
-                        top_items.append(result)
-                    elif isinstance(result, list) and len(result) >= 4:
-                        # Result is in [url, json_str, name, site] format
-                        url, json_str, name, site = result[0], result[1], result[2], result[3]
-                        try:
-                            schema_object = json.loads(json_str) if json_str else {}
-                        except:
-                            schema_object = {}
-                        
-                        top_items.append({
-                            "name": name,
-                            "url": url,
-                            "site": site,
-                            "schema_object": schema_object
-                        })
-                
-                if top_items:
-                    await self.handler.send_message({
-                        "message_type": "intermediate_message",
-                        "results": top_items
-                    })
-            
-            return ranked_results
-            
-        except Exception as e:
-            logger.error(f"Error in retrieve and rank for query '{query}': {str(e)}")
-            return []
     
     async def _execute_parallel_retrieval_and_ranking(self, queries: List[str], query_params: Dict[str, Any], original_query: str) -> List[List[Dict]]:
-        """Execute retrieval and ranking in parallel for all queries."""
-        # Execute retrieval and ranking for all queries in parallel
-        tasks = [self._retrieve_and_rank_for_query(query, idx, len(queries), query_params, original_query) for idx, query in enumerate(queries)]
-        ranked_results_per_query = await asyncio.gather(*tasks)
-        
-        return ranked_results_per_query
-    
-    async def _rank_query_results(self, results: List[tuple], original_query: str, search_query: str, query_idx: int) -> List[Dict]:
-        """Rank results from a single query.
-        
-        Args:
-            results: List of 4-tuples (url, json_str, name, site) from search
-            original_query: The original user query
-            search_query: The specific search query used
-            query_idx: Index of this query in the ensemble
         """
-        # First, deduplicate within this query's results
-        seen_ids = set()
-        unique_results = []
+        Retrieve results for all queries in one batch, then rank each distinct
+        item once against every query that retrieved it.
         
-        for result_tuple in results:
-            # Unpack the 4-tuple
-            url, json_str, name, site = result_tuple
-            
-            # Parse JSON string to dict for processing
-            try:
-                item_dict = json.loads(json_str) if isinstance(json_str, str) else json_str
-            except:
-                item_dict = {}
-            
-            item_id = self._get_item_identifier(item_dict)
-            if item_id and item_id not in seen_ids:
-                seen_ids.add(item_id)
-                unique_results.append(result_tuple)
-            elif not item_id:
-                unique_results.append(result_tuple)
-        
-        # Rank each unique result
-        ranking_tasks = []
-        for idx, result_tuple in enumerate(unique_results):
-            task = self._rank_single_item(result_tuple, original_query, idx)
-            ranking_tasks.append(task)
-        
-        # Execute all ranking tasks in parallel
-        scores = await asyncio.gather(*ranking_tasks)
-        
-        # Create ranked results with metadata
-        ranked_results = []
-        for result_tuple, score in zip(unique_results, scores):
-            url, json_str, name, site = result_tuple
-            ranked_results.append({
-                'item': result_tuple,  # Store the original tuple
-                'relevance_score': score,
-                'source_query_idx': query_idx,
-                'search_query': search_query
+        Returns:
+            One list of ranked results per query, best first
+        """
+        for query in queries:
+            await self.handler.send_message({
+                "message_type": "intermediate_message",
+                "message": f"Looking for {query}"
             })
         
-        # Sort by relevance score
-        ranked_results.sort(key=lambda x: x['relevance_score'], reverse=True)
+        start = time.perf_counter()
+        results_per_query = await self._retrieve_all(queries, query_params)
+        self.stage_timings["retrieval"] = time.perf_counter() - start
         
-        logger.info(f"Ranked {len(ranked_results)} items for query '{search_query}'")
-        return ranked_results
-    
+        start = time.perf_counter()
+        unique_items, query_indices = self._dedupe_across_queries(results_per_query)
+        self.stage_timings["dedup"] = time.perf_counter() - start
+        logger.info(f"Retrieved {sum(len(results) for results in results_per_query)} results for "
+                    f"{len(queries)} queries, {len(unique_items)} distinct items")
+        
+        start = time.perf_counter()
+        ranking_tasks = [
+            self._rank_item_for_queries(item, [queries[idx] for idx in query_indices[url]], original_query)
+            for url, item in unique_items.items()
+        ]
+        scores_per_item = await asyncio.gather(*ranking_tasks)
+        self.stage_timings["ranking"] = time.perf_counter() - start
+        
+        ranked_results_per_query = [[] for _ in queries]
+        for (url, item), scores in zip(unique_items.items(), scores_per_item):
+            for query_idx, score in zip(query_indices[url], scores):
+                ranked_results_per_query[query_idx].append({
+                    'item': item,
+                    'relevance_score': score,
+                    'source_query_idx': query_idx,
+                    'search_query': queries[query_idx]
+                })
+        
+        for query, ranked_results in zip(queries, ranked_results_per_query):
+            ranked_results.sort(key=lambda x: x['relevance_score'], reverse=True)
+            logger.info(f"Ranked {len(ranked_results)} items for query '{query}'")
+            await self._send_top_results(ranked_results)
+        
+        return ranked_results_per_query
     
     def _get_item_identifier(self, item: Dict) -> Optional[str]:
         """Extract a unique identifier from an item."""
@@ -417,6 +405,44 @@ class EnsembleToolHandler:
         return str(obj)
     
     
+    def _item_summary(self, result_tuple) -> Dict[str, str]:
+        """Name, type, start of the description and URL of an item, for ranking prompts."""
+        url, json_str, name, site = result_tuple
+        
+        # Parse JSON to get item details; arrays use their first object
+        try:
+            item_dict = describe_result(result_tuple).schema_object
+        except (ValueError, TypeError):
+            item_dict = {}
+        
+        if not isinstance(item_dict, dict):
+            item_dict = {}
+        
+        # Handle cases where fields might be lists due to collateObjAttr
+        name_value = item_dict.get('name', name)
+        if isinstance(name_value, list):
+            name_value = name_value[0] if name_value else 'Unknown'
+        
+        type_value = item_dict.get('@type', 'Unknown')
+        if isinstance(type_value, list):
+            type_value = type_value[0] if type_value else 'Unknown'
+        
+        desc_value = item_dict.get('description', '')
+        if isinstance(desc_value, list):
+            desc_value = desc_value[0] if desc_value else ''
+        desc_value = str(desc_value)[:200]  # First 200 chars
+        
+        url_value = item_dict.get('url', url)
+        if isinstance(url_value, list):
+            url_value = url_value[0] if url_value else ''
+        
+        return {
+            'name': name_value or 'Unknown',
+            'type': type_value,
+            'description': desc_value,
+            'url': url_value or ''
+        }
+    
     async def _rank_single_item(self, result_tuple: tuple, original_query: str, idx: int) -> float:
         """Rank a single item for relevance to the query.
         
@@ -426,47 +452,7 @@ class EnsembleToolHandler:
             idx: Index of the item
         """
         try:
-            # Unpack the tuple
-            url, json_str, name, site = result_tuple
-            
-            # Parse JSON to get item details
-            try:
-                item_dict = json.loads(json_str) if isinstance(json_str, str) else json_str
-            except:
-                item_dict = {}
-            
-            # Ensure item_dict is a dictionary, not a list
-            if isinstance(item_dict, list):
-                item_dict = item_dict[0] if item_dict else {}
-            
-            if not isinstance(item_dict, dict):
-                item_dict = {}
-            
-            # Create a concise representation of the item for ranking
-            # Handle cases where fields might be lists due to collateObjAttr
-            name_value = item_dict.get('name', name) if isinstance(item_dict, dict) else name
-            if isinstance(name_value, list):
-                name_value = name_value[0] if name_value else 'Unknown'
-            
-            type_value = item_dict.get('@type', 'Unknown') if isinstance(item_dict, dict) else 'Unknown'
-            if isinstance(type_value, list):
-                type_value = type_value[0] if type_value else 'Unknown'
-            
-            desc_value = item_dict.get('description', '') if isinstance(item_dict, dict) else ''
-            if isinstance(desc_value, list):
-                desc_value = desc_value[0] if desc_value else ''
-            desc_value = str(desc_value)[:200]  # First 200 chars
-            
-            url_value = item_dict.get('url', url) if isinstance(item_dict, dict) else url
-            if isinstance(url_value, list):
-                url_value = url_value[0] if url_value else ''
-            
-            item_summary = {
-                'name': name_value or 'Unknown',
-                'type': type_value,
-                'description': desc_value,
-                'url': url_value or ''
-            }
+            item_summary = self._item_summary(result_tuple)
             
             # Get the ranking prompt from XML
             prompt_str, return_struc = find_prompt(self.handler.site, self.handler.item_type, "EnsembleItemRankingPrompt")
@@ -496,6 +482,49 @@ class EnsembleToolHandler:
             logger.error(f"Error ranking item {idx}: {str(e)}")
             return 0.0
     
+    async def _rank_item_for_queries(self, result_tuple, queries: List[str], original_query: str) -> List[float]:
+        """
+        Score one item against each of the queries that retrieved it with a
+        single LLM call. Returns one score per query, in query order.
+        """
+        prompt_str, return_struc = find_prompt(self.handler.site, self.handler.item_type, "EnsembleMultiQueryRankingPrompt")
+        if not prompt_str:
+            # Older prompt files: one score against the user's query, used for every sub-query
+            score = await self._rank_single_item(result_tuple, original_query, 0)
+            return [score] * len(queries)
+        
+        try:
+            item_summary = self._item_summary(result_tuple)
+            pr_dict = {
+                "item.name": item_summary['name'],
+                "item.type": item_summary['type'],
+                "item.description": item_summary['description'],
+                "ensemble.queries": "\n".join(f"{i + 1}. {query}" for i, query in enumerate(queries))
+            }
+            filled_prompt = fill_prompt(prompt_str, self.handler, pr_dict)
+            result = await ask_llm(filled_prompt, return_struc, level="low", timeout=5, query_params=self.handler.query_params)
+            return self._parse_query_scores(result, len(queries))
+        except Exception as e:
+            logger.error(f"Error ranking item {result_tuple[0]}: {str(e)}")
+            return [0.0] * len(queries)
+    
+    @staticmethod
+    def _parse_query_scores(result: Any, count: int) -> List[float]:
+        """The per-query scores of a multi-query ranking response; missing or invalid scores are 0."""
+        scores = result.get('scores') if isinstance(result, dict) else None
+        if not isinstance(scores, list):
+            scores = [result['score']] if isinstance(result, dict) and 'score' in result and count == 1 else []
+        parsed = []
+        for i in range(count):
+            score = scores[i] if i < len(scores) else None
+            if isinstance(score, dict):
+                score = score.get('score')
+            try:
+                parsed.append(float(score))
+            except (TypeError, ValueError):
+                parsed.append(0.0)
+        return parsed
+    
     def _select_top_results_from_ranked(self, ranked_results_per_query: List[List[Dict]], num_per_query: int = 3) -> List[Dict]:
         """Select top N results from each query's ranked results.
         
@@ -520,7 +549,7 @@ class EnsembleToolHandler:
                 # Extract item dict from the tuple for ID checking
                 url, json_str, name, site = item['item']
                 try:
-                    item_dict = json.loads(json_str) if isinstance(json_str, str) else json_str
+                    item_dict = describe_result(item['item']).parsed if isinstance(json_str, str) else json_str
                 except:
                     item_dict = {}
                 
@@ -11,35 +11,93 @@ Backwards compatibility is not guaranteed at this time.
 
 import asyncio
 from core.baseHandler import NLWebHandler
-from core.llm import ask_llm
+from core.config import CONFIG
+from core.llm import ask_llm, stream_llm, supports_streaming
 from core.prompts import PromptRunner
 from core.retriever import search
 from core.prompts import find_prompt, fill_prompt
-from core.utils.json_utils import trim_json, trim_json_hard
+from core.description_cache import describe_item
 from misc.logger.logging_config_helper import get_configured_logger
-from core.utils.utils import log
+from core.utils.utils import log, get_param
 import core.query_analysis.analyze_query as analyze_query
 import core.query_analysis.relevance_detection as relevance_detection
 import core.query_analysis.memory as memory
 import core.query_analysis.required_info as required_info
-import json
+import re
+import time
 import traceback
 
 
 logger = get_configured_logger("generate_answer")
 
 
+SOURCES_MARKER = "SOURCES:"
+_SOURCES_RE = re.compile(re.escape(SOURCES_MARKER), re.IGNORECASE)
+_URL_RE = re.compile(r"https?://[^\s,;<>\"']+")
+
+
+class StreamedAnswer:
+    """
+    Splits a streamed synthesis into the answer text and the URLs listed
+    after the SOURCES: line. Text that may be the start of the marker is held
+    back until the following delta shows whether it is.
+    """
+
+    def __init__(self):
+        self.text = ""
+        self.emitted = 0
+        self.sources_at = None
+
+    def feed(self, delta):
+        """Add a delta; returns the answer text that can be shown now."""
+        self.text += delta
+        if self.sources_at is not None:
+            return ""
+        match = _SOURCES_RE.search(self.text, self.emitted)
+        if match:
+            self.sources_at = match.start()
+            end = match.start()
+        else:
+            end = len(self.text) - self._partial_marker_length()
+        text = self.text[self.emitted:end]
+        self.emitted = end
+        return text
+
+    def _partial_marker_length(self):
+        for length in range(min(len(SOURCES_MARKER) - 1, len(self.text) - self.emitted), 0, -1):
+            if self.text[-length:].upper() == SOURCES_MARKER[:length]:
+                return length
+        return 0
+
+    def finish(self):
+        """The whole answer and the cited URLs, in order and without duplicates."""
+        if self.sources_at is None:
+            return self.text.strip(), []
+        answer = self.text[:self.sources_at].rstrip().rstrip("*#").rstrip()
+        urls = []
+        for url in _URL_RE.findall(self.text[self.sources_at:]):
+            url = url.rstrip(".)]*")
+            if url not in urls:
+                urls.append(url)
+        return answer, urls
+
+
 class GenerateAnswer(NLWebHandler):
 
     GATHER_ITEMS_THRESHOLD = 55
 
     RANKING_PROMPT_NAME = "RankingPromptForGenerate"
     SYNTHESIZE_PROMPT_NAME = "SynthesizePromptForGenerate"
-    DESCRIPTION_PROMPT_NAME = "DescriptionPromptForGenerate"
+    STREAM_SYNTHESIZE_PROMPT_NAME = "SynthesizePromptForGenerateStream"
+    DESCRIPTIONS_PROMPT_NAME = "DescriptionsPromptForGenerate"
+    # Shorter ranking descriptions are requested again after synthesis
+    MIN_DESCRIPTION_LENGTH = 20
 
     def __init__(self, query_params, handler):
         super().__init__(query_params, handler)
         self.items = []
+        # Descriptions of retrieved items by URL, from ranking or the description prompt
+        self.item_descriptions = {}
         self._results_lock = asyncio.Lock()  # Add lock for thread-safe operations
         logger.info(f"GenerateAnswer initialized with query_params: {query_params}")
         log(f"GenerateAnswer query_params: {query_params}")
@@ -91,8 +149,8 @@ class GenerateAnswer(NLWebHandler):
         try:
             logger.debug(f"Ranking item: {name} from {site}")
             prompt_str, ans_struc = find_prompt(site, self.item_type, self.RANKING_PROMPT_NAME)
-            description = trim_json_hard(json_str)
-            prompt = fill_prompt(prompt_str, self, {"item.description": description})
+            item = describe_item(url, json_str)
+            prompt = fill_prompt(prompt_str, self, {"item.description": item.hard_description})
             logger.debug(f"Sending ranking request to LLM for item: {name}")
             ranking = await ask_llm(prompt, ans_struc, level="low", query_params=self.query_params)
             logger.debug(f"Received ranking score: {ranking.get('score', 'N/A')} for item: {name}")
@@ -101,10 +159,13 @@ class GenerateAnswer(NLWebHandler):
                 'site': site,
                 'name': name,
                 'ranking': ranking,
-                'schema_object': json.loads(json_str),
+                'schema_object': item.parsed,
                 'sent': False,
             }
             
+            if self.usable_description(ranking.get("description")):
+                self.item_descriptions[url] = ranking["description"]
+            
             if (ranking["score"] > self.GATHER_ITEMS_THRESHOLD):
                 logger.info(f"High score item: {name} (score: {ranking['score']})")
                 async with self._results_lock:  # Thread-safe append
@@ -143,16 +204,85 @@ class GenerateAnswer(NLWebHandler):
             logger.exception(f"Error in get_ranked_answers: {e}")
             raise
 
-    async def getDescription(self, url, json_str, query, answer, name, site):
+    @classmethod
+    def usable_description(cls, description):
+        return isinstance(description, str) and len(description.strip()) >= cls.MIN_DESCRIPTION_LENGTH
+
+    async def getDescriptions(self, items, answer):
+        """
+        Describe several cited items in the context of the answer with a single LLM call.
+
+        Returns:
+            {url: description} for the items the LLM described
+        """
+        prompt_str, ans_struc = find_prompt(self.site, self.item_type, self.DESCRIPTIONS_PROMPT_NAME)
+        if prompt_str is None:
+            logger.warning(f"Prompt {self.DESCRIPTIONS_PROMPT_NAME} not found, sending items without descriptions")
+            return {}
+        item_text = "\n".join(f"URL: {url}\nItem: {describe_item(url, json_str).hard_description}"
+                               for url, json_str, name, site in items)
+        prompt = fill_prompt(prompt_str, self, {"request.answer": answer, "request.items": item_text})
+        response = await ask_llm(prompt, ans_struc, level="low", timeout=20, query_params=self.query_params,
+                                 max_length=max(512, 150 * len(items)))
+        descriptions = {}
+        for entry in (response or {}).get("descriptions") or []:
+            if isinstance(entry, dict) and entry.get("url") and self.usable_description(entry.get("description")):
+                descriptions[entry["url"]] = entry["description"]
+        logger.debug(f"Got descriptions for {len(descriptions)} of {len(items)} items")
+        return descriptions
+
+    def should_stream_answer(self):
+        """Stream the synthesis to the client if it is listening and the LLM endpoint can stream."""
+        if not (self.streaming and self.http_handler is not None):
+            return False
+        if not CONFIG.answer_synthesis.streaming or not get_param(self.query_params, "stream_answer", bool, "true"):
+            return False
+        return supports_streaming(query_params=self.query_params)
+
+    async def streamAnswer(self):
+        """
+        Run the streaming synthesis prompt, forwarding the answer text as
+        nlws_delta messages while it is generated.
+
+        Returns:
+            {"answer": ..., "urls": [...]} like the structured synthesis prompt,
+            or None if streaming failed before any text was sent
+        """
+        prompt_str, _ = find_prompt(self.site, self.item_type, self.STREAM_SYNTHESIZE_PROMPT_NAME)
+        if prompt_str is None:
+            return None
+        prompt = fill_prompt(prompt_str, self)
+        parser = StreamedAnswer()
+        flush_interval = CONFIG.answer_synthesis.flush_interval
+        pending = []
+        last_flush = None
+        start = time.time()
         try:
-            logger.debug(f"Getting description for item: {name}")
-            description = await PromptRunner(self).run_prompt(self.DESCRIPTION_PROMPT_NAME)
-            logger.debug(f"Got description for item: {name}")
-            return (url, name, site, description["description"], json_str)
+            async for delta in stream_llm(prompt, level="high", timeout=100, query_params=self.query_params):
+                text = parser.feed(delta)
+                if not text:
+                    continue
+                pending.append(text)
+                now = time.time()
+                if last_flush is None:
+                    logger.info(f"First answer text {now - start:.2f}s after synthesis started")
+                if last_flush is None or now - last_flush >= flush_interval:
+                    await self.send_message({"message_type": "nlws_delta", "delta": "".join(pending)})
+                    pending = []
+                    last_flush = now
+                if not self.connection_alive_event.is_set():
+                    logger.warning("Connection lost while streaming the answer")
+                    break
+            if pending:
+                await self.send_message({"message_type": "nlws_delta", "delta": "".join(pending)})
         except Exception as e:
-            logger.error(f"Error getting description for {name}: {str(e)}")
-            logger.debug("Full error trace: ", exc_info=True)
-            raise
+            if last_flush is None:
+                logger.warning(f"Streaming synthesis failed, falling back to a single call: {e}")
+                return None
+            logger.error(f"Streaming synthesis failed after the answer started: {e}")
+        answer, urls = parser.finish()
+        logger.info(f"Streamed answer of {len(answer)} chars citing {len(urls)} items in {time.time() - start:.2f}s")
+        return {"answer": answer, "urls": urls}
 
     async def synthesizeAnswer(self): 
         if not self.connection_alive_event.is_set():
@@ -173,56 +303,56 @@ class GenerateAnswer(NLWebHandler):
                 await self.send_message(message)
                 return
                 
-            response = await PromptRunner(self).run_prompt(self.SYNTHESIZE_PROMPT_NAME, timeout=100, verbose=True)
-            logger.debug(f"Synthesis response received")
+            response = None
+            if self.should_stream_answer():
+                response = await self.streamAnswer()
+            if response is None:
+                response = await PromptRunner(self).run_prompt(self.SYNTHESIZE_PROMPT_NAME, timeout=100, verbose=True)
+                logger.debug(f"Synthesis response received")
             
             json_results = []
-            description_tasks = []
             answer = response["answer"]
             
-            # Create initial message with just the answer
+            # Create initial message with just the answer; after streaming it replaces the deltas
             message = {"message_type": "nlws", "answer": answer, "items": json_results}
             logger.info("Sending initial answer")
             await self.send_message(message)
             
-            # Process each URL mentioned in the response
-            if "urls" in response and response["urls"]:
-                for url in response["urls"]:
-                    # Find the matching item in our items list
-                    matching_items = [item for item in self.items if item[0] == url]
-                    if not matching_items:
-                        logger.warning(f"URL {url} referenced in response not found in items")
-                        continue
-                        
-                    item = matching_items[0]
-                    (url, json_str, name, site) = item
-                    logger.debug(f"Creating description task for item: {name}")
-                    t = asyncio.create_task(self.getDescription(url, json_str, self.decontextualized_query, answer, name, site))
-                    description_tasks.append(t)
-                    
-                if description_tasks:
-                    logger.info(f"Waiting for {len(description_tasks)} description tasks to complete")
-                    desc_answers = await asyncio.gather(*description_tasks, return_exceptions=True)
+            # Collect the items behind the URLs mentioned in the response
+            items_by_url = {}
+            for item in self.items:
+                items_by_url.setdefault(item[0], item)
+            cited = []
+            for url in response.get("urls") or []:
+                item = items_by_url.get(url)
+                if item is None:
+                    logger.warning(f"URL {url} referenced in response not found in items")
+                elif item not in cited:
+                    cited.append(item)
+            
+            if cited:
+                # Ranking already described most items; ask for the rest in one call
+                missing = [item for item in cited if not self.usable_description(self.item_descriptions.get(item[0]))]
+                if missing:
+                    logger.info(f"Requesting descriptions for {len(missing)} of {len(cited)} cited items in one call")
+                    self.item_descriptions.update(await self.getDescriptions(missing, answer))
+                else:
+                    logger.info(f"Reusing ranking descriptions for all {len(cited)} cited items")
+                
+                for url, json_str, name, site in cited:
+                    logger.debug(f"Adding result for {name} to final message")
+                    json_results.append({
+                        "url": url,
+                        "name": name,
+                        "description": self.item_descriptions.get(url, ""),
+                        "site": site,
+                        "schema_object": describe_item(url, json_str).parsed,
+                    })
                     
-                    for result in desc_answers:
-                        if isinstance(result, Exception):
-                            logger.error(f"Error getting description: {result}")
-                            continue
-                            
-                        url, name, site, description, json_str = result
-                        logger.debug(f"Adding result for {name} to final message")
-                        json_results.append({
-                            "url": url,
-                            "name": name,
-                            "description": description,
-                            "site": site,
-                            "schema_object": json.loads(json_str),
-                        })
-                        
-                    # Update message with descriptions
-                    message = {"message_type": "nlws", "answer": answer, "items": json_results}
-                    logger.info(f"Sending final answer with {len(json_results)} item descriptions")
-                    await self.send_message(message)
+                # Update message with descriptions
+                message = {"message_type": "nlws", "answer": answer, "items": json_results}
+                logger.info(f"Sending final answer with {len(json_results)} item descriptions")
+                await self.send_message(message)
             else:
                 logger.warning("No URLs found in synthesis response")
                 
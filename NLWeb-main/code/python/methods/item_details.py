@@ -9,11 +9,10 @@ Backwards compatibility is not guaranteed at this time.
 """
 
 import asyncio
-import json
 from typing import List, Dict, Any, Optional, Union
 from core.prompts import find_prompt, fill_prompt
 from misc.logger.logging_config_helper import get_configured_logger
-from core.utils.json_utils import trim_json
+from core.description_cache import describe_item
 from core.retriever import search, search_by_url
 from core.llm import ask_llm
 
@@ -112,7 +111,8 @@ class ItemDetailsHandler():
                 url, json_str, name, site = item[0], item[1], item[2], item[3]
             
             # Use the same description method as ranking.py
-            description = trim_json(json_str)
+            item_description = describe_item(url, json_str)
+            description = item_description.description
             
             # Set handler attributes for prompt filling
             self.handler.item_name = self.item_name
@@ -143,7 +143,7 @@ class ItemDetailsHandler():
                         "explanation": explanation,
                         "url": url,
                         "site": site,
-                        "schema_object": json.loads(json_str)
+                        "schema_object": item_description.parsed
                     }
                 else:
                     return
@@ -180,6 +180,7 @@ class ItemDetailsHandler():
             item = results[0]
             if isinstance(item, list) and len(item) >= 4:
                 url, json_str, name, site = item[0], item[1], item[2], item[3]
+                item_description = describe_item(url, json_str)
                 
                 # Use ExtractItemDetailsPrompt to extract the requested details
                 prompt_str, ans_struc = find_prompt(self.handler.site, self.handler.item_type, "ExtractItemDetailsPrompt")
@@ -189,17 +190,17 @@ class ItemDetailsHandler():
                     message = {
                         "message_type": "item_details",
                         "name": name,
-                        "details": trim_json(json_str),
+                        "details": item_description.trimmed,
                         "url": url,
                         "site": site,
-                        "schema_object": json.loads(json_str)
+                        "schema_object": item_description.parsed
                     }
                     await self.handler.send_message(message)
                     return
                 
                 # Fill the prompt with item description and details requested
                 pr_dict = {
-                    "item.description": trim_json(json_str),
+                    "item.description": item_description.description,
                     "request.details_requested": self.details_requested,
                     "request.query": self.handler.query
                 }
@@ -214,7 +215,7 @@ class ItemDetailsHandler():
                         "additional_context": response.get("additional_context", ""),
                         "url": url,
                         "site": site,
-                        "schema_object": json.loads(json_str)
+                        "schema_object": item_description.parsed
                     }
                     await self.handler.send_message(message)
                     logger.info(f"Sent item details for URL: {self.item_url}")
@@ -1,9 +1,12 @@
 import yaml
 import os
+import sys
 import queue
+import logging
 import threading
 import time
 import atexit
+from logging.handlers import RotatingFileHandler
 from typing import Dict, Any, Optional
 from .logger import LogLevel, LoggerUtility
 
@@ -214,15 +217,63 @@ def get_logging_config(config_path: str = "config/config_logging.yaml") -> Loggi
     return _logging_config
 
 
+# Level names used on the queue, mapped to stdlib levels
+_QUEUE_LEVELS = {
+    'debug': logging.DEBUG,
+    'info': logging.INFO,
+    'warning': logging.WARNING,
+    'error': logging.ERROR,
+    'critical': logging.CRITICAL,
+    'exception': logging.ERROR,
+}
+
+OVERFLOW_POLICIES = ('drop', 'block', 'sample')
+
+
 class AsyncLogProcessor:
-    """Background processor for handling log writes asynchronously"""
+    """
+    Background processor for handling log writes asynchronously.
+
+    Records are drained from the queue in batches, formatted, grouped by
+    handler (i.e. by destination file or console), and each group is written
+    with a single buffered write. Streams are flushed when the queue goes
+    idle, or every flush_interval while it is busy; the interval doubles
+    under sustained load and shrinks back when load drops.
+
+    When the queue holds max_queue_size records, overflow_policy decides
+    what producers do:
+    - 'drop': discard the new record
+    - 'block': wait for space (only for offline tools; adds latency)
+    - 'sample': keep one in sample_every debug/info records
+    Warnings and above are never dropped or sampled out.
+    """
     
-    def __init__(self, flush_interval=1.0, max_queue_size=1000):
-        self.log_queue = queue.Queue(maxsize=max_queue_size)
-        self.flush_interval = flush_interval
+    def __init__(self, flush_interval=1.0, max_queue_size=10000, batch_size=500,
+                 overflow_policy='sample', sample_every=10, min_flush_interval=0.05):
+        if overflow_policy not in OVERFLOW_POLICIES:
+            raise ValueError(f"Invalid overflow policy: {overflow_policy}. Must be one of {OVERFLOW_POLICIES}")
+        self.log_queue = queue.SimpleQueue()
+        self.max_queue_size = max_queue_size
+        self.batch_size = batch_size
+        self.overflow_policy = overflow_policy
+        self.sample_every = max(1, sample_every)
+        self.max_flush_interval = flush_interval
+        self.min_flush_interval = min(min_flush_interval, flush_interval)
+        self.flush_interval = self.min_flush_interval
         self.shutdown_event = threading.Event()
         self.worker_thread = None
         self.real_loggers = {}  # Cache of actual LoggerUtility instances
+        self._space_available = threading.Condition()
+        
+        # Counters, reported by get_stats() and logged when records are lost
+        self.enqueued_count = 0
+        self.written_count = 0
+        self.dropped_count = 0
+        self.sampled_out_count = 0
+        self.blocked_count = 0
+        self.batch_count = 0
+        self._overflow_seen = 0
+        self._reported_lost = 0
         
     def start(self):
         """Start the background worker thread"""
@@ -233,30 +284,24 @@ class AsyncLogProcessor:
             atexit.register(self.shutdown)
     
     def _worker(self):
-        """Background worker that processes queued log messages"""
+        """Background worker that processes queued log messages in batches"""
         last_flush = time.time()
+        dirty = False
         
         while not self.shutdown_event.is_set():
             try:
-                # Try to get a log record with timeout
-                try:
-                    log_record = self.log_queue.get(timeout=0.1)
-                except queue.Empty:
-                    # Check if we need to flush
-                    if time.time() - last_flush > self.flush_interval:
-                        self._flush_all_loggers()
-                        last_flush = time.time()
-                    continue
-                
-                # Process the log record
-                module_name, level, message, args, kwargs = log_record
+                batch = self._next_batch(timeout=0.1)
+                if batch:
+                    self._write_batch(batch)
+                    dirty = True
+                    self._adapt_flush_interval(len(batch))
                 
-                # Get or create the real logger
-                real_logger = self._get_real_logger(module_name)
-                
-                # Write the log message
-                self._dispatch_log(real_logger, level, message, args, kwargs)
-                self.log_queue.task_done()
+                now = time.time()
+                idle = self.log_queue.empty()
+                if dirty and (idle or now - last_flush >= self.flush_interval):
+                    self._flush_all_loggers()
+                    last_flush = now
+                    dirty = False
                 
             except Exception as e:
                 # Don't let exceptions in logging crash the worker thread
@@ -266,32 +311,119 @@ class AsyncLogProcessor:
         # Process remaining items in queue during shutdown
         self._drain_queue()
     
+    def _next_batch(self, timeout: float) -> list:
+        """Wait for one record, then take whatever else is queued up to batch_size"""
+        try:
+            batch = [self.log_queue.get(timeout=timeout)]
+        except queue.Empty:
+            return []
+        while len(batch) < self.batch_size:
+            try:
+                batch.append(self.log_queue.get_nowait())
+            except queue.Empty:
+                break
+        if self.overflow_policy == 'block':
+            with self._space_available:
+                self._space_available.notify_all()
+        return batch
+    
+    def _adapt_flush_interval(self, batch_len: int):
+        """Flush less often while batches are full, more often as load drops"""
+        if batch_len >= self.batch_size:
+            self.flush_interval = min(self.flush_interval * 2, self.max_flush_interval)
+        elif batch_len < self.batch_size // 4:
+            self.flush_interval = max(self.flush_interval / 2, self.min_flush_interval)
+    
     def _get_real_logger(self, module_name: str):
         """Get or create the real LoggerUtility instance"""
         if module_name not in self.real_loggers:
-            config = get_logging_config()
-            self.real_loggers[module_name] = config.get_logger(module_name)
+            # Share the real logger with the LazyLogger so handlers are created once
+            self.real_loggers[module_name] = get_configured_logger(module_name)._ensure_logger_for_sync_ops()
         return self.real_loggers[module_name]
     
-    def _dispatch_log(self, logger, level, message, args, kwargs):
-        """Dispatch log message to the appropriate logger method based on level"""
+    def _make_record(self, log_record):
+        """Turn a queued entry into a logging.LogRecord, or None if its level is disabled"""
+        module_name, level, message, args, kwargs, created = log_record
+        std_logger = self._get_real_logger(module_name).logger
+        
+        if level == 'log_with_context':
+            log_level, context = args
+            levelno = log_level.value
+            if not std_logger.isEnabledFor(levelno):
+                return None
+            context_str = " - ".join(f"{k}={v}" for k, v in context.items())
+            message = f"{message} | Context: {context_str}"
+            args = ()
+        else:
+            levelno = _QUEUE_LEVELS.get(level, logging.INFO)
+            if not std_logger.isEnabledFor(levelno):
+                return None
+        
+        exc_info = kwargs.get('exc_info')
+        record = std_logger.makeRecord(
+            std_logger.name, levelno, "(unknown file)", 0, message, args,
+            exc_info if isinstance(exc_info, tuple) else None,
+            extra=kwargs.get('extra')
+        )
+        # Keep the time the record was produced, not the time it was written
+        record.created = created
+        record.msecs = (created - int(created)) * 1000
+        return std_logger, record
+    
+    def _write_batch(self, batch: list):
+        """Format a batch and write it with one write per handler"""
+        groups = {}  # handler -> list of formatted lines
+        for log_record in batch:
+            try:
+                made = self._make_record(log_record)
+            except Exception as e:
+                print(f"Error dispatching log: {e}")
+                continue
+            if made is None:
+                continue
+            std_logger, record = made
+            for handler in std_logger.handlers:
+                if record.levelno >= handler.level:
+                    groups.setdefault(handler, []).append(handler.format(record))
+            self.written_count += 1
+        
+        for handler, lines in groups.items():
+            self._write_lines(handler, lines)
+        self.batch_count += 1
+        self._report_lost_records()
+    
+    @staticmethod
+    def _write_lines(handler: logging.Handler, lines: list):
+        """Write pre-formatted lines to a stream or file handler in one call"""
+        terminator = getattr(handler, 'terminator', '\n')
+        data = terminator.join(lines) + terminator
+        handler.acquire()
         try:
-            if level == 'debug':
-                logger.debug(message, *args, **kwargs)
-            elif level == 'info':
-                logger.info(message, *args, **kwargs)
-            elif level == 'warning':
-                logger.warning(message, *args, **kwargs)
-            elif level == 'error':
-                logger.error(message, *args, **kwargs)
-            elif level == 'critical':
-                logger.critical(message, *args, **kwargs)
-            elif level == 'exception':
-                logger.exception(message, **kwargs)
-            elif level == 'log_with_context':
-                logger.log_with_context(args[0], message, args[1])
+            if isinstance(handler, logging.FileHandler):
+                if handler.stream is None:
+                    handler.stream = handler._open()
+                if isinstance(handler, RotatingFileHandler) and handler.maxBytes > 0:
+                    handler.stream.seek(0, 2)
+                    position = handler.stream.tell()
+                    if position > 0 and position + len(data) >= handler.maxBytes:
+                        handler.doRollover()
+                        # With delay=True the rollover leaves the stream closed
+                        if handler.stream is None:
+                            handler.stream = handler._open()
+            handler.stream.write(data)
         except Exception as e:
-            print(f"Error dispatching log: {e}")
+            print(f"Error writing log batch: {e}")
+        finally:
+            handler.release()
+    
+    def _report_lost_records(self):
+        """Write a warning to stderr when records were dropped or sampled out since the last report"""
+        lost = self.dropped_count + self.sampled_out_count
+        if lost > self._reported_lost:
+            print(f"Async log processor: {lost - self._reported_lost} log records lost to queue overflow "
+                  f"(policy={self.overflow_policy}, total dropped={self.dropped_count}, "
+                  f"sampled out={self.sampled_out_count})", file=sys.stderr)
+            self._reported_lost = lost
     
     def _flush_all_loggers(self):
         """Force flush all real loggers"""
@@ -304,30 +436,11 @@ class AsyncLogProcessor:
     def _drain_queue(self):
         """Process all remaining items in the queue"""
         while True:
-            try:
-                log_record = self.log_queue.get_nowait()
-                module_name, level, message, args, kwargs = log_record
-                real_logger = self._get_real_logger(module_name)
-                
-                # Write the log message
-                if level == 'debug':
-                    real_logger.debug(message, *args, **kwargs)
-                elif level == 'info':
-                    real_logger.info(message, *args, **kwargs)
-                elif level == 'warning':
-                    real_logger.warning(message, *args, **kwargs)
-                elif level == 'error':
-                    real_logger.error(message, *args, **kwargs)
-                elif level == 'critical':
-                    real_logger.critical(message, *args, **kwargs)
-                elif level == 'exception':
-                    real_logger.exception(message, **kwargs)
-                elif level == 'log_with_context':
-                    real_logger.log_with_context(args[0], message, args[1])
-                
-                self.log_queue.task_done()
-            except queue.Empty:
+            batch = self._next_batch(timeout=0)
+            if not batch:
                 break
+            try:
+                self._write_batch(batch)
             except Exception as e:
                 print(f"Error draining log queue: {e}")
                 break
@@ -337,14 +450,65 @@ class AsyncLogProcessor:
     
     def enqueue_log(self, module_name: str, level: str, message: str, *args, **kwargs):
         """Add a log message to the queue for async processing"""
-        if not self.shutdown_event.is_set():
-            log_record = (module_name, level, message, args, kwargs)
-            self.log_queue.put(log_record)
+        if self.shutdown_event.is_set():
+            return
+        if level == 'exception' or kwargs.get('exc_info') is True:
+            # The worker thread has no active exception, so capture it here
+            kwargs['exc_info'] = sys.exc_info()
+        
+        if self.log_queue.qsize() >= self.max_queue_size and not self._admit_on_overflow(level, args):
+            return
+        
+        self.enqueued_count += 1
+        self.log_queue.put((module_name, level, message, args, kwargs, time.time()))
+    
+    def _admit_on_overflow(self, level: str, args: tuple) -> bool:
+        """Apply the overflow policy to a record arriving at a full queue"""
+        if level == 'log_with_context':
+            is_low_severity = args and args[0].value < logging.WARNING
+        else:
+            is_low_severity = level in ('debug', 'info')
+        if not is_low_severity:
+            return True
+        
+        if self.overflow_policy == 'drop':
+            self.dropped_count += 1
+            return False
+        if self.overflow_policy == 'sample':
+            self._overflow_seen += 1
+            if self._overflow_seen % self.sample_every == 0:
+                return True
+            self.sampled_out_count += 1
+            return False
+        
+        # 'block': wait for the worker to make room
+        self.blocked_count += 1
+        with self._space_available:
+            while self.log_queue.qsize() >= self.max_queue_size and not self.shutdown_event.is_set():
+                self._space_available.wait(timeout=0.1)
+        return True
+    
+    def get_stats(self) -> Dict[str, Any]:
+        """Return queue and overflow counters"""
+        return {
+            'queue_size': self.log_queue.qsize(),
+            'max_queue_size': self.max_queue_size,
+            'overflow_policy': self.overflow_policy,
+            'enqueued': self.enqueued_count,
+            'written': self.written_count,
+            'dropped': self.dropped_count,
+            'sampled_out': self.sampled_out_count,
+            'blocked': self.blocked_count,
+            'batches': self.batch_count,
+            'flush_interval': self.flush_interval,
+        }
     
     def shutdown(self, timeout=5.0):
         """Shutdown the async processor gracefully"""
         if self.worker_thread and self.worker_thread.is_alive():
             self.shutdown_event.set()
+            with self._space_available:
+                self._space_available.notify_all()
             self.worker_thread.join(timeout=timeout)
 
 
@@ -352,7 +516,15 @@ def _get_async_processor():
     """Get or create the global async log processor"""
     global _async_log_processor
     if _async_log_processor is None:
-        _async_log_processor = AsyncLogProcessor()
+        async_config = get_logging_config().config["logging"].get("async", {}) or {}
+        _async_log_processor = AsyncLogProcessor(
+            flush_interval=async_config.get("max_flush_interval", 1.0),
+            min_flush_interval=async_config.get("min_flush_interval", 0.05),
+            max_queue_size=async_config.get("max_queue_size", 10000),
+            batch_size=async_config.get("batch_size", 500),
+            overflow_policy=async_config.get("overflow_policy", "sample"),
+            sample_every=async_config.get("sample_every", 10),
+        )
         _async_log_processor.start()
     return _async_log_processor
 
@@ -360,6 +532,8 @@ def _get_async_processor():
 class LazyLogger:
     """Lazy logger that defers actual logger creation until first use and writes asynchronously"""
     
+    _creation_lock = threading.Lock()
+    
     def __init__(self, module_name: str):
         self.module_name = module_name
         self._real_logger = None
@@ -369,38 +543,51 @@ class LazyLogger:
     def _ensure_logger_for_sync_ops(self):
         """Create the actual logger for operations that need immediate response"""
         if not self._initialized:
-            config = get_logging_config()
-            self._real_logger = config.get_logger(self.module_name)
-            self._initialized = True
+            with self._creation_lock:
+                if not self._initialized:
+                    config = get_logging_config()
+                    self._real_logger = config.get_logger(self.module_name)
+                    self._initialized = True
         return self._real_logger
     
+    def _is_enabled(self, levelno: int) -> bool:
+        """Check the level before queueing so disabled records cost nothing downstream"""
+        return self._ensure_logger_for_sync_ops().logger.isEnabledFor(levelno)
+    
     def debug(self, message: str, *args, **kwargs):
         """Log a debug message asynchronously."""
-        self.async_processor.enqueue_log(self.module_name, 'debug', message, *args, **kwargs)
+        if self._is_enabled(logging.DEBUG):
+            self.async_processor.enqueue_log(self.module_name, 'debug', message, *args, **kwargs)
     
     def info(self, message: str, *args, **kwargs):
         """Log an info message asynchronously."""
-        self.async_processor.enqueue_log(self.module_name, 'info', message, *args, **kwargs)
+        if self._is_enabled(logging.INFO):
+            self.async_processor.enqueue_log(self.module_name, 'info', message, *args, **kwargs)
     
     def warning(self, message: str, *args, **kwargs):
         """Log a warning message asynchronously."""
-        self.async_processor.enqueue_log(self.module_name, 'warning', message, *args, **kwargs)
+        if self._is_enabled(logging.WARNING):
+            self.async_processor.enqueue_log(self.module_name, 'warning', message, *args, **kwargs)
     
     def error(self, message: str, *args, **kwargs):
         """Log an error message asynchronously."""
-        self.async_processor.enqueue_log(self.module_name, 'error', message, *args, **kwargs)
+        if self._is_enabled(logging.ERROR):
+            self.async_processor.enqueue_log(self.module_name, 'error', message, *args, **kwargs)
     
     def critical(self, message: str, *args, **kwargs):
         """Log a critical message asynchronously."""
-        self.async_processor.enqueue_log(self.module_name, 'critical', message, *args, **kwargs)
+        if self._is_enabled(logging.CRITICAL):
+            self.async_processor.enqueue_log(self.module_name, 'critical', message, *args, **kwargs)
     
     def exception(self, message: str, **kwargs):
         """Log an exception with traceback asynchronously."""
-        self.async_processor.enqueue_log(self.module_name, 'exception', message, **kwargs)
+        if self._is_enabled(logging.ERROR):
+            self.async_processor.enqueue_log(self.module_name, 'exception', message, **kwargs)
     
     def log_with_context(self, level, message: str, context):
         """Log a message with additional context information asynchronously."""
-        self.async_processor.enqueue_log(self.module_name, 'log_with_context', message, level, context)
+        if self._is_enabled(level.value):
+            self.async_processor.enqueue_log(self.module_name, 'log_with_context', message, level, context)
     
     def set_level(self, level):
         """Set the logging verbosity level - requires sync access to real logger."""
@@ -444,9 +631,6 @@ def set_all_loggers_to_level(level: str):
 
 # Example usage
 if __name__ == "__main__":
-    import sys
-    import os
-    
     if len(sys.argv) > 1:
         if sys.argv[1] == "set-level" and len(sys.argv) > 2:
             set_all_loggers_to_level(sys.argv[2])
@@ -56,12 +56,9 @@ CREATE TABLE IF NOT EXISTS documents (
     site TEXT NOT NULL,              -- Site or domain of the document
     embedding vector(1536) NOT NULL  -- Vector embedding (adjust dimension to match your model)
 );
-
--- Create a vector index for faster similarity searches
-CREATE INDEX IF NOT EXISTS embedding_cosine_idx 
-ON documents USING hnsw (embedding vector_cosine_ops) 
-WITH (m = 16, ef_construction = 200);
 """
+# The vector index is created by PgVectorClient.ensure_vector_index() from the
+# endpoint's vector_index settings in config_retrieval.yaml
 
 async def setup_postgres_schema(args):
     """Set up the PostgreSQL schema for vector search"""
@@ -130,6 +127,23 @@ async def setup_postgres_schema(args):
             else:
                 print("\nRun this script with --fix to attempt to fix these issues")
     
+    # Create or verify the ANN index on the embedding column
+    print(f"\nChecking {client.index_type} vector index...")
+    try:
+        index_info = await client.ensure_vector_index(create=True)
+        if index_info.get("created"):
+            print(f"Created vector index: {index_info['definition']}")
+        elif index_info.get("index_name"):
+            print(f"Vector index present: {index_info['definition']}")
+        
+        plan_info = await client.check_query_plan()
+        if plan_info.get("seq_scan"):
+            print("WARNING: the similarity search query plan uses a sequential scan")
+        elif plan_info.get("uses_index"):
+            print(f"Similarity search uses index(es): {', '.join(plan_info['index_names'])}")
+    except Exception as e:
+        print(f"ERROR checking vector index: {e}")
+    
     # Show schema information
     print("\nCurrent schema:")
     print(f"  Table: {client.table_name}")
@@ -0,0 +1,251 @@
+# Copyright (c) 2025 Microsoft Corporation.
+# Licensed under the MIT License
+
+"""
+Local in-process vector index client - keeps the index in this process instead
+of calling an external database. Suited to development, tests and single-site
+deployments of up to a few hundred thousand items.
+
+WARNING: This code is under development and may undergo changes in future releases.
+Backwards compatibility is not guaranteed at this time.
+"""
+
+import asyncio
+import os
+import threading
+import time
+from typing import Any, Dict, List, Optional, Union
+
+from core.config import CONFIG
+from core.embedding import get_embedding, batch_get_embeddings
+from misc.logger.logging_config_helper import get_configured_logger
+from misc.logger.logger import LogLevel
+from retrieval_providers.utils.local_index import DEFAULT_EXACT_THRESHOLD, LocalVectorIndex
+
+logger = get_configured_logger("local_index_client")
+
+DEFAULT_INDEX_NAME = "nlweb_index"
+DEFAULT_DATABASE_PATH = "../data/local_index"
+DEFAULT_HNSW = {"m": 16, "ef_construction": 100, "ef_search": 64}
+
+# Open indexes by directory, shared by every client in the process so that
+# writes from one (e.g. db_load) are seen by the others
+_indexes: Dict[str, LocalVectorIndex] = {}
+_indexes_lock = threading.Lock()
+
+
+def flush_local_indexes() -> None:
+    """Flush every open index (call once a loader has finished uploading)."""
+    with _indexes_lock:
+        indexes = list(_indexes.values())
+    for index in indexes:
+        index.flush()
+
+
+class LocalIndexClient:
+    """
+    Client for the local vector index, providing the same interface as the
+    database-backed retrieval clients.
+    """
+
+    def __init__(self, endpoint_name: Optional[str] = None):
+        """
+        Initialize the local index client.
+
+        Args:
+            endpoint_name: Name of the endpoint to use (defaults to the write endpoint in CONFIG)
+        """
+        self.endpoint_name = endpoint_name or CONFIG.write_endpoint
+        self.endpoint_config = self._get_endpoint_config()
+        self.default_index_name = self.endpoint_config.index_name or DEFAULT_INDEX_NAME
+        self.database_path = CONFIG._resolve_path(self.endpoint_config.database_path or DEFAULT_DATABASE_PATH)
+
+        # vector_index: {type: flat | hnsw, m, ef_construction, ef_search, exact_threshold}
+        index_settings = dict(self.endpoint_config.vector_index or {})
+        self.index_type = index_settings.pop("type", "flat")
+        self.exact_threshold = index_settings.pop("exact_threshold", DEFAULT_EXACT_THRESHOLD)
+        if self.index_type == "hnsw":
+            self.hnsw_params = {**DEFAULT_HNSW, **index_settings}
+        elif self.index_type == "flat":
+            self.hnsw_params = None
+        else:
+            raise ValueError(f"Unknown vector_index type '{self.index_type}' for endpoint "
+                             f"{self.endpoint_name} (expected 'flat' or 'hnsw')")
+        # quantization: {type: int8, quantile, oversampling}
+        self.quantization = self.endpoint_config.quantization
+
+        logger.info(f"Initialized LocalIndexClient for endpoint: {self.endpoint_name} "
+                    f"({self.index_type} index at {self.database_path})")
+
+    def _get_endpoint_config(self):
+        """Get the local index endpoint configuration from CONFIG"""
+        endpoint_config = CONFIG.retrieval_endpoints.get(self.endpoint_name)
+
+        if not endpoint_config:
+            error_msg = f"No configuration found for endpoint {self.endpoint_name}"
+            logger.error(error_msg)
+            raise ValueError(error_msg)
+
+        if endpoint_config.db_type != "local_index":
+            error_msg = f"Endpoint {self.endpoint_name} is not a local_index endpoint (type: {endpoint_config.db_type})"
+            logger.error(error_msg)
+            raise ValueError(error_msg)
+
+        return endpoint_config
+
+    def _get_index(self, index_name: Optional[str] = None) -> LocalVectorIndex:
+        """Open (or reuse) the index directory for an index name."""
+        path = os.path.join(self.database_path, index_name or self.default_index_name)
+        with _indexes_lock:
+            index = _indexes.get(path)
+            if index is None:
+                index = LocalVectorIndex(path, hnsw=self.hnsw_params, exact_threshold=self.exact_threshold,
+                                         quantization=self.quantization)
+                _indexes[path] = index
+                logger.info(f"Opened local index at {path} with {len(index)} items")
+            return index
+
+    @staticmethod
+    def _site_list(site: Union[str, List[str]]) -> Optional[List[str]]:
+        if site == "all":
+            return None
+        return site if isinstance(site, list) else [site]
+
+    @staticmethod
+    def _format_result(record: Dict[str, Any]) -> List[str]:
+        return [record["url"], record["schema_json"], record["name"], record["site"]]
+
+    async def delete_documents_by_site(self, site: str, index_name: Optional[str] = None, **kwargs) -> int:
+        """
+        Delete all documents for a site.
+
+        Args:
+            site: The site value to filter by
+            index_name: Optional index name (defaults to configured name)
+
+        Returns:
+            int: Number of documents deleted
+        """
+        index = self._get_index(index_name)
+        count = await asyncio.to_thread(index.delete_site, site)
+        logger.info(f"Deleted {count} documents for site: {site}")
+        return count
+
+    async def upload_documents(self, documents: List[Dict[str, Any]],
+                               index_name: Optional[str] = None, **kwargs) -> int:
+        """
+        Add documents to the index, replacing existing documents with the same URL.
+
+        Args:
+            documents: List of document objects with embedding, schema_json, etc.
+            index_name: Optional index name (defaults to configured name)
+
+        Returns:
+            int: Number of documents uploaded
+        """
+        if not documents:
+            logger.info("No documents to upload")
+            return 0
+        index = self._get_index(index_name)
+        count = await asyncio.to_thread(index.upsert, documents)
+        logger.info(f"Uploaded {count} documents to local index '{index_name or self.default_index_name}'")
+        return count
+
+    async def search(self, query: str, site: Union[str, List[str]],
+                     num_results: int = 50, index_name: Optional[str] = None,
+                     query_params: Optional[Dict[str, Any]] = None, **kwargs) -> List[List[str]]:
+        """
+        Search the index for records filtered by site and ranked by vector similarity.
+
+        Args:
+            query: The search query to embed and search with
+            site: Site to filter by (string or list of strings)
+            num_results: Maximum number of results to return
+            index_name: Optional index name (defaults to configured name)
+            query_params: Additional query parameters
+
+        Returns:
+            List[List[str]]: List of search results in format [url, text_json, name, site]
+        """
+        start_embed = time.time()
+        embedding = await get_embedding(query, query_params=query_params)
+        embed_time = time.time() - start_embed
+
+        start_retrieve = time.time()
+        index = self._get_index(index_name)
+        hits = await asyncio.to_thread(index.search, [embedding], num_results, self._site_list(site))
+        results = [self._format_result(record) for record, _score in hits[0]]
+        retrieve_time = time.time() - start_retrieve
+
+        logger.log_with_context(
+            LogLevel.INFO,
+            "Local index search completed",
+            {
+                "embedding_time": f"{embed_time:.2f}s",
+                "retrieval_time": f"{retrieve_time:.3f}s",
+                "results_count": len(results),
+                "index_type": self.index_type,
+            }
+        )
+        return results
+
+    async def search_batch(self, queries: List[str], site: Union[str, List[str]],
+                           num_results: int = 50, index_name: Optional[str] = None,
+                           query_params: Optional[Dict[str, Any]] = None, **kwargs) -> List[List[List[str]]]:
+        """
+        Run several queries with one batch embedding call and one scan of the index.
+
+        Returns:
+            List[List[List[str]]]: One result list per query, in query order
+        """
+        if not queries:
+            return []
+        embeddings = await batch_get_embeddings(queries, query_params=query_params)
+        index = self._get_index(index_name)
+        hits = await asyncio.to_thread(index.search, embeddings, num_results, self._site_list(site))
+        return [[self._format_result(record) for record, _score in query_hits] for query_hits in hits]
+
+    async def search_by_url(self, url: str, index_name: Optional[str] = None, **kwargs) -> Optional[List[str]]:
+        """
+        Retrieve a specific item by URL.
+
+        Args:
+            url: URL to search for
+            index_name: Optional index name (defaults to configured name)
+
+        Returns:
+            Optional[List[str]]: Search result or None if not found
+        """
+        record = self._get_index(index_name).get(url)
+        if record is None:
+            logger.warning(f"No item found for URL: {url}")
+            return None
+        return self._format_result(record)
+
+    async def search_all_sites(self, query: str, num_results: int = 50,
+                               index_name: Optional[str] = None,
+                               query_params: Optional[Dict[str, Any]] = None, **kwargs) -> List[List[str]]:
+        """
+        Search across all sites using vector similarity.
+
+        Returns:
+            List[List[str]]: List of search results
+        """
+        return await self.search(query, "all", num_results, index_name, query_params)
+
+    async def get_sites(self, index_name: Optional[str] = None, **kwargs) -> List[str]:
+        """
+        Get a list of unique site names in the index.
+
+        Returns:
+            List[str]: Sorted list of unique site names
+        """
+        return self._get_index(index_name).sites()
+
+    async def compact(self, index_name: Optional[str] = None) -> None:
+        """Drop deleted and replaced rows from disk (and rebuild the HNSW graph)."""
+        await asyncio.to_thread(self._get_index(index_name).compact)
+
+    async def flush(self, index_name: Optional[str] = None) -> None:
+        """Save the HNSW graph after a series of uploads, compacting if enough rows were replaced."""
+        await asyncio.to_thread(self._get_index(index_name).flush)
@@ -9,19 +9,94 @@ import os
 import sys
 import threading
 import asyncio
+import functools
 import json
+from concurrent.futures import ThreadPoolExecutor
 from typing import List, Dict, Union, Optional, Any, Tuple
 
+import pymilvus
 from pymilvus import MilvusClient
 import numpy as np
 
+try:
+    # Native asyncio client (pymilvus >= 2.5.3)
+    from pymilvus import AsyncMilvusClient
+except ImportError:
+    AsyncMilvusClient = None
+
 from core.config import CONFIG
-from core.embedding import get_embedding
+from core.embedding import get_embedding, batch_get_embeddings
 from misc.logger.logging_config_helper import get_configured_logger
 from misc.logger.logger import LogLevel
 
 logger = get_configured_logger("milvus_client")
 
+OUTPUT_FIELDS = ["url", "text", "name", "site"]
+
+# Threads for blocking MilvusClient calls when no async client is available,
+# kept separate from the default executor so Milvus cannot starve other work
+DEFAULT_MAX_WORKERS = 8
+
+
+def _pymilvus_version() -> Tuple[int, ...]:
+    parts = []
+    for part in getattr(pymilvus, "__version__", "0").split(".")[:2]:
+        digits = "".join(ch for ch in part if ch.isdigit())
+        parts.append(int(digits or 0))
+    return tuple(parts)
+
+
+# Filter templating (filter_params) is available from pymilvus / Milvus 2.5
+SUPPORTS_FILTER_PARAMS = _pymilvus_version() >= (2, 5)
+
+
+def build_filter(field: str, value: Union[str, List[str]]) -> Tuple[str, Dict[str, Any]]:
+    """
+    Build a Milvus filter expression and its parameters for field == value,
+    or field in [values] for a list.
+
+    The values are passed as filter_params so the expression stays the same
+    size however many sites are requested and values are never spliced into
+    it. With an older pymilvus the values are inlined as JSON-quoted literals.
+    """
+    if isinstance(value, (list, tuple, set)):
+        values = list(value)
+        if len(values) == 1:
+            value = values[0]
+        else:
+            if SUPPORTS_FILTER_PARAMS:
+                return f"{field} in {{values}}", {"values": values}
+            return f"{field} in {json.dumps(values)}", {}
+    if SUPPORTS_FILTER_PARAMS:
+        return f"{field} == {{value}}", {"value": value}
+    return f"{field} == {json.dumps(value)}", {}
+
+
+def _filter_kwargs(field: str, value: Union[str, List[str]]) -> Dict[str, Any]:
+    expr, params = build_filter(field, value)
+    kwargs = {"filter": expr}
+    if params:
+        kwargs["filter_params"] = params
+    return kwargs
+
+
+def format_hits(hits) -> List[List[str]]:
+    """
+    Convert Milvus hits to [url, json_str, name, site] rows.
+
+    The text field is passed through as the stored JSON string; it is only
+    decoded by whichever consumer actually uses the item (e.g. ranking).
+    """
+    retval = []
+    for item in hits:
+        ent = item["entity"]
+        text = ent.get("text")
+        if not text:
+            continue
+        retval.append([ent["url"], text, ent["name"], ent["site"]])
+    return retval
+
+
 class MilvusVectorClient:
     """
     Client for Milvus vector database operations, providing a unified interface for 
@@ -44,6 +119,15 @@ class MilvusVectorClient:
         # Get endpoint configuration
         self.endpoint_config = self._get_endpoint_config()
         
+        # Dedicated bounded executor for the blocking MilvusClient calls
+        max_workers = self.endpoint_config.max_workers or DEFAULT_MAX_WORKERS
+        self._executor = ThreadPoolExecutor(max_workers=max_workers,
+                                            thread_name_prefix=f"milvus-{self.endpoint_name}")
+        
+        # AsyncMilvusClient is bound to the event loop it was created on
+        self._async_client = None
+        self._async_client_loop = None
+        
         self.uri = self.endpoint_config.api_endpoint
         self.token = self.endpoint_config.api_key
 
@@ -104,6 +188,37 @@ class MilvusVectorClient:
                     
         return self._milvus_clients[client_key]
     
+    def _get_async_client(self):
+        """
+        Get the AsyncMilvusClient for the running event loop, or None if this
+        pymilvus has no async client (callers then use the executor).
+        Milvus Lite (a local .db file) is always used through the executor.
+        """
+        if AsyncMilvusClient is None or self.uri.endswith(".db"):
+            return None
+        loop = asyncio.get_running_loop()
+        if self._async_client is None or self._async_client_loop is not loop:
+            logger.debug(f"Creating async Milvus client for {self.endpoint_name}")
+            self._async_client = AsyncMilvusClient(uri=self.uri, token=self.token or "")
+            self._async_client_loop = loop
+        return self._async_client
+    
+    async def _run_sync(self, func, *args, **kwargs):
+        """Run a blocking MilvusClient call on the endpoint's executor."""
+        loop = asyncio.get_running_loop()
+        return await loop.run_in_executor(self._executor, functools.partial(func, *args, **kwargs))
+    
+    async def close(self):
+        """Close the async client and shut down the executor."""
+        if self._async_client is not None:
+            try:
+                await self._async_client.close()
+            except Exception as e:
+                logger.warning(f"Error closing async Milvus client: {str(e)}")
+            self._async_client = None
+            self._async_client_loop = None
+        self._executor.shutdown(wait=False)
+    
     def collection_exists(self, collection_name: Optional[str] = None, 
                          embedding_size: str = "small") -> bool:
         """
@@ -202,15 +317,13 @@ class MilvusVectorClient:
         collection_name = collection_name or self.default_collection_name
         client = self._get_milvus_client(embedding_size)
         
-        if not client.has_collection(collection_name):
+        if not await self._run_sync(client.has_collection, collection_name):
             logger.warning(f"Collection '{collection_name}' does not exist")
             return 0
         
         try:
             # Run the delete operation asynchronously
-            return await asyncio.get_event_loop().run_in_executor(
-                None, self._delete_documents_by_site_sync, site, collection_name, client
-            )
+            return await self._run_sync(self._delete_documents_by_site_sync, site, collection_name, client)
         except Exception as e:
             logger.error(f"Error deleting documents for site {site}: {str(e)}")
             return 0
@@ -220,11 +333,10 @@ class MilvusVectorClient:
         """Synchronous implementation of delete_documents_by_site for thread execution"""
         try:
             # Query to find entities with the specified site
-            expr = f'site == "{site}"'
             result = client.query(
                 collection_name=collection_name,
-                filter=expr,
-                output_fields=["id"]
+                output_fields=["id"],
+                **_filter_kwargs("site", site)
             )
             
             total_entities = len(result)
@@ -270,12 +382,10 @@ class MilvusVectorClient:
         collection_name = collection_name or self.default_collection_name
         
         # Ensure collection exists
-        self.ensure_collection_exists(collection_name, embedding_size)
+        await self._run_sync(self.ensure_collection_exists, collection_name, embedding_size)
         
         # Run the upload operation asynchronously
-        return await asyncio.get_event_loop().run_in_executor(
-            None, self._upload_documents_sync, documents, collection_name, embedding_size
-        )
+        return await self._run_sync(self._upload_documents_sync, documents, collection_name, embedding_size)
     
     def _upload_documents_sync(self, documents: List[Dict[str, Any]], 
                              collection_name: str, embedding_size: str) -> int:
@@ -330,10 +440,7 @@ class MilvusVectorClient:
             embedding = await get_embedding(query, query_params=query_params)
             logger.debug(f"Generated embedding with dimension: {len(embedding)}")
             
-            # Run the search operation asynchronously
-            results = await asyncio.get_event_loop().run_in_executor(
-                None, self._search_sync, query, site, num_results, embedding, collection_name, query_params
-            )
+            results = (await self._search_vectors([embedding], site, num_results, collection_name))[0]
             
             logger.info(f"Milvus search completed successfully, found {len(results)} results")
             return results
@@ -353,65 +460,73 @@ class MilvusVectorClient:
             )
             raise
     
-    def _search_sync(self, query: str, site: Union[str, List[str]], num_results: int, 
-                   embedding: List[float], collection_name: str, 
-                   query_params: Optional[Dict[str, Any]]) -> List[List[str]]:
-        """Synchronous implementation of search for thread execution"""
-        logger.debug(f"Executing synchronous search - site: {site}, num_results: {num_results}")
+    async def search_batch(self, queries: List[str], site: Union[str, List[str]],
+                           num_results: int = 50, collection_name: Optional[str] = None,
+                           query_params: Optional[Dict[str, Any]] = None, **kwargs) -> List[List[List[str]]]:
+        """
+        Run several queries with the same site filter in one Milvus search call.
         
-        try:
-            client = self._get_milvus_client()
-            
-            # Perform the search based on the site parameter
-            if site == "all":
-                logger.debug(f"Searching all sites in collection: {collection_name}")
-                res = client.search(
-                    collection_name=collection_name,
-                    data=[embedding],
-                    limit=num_results,
-                    output_fields=["url", "text", "name", "site"],
-                )
-            elif isinstance(site, list):
-                site_filter = " || ".join([f"site == '{s}'" for s in site])
-                logger.debug(f"Searching sites: {site} with filter: {site_filter}")
-                res = client.search(
-                    collection_name=collection_name, 
-                    data=[embedding],
-                    filter=site_filter,
-                    limit=num_results,
-                    output_fields=["url", "text", "name", "site"],
-                )
-            else:
-                logger.debug(f"Searching site: {site} in collection: {collection_name}")
-                res = client.search(
-                    collection_name=collection_name,
-                    data=[embedding],
-                    filter=f"site == '{site}'",
-                    limit=num_results,
-                    output_fields=["url", "text", "name", "site"],
-                )
-
-            # Format the results
-            retval = []
-            if res and len(res) > 0:
-                for item in res[0]:
-                    ent = item["entity"]
-                    try:
-                        # Parse text field as JSON
-                        schema_json = json.loads(ent["text"])
-                        retval.append([ent["url"], schema_json, ent["name"], ent["site"]])
-                    except json.JSONDecodeError as e:
-                        logger.error(f"Failed to parse text field as JSON: {str(e)}")
-                        continue
+        Args:
+            queries: The search queries to embed and search with
+            site: Site to filter by (string or list of strings)
+            num_results: Maximum number of results per query
+            collection_name: Optional collection name (defaults to configured name)
+            query_params: Additional query parameters
             
-            logger.info(f"Retrieved {len(retval)} items from Milvus")
-            logger.debug(f"First result URL: {retval[0][0] if retval else 'No results'}")
-            return retval
+        Returns:
+            List[List[List[str]]]: One result list per query, in query order
+        """
+        if not queries:
+            return []
+        collection_name = collection_name or self.default_collection_name
+        logger.info(f"Starting Milvus batch search - collection: {collection_name}, site: {site}, "
+                    f"queries: {len(queries)}, num_results: {num_results}")
         
+        try:
+            embeddings = await batch_get_embeddings(queries, query_params=query_params)
+            results = await self._search_vectors(embeddings, site, num_results, collection_name)
+            logger.info(f"Milvus batch search completed, found {sum(len(r) for r in results)} results")
+            return results
         except Exception as e:
-            logger.exception(f"Error in _search_sync")
+            logger.exception(f"Error in Milvus batch search")
+            logger.log_with_context(
+                LogLevel.ERROR,
+                "Milvus batch search failed",
+                {
+                    "error_type": type(e).__name__,
+                    "error_message": str(e),
+                    "collection": collection_name,
+                    "site": site,
+                    "query_count": len(queries)
+                }
+            )
             raise
     
+    async def _search_vectors(self, embeddings: List[List[float]], site: Union[str, List[str]],
+                              num_results: int, collection_name: str) -> List[List[List[str]]]:
+        """Search with one or more query vectors and return one result list per vector."""
+        search_kwargs = {
+            "collection_name": collection_name,
+            "data": embeddings,
+            "limit": num_results,
+            "output_fields": OUTPUT_FIELDS,
+        }
+        if site != "all":
+            search_kwargs.update(_filter_kwargs("site", site))
+        logger.debug(f"Milvus search filter: {search_kwargs.get('filter')}, vectors: {len(embeddings)}")
+        
+        async_client = self._get_async_client()
+        if async_client is not None:
+            res = await async_client.search(**search_kwargs)
+        else:
+            res = await self._run_sync(self._get_milvus_client().search, **search_kwargs)
+        
+        results = [format_hits(hits) for hits in (res or [])]
+        # Always return one list per query vector
+        while len(results) < len(embeddings):
+            results.append([])
+        return results
+    
     async def search_by_url(self, url: str, collection_name: Optional[str] = None) -> Optional[List[str]]:
         """
         Retrieve a record by its exact URL.
@@ -427,10 +542,25 @@ class MilvusVectorClient:
         logger.info(f"Retrieving item by URL: {url} from collection: {collection_name}")
         
         try:
-            # Run the search by URL operation asynchronously
-            return await asyncio.get_event_loop().run_in_executor(
-                None, self._search_by_url_sync, url, collection_name
-            )
+            query_kwargs = {
+                "collection_name": collection_name,
+                "limit": 1,
+                "output_fields": OUTPUT_FIELDS,
+                **_filter_kwargs("url", url),
+            }
+            async_client = self._get_async_client()
+            if async_client is not None:
+                res = await async_client.query(**query_kwargs)
+            else:
+                res = await self._run_sync(self._get_milvus_client().query, **query_kwargs)
+            
+            if not res:
+                logger.warning(f"No item found for URL: {url}")
+                return None
+            
+            item = res[0]
+            logger.info(f"Successfully retrieved item for URL: {url}")
+            return [item["url"], item["text"], item["name"], item["site"]]
         except Exception as e:
             logger.exception(f"Error retrieving item with URL: {url}")
             logger.log_with_context(
@@ -445,32 +575,6 @@ class MilvusVectorClient:
             )
             raise
     
-    def _search_by_url_sync(self, url: str, collection_name: str) -> Optional[List[str]]:
-        """Synchronous implementation of search_by_url for thread execution"""
-        client = self._get_milvus_client()
-        
-        logger.debug(f"Querying collection: {collection_name} for URL: {url}")
-        res = client.query(
-            collection_name=collection_name,
-            filter=f"url == '{url}'",
-            limit=1,
-            output_fields=["url", "text", "name", "site"],
-        )
-        
-        if len(res) == 0:
-            logger.warning(f"No item found for URL: {url}")
-            return None
-        
-        item = res[0]
-        try:
-            # Parse text field as JSON
-            schema_json = json.loads(item["text"])
-            logger.info(f"Successfully retrieved item for URL: {url}")
-            return [item["url"], schema_json, item["name"], item["site"]]
-        except json.JSONDecodeError as e:
-            logger.error(f"Failed to parse text field as JSON: {str(e)}")
-            return None
-    
     async def search_all_sites(self, query: str, num_results: int = 50, 
                              collection_name: Optional[str] = None,
                              query_params: Optional[Dict[str, Any]] = None, **kwargs) -> List[List[str]]:
@@ -506,9 +610,7 @@ class MilvusVectorClient:
         
         try:
             # Run the get_sites operation asynchronously
-            return await asyncio.get_event_loop().run_in_executor(
-                None, self._get_sites_sync, collection_name, embedding_size
-            )
+            return await self._run_sync(self._get_sites_sync, collection_name, embedding_size)
         except Exception as e:
             logger.exception(f"Error retrieving sites from collection '{collection_name}': {str(e)}")
             logger.log_with_context(
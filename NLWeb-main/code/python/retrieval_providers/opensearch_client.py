@@ -6,19 +6,46 @@ OpenSearch Client - Interface for OpenSearch operations.
 """
 
 import time
+import asyncio
 import threading
 import base64
 import json
 from typing import List, Dict, Union, Optional, Any
-import httpx
 
 from core.config import CONFIG
+from core.http_client import get_httpx_client
 from core.embedding import get_embedding
 from misc.logger.logging_config_helper import get_configured_logger
 from misc.logger.logger import LogLevel
 
 logger = get_configured_logger("opensearch_client")
 
+SOURCE_FIELDS = ["url", "site", "schema_json", "name"]
+
+# Default knn_vector method; override with vector_type in config_retrieval.yaml
+DEFAULT_KNN_METHOD = {
+    "name": "hnsw",
+    "space_type": "cosinesimil",
+    "engine": "lucene",
+    "parameters": {
+        "ef_construction": 128,
+        "m": 24
+    }
+}
+
+# Exhaustive cosine similarity for indexes without a knn_vector field
+COSINE_SCRIPT = """
+    double dotProduct = 0.0;
+    double normA = 0.0;
+    double normB = 0.0;
+    for (int i = 0; i < params.query_vector.length; i++) {
+        dotProduct += params.query_vector[i] * doc['embedding'][i];
+        normA += params.query_vector[i] * params.query_vector[i];
+        normB += doc['embedding'][i] * doc['embedding'][i];
+    }
+    return dotProduct / (Math.sqrt(normA) * Math.sqrt(normB)) + 1.0;
+"""
+
 
 class OpenSearchClient:
     """
@@ -59,6 +86,9 @@ class OpenSearchClient:
             # Default based on endpoint name for backward compatibility
             self.use_knn = 'script' not in self.endpoint_name.lower()
         
+        # Per-index query layout (k-NN or script, site field), read from the mapping
+        self._index_layouts: Dict[str, Dict[str, Any]] = {}
+        
         logger.info(f"Initialized OpenSearchClient for endpoint: {self.endpoint_name}, use_knn: {self.use_knn}")
     
     def _get_endpoint_config(self):
@@ -98,6 +128,127 @@ class OpenSearchClient:
         
         return headers
     
+    def _knn_vector_mapping(self, vector_dimension: int) -> Dict[str, Any]:
+        """knn_vector field mapping with HNSW parameters, merged with vector_type from config."""
+        mapping = {
+            "type": "knn_vector",
+            "dimension": vector_dimension,
+            "method": DEFAULT_KNN_METHOD
+        }
+        mapping.update(self.endpoint_config.vector_type or {})
+        return mapping
+    
+    async def _get_index_layout(self, index_name: str) -> Dict[str, Any]:
+        """
+        Work out how to query an index from its mapping.
+        
+        k-NN queries are only used if they are enabled for the endpoint and the
+        index's embedding field is a knn_vector; legacy indexes that store the
+        embedding as a plain float array fall back to the script_score path.
+        The result is cached per index.
+        """
+        layout = self._index_layouts.get(index_name)
+        if layout is not None:
+            return layout
+        
+        layout = {"knn": self.use_knn, "site_field": "site"}
+        try:
+            client = await get_httpx_client()
+            response = await client.get(
+                f"{self.api_endpoint}/{index_name}/_mapping",
+                headers=self._get_auth_headers(),
+                timeout=30
+            )
+            response.raise_for_status()
+            # Keyed by the concrete index name, which differs from index_name for aliases
+            properties = {}
+            for index_mapping in response.json().values():
+                properties = index_mapping.get('mappings', {}).get('properties', {})
+                break
+            
+            embedding_type = properties.get('embedding', {}).get('type')
+            if self.use_knn and embedding_type != 'knn_vector':
+                logger.warning(f"Index {index_name} has no knn_vector embedding field (type: {embedding_type}); "
+                               f"using script_score search. Run data_loading/opensearch_knn_migrate.py to reindex it.")
+            layout["knn"] = self.use_knn and embedding_type == 'knn_vector'
+            
+            site_mapping = properties.get('site', {})
+            if site_mapping.get('type') == 'text' and 'keyword' in site_mapping.get('fields', {}):
+                layout["site_field"] = "site.keyword"
+        except Exception as e:
+            logger.warning(f"Could not read mapping of index {index_name}, assuming use_knn={self.use_knn}: {e}")
+        
+        self._index_layouts[index_name] = layout
+        logger.info(f"Index {index_name} query layout: {layout}")
+        return layout
+    
+    @staticmethod
+    def _site_filter(site_field: str, sites: List[str]) -> Dict[str, Any]:
+        if len(sites) == 1:
+            return {"term": {site_field: sites[0]}}
+        return {"terms": {site_field: sites}}
+    
+    def _build_vector_query(self, layout: Dict[str, Any], vector_embedding: List[float],
+                            top_n: int, sites: Optional[List[str]] = None) -> Dict[str, Any]:
+        """
+        Build a vector similarity query for the index layout.
+        
+        In k-NN mode the site filter goes inside the knn clause, so OpenSearch
+        applies it while walking the HNSW graph (efficient filtering) instead
+        of post-filtering the k nearest neighbours.
+        """
+        site_filter = self._site_filter(layout["site_field"], sites) if sites else None
+        
+        if layout["knn"]:
+            knn_clause = {
+                "vector": vector_embedding,
+                "k": top_n
+            }
+            if site_filter:
+                knn_clause["filter"] = site_filter
+            query = {"knn": {"embedding": knn_clause}}
+        else:
+            query = {
+                "script_score": {
+                    "query": {"bool": {"filter": [site_filter]}} if site_filter else {"match_all": {}},
+                    "script": {
+                        "source": COSINE_SCRIPT,
+                        "params": {
+                            "query_vector": vector_embedding
+                        }
+                    }
+                }
+            }
+        
+        return {
+            "size": top_n,
+            "_source": SOURCE_FIELDS,
+            "query": query
+        }
+    
+    async def _execute_search(self, index_name: str, search_query: Dict[str, Any]) -> List[List[str]]:
+        """Run a _search request and convert the hits to [url, schema_json, name, site] rows."""
+        client = await get_httpx_client()
+        response = await client.post(
+            f"{self.api_endpoint}/{index_name}/_search",
+            json=search_query,
+            headers=self._get_auth_headers(),
+            timeout=60
+        )
+        response.raise_for_status()
+        
+        hits = response.json().get('hits', {}).get('hits', [])
+        processed_results = []
+        for hit in hits:
+            source = hit.get('_source', {})
+            processed_results.append([
+                source.get('url', ''),
+                source.get('schema_json', '{}'),
+                source.get('name', ''),
+                source.get('site', '')
+            ])
+        return processed_results
+    
     async def create_index_if_not_exists(self, index_name: Optional[str] = None, 
                                        vector_dimension: int = 1536) -> bool:
         """
@@ -114,15 +265,15 @@ class OpenSearchClient:
         
         # Check if index already exists
         try:
-            async with httpx.AsyncClient() as client:
-                response = await client.head(
-                    f"{self.api_endpoint}/{index_name}",
-                    headers=self._get_auth_headers(),
-                    timeout=30
-                )
-                if response.status_code == 200:
-                    logger.info(f"Index {index_name} already exists")
-                    return False
+            client = await get_httpx_client()
+            response = await client.head(
+                f"{self.api_endpoint}/{index_name}",
+                headers=self._get_auth_headers(),
+                timeout=30
+            )
+            if response.status_code == 200:
+                logger.info(f"Index {index_name} already exists")
+                return False
         except Exception:
             pass  # Index doesn't exist, proceed to create
         
@@ -178,19 +329,7 @@ class OpenSearchClient:
                 "mappings": {
                     "properties": {
                         **base_properties,
-                        "embedding": {
-                            "type": "knn_vector",
-                            "dimension": vector_dimension,
-                            "method": {
-                                "name": "hnsw",
-                                "space_type": "cosinesimil",
-                                "engine": "lucene",
-                                "parameters": {
-                                    "ef_construction": 128,
-                                    "m": 24
-                                }
-                            }
-                        }
+                        "embedding": self._knn_vector_mapping(vector_dimension)
                     }
                 }
             }
@@ -208,17 +347,18 @@ class OpenSearchClient:
             }
         
         try:
-            async with httpx.AsyncClient() as client:
-                response = await client.put(
-                    f"{self.api_endpoint}/{index_name}",
-                    json=index_mapping,
-                    headers=self._get_auth_headers(),
-                    timeout=60
-                )
-                response.raise_for_status()
-                
-                logger.info(f"Successfully created index {index_name} with kNN vector mapping")
-                return True
+            client = await get_httpx_client()
+            response = await client.put(
+                f"{self.api_endpoint}/{index_name}",
+                json=index_mapping,
+                headers=self._get_auth_headers(),
+                timeout=60
+            )
+            response.raise_for_status()
+            
+            self._index_layouts.pop(index_name, None)
+            logger.info(f"Successfully created index {index_name} with {'kNN vector' if self.use_knn else 'float'} mapping")
+            return True
                 
         except Exception as e:
             error_details = str(e)
@@ -253,22 +393,23 @@ class OpenSearchClient:
         index_name = index_name or self.default_index_name
         
         try:
-            async with httpx.AsyncClient() as client:
-                response = await client.delete(
-                    f"{self.api_endpoint}/{index_name}",
-                    headers=self._get_auth_headers(),
-                    timeout=30
-                )
+            client = await get_httpx_client()
+            response = await client.delete(
+                f"{self.api_endpoint}/{index_name}",
+                headers=self._get_auth_headers(),
+                timeout=30
+            )
+                
+            self._index_layouts.pop(index_name, None)
+            if response.status_code == 200:
+                logger.info(f"Successfully deleted index {index_name}")
+                return True
+            elif response.status_code == 404:
+                logger.info(f"Index {index_name} does not exist")
+                return False
+            else:
+                response.raise_for_status()
                 
-                if response.status_code == 200:
-                    logger.info(f"Successfully deleted index {index_name}")
-                    return True
-                elif response.status_code == 404:
-                    logger.info(f"Index {index_name} does not exist")
-                    return False
-                else:
-                    response.raise_for_status()
-                    
         except Exception as e:
             logger.exception(f"Error deleting index {index_name}: {e}")
             logger.log_with_context(
@@ -304,6 +445,101 @@ class OpenSearchClient:
         # Create new index with proper mapping
         return await self.create_index_if_not_exists(index_name, vector_dimension)
     
+    async def _detect_vector_dimension(self, index_name: str) -> int:
+        """Read the embedding length of one document in the index."""
+        client = await get_httpx_client()
+        response = await client.post(
+            f"{self.api_endpoint}/{index_name}/_search",
+            json={"size": 1, "_source": ["embedding"], "query": {"exists": {"field": "embedding"}}},
+            headers=self._get_auth_headers(),
+            timeout=30
+        )
+        response.raise_for_status()
+        hits = response.json().get('hits', {}).get('hits', [])
+        if not hits or not hits[0].get('_source', {}).get('embedding'):
+            raise ValueError(f"Cannot detect the vector dimension: index {index_name} has no embedded documents")
+        return len(hits[0]['_source']['embedding'])
+    
+    async def migrate_to_knn(self, source_index: Optional[str] = None, target_index: Optional[str] = None,
+                             vector_dimension: Optional[int] = None,
+                             poll_interval: float = 5.0) -> Dict[str, Any]:
+        """
+        Reindex a legacy (script_score) index into a new index with the k-NN layout.
+        
+        The target index is created with a knn_vector embedding field, then the
+        documents are copied server-side with _reindex, which runs as a task
+        that is polled until it completes. The source index is left untouched;
+        point index_name at the target (or move an alias) once it is verified.
+        
+        Args:
+            source_index: Index to copy from (defaults to configured index name)
+            target_index: Index to create (defaults to "<source_index>_knn")
+            vector_dimension: Embedding dimension, detected from the data if not given
+            poll_interval: Seconds between task status checks
+            
+        Returns:
+            Dict with created, failures and took_seconds
+        """
+        source_index = source_index or self.default_index_name
+        target_index = target_index or f"{source_index}_knn"
+        if source_index == target_index:
+            raise ValueError("Source and target index must differ")
+        
+        vector_dimension = vector_dimension or await self._detect_vector_dimension(source_index)
+        logger.info(f"Migrating {source_index} -> {target_index} (k-NN, dimension {vector_dimension})")
+        
+        use_knn = self.use_knn
+        self.use_knn = True
+        try:
+            if not await self.create_index_if_not_exists(target_index, vector_dimension):
+                raise ValueError(f"Target index {target_index} already exists")
+        finally:
+            self.use_knn = use_knn
+        
+        start = time.time()
+        client = await get_httpx_client()
+        response = await client.post(
+            f"{self.api_endpoint}/_reindex",
+            params={"wait_for_completion": "false"},
+            json={"source": {"index": source_index}, "dest": {"index": target_index}},
+            headers=self._get_auth_headers(),
+            timeout=60
+        )
+        response.raise_for_status()
+        task_id = response.json()["task"]
+        logger.info(f"Reindex task {task_id} started")
+        
+        while True:
+            await asyncio.sleep(poll_interval)
+            response = await client.get(
+                f"{self.api_endpoint}/_tasks/{task_id}",
+                headers=self._get_auth_headers(),
+                timeout=30
+            )
+            response.raise_for_status()
+            task = response.json()
+            status = task.get('task', {}).get('status', {})
+            logger.info(f"Reindex progress: {status.get('created', 0)}/{status.get('total', '?')} documents")
+            if task.get('completed'):
+                break
+        
+        if 'error' in task:
+            raise RuntimeError(f"Reindex task {task_id} failed: {task['error']}")
+        result = task.get('response', {})
+        failures = result.get('failures', [])
+        if failures:
+            logger.warning(f"{len(failures)} documents failed to reindex. First failures: {failures[:5]}")
+        
+        summary = {
+            "source_index": source_index,
+            "target_index": target_index,
+            "created": result.get('created', 0),
+            "failures": len(failures),
+            "took_seconds": round(time.time() - start, 1)
+        }
+        logger.info(f"Migration finished: {summary}")
+        return summary
+    
     async def delete_documents_by_site(self, site: str, **kwargs) -> int:
         """
         Delete all documents matching the specified site.
@@ -318,29 +554,26 @@ class OpenSearchClient:
         index_name = kwargs.get('index_name', self.default_index_name)
         logger.info(f"Deleting documents for site: {site} from index: {index_name}")
         
-        delete_query = {
-            "query": {
-                "term": {
-                    "site": site
-                }
-            }
-        }
-        
         try:
-            async with httpx.AsyncClient() as client:
-                response = await client.post(
-                    f"{self.api_endpoint}/{index_name}/_delete_by_query",
-                    json=delete_query,
-                    headers=self._get_auth_headers(),
-                    timeout=60
-                )
-                response.raise_for_status()
+            layout = await self._get_index_layout(index_name)
+            delete_query = {
+                "query": self._site_filter(layout["site_field"], [site])
+            }
+            
+            client = await get_httpx_client()
+            response = await client.post(
+                f"{self.api_endpoint}/{index_name}/_delete_by_query",
+                json=delete_query,
+                headers=self._get_auth_headers(),
+                timeout=60
+            )
+            response.raise_for_status()
                 
-                result = response.json()
-                deleted_count = result.get('deleted', 0)
+            result = response.json()
+            deleted_count = result.get('deleted', 0)
                 
-                logger.info(f"Successfully deleted {deleted_count} documents for site: {site}")
-                return deleted_count
+            logger.info(f"Successfully deleted {deleted_count} documents for site: {site}")
+            return deleted_count
                 
         except Exception as e:
             logger.exception(f"Error deleting documents for site {site}: {e}")
@@ -409,34 +642,34 @@ class OpenSearchClient:
             headers = self._get_auth_headers()
             headers["Content-Type"] = "application/x-ndjson"
             
-            async with httpx.AsyncClient() as client:
-                response = await client.post(
-                    f"{self.api_endpoint}/_bulk",
-                    content=bulk_data,
-                    headers=headers,
-                    timeout=120  # Longer timeout for bulk operations
-                )
-                response.raise_for_status()
+            client = await get_httpx_client()
+            response = await client.post(
+                f"{self.api_endpoint}/_bulk",
+                content=bulk_data,
+                headers=headers,
+                timeout=120  # Longer timeout for bulk operations
+            )
+            response.raise_for_status()
                 
-                result = response.json()
+            result = response.json()
                 
-                # Count successful uploads
-                successful_count = 0
-                errors = []
+            # Count successful uploads
+            successful_count = 0
+            errors = []
                 
-                if 'items' in result:
-                    for item in result['items']:
-                        if 'index' in item:
-                            if item['index'].get('status') in [200, 201]:
-                                successful_count += 1
-                            else:
-                                errors.append(item['index'].get('error', 'Unknown error'))
+            if 'items' in result:
+                for item in result['items']:
+                    if 'index' in item:
+                        if item['index'].get('status') in [200, 201]:
+                            successful_count += 1
+                        else:
+                            errors.append(item['index'].get('error', 'Unknown error'))
                 
-                if errors:
-                    logger.warning(f"Some documents failed to upload. Errors: {errors[:5]}...")  # Show first 5 errors
+            if errors:
+                logger.warning(f"Some documents failed to upload. Errors: {errors[:5]}...")  # Show first 5 errors
                 
-                logger.info(f"Successfully uploaded {successful_count} documents to index: {index_name}")
-                return successful_count
+            logger.info(f"Successfully uploaded {successful_count} documents to index: {index_name}")
+            return successful_count
                 
         except Exception as e:
             logger.exception(f"Error uploading documents: {e}")
@@ -480,72 +713,25 @@ class OpenSearchClient:
         else:
             sites = site
         
-        # Build site filter
-        if len(sites) == 1:
-            site_filter = {"term": {"site": sites[0]}}
-        else:
-            site_filter = {"terms": {"site": sites}}
-        
-        # Build OpenSearch query with kNN vector search and site filtering
-        search_query = {
-            "size": num_results,
-            "_source": ["url", "site", "schema_json", "name"],
-            "query": {
-                "bool": {
-                    "must": [
-                        {
-                            "knn": {
-                                "embedding": {
-                                    "vector": embedding,
-                                    "k": num_results
-                                }
-                            }
-                        }
-                    ],
-                    "filter": [site_filter]
-                }
-            }
-        }
-        
         start_retrieve = time.time()
         try:
-            async with httpx.AsyncClient() as client:
-                response = await client.post(
-                    f"{self.api_endpoint}/{index_name}/_search",
-                    json=search_query,
-                    headers=self._get_auth_headers(),
-                    timeout=60
-                )
-                response.raise_for_status()
+            layout = await self._get_index_layout(index_name)
+            search_query = self._build_vector_query(layout, embedding, num_results, sites)
+            processed_results = await self._execute_search(index_name, search_query)
                 
-                result = response.json()
-                hits = result.get('hits', {}).get('hits', [])
+            retrieve_time = time.time() - start_retrieve
                 
-                # Process results into the expected format
-                processed_results = []
-                for hit in hits:
-                    source = hit.get('_source', {})
-                    url = source.get('url', '')
-                    schema_json = source.get('schema_json', '{}')
-                    name = source.get('name', '')
-                    site_name = source.get('site', '')
-                    
-                    processed_result = [url, schema_json, name, site_name]
-                    processed_results.append(processed_result)
-                
-                retrieve_time = time.time() - start_retrieve
-                
-                logger.log_with_context(
-                    LogLevel.INFO,
-                    "OpenSearch completed",
-                    {
-                        "embedding_time": f"{embed_time:.2f}s",
-                        "retrieval_time": f"{retrieve_time:.2f}s",
-                        "total_time": f"{embed_time + retrieve_time:.2f}s",
-                        "results_count": len(processed_results)
-                    }
-                )
-                return processed_results
+            logger.log_with_context(
+                LogLevel.INFO,
+                "OpenSearch completed",
+                {
+                    "embedding_time": f"{embed_time:.2f}s",
+                    "retrieval_time": f"{retrieve_time:.2f}s",
+                    "total_time": f"{embed_time + retrieve_time:.2f}s",
+                    "results_count": len(processed_results)
+                }
+            )
+            return processed_results
         
         except Exception as e:
             logger.exception(f"Error in OpenSearch")
@@ -584,93 +770,13 @@ class OpenSearchClient:
         if isinstance(sites, str):
             sites = [sites]
         
-        # Build site filter
-        if len(sites) == 1:
-            site_filter = {"term": {"site": sites[0]}}
-        else:
-            site_filter = {"terms": {"site": sites}}
-        
-        # Build OpenSearch query based on k-NN availability
-        if self.use_knn:
-            # Use k-NN plugin query
-            search_query = {
-                "size": top_n,
-                "_source": ["url", "site", "schema_json", "name"],
-                "query": {
-                    "bool": {
-                        "must": [
-                            {
-                                "knn": {
-                                    "embedding": {
-                                        "vector": vector_embedding,
-                                        "k": top_n
-                                    }
-                                }
-                            }
-                        ],
-                        "filter": [site_filter]
-                    }
-                }
-            }
-        else:
-            # Use script_score for vector similarity
-            search_query = {
-                "size": top_n,
-                "_source": ["url", "site", "schema_json", "name"],
-                "query": {
-                    "script_score": {
-                        "query": {
-                            "bool": {
-                                "filter": [site_filter]
-                            }
-                        },
-                        "script": {
-                            "source": """
-                                double dotProduct = 0.0;
-                                double normA = 0.0;
-                                double normB = 0.0;
-                                for (int i = 0; i < params.query_vector.length; i++) {
-                                    dotProduct += params.query_vector[i] * doc['embedding'][i];
-                                    normA += params.query_vector[i] * params.query_vector[i];
-                                    normB += doc['embedding'][i] * doc['embedding'][i];
-                                }
-                                return dotProduct / (Math.sqrt(normA) * Math.sqrt(normB)) + 1.0;
-                            """,
-                            "params": {
-                                "query_vector": vector_embedding
-                            }
-                        }
-                    }
-                }
-            }
-        
         try:
-            async with httpx.AsyncClient() as client:
-                response = await client.post(
-                    f"{self.api_endpoint}/{index_name}/_search",
-                    json=search_query,
-                    headers=self._get_auth_headers(),
-                    timeout=60
-                )
-                response.raise_for_status()
-                
-                result = response.json()
-                hits = result.get('hits', {}).get('hits', [])
-                
-                # Process results into the expected format
-                processed_results = []
-                for hit in hits:
-                    source = hit.get('_source', {})
-                    url = source.get('url', '')
-                    schema_json = source.get('schema_json', '{}')
-                    name = source.get('name', '')
-                    site = source.get('site', '')
-                    
-                    processed_result = [url, schema_json, name, site]
-                    processed_results.append(processed_result)
+            layout = await self._get_index_layout(index_name)
+            search_query = self._build_vector_query(layout, vector_embedding, top_n, sites)
+            processed_results = await self._execute_search(index_name, search_query)
                 
-                logger.debug(f"Retrieved {len(processed_results)} results")
-                return processed_results
+            logger.debug(f"Retrieved {len(processed_results)} results")
+            return processed_results
         
         except Exception as e:
             logger.exception(f"Error in _search_by_site_and_vector")
@@ -713,30 +819,30 @@ class OpenSearchClient:
         }
         
         try:
-            async with httpx.AsyncClient() as client:
-                response = await client.post(
-                    f"{self.api_endpoint}/{index_name}/_search",
-                    json=search_query,
-                    headers=self._get_auth_headers(),
-                    timeout=60
-                )
-                response.raise_for_status()
+            client = await get_httpx_client()
+            response = await client.post(
+                f"{self.api_endpoint}/{index_name}/_search",
+                json=search_query,
+                headers=self._get_auth_headers(),
+                timeout=60
+            )
+            response.raise_for_status()
                 
-                result = response.json()
-                hits = result.get('hits', {}).get('hits', [])
+            result = response.json()
+            hits = result.get('hits', {}).get('hits', [])
                 
-                if hits:
-                    source = hits[0].get('_source', {})
-                    logger.info(f"Successfully retrieved item for URL: {url}")
-                    return [
-                        source.get('url', ''),
-                        source.get('schema_json', '{}'),
-                        source.get('name', ''),
-                        source.get('site', '')
-                    ]
+            if hits:
+                source = hits[0].get('_source', {})
+                logger.info(f"Successfully retrieved item for URL: {url}")
+                return [
+                    source.get('url', ''),
+                    source.get('schema_json', '{}'),
+                    source.get('name', ''),
+                    source.get('site', '')
+                ]
                 
-                logger.warning(f"No item found for URL: {url}")
-                return None
+            logger.warning(f"No item found for URL: {url}")
+            return None
         
         except Exception as e:
             logger.exception(f"Error retrieving item with URL: {url}")
@@ -772,77 +878,13 @@ class OpenSearchClient:
             query_embedding = await get_embedding(query, query_params=query_params)
             logger.debug(f"Generated embedding with dimension: {len(query_embedding)}")
             
-            # Build OpenSearch query based on k-NN availability (no site filter)
-            if self.use_knn:
-                # Use k-NN plugin query
-                search_query = {
-                    "size": top_n,
-                    "_source": ["url", "site", "schema_json", "name"],
-                    "query": {
-                        "knn": {
-                            "embedding": {
-                                "vector": query_embedding,
-                                "k": top_n
-                            }
-                        }
-                    }
-                }
-            else:
-                # Use script_score for vector similarity
-                search_query = {
-                    "size": top_n,
-                    "_source": ["url", "site", "schema_json", "name"],
-                    "query": {
-                        "script_score": {
-                            "query": {
-                                "match_all": {}
-                            },
-                            "script": {
-                                "source": """
-                                    double dotProduct = 0.0;
-                                    double normA = 0.0;
-                                    double normB = 0.0;
-                                    for (int i = 0; i < params.query_vector.length; i++) {
-                                        dotProduct += params.query_vector[i] * doc['embedding'][i];
-                                        normA += params.query_vector[i] * params.query_vector[i];
-                                        normB += doc['embedding'][i] * doc['embedding'][i];
-                                    }
-                                    return dotProduct / (Math.sqrt(normA) * Math.sqrt(normB)) + 1.0;
-                                """,
-                                "params": {
-                                    "query_vector": query_embedding
-                                }
-                            }
-                        }
-                    }
-                }
-            
-            async with httpx.AsyncClient() as client:
-                response = await client.post(
-                    f"{self.api_endpoint}/{index_name}/_search",
-                    json=search_query,
-                    headers=self._get_auth_headers(),
-                    timeout=60
-                )
-                response.raise_for_status()
-                
-                result = response.json()
-                hits = result.get('hits', {}).get('hits', [])
+            # No site filter
+            layout = await self._get_index_layout(index_name)
+            search_query = self._build_vector_query(layout, query_embedding, top_n)
+            processed_results = await self._execute_search(index_name, search_query)
                 
-                # Process results into the expected format
-                processed_results = []
-                for hit in hits:
-                    source = hit.get('_source', {})
-                    processed_result = [
-                        source.get('url', ''),
-                        source.get('schema_json', '{}'),
-                        source.get('name', ''),
-                        source.get('site', '')
-                    ]
-                    processed_results.append(processed_result)
-                
-                logger.info(f"Global search completed, found {len(processed_results)} results")
-                return processed_results
+            logger.info(f"Global search completed, found {len(processed_results)} results")
+            return processed_results
         
         except Exception as e:
             logger.exception(f"Error in search_all_sites")
@@ -884,21 +926,21 @@ class OpenSearchClient:
         }
         
         try:
-            async with httpx.AsyncClient() as client:
-                response = await client.post(
-                    f"{self.api_endpoint}/{index_name}/_search",
-                    json=aggregation_query,
-                    headers=self._get_auth_headers(),
-                    timeout=60
-                )
-                response.raise_for_status()
+            client = await get_httpx_client()
+            response = await client.post(
+                f"{self.api_endpoint}/{index_name}/_search",
+                json=aggregation_query,
+                headers=self._get_auth_headers(),
+                timeout=60
+            )
+            response.raise_for_status()
                 
-                result = response.json()
-                buckets = result.get('aggregations', {}).get('unique_sites', {}).get('buckets', [])
+            result = response.json()
+            buckets = result.get('aggregations', {}).get('unique_sites', {}).get('buckets', [])
                 
-                sites = [bucket['key'] for bucket in buckets]
-                logger.info(f"Retrieved {len(sites)} unique sites")
-                return sorted(sites)
+            sites = [bucket['key'] for bucket in buckets]
+            logger.info(f"Retrieved {len(sites)} unique sites")
+            return sorted(sites)
         
         except Exception as e:
             logger.exception(f"Error retrieving sites from index: {index_name}")
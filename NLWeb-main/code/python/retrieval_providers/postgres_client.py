@@ -28,6 +28,35 @@ from misc.logger.logger import LogLevel
 
 logger = get_configured_logger("postgres_client")
 
+# pgvector distance operators and the operator classes that index them
+DISTANCE_OPERATORS = {
+    "cosine": ("<=>", "vector_cosine_ops"),          # Cosine distance
+    "inner_product": ("<#>", "vector_ip_ops"),      # Negative inner product
+    "euclidean": ("<->", "vector_l2_ops"),          # Euclidean distance
+}
+
+# halfvec operator classes for indexing the embedding column at half precision
+HALFVEC_OPERATOR_CLASSES = {
+    "cosine": "halfvec_cosine_ops",
+    "inner_product": "halfvec_ip_ops",
+    "euclidean": "halfvec_l2_ops",
+}
+
+# Defaults for the vector_index section of the endpoint config
+DEFAULT_VECTOR_INDEX = {
+    "type": "hnsw",             # hnsw, ivfflat or none
+    "metric": "cosine",
+    "m": 16,                    # hnsw
+    "ef_construction": 64,      # hnsw
+    "lists": 100,               # ivfflat
+    "ef_search": 40,            # hnsw, per query
+    "probes": 10,               # ivfflat, per query
+    "create": True,             # create the index at startup if it is missing
+    "self_check": True,         # EXPLAIN the search query at startup
+    "prepared_statements": True,
+}
+
+
 class PgVectorClient:
     """
     Client for PostgreSQL vector database operations with pgvector extension.
@@ -49,6 +78,7 @@ class PgVectorClient:
         self._conn_lock = asyncio.Lock()
         self._pool = None
         self._pool_init_lock = asyncio.Lock()
+        self._pgvector_installed = False
         
         logger.info(f"Initializing PgVectorClient for endpoint: {self.endpoint_name}")
         
@@ -81,6 +111,28 @@ class PgVectorClient:
         
         logger.info(f"Using PostgreSQL database: {self.dbname} on {self.host}:{self.port}")
         logger.info(f"Table name: {self.default_collection_name}")
+        
+        # ANN index management and query settings
+        self.vector_index = {**DEFAULT_VECTOR_INDEX, **(self.endpoint_config.vector_index or {})}
+        self.index_type = str(self.vector_index["type"]).lower()
+        if self.index_type not in ("hnsw", "ivfflat", "none"):
+            raise ValueError(f"Unsupported vector_index.type '{self.index_type}' for endpoint '{self.endpoint_name}'")
+        if self.vector_index["metric"] not in DISTANCE_OPERATORS:
+            raise ValueError(f"Unsupported vector_index.metric '{self.vector_index['metric']}' for endpoint '{self.endpoint_name}'")
+        # Server-side prepared statements (disable behind pgbouncer in transaction mode)
+        self.prepare = bool(self.vector_index["prepared_statements"])
+        
+        # quantization: {type: halfvec, dimensions, oversampling} indexes and searches the
+        # embeddings as halfvec, then rescores the candidates with the full-precision column
+        self.quantization = self.endpoint_config.quantization
+        if self.quantization:
+            if self.quantization.get("type") != "halfvec":
+                raise ValueError(f"Unsupported quantization.type '{self.quantization.get('type')}' for endpoint "
+                                 f"'{self.endpoint_name}' (expected 'halfvec')")
+            if not self.quantization.get("dimensions"):
+                raise ValueError(f"quantization.dimensions is required for halfvec on endpoint '{self.endpoint_name}'")
+            self.halfvec_type = f"halfvec({int(self.quantization['dimensions'])})"
+            self.oversampling = int(self.quantization.get("oversampling", 4))
     
     def _get_config_from_postgres_connection_string(self, connection_string: str) -> Dict[str, Any]:
         """
@@ -165,32 +217,250 @@ class PgVectorClient:
                         
                         # Set up async connection pool with reasonable defaults
                         conninfo = f"host={self.host} port={self.port} dbname={self.dbname} user={self.username} password={self.password}"
-                        self._pool = AsyncConnectionPool(
+                        pool = AsyncConnectionPool(
                             conninfo=conninfo,
                             min_size=1,
                             max_size=10, 
+                            configure=self._configure_connection,
                             open=False # Don't open immediately, we will do it explicitly later
                         )
                         # Explicitly open the pool as recommended in newer psycopg versions
-                        await self._pool.open()
+                        await pool.open()
                         logger.info("PostgreSQL connection pool initialized")
                         
                         # Verify pgvector extension is installed
-                        async with self._pool.connection() as conn:
-                            # Register vector type
-                            await pgvector.psycopg.register_vector_async(conn)
-                            
+                        async with pool.connection() as conn:
                             async with conn.cursor() as cur:
                                 await cur.execute("SELECT * FROM pg_extension WHERE extname = 'vector'")
-                                row = await cur.fetchone()
-                                if not row:
+                                self._pgvector_installed = await cur.fetchone() is not None
+                                if not self._pgvector_installed:
                                     logger.warning("pgvector extension not found in the database")
+                        
+                        self._pool = pool
                     
                     except Exception as e:
                         logger.exception(f"Error creating PostgreSQL connection pool: {e}")
                         raise
         
         return self._pool
+    
+    @staticmethod
+    async def _configure_connection(conn):
+        """Register the vector type once per pooled connection rather than per query."""
+        await pgvector.psycopg.register_vector_async(conn)
+        # configure must leave the connection idle
+        await conn.commit()
+    
+    async def prepare_vector_index(self):
+        """
+        Create or verify the ANN index and EXPLAIN the search query, without raising.
+        
+        Called by core.retriever.prepare_vector_indexes() at server startup and
+        after db_load, never from a search request.
+        """
+        try:
+            await self._get_connection_pool()
+            if not self._pgvector_installed:
+                return
+            await self.ensure_vector_index(create=bool(self.vector_index["create"]))
+            if self.vector_index["self_check"]:
+                await self.check_query_plan()
+        except Exception as e:
+            logger.warning(f"Vector index checks failed for table {self.table_name}: {e}")
+    
+    def _index_opclass(self) -> str:
+        """Operator class of the ANN index (halfvec when quantized)."""
+        if self.quantization:
+            return HALFVEC_OPERATOR_CLASSES[self.vector_index["metric"]]
+        return DISTANCE_OPERATORS[self.vector_index["metric"]][1]
+    
+    def _index_definition(self) -> Tuple[str, str]:
+        """Return (index name, CREATE INDEX statement) for the configured ANN index."""
+        opclass = self._index_opclass()
+        column = f"(embedding::{self.halfvec_type})" if self.quantization else "embedding"
+        suffix = "_halfvec" if self.quantization else ""
+        index_name = f"{self.table_name}_embedding_{self.index_type}{suffix}_idx"
+        if self.index_type == "hnsw":
+            options = f"m = {int(self.vector_index['m'])}, ef_construction = {int(self.vector_index['ef_construction'])}"
+        else:
+            options = f"lists = {int(self.vector_index['lists'])}"
+        sql = (f"CREATE INDEX CONCURRENTLY IF NOT EXISTS {index_name} ON {self.table_name} "
+               f"USING {self.index_type} ({column} {opclass}) WITH ({options})")
+        return index_name, sql
+    
+    async def ensure_vector_index(self, create: bool = True) -> Dict[str, Any]:
+        """
+        Verify that the embedding column has the configured ANN index, creating it if asked.
+        
+        Any existing valid index with the same access method and operator class
+        is accepted, whatever its name. The index is built CONCURRENTLY, so
+        writes to the table continue while it builds. Idempotent: safe to call
+        on every startup.
+        
+        Args:
+            create: Create the index if no matching index exists
+            
+        Returns:
+            Dict with index_name, definition, and whether it was created
+        """
+        if self.index_type == "none":
+            return {"index_name": None, "definition": None, "created": False}
+        
+        opclass = self._index_opclass()
+        index_name, create_sql = self._index_definition()
+        
+        async def _find_index(conn):
+            async with conn.cursor(row_factory=dict_row) as cur:
+                await cur.execute("""
+                    SELECT i.relname AS index_name, am.amname AS method, pg_get_indexdef(i.oid) AS definition,
+                           ix.indisvalid AS valid
+                    FROM pg_index ix
+                    JOIN pg_class t ON t.oid = ix.indrelid
+                    JOIN pg_class i ON i.oid = ix.indexrelid
+                    JOIN pg_am am ON am.oid = i.relam
+                    JOIN pg_attribute a ON a.attrelid = t.oid AND a.attnum = ANY(ix.indkey)
+                    WHERE t.relname = %s AND a.attname = 'embedding'
+                """, (self.table_name,))
+                return await cur.fetchall()
+        
+        indexes = await self._execute_with_retry(_find_index)
+        for index in indexes:
+            if index["valid"] and index["method"] == self.index_type and opclass in index["definition"]:
+                logger.info(f"Using existing vector index {index['index_name']}: {index['definition']}")
+                return {"index_name": index["index_name"], "definition": index["definition"], "created": False}
+        
+        if not create:
+            logger.warning(f"No {self.index_type} index with {opclass} on {self.table_name}.embedding; "
+                           f"similarity searches will scan the whole table. Expected: {create_sql}")
+            return {"index_name": None, "definition": None, "created": False}
+        
+        logger.info(f"Creating vector index: {create_sql}")
+        start_time = time.time()
+        
+        # A concurrent build that failed leaves an invalid index under our name,
+        # which CREATE INDEX IF NOT EXISTS would otherwise keep
+        stale_index = any(index["index_name"] == index_name and not index["valid"] for index in indexes)
+        
+        async def _create_index(conn):
+            # CONCURRENTLY cannot run inside a transaction block
+            await conn.set_autocommit(True)
+            try:
+                async with conn.cursor() as cur:
+                    if stale_index:
+                        await cur.execute(f"DROP INDEX CONCURRENTLY IF EXISTS {index_name}")
+                    await cur.execute(create_sql)
+            finally:
+                await conn.set_autocommit(False)
+        
+        await self._execute_with_retry(_create_index)
+        logger.info(f"Created vector index {index_name} in {time.time() - start_time:.1f}s")
+        return {"index_name": index_name, "definition": create_sql, "created": True}
+    
+    def _search_sql(self, similarity_func: str, filter_sites: bool) -> str:
+        """
+        Search SQL for a distance operator. The text only depends on the operator
+        and on whether sites are filtered, so every call reuses the same
+        server-side prepared statement.
+        """
+        where_clause = "WHERE site = ANY(%(sites)s)" if filter_sites else ""
+        if self.quantization:
+            # Nearest candidates by halfvec distance (served by the halfvec index),
+            # reordered by full-precision distance
+            return f"""
+            SELECT 
+                name,
+                url,
+                embedding {similarity_func} %(embedding)s::vector AS similarity_score,
+                site,
+                schema_json
+            FROM (
+                SELECT name, url, embedding, site, schema_json
+                FROM {self.table_name}
+                {where_clause}
+                ORDER BY embedding::{self.halfvec_type} {similarity_func} %(embedding)s::{self.halfvec_type}
+                LIMIT %(candidates)s
+            ) AS candidates
+            ORDER BY similarity_score
+            LIMIT %(limit)s
+        """
+        return f"""
+            SELECT 
+                name,
+                url,
+                embedding {similarity_func} %(embedding)s::vector AS similarity_score,
+                site,
+                schema_json
+            FROM {self.table_name}
+            {where_clause}
+            ORDER BY similarity_score
+            LIMIT %(limit)s
+        """
+    
+    def _oversampling(self) -> int:
+        return self.oversampling if self.quantization else 1
+    
+    async def _set_search_params(self, cur, ef_search: Optional[int] = None, probes: Optional[int] = None):
+        """Set the ANN search breadth for the current transaction only (SET LOCAL)."""
+        if self.index_type == "hnsw":
+            value = ef_search or self.vector_index["ef_search"]
+            await cur.execute("SELECT set_config('hnsw.ef_search', %s, true)", (str(int(value)),))
+        elif self.index_type == "ivfflat":
+            value = probes or self.vector_index["probes"]
+            await cur.execute("SELECT set_config('ivfflat.probes', %s, true)", (str(int(value)),))
+    
+    async def check_query_plan(self, sites: Optional[List[str]] = None) -> Dict[str, Any]:
+        """
+        EXPLAIN the similarity search and warn if it falls back to a sequential scan.
+        
+        A real embedding from the table is used as the query vector. Note that the
+        planner may legitimately prefer a sequential scan on small tables or very
+        selective site filters.
+        
+        Args:
+            sites: Optional site filter to include in the checked query
+            
+        Returns:
+            Dict with uses_index, seq_scan, index_names and the plan
+        """
+        similarity_func, _ = DISTANCE_OPERATORS[self.vector_index["metric"]]
+        
+        async def _explain(conn):
+            async with conn.cursor() as cur:
+                await cur.execute(f"SELECT embedding FROM {self.table_name} LIMIT 1")
+                row = await cur.fetchone()
+                if row is None:
+                    return None
+                await self._set_search_params(cur)
+                params = {"embedding": row[0], "limit": 10, "candidates": 10 * self._oversampling()}
+                if sites:
+                    params["sites"] = sites
+                await cur.execute("EXPLAIN (FORMAT JSON) " + self._search_sql(similarity_func, bool(sites)), params)
+                return (await cur.fetchone())[0]
+        
+        plan = await self._execute_with_retry(_explain)
+        if plan is None:
+            logger.info(f"Table {self.table_name} is empty, skipping query plan check")
+            return {"uses_index": None, "seq_scan": None, "index_names": [], "plan": None}
+        
+        seq_scan = False
+        index_names = []
+        nodes = [plan[0]["Plan"]] if isinstance(plan, list) else [plan["Plan"]]
+        while nodes:
+            node = nodes.pop()
+            if node.get("Node Type") == "Seq Scan" and node.get("Relation Name") == self.table_name:
+                seq_scan = True
+            if "Index Name" in node:
+                index_names.append(node["Index Name"])
+            nodes.extend(node.get("Plans", []))
+        
+        result = {"uses_index": bool(index_names), "seq_scan": seq_scan, "index_names": index_names, "plan": plan}
+        if seq_scan:
+            logger.warning(f"Similarity search on {self.table_name} uses a sequential scan instead of the "
+                           f"{self.index_type} index. Check ensure_vector_index() and the metric "
+                           f"({self.vector_index['metric']}) against the index operator class.")
+        else:
+            logger.info(f"Similarity search on {self.table_name} uses index(es): {index_names}")
+        return result
 
     async def close(self):
         """Close the connection pool when done"""
@@ -215,9 +485,8 @@ class PgVectorClient:
         while True:
             try:
                 # With psycopg3, we can use async directly
+                # (the vector type is registered when the pool opens each connection)
                 async with (await self._get_connection_pool()).connection() as conn:
-                    # Register vector type
-                    await pgvector.psycopg.register_vector_async(conn)
                     return await query_func(conn)
             
             except (psycopg.OperationalError, psycopg.InternalError) as e:
@@ -426,44 +695,21 @@ class PgVectorClient:
         elif isinstance(site, str) and site != "all":
             sites = [site]
         
-        similarity_metric = kwargs.get("similarity_metric", "cosine")  # Default to cosine similarity
+        similarity_metric = kwargs.get("similarity_metric", self.vector_index["metric"])
         
         # Select appropriate similarity function based on metric
-        similarity_func = {
-            "cosine": "<=>",          # Cosine distance
-            "inner_product": "<#>",    # Negative inner product
-            "euclidean": "<->",        # Euclidean distance
-        }.get(similarity_metric, "<=>")  # Default to cosine
+        similarity_func, _ = DISTANCE_OPERATORS.get(similarity_metric, DISTANCE_OPERATORS["cosine"])
+        query_sql = self._search_sql(similarity_func, bool(sites))
+        params = {"embedding": query_embedding, "limit": num_results,
+                  "candidates": num_results * self._oversampling()}
+        if sites:
+            params["sites"] = list(sites)
         
         async def _search_docs(conn):
             # Use dict_row to get results as dictionaries
             async with conn.cursor(row_factory=dict_row) as cur:
-                # Build WHERE clause for site filtering if needed
-                where_clause = ""
-                params = [query_embedding]
-                
-                if sites:
-                    # Create placeholders for site parameters
-                    site_placeholders = ", ".join(["%s"] * len(sites))
-                    where_clause = f"WHERE site IN ({site_placeholders})"
-                    params.extend(sites)
-                
-                # Construct and execute query
-                query_sql = f"""
-                    SELECT 
-                        name,
-                        url,
-                        embedding {similarity_func} %s::vector AS similarity_score,
-                        site,
-                        schema_json
-                    FROM {self.table_name}
-                    {where_clause}
-                    ORDER BY similarity_score
-                    LIMIT %s
-                """
-                
-                params.append(num_results)
-                await cur.execute(query_sql, params)
+                await self._set_search_params(cur, kwargs.get("ef_search"), kwargs.get("probes"))
+                await cur.execute(query_sql, params, prepare=self.prepare)
                 rows = await cur.fetchall()
                 
                 # Format results
@@ -508,9 +754,9 @@ class PgVectorClient:
             async with conn.cursor(row_factory=dict_row) as cur:
                 await cur.execute(
                     f"SELECT url, schema_json, site, name FROM {self.table_name} WHERE url ILIKE %s",
-                    (f"%{url}%",)
+                    (f"%{url}%",),
+                    prepare=self.prepare
                 )
-                print(url)
                 row = await cur.fetchone()
                 
                 if row:
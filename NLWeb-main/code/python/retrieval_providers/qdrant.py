@@ -18,12 +18,27 @@ from qdrant_client.http import models
 from qdrant_client.http.exceptions import UnexpectedResponse
 
 from core.config import CONFIG
-from core.embedding import get_embedding
+from core.embedding import get_embedding, batch_get_embeddings
 from misc.logger.logging_config_helper import get_configured_logger
 from misc.logger.logger import LogLevel
 
 logger = get_configured_logger("qdrant_client")
 
+# Collections known to exist, keyed by (Qdrant location, collection name).
+# Shared by all client instances for the lifetime of the process; entries are
+# dropped when this process deletes a collection or a search reports it missing.
+_existing_collections: Set[Tuple[str, str]] = set()
+_existing_collections_lock = threading.Lock()
+
+# Defaults for the quantization section of the endpoint config
+DEFAULT_QUANTIZATION = {
+    "type": "int8",
+    "quantile": 0.99,        # Clip outliers when calibrating the int8 range
+    "always_ram": True,      # Keep the int8 vectors in RAM, the originals on disk
+    "oversampling": 4.0,     # Candidates fetched per result before rescoring
+    "rescore": True,         # Rescore candidates with the full-precision vectors
+}
+
 class QdrantVectorClient:
     """
     Client for Qdrant vector database operations, providing a unified interface for 
@@ -47,6 +62,12 @@ class QdrantVectorClient:
         self.api_key = self.endpoint_config.api_key
         self.database_path = self.endpoint_config.database_path
         self.default_collection_name = self.endpoint_config.index_name or "nlweb_collection"
+        self.quantization = None
+        if self.endpoint_config.quantization:
+            self.quantization = {**DEFAULT_QUANTIZATION, **self.endpoint_config.quantization}
+            if self.quantization["type"] != "int8":
+                raise ValueError(f"Unsupported quantization type '{self.quantization['type']}' for endpoint "
+                                 f"{self.endpoint_name} (expected 'int8')")
         
         logger.info(f"Initialized QdrantVectorClient for endpoint: {self.endpoint_name}")
         if self.api_endpoint:
@@ -54,6 +75,8 @@ class QdrantVectorClient:
         elif self.database_path:
             logger.info(f"Using local Qdrant database path: {self.database_path}")
         logger.info(f"Default collection name: {self.default_collection_name}")
+        if self.quantization:
+            logger.info(f"Using int8 scalar quantization: {self.quantization}")
     
     def _get_endpoint_config(self):
         """Get the Qdrant endpoint configuration from CONFIG"""
@@ -105,6 +128,37 @@ class QdrantVectorClient:
         logger.debug(f"Resolved path: {resolved_path}")
         return resolved_path
     
+    def _collection_params(self, vector_size: int) -> Dict[str, Any]:
+        """
+        Vector and quantization settings for create_collection.
+        
+        With quantization the full-precision vectors are kept on disk for
+        rescoring and only the int8 copies are searched in memory.
+        """
+        if not self.quantization:
+            return {"vectors_config": models.VectorParams(size=vector_size, distance=models.Distance.COSINE)}
+        return {
+            "vectors_config": models.VectorParams(size=vector_size, distance=models.Distance.COSINE, on_disk=True),
+            "quantization_config": models.ScalarQuantization(
+                scalar=models.ScalarQuantizationConfig(
+                    type=models.ScalarType.INT8,
+                    quantile=float(self.quantization["quantile"]),
+                    always_ram=bool(self.quantization["always_ram"]),
+                )
+            ),
+        }
+    
+    def _search_params(self) -> Optional[models.SearchParams]:
+        """Search over the quantized vectors, rescoring the oversampled candidates."""
+        if not self.quantization:
+            return None
+        return models.SearchParams(
+            quantization=models.QuantizationSearchParams(
+                rescore=bool(self.quantization["rescore"]),
+                oversampling=float(self.quantization["oversampling"]),
+            )
+        )
+    
     def _create_client_params(self):
         """Extract client parameters from endpoint config."""
         params = {}
@@ -196,6 +250,18 @@ class QdrantVectorClient:
             else:
                 raise
     
+    def _collection_key(self, collection_name: str) -> Tuple[str, str]:
+        return (self.api_endpoint or self.database_path or self.endpoint_name, collection_name)
+    
+    def _mark_collection(self, collection_name: str, exists: bool):
+        """Record in the process-wide cache whether a collection exists."""
+        key = self._collection_key(collection_name)
+        with _existing_collections_lock:
+            if exists:
+                _existing_collections.add(key)
+            else:
+                _existing_collections.discard(key)
+    
     async def collection_exists(self, collection_name: Optional[str] = None) -> bool:
         """
         Check if a collection exists in Qdrant.
@@ -240,8 +306,9 @@ class QdrantVectorClient:
             logger.info(f"Creating collection '{collection_name}' with vector size {vector_size}")
             await client.create_collection(
                 collection_name=collection_name,
-                vectors_config=models.VectorParams(size=vector_size, distance=models.Distance.COSINE),
+                **self._collection_params(vector_size),
             )
+            self._mark_collection(collection_name, True)
             logger.info(f"Successfully created collection '{collection_name}'")
             return True
         
@@ -252,7 +319,7 @@ class QdrantVectorClient:
                 try:
                     await client.create_collection(
                         collection_name=collection_name,
-                        vectors_config=models.VectorParams(size=vector_size, distance=models.Distance.COSINE),
+                        **self._collection_params(vector_size),
                     )
                     logger.info(f"Successfully created collection '{collection_name}' on second attempt")
                     return True
@@ -278,6 +345,7 @@ class QdrantVectorClient:
         
         try:
             # Delete collection if it exists
+            self._mark_collection(collection_name, False)
             if await client.collection_exists(collection_name):
                 logger.info(f"Dropping existing collection '{collection_name}'")
                 await client.delete_collection(collection_name)
@@ -286,9 +354,10 @@ class QdrantVectorClient:
             logger.info(f"Creating collection '{collection_name}' with vector size {vector_size}")
             await client.create_collection(
                 collection_name=collection_name,
-                vectors_config=models.VectorParams(size=vector_size, distance=models.Distance.COSINE),
+                **self._collection_params(vector_size),
             )
             
+            self._mark_collection(collection_name, True)
             logger.info(f"Successfully recreated collection '{collection_name}'")
             return True
             
@@ -299,7 +368,7 @@ class QdrantVectorClient:
                 try:
                     await client.create_collection(
                         collection_name=collection_name,
-                        vectors_config=models.VectorParams(size=vector_size, distance=models.Distance.COSINE),
+                        **self._collection_params(vector_size),
                     )
                     logger.info(f"Successfully created collection '{collection_name}' on second attempt")
                     return True
@@ -322,8 +391,14 @@ class QdrantVectorClient:
         """
         collection_name = collection_name or self.default_collection_name
         
+        # Checked once per process; afterwards this is a set lookup
+        with _existing_collections_lock:
+            if self._collection_key(collection_name) in _existing_collections:
+                return True
+        
         if await self.collection_exists(collection_name):
             logger.info(f"Collection '{collection_name}' already exists")
+            self._mark_collection(collection_name, True)
             return True
         else:
             logger.info(f"Collection '{collection_name}' does not exist. Creating it...")
@@ -443,7 +518,7 @@ class QdrantVectorClient:
                             logger.info(f"Collection '{collection_name}' not found during upload. Creating it...")
                             await client.create_collection(
                                 collection_name=collection_name,
-                                vectors_config=models.VectorParams(size=vector_size, distance=models.Distance.COSINE),
+                                **self._collection_params(vector_size),
                             )
                             # Try upload again
                             await client.upsert(collection_name=collection_name, points=batch)
@@ -552,6 +627,7 @@ class QdrantVectorClient:
                         query_vector=embedding,
                         limit=num_results,
                         query_filter=filter_condition,
+                        search_params=self._search_params(),
                         with_payload=True,
                     )
                 )
@@ -577,6 +653,8 @@ class QdrantVectorClient:
             
         except Exception as e:
             logger.exception(f"Error in Qdrant search: {str(e)}")
+            if "Collection not found" in str(e) or "doesn't exist" in str(e):
+                self._mark_collection(collection_name, False)
             
             # Try fallback if we're using a URL endpoint and it fails
             if self.api_endpoint and "Connection refused" in str(e):
@@ -603,6 +681,88 @@ class QdrantVectorClient:
             )
             raise
     
+    async def search_batch(self, queries: List[str], site: Union[str, List[str]],
+                           num_results: int = 50, collection_name: Optional[str] = None,
+                           query_params: Optional[Dict[str, Any]] = None, **kwargs) -> List[List[List[str]]]:
+        """
+        Run several queries in one round trip using Qdrant's batch search endpoint.
+        
+        The queries are embedded with one batch embedding call and sent as one
+        search request per query vector, each carrying the site filter.
+        
+        Args:
+            queries: The search queries to embed and search with
+            site: Site to filter by (string or list of strings)
+            num_results: Maximum number of results per query
+            collection_name: Optional collection name (defaults to configured name)
+            query_params: Additional query parameters
+            
+        Returns:
+            List[List[List[str]]]: One result list per query, in query order
+        """
+        if not queries:
+            return []
+        collection_name = collection_name or self.default_collection_name
+        logger.info(f"Starting Qdrant batch search - collection: {collection_name}, site: {site}, "
+                    f"queries: {len(queries)}, num_results: {num_results}")
+        
+        try:
+            start_embed = time.time()
+            embeddings = await batch_get_embeddings(queries, query_params=query_params)
+            embed_time = time.time() - start_embed
+            
+            start_retrieve = time.time()
+            client = await self._get_qdrant_client()
+            filter_condition = self._create_site_filter(site)
+            
+            if not await self.ensure_collection_exists(collection_name, len(embeddings[0])):
+                logger.info(f"Collection '{collection_name}' was just created. Returning empty results.")
+                return [[] for _ in queries]
+            
+            requests = [
+                models.SearchRequest(
+                    vector=embedding,
+                    filter=filter_condition,
+                    limit=num_results,
+                    params=self._search_params(),
+                    with_payload=True,
+                )
+                for embedding in embeddings
+            ]
+            batch_result = await client.search_batch(collection_name=collection_name, requests=requests)
+            results = [self._format_results(points) for points in batch_result]
+            retrieve_time = time.time() - start_retrieve
+            
+            logger.log_with_context(
+                LogLevel.INFO,
+                "Qdrant batch search completed",
+                {
+                    "embedding_time": f"{embed_time:.2f}s",
+                    "retrieval_time": f"{retrieve_time:.2f}s",
+                    "total_time": f"{embed_time + retrieve_time:.2f}s",
+                    "query_count": len(queries),
+                    "results_count": sum(len(r) for r in results),
+                }
+            )
+            return results
+            
+        except Exception as e:
+            logger.exception(f"Error in Qdrant batch search: {str(e)}")
+            if "Collection not found" in str(e) or "doesn't exist" in str(e):
+                self._mark_collection(collection_name, False)
+            logger.log_with_context(
+                LogLevel.ERROR,
+                "Qdrant batch search failed",
+                {
+                    "error_type": type(e).__name__,
+                    "error_message": str(e),
+                    "collection": collection_name,
+                    "site": site,
+                    "query_count": len(queries),
+                }
+            )
+            raise
+    
     async def search_by_url(self, url: str, collection_name: Optional[str] = None) -> Optional[List[str]]:
         """
         Retrieve a specific item by URL from Qdrant database.
@@ -1,6 +1,6 @@
-import httpx
 import json
 from core.config import CONFIG, RetrievalProviderConfig
+from core.http_client import get_httpx_client
 from typing import Any, Dict, List, Optional, Tuple, Union
 from retrieval_providers.utils import snowflake
 
@@ -78,27 +78,27 @@ async def search(query: str, site: str|List[str]|None=None, url: str|None=None,
         }
 
     (database, schema, service) = get_cortex_search_service(cfg)
-    async with httpx.AsyncClient() as client:
-        response =  await client.post(
-            snowflake.get_account_url(cfg) + f"/api/v2/databases/{database}/schemas/{schema}/cortex-search-services/{service}:query",
-            json={
-                "query": query,
-                "limit": max(1, min(top_n, 1000)),
-                "columns": ["url", "site", "schema_json"],
-                "filter": filter,
-            },
-            headers={
-                    "Authorization": f"Bearer {snowflake.get_pat(cfg)}",
-                    "Content-Type": "application/json",
-                    "Accept": "application/json",
-            },
-            timeout=60,
-        )
-        if response.status_code == 400:
-            raise Exception(response.json())
-        response.raise_for_status()
-        results = response.json().get("results", [])
-        return list(map(_process_result, results))
+    client = await get_httpx_client()
+    response =  await client.post(
+        snowflake.get_account_url(cfg) + f"/api/v2/databases/{database}/schemas/{schema}/cortex-search-services/{service}:query",
+        json={
+            "query": query,
+            "limit": max(1, min(top_n, 1000)),
+            "columns": ["url", "site", "schema_json"],
+            "filter": filter,
+        },
+        headers={
+                "Authorization": f"Bearer {snowflake.get_pat(cfg)}",
+                "Content-Type": "application/json",
+                "Accept": "application/json",
+        },
+        timeout=60,
+    )
+    if response.status_code == 400:
+        raise Exception(response.json())
+    response.raise_for_status()
+    results = response.json().get("results", [])
+    return list(map(_process_result, results))
 
 def _process_result(r: Dict[str, str]) -> List[str]:
     url = r.get("url", "")
@@ -132,24 +132,24 @@ async def get_unique_sites(cfg: RetrievalProviderConfig) -> List[str]:
     # Use CORTEX_SEARCH_DATA_SCAN as recommended by sfc-gh-ashankar
     query = f"SELECT DISTINCT site FROM TABLE(CORTEX_SEARCH_DATA_SCAN(SERVICE_NAME=>'{database}.{schema}.{service}')) ORDER BY site"
     
-    async with httpx.AsyncClient() as client:
-        response = await client.post(
-            snowflake.get_account_url(cfg) + "/api/v2/statements",
-            json={
-                "statement": query,
-                "timeout": 60,
-            },
-            headers={
-                "Authorization": f"Bearer {snowflake.get_pat(cfg)}",
-                "Content-Type": "application/json",
-                "Accept": "application/json",
-            },
-            timeout=60,
-        )
+    client = await get_httpx_client()
+    response = await client.post(
+        snowflake.get_account_url(cfg) + "/api/v2/statements",
+        json={
+            "statement": query,
+            "timeout": 60,
+        },
+        headers={
+            "Authorization": f"Bearer {snowflake.get_pat(cfg)}",
+            "Content-Type": "application/json",
+            "Accept": "application/json",
+        },
+        timeout=60,
+    )
         
-        if response.status_code == 400:
-            raise Exception(response.json())
-        response.raise_for_status()
+    if response.status_code == 400:
+        raise Exception(response.json())
+    response.raise_for_status()
         
-        # Use concise list comprehension as recommended by sfc-gh-ashankar
-        return [x[0] for x in response.json().get("data", [])]
+    # Use concise list comprehension as recommended by sfc-gh-ashankar
+    return [x[0] for x in response.json().get("data", [])]
@@ -0,0 +1,679 @@
+"""
+In-process vector index used by the local_index retrieval backend.
+
+Vectors are stored L2-normalised in a raw float32 file that is memory-mapped
+on load, next to a JSON-lines file with one record (url, name, site,
+schema_json) per row. Search is either an exact scan in numpy or, when
+configured, an HNSW graph implemented here in plain Python/numpy.
+
+Uploads append to the vector and record files, and deletes append row numbers
+to a tombstone log; meta.json holds the committed row count and is written
+last. The HNSW graph is saved by flush(), which loaders call once at the end,
+and rows added since are inserted when the index is opened. Tombstoned rows
+are removed by compact(), which rewrites every file.
+
+With int8 quantization the exact scan reads a scalar-quantized copy of the
+vectors (a quarter of the size) and only the best candidates are rescored
+against the full-precision vectors, which stay in the memory-mapped file.
+
+WARNING: This code is under development and may undergo changes in future releases.
+Backwards compatibility is not guaranteed at this time.
+"""
+
+import heapq
+import json
+import math
+import os
+import threading
+from typing import Any, Dict, Iterable, List, Optional, Sequence, Tuple
+
+import numpy as np
+
+VECTORS_FILE = "vectors.f32"
+RECORDS_FILE = "records.jsonl"
+TOMBSTONES_FILE = "tombstones.log"
+GRAPH_FILE = "hnsw.npz"
+CODES_FILE = "codes.i8"
+SCALES_FILE = "scales.npy"
+META_FILE = "meta.json"
+# Vector file of indexes written before the files became append-only
+LEGACY_VECTORS_FILE = "vectors.npy"
+
+# Filtered searches that leave this many rows or fewer are always answered exactly
+DEFAULT_EXACT_THRESHOLD = 10000
+
+# Tombstoned rows are compacted away once they make up this fraction of the index
+COMPACT_RATIO = 0.5
+
+# Defaults for int8 quantization: per-dimension scales are set from this
+# quantile of absolute values, and k * oversampling candidates are rescored
+DEFAULT_QUANTIZATION = {"type": "int8", "quantile": 0.99, "oversampling": 4}
+
+# Scales are calibrated on at most this many live rows. Until an index has
+# that many, flush() recalibrates whenever it has doubled since the last time,
+# so scales set by a small first upload do not clip later vectors.
+CALIBRATION_SAMPLE_ROWS = 20000
+
+# Rows scored per block in the quantized scan, bounding the float32 temporary
+_SCAN_BLOCK_ROWS = 65536
+
+
+def _normalize(vectors: np.ndarray) -> np.ndarray:
+    """L2-normalise rows so that a dot product is the cosine similarity."""
+    norms = np.linalg.norm(vectors, axis=1, keepdims=True)
+    norms[norms == 0] = 1.0
+    return vectors / norms
+
+
+def calibrate_int8(vectors: np.ndarray, quantile: float = 0.99) -> np.ndarray:
+    """Per-dimension scales mapping [-quantile(|x|), quantile(|x|)] onto [-127, 127]."""
+    scales = np.quantile(np.abs(vectors), quantile, axis=0).astype(np.float32) / 127.0
+    scales[scales <= 0] = np.float32(1e-8)
+    return scales
+
+
+def quantize_int8(vectors: np.ndarray, scales: np.ndarray) -> np.ndarray:
+    """Scalar-quantize vectors with calibrated scales, clipping outliers."""
+    return np.clip(np.rint(vectors / scales), -127, 127).astype(np.int8)
+
+
+def _write_atomic(path: str, write) -> None:
+    """Write a file through a temporary name so readers never see a partial file."""
+    tmp_path = path + ".tmp"
+    with open(tmp_path, "wb") as f:
+        write(f)
+    os.replace(tmp_path, path)
+
+
+def _append(path: str, data: bytes) -> None:
+    with open(path, "ab") as f:
+        f.write(data)
+
+
+def _truncate(path: str, size: int) -> None:
+    """Drop bytes appended after the last commit, e.g. by an upload that crashed."""
+    if os.path.exists(path) and os.path.getsize(path) > size:
+        with open(path, "r+b") as f:
+            f.truncate(size)
+
+
+class HNSWGraph:
+    """
+    Hierarchical navigable small world graph over the rows of a vector array.
+
+    Nodes are row numbers and are inserted in row order. The graph only stores
+    adjacency; vectors are passed in by the owning index, which keeps them
+    normalised so similarity is a dot product.
+    """
+
+    def __init__(self, m: int = 16, ef_construction: int = 100, ef_search: int = 64, seed: int = 0):
+        self.m = m
+        self.m0 = 2 * m
+        self.ef_construction = ef_construction
+        self.ef_search = ef_search
+        self._level_mult = 1 / math.log(max(m, 2))
+        self._rng = np.random.default_rng(seed)
+        self.levels: List[int] = []
+        self.layers: List[Dict[int, List[int]]] = []
+        self.entry_point: Optional[int] = None
+
+    def __len__(self) -> int:
+        return len(self.levels)
+
+    def _max_neighbours(self, layer: int) -> int:
+        return self.m0 if layer == 0 else self.m
+
+    def _search_layer(self, query: np.ndarray, entry_points: List[int], ef: int,
+                      layer: int, vectors: np.ndarray) -> List[Tuple[float, int]]:
+        """Best-first search of one layer. Returns up to ef (similarity, node), best first."""
+        adjacency = self.layers[layer]
+        visited = set(entry_points)
+        scores = (vectors[entry_points] @ query).tolist()
+        candidates = [(-score, node) for score, node in zip(scores, entry_points)]
+        results = [(score, node) for score, node in zip(scores, entry_points)]
+        heapq.heapify(candidates)
+        heapq.heapify(results)
+        while len(results) > ef:
+            heapq.heappop(results)
+
+        while candidates:
+            neg_score, node = heapq.heappop(candidates)
+            if len(results) >= ef and -neg_score < results[0][0]:
+                break
+            neighbours = [n for n in adjacency.get(node, ()) if n not in visited]
+            if not neighbours:
+                continue
+            visited.update(neighbours)
+            for score, neighbour in zip((vectors[neighbours] @ query).tolist(), neighbours):
+                if len(results) < ef or score > results[0][0]:
+                    heapq.heappush(candidates, (-score, neighbour))
+                    heapq.heappush(results, (score, neighbour))
+                    if len(results) > ef:
+                        heapq.heappop(results)
+
+        return sorted(results, reverse=True)
+
+    def _prune(self, node: int, layer: int, vectors: np.ndarray) -> None:
+        """Keep only a node's most similar neighbours once it has too many."""
+        neighbours = self.layers[layer][node]
+        max_neighbours = self._max_neighbours(layer)
+        if len(neighbours) <= max_neighbours:
+            return
+        scores = vectors[neighbours] @ vectors[node]
+        keep = np.argsort(-scores)[:max_neighbours]
+        self.layers[layer][node] = [neighbours[i] for i in keep]
+
+    def insert(self, node: int, vectors: np.ndarray) -> None:
+        """Add the row `node` (which must be the next row number) to the graph."""
+        if node != len(self.levels):
+            raise ValueError(f"HNSW nodes must be inserted in row order (expected {len(self.levels)}, got {node})")
+        level = int(-math.log(1.0 - self._rng.random()) * self._level_mult)
+        self.levels.append(level)
+        while len(self.layers) <= level:
+            self.layers.append({})
+        for layer in range(level + 1):
+            self.layers[layer][node] = []
+
+        if self.entry_point is None:
+            self.entry_point = node
+            return
+
+        query = vectors[node]
+        entry = self.entry_point
+        top_level = self.levels[entry]
+        for layer in range(top_level, level, -1):
+            entry = self._search_layer(query, [entry], 1, layer, vectors)[0][1]
+
+        for layer in range(min(level, top_level), -1, -1):
+            found = self._search_layer(query, [entry], self.ef_construction, layer, vectors)
+            neighbours = [n for _, n in found if n != node][:self._max_neighbours(layer)]
+            self.layers[layer][node] = neighbours
+            for neighbour in neighbours:
+                self.layers[layer][neighbour].append(node)
+                self._prune(neighbour, layer, vectors)
+            entry = found[0][1]
+
+        if level > top_level:
+            self.entry_point = node
+
+    def search(self, query: np.ndarray, k: int, vectors: np.ndarray,
+               allowed: Optional[np.ndarray] = None, ef: Optional[int] = None) -> List[Tuple[float, int]]:
+        """
+        Approximate k nearest rows to a normalised query.
+
+        Rows where `allowed` is False are traversed but never returned; ef is
+        widened by the inverse of the allowed fraction so enough allowed rows
+        are still reached.
+        """
+        if self.entry_point is None or k <= 0:
+            return []
+        ef = max(ef or self.ef_search, k)
+        if allowed is not None:
+            allowed_count = int(allowed[:len(self.levels)].sum())
+            if allowed_count == 0:
+                return []
+            ef = min(len(self.levels), int(ef * len(self.levels) / allowed_count))
+
+        entry = self.entry_point
+        for layer in range(self.levels[entry], 0, -1):
+            entry = self._search_layer(query, [entry], 1, layer, vectors)[0][1]
+        found = self._search_layer(query, [entry], ef, 0, vectors)
+        if allowed is not None:
+            found = [(score, node) for score, node in found if allowed[node]]
+        return found[:k]
+
+    def save(self, path: str) -> None:
+        arrays = {
+            "params": np.array([self.m, self.ef_construction, self.ef_search], dtype=np.int64),
+            "levels": np.array(self.levels, dtype=np.int32),
+            "entry_point": np.array([-1 if self.entry_point is None else self.entry_point], dtype=np.int64),
+        }
+        for layer, adjacency in enumerate(self.layers):
+            nodes = np.fromiter(adjacency.keys(), dtype=np.int64, count=len(adjacency))
+            neighbours = np.full((len(nodes), self._max_neighbours(layer)), -1, dtype=np.int64)
+            for i, node in enumerate(nodes.tolist()):
+                row = adjacency[node]
+                neighbours[i, :len(row)] = row
+            arrays[f"layer{layer}_nodes"] = nodes
+            arrays[f"layer{layer}_neighbours"] = neighbours
+        _write_atomic(path, lambda f: np.savez(f, **arrays))
+
+    @classmethod
+    def load(cls, path: str) -> "HNSWGraph":
+        with np.load(path) as data:
+            m, ef_construction, ef_search = (int(v) for v in data["params"])
+            graph = cls(m=m, ef_construction=ef_construction, ef_search=ef_search, seed=len(data["levels"]))
+            graph.levels = data["levels"].tolist()
+            entry_point = int(data["entry_point"][0])
+            graph.entry_point = None if entry_point < 0 else entry_point
+            layer = 0
+            while f"layer{layer}_nodes" in data:
+                nodes = data[f"layer{layer}_nodes"].tolist()
+                neighbours = data[f"layer{layer}_neighbours"]
+                graph.layers.append({
+                    node: [n for n in row if n >= 0]
+                    for node, row in zip(nodes, neighbours.tolist())
+                })
+                layer += 1
+        return graph
+
+
+class LocalVectorIndex:
+    """
+    Vectors plus their records, persisted in one directory.
+
+    Rows are never rewritten in place: uploading a URL that is already present
+    tombstones the old row and appends a new one, and deletes only tombstone.
+    Rows and tombstones are on disk before the call returns; call flush()
+    after a series of uploads to save the HNSW graph and compact. All methods
+    are thread-safe.
+    """
+
+    def __init__(self, path: str, hnsw: Optional[Dict[str, Any]] = None,
+                 exact_threshold: int = DEFAULT_EXACT_THRESHOLD,
+                 quantization: Optional[Dict[str, Any]] = None):
+        """
+        Args:
+            path: Directory holding the index files (created if missing)
+            hnsw: HNSW settings (m, ef_construction, ef_search); None for exact search only
+            exact_threshold: Searches over at most this many rows skip the graph
+            quantization: int8 settings (quantile, oversampling); None to scan float32 vectors
+        """
+        self.path = path
+        self.hnsw_params = dict(hnsw) if hnsw is not None else None
+        self.exact_threshold = exact_threshold
+        self.quantization = {**DEFAULT_QUANTIZATION, **quantization} if quantization is not None else None
+        if self.quantization is not None and self.quantization["type"] != "int8":
+            raise ValueError(f"Unsupported quantization type '{self.quantization['type']}' (expected 'int8')")
+        self._lock = threading.RLock()
+
+        self._vectors: Optional[np.ndarray] = None
+        self._records: List[Optional[Dict[str, Any]]] = []
+        self._live = np.zeros(0, dtype=bool)
+        self._site_codes = np.zeros(0, dtype=np.int32)
+        self._site_ids: Dict[str, int] = {}
+        self._url_rows: Dict[str, int] = {}
+        self._graph: Optional[HNSWGraph] = None
+        self._codes: Optional[np.ndarray] = None
+        self._scales: Optional[np.ndarray] = None
+        # Live rows when the scales were last calibrated
+        self._calibrated_rows = 0
+        self._dimension: Optional[int] = None
+        # Graph rows already in the graph file
+        self._saved_graph_rows = 0
+
+        os.makedirs(path, exist_ok=True)
+        self._load()
+
+    @property
+    def dimension(self) -> Optional[int]:
+        return None if self._vectors is None else self._dimension
+
+    def __len__(self) -> int:
+        return len(self._url_rows)
+
+    def _file(self, name: str) -> str:
+        return os.path.join(self.path, name)
+
+    def _new_graph(self) -> HNSWGraph:
+        return HNSWGraph(**self.hnsw_params)
+
+    def _site_code(self, site: Optional[str]) -> int:
+        site = site or ""
+        if site not in self._site_ids:
+            self._site_ids[site] = len(self._site_ids)
+        return self._site_ids[site]
+
+    def _open_vectors(self) -> None:
+        """Memory-map the committed rows of the vector (and int8 code) files."""
+        rows = len(self._records)
+        self._vectors = np.memmap(self._file(VECTORS_FILE), dtype=np.float32, mode="r",
+                                  shape=(rows, self._dimension)) if rows else None
+        if self._codes is not None:
+            self._codes = np.memmap(self._file(CODES_FILE), dtype=np.int8, mode="r",
+                                    shape=(rows, self._dimension)) if rows else None
+
+    def _load(self) -> None:
+        if not os.path.exists(self._file(META_FILE)):
+            return
+        with open(self._file(META_FILE), "r", encoding="utf-8") as f:
+            meta = json.load(f)
+        self._dimension, rows = meta["dimension"], meta["rows"]
+        if os.path.exists(self._file(LEGACY_VECTORS_FILE)):
+            np.load(self._file(LEGACY_VECTORS_FILE)).astype(np.float32).tofile(self._file(VECTORS_FILE))
+            os.remove(self._file(LEGACY_VECTORS_FILE))
+
+        # Rows past the committed count belong to an upload that did not finish
+        _truncate(self._file(VECTORS_FILE), rows * self._dimension * 4)
+        with open(self._file(RECORDS_FILE), "rb") as f:
+            lines = [f.readline() for _ in range(rows)]
+        if len(lines) != rows or not all(line.endswith(b"\n") for line in lines):
+            raise ValueError(f"Local index at {self.path} is inconsistent: "
+                             f"{rows} committed rows but fewer records")
+        _truncate(self._file(RECORDS_FILE), sum(len(line) for line in lines))
+        self._records = [json.loads(line) for line in lines]
+
+        # A later row for the same URL replaces the earlier one
+        for row, record in enumerate(self._records):
+            if record is None:
+                continue
+            old_row = self._url_rows.get(record["url"])
+            if old_row is not None:
+                self._records[old_row] = None
+            self._url_rows[record["url"]] = row
+        if os.path.exists(self._file(TOMBSTONES_FILE)):
+            with open(self._file(TOMBSTONES_FILE), "r", encoding="utf-8") as f:
+                for line in f:
+                    row = int(line)
+                    if row < rows and self._records[row] is not None:
+                        self._url_rows.pop(self._records[row]["url"], None)
+                        self._records[row] = None
+
+        self._live = np.array([record is not None for record in self._records], dtype=bool)
+        self._site_codes = np.array(
+            [self._site_code(record["site"]) if record else -1 for record in self._records], dtype=np.int32)
+
+        if self.quantization is not None and os.path.exists(self._file(SCALES_FILE)) \
+                and os.path.exists(self._file(CODES_FILE)) \
+                and os.path.getsize(self._file(CODES_FILE)) >= rows * self._dimension:
+            _truncate(self._file(CODES_FILE), rows * self._dimension)
+            self._scales = np.load(self._file(SCALES_FILE))
+            self._calibrated_rows = meta.get("calibrated_rows", 0)
+            self._codes = np.zeros(0, dtype=np.int8)  # mapped by _open_vectors
+        self._open_vectors()
+        if self.quantization is not None and self._codes is None and self._vectors is not None:
+            self._calibrate()
+            self._write_codes()
+
+        if self.hnsw_params is not None and self._vectors is not None:
+            graph_path = self._file(GRAPH_FILE)
+            if os.path.exists(graph_path):
+                self._graph = HNSWGraph.load(graph_path)
+                self._graph.ef_search = self.hnsw_params.get("ef_search", self._graph.ef_search)
+                if len(self._graph) > rows:
+                    self._graph = None
+                else:
+                    self._saved_graph_rows = len(self._graph)
+            if self._graph is None:
+                self._graph = self._new_graph()
+            # Rows uploaded since the graph was last saved
+            for row in range(len(self._graph), rows):
+                self._graph.insert(row, self._vectors)
+
+    def _calibrate(self) -> None:
+        """Compute int8 scales from (a sample of) the live vectors and re-quantize every row."""
+        rows = np.flatnonzero(self._live) if self._live.any() else np.arange(len(self._records))
+        self._calibrated_rows = len(rows)
+        if len(rows) > CALIBRATION_SAMPLE_ROWS:
+            rows = rows[np.linspace(0, len(rows) - 1, CALIBRATION_SAMPLE_ROWS).astype(np.int64)]
+        self._scales = calibrate_int8(np.asarray(self._vectors[rows]), self.quantization["quantile"])
+        self._codes = quantize_int8(np.asarray(self._vectors), self._scales)
+
+    def _should_recalibrate(self) -> bool:
+        return self._codes is not None and self._calibrated_rows < CALIBRATION_SAMPLE_ROWS \
+            and len(self._url_rows) >= 2 * self._calibrated_rows
+
+    def _rebuild_graph(self) -> None:
+        self._graph = self._new_graph()
+        for row in range(len(self._records)):
+            self._graph.insert(row, self._vectors)
+
+    def _write_codes(self) -> None:
+        codes, scales = np.ascontiguousarray(self._codes, dtype=np.int8), self._scales
+        _write_atomic(self._file(CODES_FILE), lambda f: f.write(codes.tobytes()))
+        _write_atomic(self._file(SCALES_FILE), lambda f: np.save(f, scales))
+
+    def _write_meta(self) -> None:
+        """Commit the rows appended so far; readers ignore anything past meta["rows"]."""
+        meta = {"dimension": self._dimension, "rows": len(self._records), "live": len(self._url_rows)}
+        if self._codes is not None:
+            meta["calibrated_rows"] = self._calibrated_rows
+        _write_atomic(self._file(META_FILE), lambda f: f.write(json.dumps(meta).encode("utf-8")))
+
+    def _save_graph(self) -> None:
+        if self._graph is not None and len(self._graph) != self._saved_graph_rows:
+            self._graph.save(self._file(GRAPH_FILE))
+            self._saved_graph_rows = len(self._graph)
+
+    def save(self) -> None:
+        """Rewrite every file of the index and re-open the vectors memory-mapped."""
+        with self._lock:
+            if self._vectors is None:
+                return
+            # Copy out of the old memory map before replacing the file it maps
+            vectors = np.array(self._vectors, dtype=np.float32)
+            _write_atomic(self._file(VECTORS_FILE), lambda f: f.write(vectors.tobytes()))
+            records = "".join(json.dumps(record) + "\n" for record in self._records).encode("utf-8")
+            _write_atomic(self._file(RECORDS_FILE), lambda f: f.write(records))
+            if os.path.exists(self._file(TOMBSTONES_FILE)):
+                os.remove(self._file(TOMBSTONES_FILE))
+            self._saved_graph_rows = 0
+            if self._graph is not None:
+                self._save_graph()
+            elif os.path.exists(self._file(GRAPH_FILE)):
+                os.remove(self._file(GRAPH_FILE))
+            if self._codes is not None:
+                self._write_codes()
+            else:
+                for name in (CODES_FILE, SCALES_FILE):
+                    if os.path.exists(self._file(name)):
+                        os.remove(self._file(name))
+            self._write_meta()
+            self._open_vectors()
+
+    def flush(self) -> None:
+        """
+        Finish a series of uploads: compact if enough rows are tombstoned,
+        otherwise save the HNSW graph so the next open does not re-insert rows.
+        int8 scales are recalibrated if the index has grown enough since they were set.
+        """
+        with self._lock:
+            if self._vectors is None:
+                return
+            if self._should_compact():
+                self._compact()
+                self.save()
+                return
+            if self._should_recalibrate():
+                self._calibrate()
+                self._write_codes()
+                self._write_meta()
+                self._open_vectors()
+            self._save_graph()
+
+    def upsert(self, documents: Sequence[Dict[str, Any]]) -> int:
+        """
+        Add documents with an "embedding", replacing any existing rows for the same URL.
+
+        Returns:
+            Number of documents written
+        """
+        documents = [doc for doc in documents if doc.get("embedding") and doc.get("url")]
+        if not documents:
+            return 0
+        vectors = _normalize(np.asarray([doc["embedding"] for doc in documents], dtype=np.float32))
+
+        with self._lock:
+            if self.dimension is not None and vectors.shape[1] != self.dimension:
+                raise ValueError(f"Embedding dimension {vectors.shape[1]} does not match "
+                                 f"the index dimension {self.dimension}")
+            first_row = len(self._records)
+            if self._vectors is None:
+                # First rows, or the first since compact() emptied the index
+                self._dimension = int(vectors.shape[1])
+                for name in (VECTORS_FILE, RECORDS_FILE, CODES_FILE, TOMBSTONES_FILE):
+                    if os.path.exists(self._file(name)):
+                        os.remove(self._file(name))
+            live = np.ones(len(documents), dtype=bool)
+            site_codes = np.empty(len(documents), dtype=np.int32)
+
+            for offset, doc in enumerate(documents):
+                old_row = self._url_rows.get(doc["url"])
+                if old_row is not None:
+                    self._tombstone(old_row, live, first_row)
+                self._url_rows[doc["url"]] = first_row + offset
+                site_codes[offset] = self._site_code(doc.get("site"))
+                self._records.append({
+                    "url": doc["url"],
+                    "name": doc.get("name", ""),
+                    "site": doc.get("site", ""),
+                    "schema_json": doc.get("schema_json", "")
+                })
+            self._live = np.concatenate([self._live, live])
+            self._site_codes = np.concatenate([self._site_codes, site_codes])
+
+            _append(self._file(VECTORS_FILE), vectors.tobytes())
+            records = "".join(json.dumps(record) + "\n" for record in self._records[first_row:])
+            _append(self._file(RECORDS_FILE), records.encode("utf-8"))
+            quantized = self.quantization is not None and self._scales is not None
+            if quantized:
+                _append(self._file(CODES_FILE), quantize_int8(vectors, self._scales).tobytes())
+                self._codes = np.zeros(0, dtype=np.int8)  # mapped by _open_vectors
+            self._write_meta()
+            self._open_vectors()
+
+            if self.quantization is not None and not quantized:
+                # The first upload calibrates the index; flush() and compact() recalibrate
+                self._calibrate()
+                self._write_codes()
+                self._open_vectors()
+
+            if self.hnsw_params is not None:
+                if self._graph is None:
+                    self._graph = self._new_graph()
+                for row in range(len(self._graph), len(self._records)):
+                    self._graph.insert(row, self._vectors)
+        return len(documents)
+
+    def _tombstone(self, row: int, new_live: Optional[np.ndarray] = None, first_new_row: int = 0) -> None:
+        self._records[row] = None
+        if row >= first_new_row and new_live is not None and row >= len(self._live):
+            new_live[row - first_new_row] = False
+        else:
+            self._live[row] = False
+
+    def delete_site(self, site: str) -> int:
+        """Remove every row for a site. Returns the number of rows removed."""
+        with self._lock:
+            code = self._site_ids.get(site)
+            if code is None:
+                return 0
+            rows = np.flatnonzero(self._live & (self._site_codes == code))
+            for row in rows.tolist():
+                self._url_rows.pop(self._records[row]["url"], None)
+                self._tombstone(row)
+            if len(rows):
+                _append(self._file(TOMBSTONES_FILE), "".join(f"{row}\n" for row in rows.tolist()).encode("utf-8"))
+                self._write_meta()
+            return len(rows)
+
+    def _should_compact(self) -> bool:
+        dead = len(self._records) - len(self._url_rows)
+        # Without a graph, dropping tombstones is just an array copy
+        return bool(dead) and (self._graph is None or dead >= COMPACT_RATIO * len(self._records))
+
+    def compact(self) -> None:
+        """Drop tombstoned rows (rebuilding the HNSW graph if there is one) and save."""
+        with self._lock:
+            self._compact()
+            self.save()
+
+    def _compact(self) -> None:
+        keep = np.flatnonzero(self._live)
+        if len(keep) == len(self._records):
+            return
+        self._vectors = np.ascontiguousarray(self._vectors[keep]) if len(keep) else None
+        self._records = [self._records[row] for row in keep.tolist()]
+        self._live = np.ones(len(keep), dtype=bool)
+        self._site_codes = self._site_codes[keep]
+        self._url_rows = {record["url"]: row for row, record in enumerate(self._records)}
+        if self._graph is not None:
+            self._graph = None
+            if self._vectors is not None:
+                self._rebuild_graph()
+        if self.quantization is not None:
+            self._codes = self._scales = None
+            if self._vectors is not None:
+                self._calibrate()
+        if self._vectors is None:
+            self._saved_graph_rows = 0
+            for name in (VECTORS_FILE, RECORDS_FILE, TOMBSTONES_FILE, GRAPH_FILE, CODES_FILE, SCALES_FILE, META_FILE):
+                if os.path.exists(self._file(name)):
+                    os.remove(self._file(name))
+
+    def _allowed_rows(self, sites: Optional[Iterable[str]]) -> np.ndarray:
+        if sites is None:
+            return self._live
+        codes = [self._site_ids[site] for site in sites if site in self._site_ids]
+        return self._live & np.isin(self._site_codes, codes)
+
+    def search(self, query_vectors: Sequence[Sequence[float]], k: int,
+               sites: Optional[Iterable[str]] = None) -> List[List[Tuple[Dict[str, Any], float]]]:
+        """
+        Nearest records for each query vector, optionally limited to some sites.
+
+        Returns:
+            For each query, up to k (record, cosine similarity) pairs, best first
+        """
+        queries = _normalize(np.atleast_2d(np.asarray(query_vectors, dtype=np.float32)))
+        with self._lock:
+            if self._vectors is None or k <= 0:
+                return [[] for _ in range(len(queries))]
+            if queries.shape[1] != self.dimension:
+                raise ValueError(f"Query dimension {queries.shape[1]} does not match "
+                                 f"the index dimension {self.dimension}")
+            allowed = self._allowed_rows(sites)
+            rows = np.flatnonzero(allowed)
+
+            if self._graph is not None and len(rows) > self.exact_threshold:
+                filter_mask = None if len(rows) == len(self._records) else allowed
+                hits = [self._graph.search(query, k, self._vectors, filter_mask) for query in queries]
+            else:
+                hits = self._exact_search(queries, k, rows)
+            return [[(self._records[row], score) for score, row in query_hits] for query_hits in hits]
+
+    def _exact_search(self, queries: np.ndarray, k: int, rows: np.ndarray) -> List[List[Tuple[float, int]]]:
+        if len(rows) == 0:
+            return [[] for _ in range(len(queries))]
+        if self._codes is not None:
+            return self._quantized_search(queries, k, rows)
+        candidates = self._vectors if len(rows) == len(self._vectors) else self._vectors[rows]
+        scores = queries @ candidates.T
+        k = min(k, len(rows))
+        hits = []
+        for query_scores in scores:
+            top = np.argpartition(-query_scores, k - 1)[:k]
+            top = top[np.argsort(-query_scores[top])]
+            hits.append([(float(query_scores[i]), int(rows[i])) for i in top])
+        return hits
+
+    def _quantized_search(self, queries: np.ndarray, k: int, rows: np.ndarray) -> List[List[Tuple[float, int]]]:
+        """Scan the int8 codes, then rescore the best k * oversampling rows in float32."""
+        scaled_queries = (queries * self._scales).T
+        all_rows = len(rows) == len(self._codes)
+        approximate = np.empty((len(queries), len(rows)), dtype=np.float32)
+        for start in range(0, len(rows), _SCAN_BLOCK_ROWS):
+            block = self._codes[start:start + _SCAN_BLOCK_ROWS] if all_rows \
+                else self._codes[rows[start:start + _SCAN_BLOCK_ROWS]]
+            approximate[:, start:start + len(block)] = (block.astype(np.float32) @ scaled_queries).T
+
+        k = min(k, len(rows))
+        shortlist_size = min(len(rows), max(k, int(k * self.quantization["oversampling"])))
+        hits = []
+        for query, query_scores in zip(queries, approximate):
+            shortlist = rows[np.argpartition(-query_scores, shortlist_size - 1)[:shortlist_size]]
+            shortlist.sort()  # sequential reads from the memory-mapped vectors
+            exact_scores = self._vectors[shortlist] @ query
+            top = np.argsort(-exact_scores)[:k]
+            hits.append([(float(exact_scores[i]), int(shortlist[i])) for i in top])
+        return hits
+
+    def get(self, url: str) -> Optional[Dict[str, Any]]:
+        with self._lock:
+            row = self._url_rows.get(url)
+            return None if row is None else self._records[row]
+
+    def sites(self) -> List[str]:
+        with self._lock:
+            live_codes = set(np.unique(self._site_codes[self._live]).tolist())
+            return sorted(site for site, code in self._site_ids.items() if code in live_codes and site)
@@ -0,0 +1,71 @@
+import pytest
+
+np = pytest.importorskip("numpy")
+
+from data_loading.embedding_store import (
+    EmbeddingFileError,
+    EmbeddingFileReader,
+    EmbeddingFileWriter,
+    binary_embeddings_stem,
+    convert_binary_to_tsv,
+    convert_tsv_to_binary,
+)
+
+
+def write_tsv(path, vectors):
+    with open(path, "w", encoding="utf-8") as f:
+        for i, vector in enumerate(vectors):
+            embedding_str = str(vector.tolist()).replace(" ", "")
+            f.write(f"https://example.com/{i}\t{{\"@type\": \"Thing\", \"name\": \"Item {i}\"}}\t{embedding_str}\n")
+
+
+@pytest.mark.parametrize("dtype,tolerance", [("float32", 0), ("float16", 1e-2)])
+def test_round_trip(tmp_path, dtype, tolerance):
+    vectors = np.random.default_rng(0).normal(size=(20, 8)).astype(np.float32)
+    stem = str(tmp_path / "site")
+    with EmbeddingFileWriter(stem, dtype) as writer:
+        for i, vector in enumerate(vectors):
+            writer.write(f"https://example.com/{i}", '{"name": "x"}', vector.tolist())
+
+    reader = EmbeddingFileReader(stem)
+    assert (len(reader), reader.dimension, reader.dtype.name) == (20, 8, dtype)
+    assert isinstance(reader.vectors, np.memmap)
+    rows = list(reader)
+    assert rows[3][0] == "https://example.com/3"
+    assert np.allclose(rows[3][2], vectors[3], atol=tolerance)
+    assert [len(batch) for batch in reader.iter_batches(8)] == [8, 8, 4]
+
+
+def test_incomplete_and_corrupt_containers(tmp_path):
+    stem = str(tmp_path / "site")
+    with pytest.raises(RuntimeError):
+        with EmbeddingFileWriter(stem) as writer:
+            writer.write("https://example.com/0", "{}", [0.1, 0.2])
+            raise RuntimeError("interrupted")
+    assert binary_embeddings_stem(stem) is None
+
+    with EmbeddingFileWriter(stem) as writer:
+        writer.write("https://example.com/0", "{}", [0.1, 0.2])
+        with pytest.raises(ValueError):
+            writer.write("https://example.com/1", "{}", [0.1, 0.2, 0.3])
+    assert binary_embeddings_stem(stem + ".vec") == stem
+
+    with open(stem + ".vec", "r+b") as f:
+        f.write(b"\x00\x00\x00\x00")
+    with pytest.raises(EmbeddingFileError):
+        EmbeddingFileReader(stem)
+
+
+def test_tsv_conversion(tmp_path):
+    vectors = np.random.default_rng(1).normal(size=(5, 4)).astype(np.float32)
+    tsv_path = str(tmp_path / "site.txt")
+    write_tsv(tsv_path, vectors)
+
+    stem = str(tmp_path / "site")
+    assert convert_tsv_to_binary(tsv_path, stem) == 5
+    assert np.array_equal(EmbeddingFileReader(stem).vectors, vectors)
+
+    back_path = str(tmp_path / "back.txt")
+    assert convert_binary_to_tsv(stem, back_path) == 5
+    assert convert_tsv_to_binary(back_path, str(tmp_path / "again")) == 5
+    assert np.array_equal(EmbeddingFileReader(str(tmp_path / "again")).vectors, vectors)
@@ -0,0 +1,109 @@
+import json
+from types import SimpleNamespace
+
+import methods.ensemble_tool as ensemble_tool
+from core.description_cache import describe_item
+from methods.ensemble_tool import EnsembleToolHandler
+
+
+def row(i):
+    return [f"https://a.com/{i}", json.dumps({"@type": "Restaurant", "name": f"Place {i}"}), f"Place {i}", "a"]
+
+
+QUERIES = ["dinner in Soho", "dessert in Soho", "bar in Soho"]
+BATCH = [[row(0), row(1)], [row(1), row(2)], [row(1), row(0)]]
+# Score of each item for each query
+SCORES = {"Place 0": {"dinner in Soho": 40, "bar in Soho": 90},
+          "Place 1": {"dinner in Soho": 80, "dessert in Soho": 70, "bar in Soho": 30},
+          "Place 2": {"dessert in Soho": 60}}
+
+
+def make_ensemble(monkeypatch, batch):
+    calls = {"batch": 0, "search": [], "llm": []}
+
+    async def fake_search_batch(queries, site="all", num_results=50, query_params=None, **kwargs):
+        calls["batch"] += 1
+        if isinstance(batch, Exception):
+            raise batch
+        return batch
+
+    async def fake_search(query, site="all", num_results=50, query_params=None, **kwargs):
+        calls["search"].append(query)
+        return BATCH[QUERIES.index(query)]
+
+    async def fake_ask_llm(prompt, schema, **kwargs):
+        calls["llm"].append(prompt)
+        listed, name = prompt.split("|")
+        return {"scores": [SCORES[name][line.split(". ", 1)[1]] for line in listed.split("\n")]}
+
+    monkeypatch.setattr(ensemble_tool, "search_batch", fake_search_batch)
+    monkeypatch.setattr(ensemble_tool, "search", fake_search)
+    monkeypatch.setattr(ensemble_tool, "ask_llm", fake_ask_llm)
+    monkeypatch.setattr(ensemble_tool, "find_prompt", lambda *args: ("{ensemble.queries}|{item.name}", {}))
+
+    sent = []
+
+    async def send_message(message):
+        sent.append(message)
+
+    handler = SimpleNamespace(site="a", item_type="{http://nlweb.ai/base}Restaurant", query="night out in Soho",
+                              query_params={}, send_message=send_message)
+    return EnsembleToolHandler({"queries": QUERIES}, handler), calls, sent
+
+
+async def test_items_are_retrieved_in_one_batch_and_ranked_once(monkeypatch):
+    ensemble, calls, sent = make_ensemble(monkeypatch, BATCH)
+    ranked = await ensemble._execute_parallel_retrieval_and_ranking(QUERIES, {}, "night out in Soho")
+
+    assert calls["batch"] == 1 and calls["search"] == []
+    # Place 1 was found by all three queries and is scored against them in one prompt
+    assert len(calls["llm"]) == 3
+    assert calls["llm"][1] == "1. dinner in Soho\n2. dessert in Soho\n3. bar in Soho|Place 1"
+    assert [[r["item"][2] for r in results] for results in ranked] == [
+        ["Place 1", "Place 0"], ["Place 1", "Place 2"], ["Place 0", "Place 1"]]
+    assert [r["relevance_score"] for r in ranked[2]] == [90.0, 30.0]
+    assert all(r["source_query_idx"] == idx and r["search_query"] == QUERIES[idx]
+               for idx, results in enumerate(ranked) for r in results)
+    assert set(ensemble.stage_timings) == {"retrieval", "dedup", "ranking"}
+    assert sum(1 for message in sent if "results" in message) == 3
+
+
+async def test_failed_batch_falls_back_to_per_query_search(monkeypatch):
+    ensemble, calls, _ = make_ensemble(monkeypatch, RuntimeError("no batch"))
+    ranked = await ensemble._execute_parallel_retrieval_and_ranking(QUERIES, {}, "night out in Soho")
+
+    assert calls["search"] == QUERIES
+    assert len(calls["llm"]) == 3
+    assert [len(results) for results in ranked] == [2, 2, 2]
+
+
+async def test_repeated_requests_leave_cached_items_serializable(monkeypatch):
+    ensemble, calls, sent = make_ensemble(monkeypatch, BATCH)
+    ranking_prompt = ("{ensemble.queries}|{item.name}", {})
+    monkeypatch.setattr(ensemble_tool, "find_prompt", lambda site, item_type, name:
+                        ranking_prompt if name == "EnsembleMultiQueryRankingPrompt" else ("{ensemble.results}", {}))
+    ranking_llm = ensemble_tool.ask_llm
+
+    async def fake_ask_llm(prompt, schema, **kwargs):
+        if "|" in prompt:
+            return await ranking_llm(prompt, schema, **kwargs)
+        return {"items": [{"url": row(1)[0], "name": "Place 1"}]}
+
+    monkeypatch.setattr(ensemble_tool, "ask_llm", fake_ask_llm)
+
+    for _ in range(2):
+        await ensemble.do()
+        result = sent[-1]["result"]
+        assert result["success"], result
+        json.dumps(result)
+        assert result["recommendations"]["items"][0]["schema_object"]["name"] == "Place 1"
+
+    cached = describe_item(row(1)[0], row(1)[1]).schema_object
+    assert "schema_object" not in cached and "url" not in cached
+
+
+def test_missing_query_scores_default_to_zero():
+    assert EnsembleToolHandler._parse_query_scores({"scores": [80, "x"]}, 3) == [80.0, 0.0, 0.0]
+    assert EnsembleToolHandler._parse_query_scores({"scores": [{"score": 55}]}, 1) == [55.0]
+    assert EnsembleToolHandler._parse_query_scores({"score": 70}, 1) == [70.0]
+    assert EnsembleToolHandler._parse_query_scores(None, 2) == [0.0, 0.0]
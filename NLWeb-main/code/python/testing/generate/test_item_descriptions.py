@@ -0,0 +1,62 @@
+import asyncio
+import json
+
+import methods.generate_answer as generate_answer
+from methods.generate_answer import GenerateAnswer
+
+ITEMS = [[f"https://a.com/{i}", json.dumps({"@type": "Recipe", "name": f"Dish {i}"}), f"Dish {i}", "a"]
+         for i in range(4)]
+
+
+def make_handler(monkeypatch, cited, llm_descriptions):
+    class FakeRunner:
+        def __init__(self, handler):
+            pass
+
+        async def run_prompt(self, prompt_name, **kwargs):
+            return {"answer": "Cook these.", "urls": cited}
+
+    llm_calls = []
+
+    async def fake_ask_llm(prompt, schema, **kwargs):
+        llm_calls.append(prompt)
+        return {"descriptions": [{"url": url, "description": text} for url, text in llm_descriptions.items()]}
+
+    monkeypatch.setattr(generate_answer, "PromptRunner", FakeRunner)
+    monkeypatch.setattr(generate_answer, "ask_llm", fake_ask_llm)
+    monkeypatch.setattr(generate_answer, "find_prompt", lambda *args: ("{request.answer}\n{request.items}", {}))
+
+    handler = GenerateAnswer.__new__(GenerateAnswer)
+    handler.connection_alive_event = asyncio.Event()
+    handler.connection_alive_event.set()
+    handler.streaming, handler.http_handler = False, None
+    handler.site, handler.item_type, handler.query_params = "a", "{http://nlweb.ai/base}Recipe", {}
+    handler.items, handler.final_ranked_answers = ITEMS, [{"url": ITEMS[0][0]}]
+    handler.item_descriptions = {ITEMS[0][0]: "A ranking description of dish 0", ITEMS[1][0]: "short"}
+    handler.sent = []
+
+    async def send_message(message):
+        handler.sent.append(message)
+
+    handler.send_message = send_message
+    return handler, llm_calls
+
+
+async def test_ranking_descriptions_are_reused(monkeypatch):
+    handler, llm_calls = make_handler(monkeypatch, [ITEMS[0][0]], {})
+    await handler.synthesizeAnswer()
+    assert llm_calls == []
+    assert handler.sent[-1]["items"][0]["description"] == "A ranking description of dish 0"
+
+
+async def test_missing_descriptions_are_requested_in_one_call(monkeypatch):
+    cited = [ITEMS[0][0], ITEMS[1][0], ITEMS[2][0], ITEMS[2][0], "https://elsewhere.com/x"]
+    handler, llm_calls = make_handler(monkeypatch, cited, {ITEMS[2][0]: "Described after synthesis, dish 2"})
+    await handler.synthesizeAnswer()
+
+    assert len(llm_calls) == 1
+    assert ITEMS[1][0] in llm_calls[0] and ITEMS[2][0] in llm_calls[0] and ITEMS[0][0] not in llm_calls[0]
+    items = handler.sent[-1]["items"]
+    assert [item["url"] for item in items] == [ITEMS[0][0], ITEMS[1][0], ITEMS[2][0]]
+    assert [item["description"] for item in items] == ["A ranking description of dish 0", "short",
+                                                       "Described after synthesis, dish 2"]
@@ -0,0 +1,99 @@
+import asyncio
+from types import SimpleNamespace
+
+import pytest
+
+import core.llm as llm
+import methods.generate_answer as generate_answer
+from methods.generate_answer import GenerateAnswer, StreamedAnswer
+
+
+def test_answer_and_sources_split_across_deltas():
+    parser = StreamedAnswer()
+    shown = [parser.feed(delta) for delta in ["Try the dal. It is ", "great.\nSOU", "RCES: https://a.com/1, ", "https://a.com/2."]]
+    assert shown == ["Try the dal. It is ", "great.\n", "", ""]
+    assert parser.finish() == ("Try the dal. It is great.", ["https://a.com/1", "https://a.com/2"])
+
+
+def test_text_resembling_the_marker_is_released():
+    parser = StreamedAnswer()
+    assert parser.feed("Use sou") == "Use "
+    assert parser.feed("p stock") == "soup stock"
+    assert parser.finish() == ("Use soup stock", [])
+
+
+class FakeStreamingProvider:
+    supports_streaming = True
+
+    def __init__(self, deltas, delay=0.0):
+        self.deltas = deltas
+        self.delay = delay
+
+    async def stream_completion(self, prompt, model=None, timeout=30.0, max_tokens=2048, **kwargs):
+        for delta in self.deltas:
+            await asyncio.sleep(self.delay)
+            yield delta
+
+
+def use_provider(monkeypatch, provider):
+    monkeypatch.setattr(llm, "_resolve_llm_endpoint", lambda *args: ("fake", "fake", "fake-model"))
+    monkeypatch.setattr(llm, "_get_provider", lambda llm_type: provider)
+
+
+async def test_stream_llm_yields_deltas_and_enforces_timeout(monkeypatch):
+    use_provider(monkeypatch, FakeStreamingProvider(["a", "", "b"]))
+    assert [delta async for delta in llm.stream_llm("prompt")] == ["a", "b"]
+
+    use_provider(monkeypatch, FakeStreamingProvider(["a", "b"], delay=0.2))
+    with pytest.raises(asyncio.TimeoutError):
+        [delta async for delta in llm.stream_llm("prompt", timeout=0.3)]
+
+
+async def test_stream_answer_sends_deltas_then_returns_citations(monkeypatch):
+    use_provider(monkeypatch, FakeStreamingProvider(["Make ", "the dal.", "\nSOURCES: https://a.com/dal"]))
+    monkeypatch.setattr(generate_answer, "find_prompt", lambda *args: ("Answer {request.rawQuery}", None))
+    sent = []
+
+    async def send_message(message):
+        sent.append(message)
+
+    alive = asyncio.Event()
+    alive.set()
+    handler = SimpleNamespace(site="all", item_type="{http://nlweb.ai/base}Recipe", query="dinner", query_params={},
+                              connection_alive_event=alive, send_message=send_message,
+                              STREAM_SYNTHESIZE_PROMPT_NAME=GenerateAnswer.STREAM_SYNTHESIZE_PROMPT_NAME)
+    response = await GenerateAnswer.streamAnswer(handler)
+
+    assert response == {"answer": "Make the dal.", "urls": ["https://a.com/dal"]}
+    assert all(message["message_type"] == "nlws_delta" for message in sent)
+    assert "".join(message["delta"] for message in sent) == "Make the dal.\n"
+
+
+class FakeOpenAIStream:
+    def __init__(self, deltas):
+        self.deltas = deltas
+        self.closed = False
+
+    async def __aiter__(self):
+        for delta in self.deltas:
+            await asyncio.sleep(0.2)
+            yield SimpleNamespace(choices=[SimpleNamespace(delta=SimpleNamespace(content=delta))])
+
+    async def close(self):
+        self.closed = True
+
+
+async def test_openai_stream_is_closed_when_reading_stops_early(monkeypatch):
+    openai_provider = pytest.importorskip("llm_providers.openai", reason="the OpenAI provider needs openai")
+    stream = FakeOpenAIStream(["a", "b", "c"])
+
+    async def create(**kwargs):
+        return stream
+
+    client = SimpleNamespace(chat=SimpleNamespace(completions=SimpleNamespace(create=create)))
+    provider = openai_provider.provider
+    monkeypatch.setattr(provider, "get_client", lambda: client)
+    use_provider(monkeypatch, provider)
+    with pytest.raises(asyncio.TimeoutError):
+        [delta async for delta in llm.stream_llm("prompt", timeout=0.3)]
+    assert stream.closed
@@ -0,0 +1,23 @@
+from logging.handlers import RotatingFileHandler
+
+from misc.logger.logging_config_helper import AsyncLogProcessor
+
+
+def test_rotation_keeps_every_batch(tmp_path):
+    log_path = tmp_path / "rotating.log"
+    handler = RotatingFileHandler(log_path, maxBytes=200, backupCount=50, delay=True)
+    expected = []
+    try:
+        for batch in range(20):
+            lines = [f"batch {batch} line {i}" for i in range(3)]
+            AsyncLogProcessor._write_lines(handler, lines)
+            expected.extend(lines)
+    finally:
+        handler.close()
+
+    files = sorted(tmp_path.glob("rotating.log*"))
+    assert len(files) > 1
+    written = []
+    for path in files:
+        written.extend(path.read_text().splitlines())
+    assert sorted(written) == sorted(expected)
@@ -0,0 +1,80 @@
+from types import SimpleNamespace
+
+import pytest
+
+import core.llm as llm
+import core.retriever as retriever
+from core.config import CONFIG
+
+
+class FakeProvider:
+    def get_client(self):
+        return object()
+
+
+def test_llm_preload_loads_every_configured_endpoint(monkeypatch):
+    monkeypatch.setattr(CONFIG, "preferred_llm_endpoint", "preferred")
+    monkeypatch.setattr(CONFIG, "llm_endpoints", {
+        "preferred": SimpleNamespace(llm_type="openai", api_key=None, endpoint=None),
+        "with_key": SimpleNamespace(llm_type="anthropic", api_key="key", endpoint=None),
+        "with_endpoint": SimpleNamespace(llm_type="ollama", api_key=None, endpoint="http://localhost:11434"),
+        "unconfigured": SimpleNamespace(llm_type="gemini", api_key=None, endpoint=None),
+    })
+    monkeypatch.setattr(llm, "_loaded_providers", {})
+    requested = []
+
+    def fake_get_provider(llm_type):
+        requested.append(llm_type)
+        return FakeProvider()
+
+    monkeypatch.setattr(llm, "_get_provider", fake_get_provider)
+    timings = llm.preload()
+    assert requested == ["openai", "anthropic", "ollama"]
+    assert [entry["name"] for entry in timings] == ["preferred", "with_key", "with_endpoint"]
+
+
+def test_llm_preload_reports_every_missing_package(monkeypatch):
+    monkeypatch.setattr(CONFIG, "preferred_llm_endpoint", "first")
+    monkeypatch.setattr(CONFIG, "llm_endpoints", {
+        "first": SimpleNamespace(llm_type="anthropic", api_key="key", endpoint=None),
+        "second": SimpleNamespace(llm_type="huggingface", api_key="key", endpoint=None),
+    })
+    monkeypatch.setattr(llm, "_loaded_providers", {})
+
+    def missing(llm_type):
+        raise ValueError(f"Missing required package for {llm_type} provider")
+
+    monkeypatch.setattr(llm, "_get_provider", missing)
+    with pytest.raises(ValueError) as excinfo:
+        llm.preload()
+    assert "anthropic" in str(excinfo.value)
+    assert "huggingface" in str(excinfo.value)
+
+
+def test_retrieval_preload_reports_every_missing_package(monkeypatch):
+    monkeypatch.setattr(CONFIG, "write_endpoint", None)
+    monkeypatch.setattr(CONFIG, "retrieval_endpoints", {
+        "es": SimpleNamespace(enabled=True, db_type="elasticsearch"),
+        "pg": SimpleNamespace(enabled=True, db_type="postgres"),
+        "local": SimpleNamespace(enabled=True, db_type="local_index"),
+        "off": SimpleNamespace(enabled=False, db_type="milvus"),
+    })
+    monkeypatch.setattr(retriever, "_client_cache", {})
+    created = []
+
+    class FakeClient:
+        def __init__(self, endpoint_name):
+            created.append(endpoint_name)
+
+    def load_client_class(db_type):
+        if db_type == "local_index":
+            return FakeClient
+        raise ValueError(f"Missing required package for {db_type}")
+
+    monkeypatch.setattr(retriever, "_load_client_class", load_client_class)
+    with pytest.raises(ValueError) as excinfo:
+        retriever.preload()
+    message = str(excinfo.value)
+    assert "es: " in message and "pg: " in message
+    assert "milvus" not in message
+    assert created == ["local"]
@@ -0,0 +1,64 @@
+import os
+
+import pytest
+
+import core.prompts as prompts
+from core.config import CONFIG
+
+NS = "{http://nlweb.ai/base}"
+
+PROMPTS_XML = """<root xmlns="http://nlweb.ai/base">
+  <Item>
+    <Prompt ref="RankingPrompt"><promptString>generic {request.query}</promptString>
+      <returnStruc>{"score": "integer"}</returnStruc></Prompt>
+    <Prompt ref="SummarizePrompt"><promptString>summarize</promptString><returnStruc></returnStruc></Prompt>
+  </Item>
+  <Recipe>
+    <Prompt ref="RankingPrompt"><promptString>{label} recipe</promptString><returnStruc></returnStruc></Prompt>
+  </Recipe>
+  <Site ref="seriouseats">
+    <Item>
+      <Prompt ref="SummarizePrompt"><promptString>seriouseats summary</promptString></Prompt>
+    </Item>
+  </Site>
+</root>
+"""
+
+
+@pytest.fixture
+def prompt_file(tmp_path, monkeypatch):
+    path = tmp_path / "prompts.xml"
+    path.write_text(PROMPTS_XML.replace("{label}", "type"))
+    monkeypatch.setattr(CONFIG, "config_directory", str(tmp_path), raising=False)
+    monkeypatch.setattr(prompts, "prompt_index", None)
+    return path
+
+
+def test_fallback_chain(prompt_file):
+    assert prompts.find_prompt("all", NS + "Recipe", "RankingPrompt") == ("type recipe", None)
+    assert prompts.find_prompt("all", NS + "Movie", "RankingPrompt") == ("generic {request.query}", {"score": "integer"})
+    assert prompts.find_prompt(["seriouseats"], NS + "Recipe", "SummarizePrompt")[0] == "seriouseats summary"
+    assert prompts.find_prompt("other", NS + "Recipe", "SummarizePrompt")[0] == "summarize"
+    assert prompts.find_prompt("all", NS + "Recipe", "NoSuchPrompt") == (None, None)
+
+
+def test_string_site_is_not_truncated(prompt_file):
+    assert prompts.find_prompt("seriouseats", NS + "Item", "SummarizePrompt")[0] == "seriouseats summary"
+    assert prompts.find_prompt("s", NS + "Item", "SummarizePrompt")[0] == "summarize"
+    assert ("seriouseats", NS + "Item", "SummarizePrompt") in prompts.prompt_index.resolved
+
+
+def test_changed_prompt_file_is_reloaded(prompt_file):
+    index = prompts.init_prompts()
+    index.reload_interval = 0
+    assert prompts.find_prompt("all", NS + "Recipe", "RankingPrompt")[0] == "type recipe"
+
+    prompt_file.write_text(PROMPTS_XML.replace("{label}", "edited"))
+    stat = os.stat(prompt_file)
+    os.utime(prompt_file, (stat.st_atime, stat.st_mtime + 10))
+    assert prompts.find_prompt("all", NS + "Recipe", "RankingPrompt")[0] == "edited recipe"
+
+    # A broken edit keeps the last good prompts
+    prompt_file.write_text("<root")
+    os.utime(prompt_file, (stat.st_atime, stat.st_mtime + 20))
+    assert prompts.find_prompt("all", NS + "Recipe", "RankingPrompt")[0] == "edited recipe"
@@ -0,0 +1,37 @@
+from types import SimpleNamespace
+
+from core.prompts import CompiledPrompt, compiled_prompts, fill_prompt
+
+
+def make_handler(**overrides):
+    values = dict(site="seriouseats", query="pasta", prev_queries=[], decontextualized_query="vegan pasta",
+                  item_type="{http://schema.org/}Recipe", context_url="", context_description="",
+                  last_answers=[], final_ranked_answers=[],
+                  state=SimpleNamespace(is_decontextualization_done=lambda: True))
+    values.update(overrides)
+    return SimpleNamespace(**values)
+
+
+def test_fill_substitutes_handler_and_extra_variables():
+    prompt = "Rate this {site.itemType} for {request.query}: {item.description}. Again: {request.query}"
+    filled = fill_prompt(prompt, make_handler(), {"item.description": {"name": "Carbonara"}})
+    assert filled == "Rate this Recipe for vegan pasta: {'name': 'Carbonara'}. Again: vegan pasta"
+    assert isinstance(compiled_prompts[prompt], CompiledPrompt)
+
+
+def test_fill_matches_previous_replace_semantics():
+    handler = make_handler(state=SimpleNamespace(is_decontextualization_done=lambda: False), prev_queries=["soup"])
+    prompt = "Q: {request.query} { request.rawQuery } {unknown.var} {request.previousQueries}"
+    assert fill_prompt(prompt, handler) == "Q: pasta previous queries: ['soup'] { request.rawQuery }  ['soup']"
+
+
+def test_values_are_not_substituted_again():
+    prompt = "{item.description} / {request.rawQuery}"
+    assert fill_prompt(prompt, make_handler(), {"item.description": "{request.rawQuery}"}) == "{request.rawQuery} / pasta"
+
+
+def test_compiled_prompt_segments():
+    compiled = CompiledPrompt("a {x} b {y} c {x")
+    assert compiled.literals == ["a ", " b ", " c {x"]
+    assert compiled.slots == ["x", "y"]
+    assert CompiledPrompt("no variables").fill(make_handler(), {}) == "no variables"
@@ -0,0 +1,39 @@
+import json
+
+from core.description_cache import DescriptionCache
+from core.utils.json_utils import trim_json
+
+RECIPE = json.dumps({"@type": "Recipe", "name": "Dal", "image": "dal.jpg", "author": "A. Cook"})
+
+
+def test_hit_reuses_parsed_and_trimmed_item():
+    cache = DescriptionCache(max_items=10)
+    first = cache.get("https://example.com/dal", RECIPE)
+    assert first.description == str(trim_json(RECIPE))
+    assert "image" not in first.description
+    assert first.schema_object == json.loads(RECIPE)
+
+    assert cache.get("https://example.com/dal", RECIPE) is first
+    assert (cache.hits, cache.misses) == (1, 1)
+
+
+def test_changed_content_is_parsed_again():
+    cache = DescriptionCache(max_items=10)
+    first = cache.get("https://example.com/dal", RECIPE)
+    edited = json.dumps({"@type": "Recipe", "name": "Tadka dal"})
+    second = cache.get("https://example.com/dal", edited)
+    assert second is not first
+    assert second.schema_object["name"] == "Tadka dal"
+
+
+def test_cache_is_bounded_and_skips_non_strings():
+    cache = DescriptionCache(max_items=2)
+    for i in range(3):
+        cache.get(f"https://example.com/{i}", json.dumps([{"name": str(i)}]))
+    assert len(cache) == 2
+    assert cache.get("https://example.com/2", json.dumps([{"name": "2"}])).schema_object == {"name": "2"}
+    assert cache.misses == 3
+
+    item = cache.get("https://example.com/dict", {"name": "inline"})
+    assert item.schema_object == {"name": "inline"}
+    assert len(cache) == 2
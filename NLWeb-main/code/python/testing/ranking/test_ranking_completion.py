@@ -0,0 +1,102 @@
+import asyncio
+import json
+import re
+from types import SimpleNamespace
+
+import pytest
+
+from core import ranking
+from core.config import CONFIG, RankingCompletionConfig, RankingPrefilterConfig
+from core.ranking_prefilter import RankingPrefilter
+
+NUM_ITEMS = 40
+
+
+def make_handler(query_params, generate_mode="none"):
+    async def send_message(message):
+        sent.extend(message["results"])
+
+    sent = []
+    connection = asyncio.Event()
+    connection.set()
+    pre_checks = asyncio.Event()
+    pre_checks.set()
+    handler = SimpleNamespace(site="recipes", item_type="Recipe", query="soup", decontextualized_query="",
+                              query_params=query_params, query_id="q", required_item_type=None,
+                              generate_mode=generate_mode, connection_alive_event=connection,
+                              pre_checks_done_event=pre_checks, send_message=send_message, state=None,
+                              fastTrackWorked=False)
+    return handler, sent
+
+
+@pytest.fixture
+def fake_llm(monkeypatch):
+    calls = {"started": 0, "finished": 0}
+
+    async def fake_ask_llm(prompt, ans_struc, level="low", query_params=None):
+        index = int(re.search(r"dish (\d+)", prompt).group(1))
+        calls["started"] += 1
+        await asyncio.sleep(0.002 * index)
+        calls["finished"] += 1
+        # Later items score higher, so each one displaces an earlier result
+        return {"score": 60 + index, "description": "d"}
+
+    monkeypatch.setattr(ranking, "ask_llm", fake_ask_llm)
+    monkeypatch.setattr(ranking, "fill_prompt", lambda prompt, handler, extra: str(extra["item.description"]))
+    monkeypatch.setattr(ranking, "RankingPrefilter", lambda: RankingPrefilter(RankingPrefilterConfig()))
+    monkeypatch.setattr(CONFIG, "ranking_completion", RankingCompletionConfig(settled_score=90))
+    return calls
+
+
+def make_items():
+    return [[f"https://example.com/{i}", json.dumps({"description": f"dish {i}"}), f"Item {i}", "recipes"]
+            for i in range(NUM_ITEMS)]
+
+
+async def test_list_mode_cancels_once_results_are_sent(fake_llm):
+    handler, sent = make_handler({})
+    ranker = ranking.Ranking(handler, make_items(), ranking.Ranking.REGULAR_TRACK)
+    await ranker.do()
+
+    assert len(sent) == ranking.Ranking.NUM_RESULTS_TO_SEND
+    assert ranker.ranking_settled
+    assert fake_llm["finished"] == ranking.Ranking.NUM_RESULTS_TO_SEND
+    assert ranker.cancelled_calls == NUM_ITEMS - ranking.Ranking.NUM_RESULTS_TO_SEND
+    assert ranker.tokens_saved > 0
+
+
+async def test_full_ranking_opt_out(fake_llm):
+    handler, sent = make_handler({"full_ranking": ["true"]})
+    ranker = ranking.Ranking(handler, make_items(), ranking.Ranking.REGULAR_TRACK)
+    await ranker.do()
+
+    assert fake_llm["finished"] == NUM_ITEMS
+    assert ranker.cancelled_calls == 0
+    assert len(handler.final_ranked_answers) == ranking.Ranking.NUM_RESULTS_TO_SEND
+    assert handler.final_ranked_answers[0]["ranking"]["score"] == 60 + NUM_ITEMS - 1
+
+
+async def test_summarize_mode_waits_for_settled_scores(fake_llm):
+    handler, _sent = make_handler({}, generate_mode="summarize")
+    ranker = ranking.Ranking(handler, make_items(), ranking.Ranking.REGULAR_TRACK)
+    await ranker.do()
+
+    # Items 30-39 are the first ten to reach the settled score (90)
+    assert ranker.ranking_settled
+    assert fake_llm["finished"] == NUM_ITEMS
+    assert [r["ranking"]["score"] for r in handler.final_ranked_answers] == list(range(99, 89, -1))
+
+
+async def test_late_items_are_ranked_until_results_are_final(fake_llm):
+    handler, sent = make_handler({"full_ranking": "true"})
+    items = make_items()
+    ranker = ranking.Ranking(handler, items[:5], ranking.Ranking.REGULAR_TRACK)
+    ranking_task = asyncio.create_task(ranker.do())
+    await asyncio.sleep(0)
+    assert handler.active_ranking is ranker
+    assert ranker.add_items(items[5:10])
+    await ranking_task
+
+    assert fake_llm["finished"] == 10
+    assert {answer["url"] for answer in ranker.rankedAnswers} == {item[0] for item in items[:10]}
+    assert not ranker.add_items(items[10:])
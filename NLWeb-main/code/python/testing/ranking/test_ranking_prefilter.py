@@ -0,0 +1,70 @@
+import asyncio
+import json
+import re
+from types import SimpleNamespace
+
+import pytest
+
+from core import ranking
+from core.config import RankingPrefilterConfig
+from core.ranking_prefilter import RankingPrefilter
+
+
+def make_items(count):
+    return [[f"https://example.com/{i}", json.dumps({"@type": "Recipe", "description": f"dish {i}"}),
+             f"Item {i}", "recipes"] for i in range(count)]
+
+
+def test_split_keeps_retrieval_order_and_boosts_name_matches():
+    items = make_items(40)
+    items[30][2] = "Spicy lentil soup"
+    prefilter = RankingPrefilter(RankingPrefilterConfig(enabled=True, top_k=20, min_forward=5,
+                                                        cutoff_ratio=0.5, lexical_weight=0.3, min_items=15))
+    forwarded, reserve, scores = prefilter.split("spicy lentil soup", items)
+
+    assert len(forwarded) == 20 and len(reserve) == 20
+    assert forwarded[0][0] == "https://example.com/0"
+    assert items[30] in forwarded
+    assert len(scores) == 40
+
+
+def test_disabled_or_small_result_sets_are_ranked_in_full():
+    items = make_items(10)
+    assert RankingPrefilter(RankingPrefilterConfig(enabled=False)).split("soup", items)[1] == []
+    assert RankingPrefilter(RankingPrefilterConfig(enabled=True, min_items=15)).split("soup", items)[1] == []
+
+
+@pytest.mark.parametrize("good_items,expected_calls", [(20, 20), (3, 40)])
+async def test_reserve_ranked_only_when_too_few_pass(monkeypatch, tmp_path, good_items, expected_calls):
+    calls = []
+
+    async def fake_ask_llm(prompt, ans_struc, level="low", query_params=None):
+        calls.append(prompt)
+        index = int(re.search(r"dish (\d+)", prompt).group(1))
+        return {"score": 80 if index < good_items else 20, "description": "d"}
+
+    monkeypatch.setattr(ranking, "ask_llm", fake_ask_llm)
+    tuning_log = tmp_path / "tuning.jsonl"
+    config = RankingPrefilterConfig(enabled=True, top_k=20, min_forward=20, lexical_weight=0.0,
+                                    min_items=15, tuning_log=str(tuning_log))
+    monkeypatch.setattr(ranking, "RankingPrefilter", lambda: RankingPrefilter(config))
+
+    async def send_message(message):
+        pass
+
+    connection = asyncio.Event()
+    connection.set()
+    pre_checks = asyncio.Event()
+    pre_checks.set()
+    handler = SimpleNamespace(site="recipes", item_type="Recipe", query="soup", decontextualized_query="",
+                              query_params={}, query_id="q", required_item_type=None,
+                              connection_alive_event=connection, pre_checks_done_event=pre_checks,
+                              send_message=send_message, state=None, fastTrackWorked=False)
+    monkeypatch.setattr(ranking, "fill_prompt", lambda prompt, handler, extra: str(extra["item.description"]))
+
+    await ranking.Ranking(handler, make_items(40), ranking.Ranking.REGULAR_TRACK).do()
+
+    assert len(calls) == expected_calls
+    entry = json.loads(tuning_log.read_text().splitlines()[0])
+    assert entry["site"] == "recipes" and len(entry["items"]) == 40
+    assert entry["reserve_used"] == (expected_calls == 40)
@@ -0,0 +1,89 @@
+import json
+import os
+
+import core.keyword_index as keyword_index
+from core.keyword_index import KeywordIndex, indexed_text, schema_text
+from core.retriever import reciprocal_rank_fusion
+
+DOCUMENTS = [
+    {"url": "https://example.com/blade-runner", "name": "Blade Runner 2049", "site": "movies",
+     "schema_json": '{"@type": "Movie", "description": "A replicant hunter uncovers a secret"}'},
+    {"url": "https://example.com/alien", "name": "Alien", "site": "movies",
+     "schema_json": '{"@type": "Movie", "description": "A blade of light in deep space", "url": "https://example.com/alien"}'},
+    {"url": "https://example.com/widget", "name": "Widget ABC-123", "site": "shop",
+     "schema_json": '{"@type": "Product", "sku": "ABC-123"}'},
+]
+
+
+def test_name_matches_rank_first():
+    index = KeywordIndex()
+    assert index.add_documents(DOCUMENTS) == 3
+
+    hits = index.search("blade runner")
+    assert [row[0] for row, _score in hits] == ["https://example.com/blade-runner", "https://example.com/alien"]
+    assert hits[0][0][2] == "Blade Runner 2049"
+
+
+def test_site_filter_and_sku_tokens():
+    index = KeywordIndex()
+    index.add_documents(DOCUMENTS)
+
+    assert [row[0] for row, _score in index.search("abc-123", sites=["shop"])] == ["https://example.com/widget"]
+    assert index.search("abc-123", sites=["movies"]) == []
+    assert "example.com" not in schema_text(DOCUMENTS[1]["schema_json"])
+
+
+def test_incremental_updates_and_persistence(tmp_path):
+    path = str(tmp_path / "keyword_index.json")
+    index = KeywordIndex(path)
+    index.add_documents(DOCUMENTS)
+    index.add_documents([dict(DOCUMENTS[1], name="Aliens")])
+    assert len(index) == 3
+    assert index.search("alien") == []
+
+    index.save()
+    reopened = KeywordIndex(path)
+    assert [row[2] for row, _score in reopened.search("aliens")] == ["Aliens"]
+
+    assert reopened.delete_site("movies") == 2
+    assert len(reopened) == 1
+    assert reopened.search("blade") == []
+
+
+def test_trimmed_schema_is_indexed():
+    recipe = {"@type": "Recipe", "name": "Dal", "recipeIngredient": ["lentils"],
+              "author": {"@type": "Person", "name": "Zanzibar"}}
+    assert "lentils" in indexed_text([recipe]) and "Zanzibar" not in indexed_text([recipe])
+
+    index = KeywordIndex()
+    index.add_documents([{"url": "https://example.com/dal", "name": "Dal", "site": "recipes",
+                          "schema_json": json.dumps(recipe)}])
+    assert index.search("lentils") and index.search("zanzibar") == []
+
+
+def test_reload_checks_are_throttled(tmp_path, monkeypatch):
+    path = str(tmp_path / "keyword_index.json")
+    writer = KeywordIndex(path)
+    writer.add_documents(DOCUMENTS[:1])
+    writer.save()
+    reader = KeywordIndex(path)
+    assert len(reader.search("blade")) == 1
+
+    writer.add_documents(DOCUMENTS[1:2])
+    writer.save()
+    os.utime(path, (0, 0))  # a distinct mtime even on coarse clocks
+    assert len(reader.search("blade")) == 1  # checked less than RELOAD_CHECK_INTERVAL ago
+
+    monkeypatch.setattr(keyword_index, "RELOAD_CHECK_INTERVAL", 0.0)
+    reader._next_reload_check = 0.0
+    assert len(reader.search("blade")) == 2
+
+
+def test_reciprocal_rank_fusion():
+    vector = [["a", "{}", "A", "s"], ["b", "{}", "B", "s"], ["c", "{}", "C", "s"]]
+    keyword = [["c", "{\"k\": 1}", "C", "s"], ["d", "{}", "D", "s"]]
+
+    fused = reciprocal_rank_fusion([vector, keyword], k=60, limit=3)
+    assert [row[0] for row in fused] == ["c", "a", "b"]
+    # The row from the first list wins for URLs found by both
+    assert fused[0][1] == "{}"
@@ -0,0 +1,282 @@
+import os
+
+import pytest
+
+np = pytest.importorskip("numpy")
+
+from core.config import CONFIG, RetrievalProviderConfig
+from retrieval_providers import local_index_client
+from retrieval_providers.local_index_client import LocalIndexClient
+from retrieval_providers.utils import local_index
+from retrieval_providers.utils.local_index import LocalVectorIndex
+
+DIMENSION = 16
+
+
+def make_documents(count: int, seed: int = 0):
+    rng = np.random.default_rng(seed)
+    vectors = rng.normal(size=(count, DIMENSION)).astype(np.float32)
+    documents = [
+        {
+            "url": f"https://example.com/item/{i}",
+            "name": f"Item {i}",
+            "site": "site_a" if i % 2 else "site_b",
+            "schema_json": f'{{"@type": "Thing", "name": "Item {i}"}}',
+            "embedding": vectors[i].tolist(),
+        }
+        for i in range(count)
+    ]
+    return documents, vectors
+
+
+def urls(hits):
+    return [record["url"] for record, _score in hits]
+
+
+def test_flat_search_returns_nearest_first(tmp_path):
+    documents, vectors = make_documents(200)
+    index = LocalVectorIndex(str(tmp_path / "index"))
+    assert index.upsert(documents) == 200
+
+    hits = index.search([vectors[7]], 5)[0]
+    assert urls(hits)[0] == documents[7]["url"]
+    scores = [score for _record, score in hits]
+    assert scores == sorted(scores, reverse=True)
+    assert scores[0] == pytest.approx(1.0, abs=1e-5)
+
+
+def test_site_filter(tmp_path):
+    documents, vectors = make_documents(200)
+    index = LocalVectorIndex(str(tmp_path / "index"))
+    index.upsert(documents)
+
+    hits = index.search([vectors[7]], 20, sites=["site_b"])[0]
+    assert len(hits) == 20
+    assert all(record["site"] == "site_b" for record, _score in hits)
+    assert index.search([vectors[7]], 5, sites=["unknown"])[0] == []
+    assert index.sites() == ["site_a", "site_b"]
+
+
+def test_upsert_replaces_and_delete_by_site(tmp_path):
+    documents, vectors = make_documents(50)
+    index = LocalVectorIndex(str(tmp_path / "index"))
+    index.upsert(documents)
+
+    index.upsert([dict(documents[3], name="Renamed")])
+    assert len(index) == 50
+    assert index.get(documents[3]["url"])["name"] == "Renamed"
+    assert urls(index.search([vectors[3]], 1)[0]) == [documents[3]["url"]]
+
+    assert index.delete_site("site_a") == 25
+    assert len(index) == 25
+    assert index.get(documents[3]["url"]) is None
+    assert index.sites() == ["site_b"]
+    assert all(record["site"] == "site_b" for record, _score in index.search([vectors[3]], 50)[0])
+
+
+def test_persistence(tmp_path):
+    documents, vectors = make_documents(100)
+    path = str(tmp_path / "index")
+    LocalVectorIndex(path).upsert(documents)
+
+    reopened = LocalVectorIndex(path)
+    assert len(reopened) == 100
+    assert isinstance(reopened._vectors, np.memmap)
+    assert urls(reopened.search([vectors[42]], 1)[0]) == [documents[42]["url"]]
+
+    reopened.upsert([dict(documents[0], url="https://example.com/new")])
+    assert LocalVectorIndex(path).get("https://example.com/new") is not None
+
+
+def test_uploads_append_instead_of_rewriting(tmp_path, monkeypatch):
+    documents, vectors = make_documents(150)
+    path = tmp_path / "index"
+    index = LocalVectorIndex(str(path), quantization={"type": "int8"})
+    index.upsert(documents[:100])
+    vector_bytes = (path / local_index.VECTORS_FILE).stat().st_size
+
+    rewritten = []
+    write_atomic = local_index._write_atomic
+    monkeypatch.setattr(local_index, "_write_atomic",
+                        lambda file, write: rewritten.append(file) or write_atomic(file, write))
+    index.upsert(documents[100:])
+    assert [os.path.basename(file) for file in rewritten] == [local_index.META_FILE]
+    assert (path / local_index.VECTORS_FILE).stat().st_size == vector_bytes * 3 // 2
+    assert (path / local_index.CODES_FILE).stat().st_size == 150 * DIMENSION
+
+    reopened = LocalVectorIndex(str(path), quantization={"type": "int8"})
+    assert len(reopened) == 150
+    assert urls(reopened.search([vectors[120]], 1)[0]) == [documents[120]["url"]]
+
+
+def test_tombstones_survive_reopen_until_flush_compacts(tmp_path):
+    documents, vectors = make_documents(50)
+    path = str(tmp_path / "index")
+    index = LocalVectorIndex(path)
+    index.upsert(documents)
+    index.upsert([dict(documents[4], name="Renamed")])
+    index.delete_site("site_a")
+
+    reopened = LocalVectorIndex(path)
+    assert len(reopened) == 25 and len(reopened._records) == 51
+    assert reopened.get(documents[4]["url"])["name"] == "Renamed"
+    assert reopened.get(documents[3]["url"]) is None
+    assert urls(reopened.search([vectors[4]], 1)[0]) == [documents[4]["url"]]
+
+    reopened.flush()
+    assert len(reopened._records) == 25
+    assert not (tmp_path / "index" / local_index.TOMBSTONES_FILE).exists()
+    assert len(LocalVectorIndex(path)) == 25
+
+
+def test_uncommitted_rows_are_ignored(tmp_path):
+    documents, vectors = make_documents(20)
+    path = tmp_path / "index"
+    LocalVectorIndex(str(path)).upsert(documents[:10])
+    # An upload that wrote its rows but crashed before committing meta.json
+    with open(path / local_index.VECTORS_FILE, "ab") as f:
+        f.write(vectors[10:12].tobytes())
+    with open(path / local_index.RECORDS_FILE, "a") as f:
+        f.write('{"url": "https://example.com/partial", "name": "", "site": "", "schema_json": ""}\n')
+
+    reopened = LocalVectorIndex(str(path))
+    assert len(reopened) == 10 and reopened.get("https://example.com/partial") is None
+    reopened.upsert(documents[10:])
+    assert urls(LocalVectorIndex(str(path)).search([vectors[15]], 1)[0]) == [documents[15]["url"]]
+
+
+def test_dimension_mismatch(tmp_path):
+    documents, _vectors = make_documents(10)
+    index = LocalVectorIndex(str(tmp_path / "index"))
+    index.upsert(documents)
+    with pytest.raises(ValueError):
+        index.upsert([dict(documents[0], url="https://example.com/bad", embedding=[0.1, 0.2])])
+
+
+def test_hnsw_matches_exact_search(tmp_path):
+    documents, _vectors = make_documents(1000)
+    queries = np.random.default_rng(1).normal(size=(20, DIMENSION))
+    exact = LocalVectorIndex(str(tmp_path / "flat"))
+    exact.upsert(documents)
+    hnsw_path = str(tmp_path / "hnsw")
+    approximate = LocalVectorIndex(hnsw_path, hnsw={"m": 8, "ef_construction": 64, "ef_search": 64},
+                                   exact_threshold=0)
+    approximate.upsert(documents)
+
+    def recall(index, sites=None):
+        found = index.search(queries, 10, sites)
+        expected = exact.search(queries, 10, sites)
+        return np.mean([len(set(urls(a)) & set(urls(e))) / 10 for a, e in zip(found, expected)])
+
+    assert recall(approximate) >= 0.9
+    assert recall(approximate, ["site_a"]) >= 0.9
+
+    # The graph is saved by flush() and reloaded with the index
+    approximate.flush()
+    reopened = LocalVectorIndex(hnsw_path, hnsw={"m": 8, "ef_construction": 64, "ef_search": 64},
+                                exact_threshold=0)
+    assert len(reopened._graph) == 1000
+    assert recall(reopened) >= 0.9
+
+
+def test_int8_quantized_search_matches_exact(tmp_path):
+    documents, _vectors = make_documents(1000)
+    queries = np.random.default_rng(2).normal(size=(10, DIMENSION))
+    exact = LocalVectorIndex(str(tmp_path / "flat"))
+    exact.upsert(documents)
+    quantized_path = str(tmp_path / "int8")
+    quantized = LocalVectorIndex(quantized_path, quantization={"type": "int8", "oversampling": 4})
+    quantized.upsert(documents[:500])
+    quantized.upsert(documents[500:])  # quantized with the scales calibrated on the first upload
+
+    for sites in (None, ["site_a"]):
+        found = quantized.search(queries, 10, sites)
+        expected = exact.search(queries, 10, sites)
+        assert np.mean([len(set(urls(f)) & set(urls(e))) / 10 for f, e in zip(found, expected)]) >= 0.95
+        # Returned scores are the full-precision rescored similarities
+        assert found[0][0][1] == pytest.approx(expected[0][0][1], abs=1e-5)
+
+    reopened = LocalVectorIndex(quantized_path, quantization={"type": "int8"})
+    assert reopened._codes.dtype == np.int8 and reopened._codes.shape == (1000, DIMENSION)
+    with pytest.raises(ValueError):
+        LocalVectorIndex(str(tmp_path / "bad"), quantization={"type": "binary"})
+
+
+
+def test_flush_recalibrates_int8_scales_as_the_index_grows(tmp_path):
+    documents, vectors = make_documents(300, seed=3)
+    # The first batch barely uses the second half of the dimensions
+    vectors[:100, DIMENSION // 2:] *= 0.01
+    for doc, vector in zip(documents, vectors):
+        doc["embedding"] = vector.tolist()
+    path = str(tmp_path / "index")
+    index = LocalVectorIndex(path, quantization={"type": "int8"})
+    index.upsert(documents[:100])
+    index.upsert(documents[100:])
+
+    def mean_error(idx):
+        later = np.asarray(idx._vectors[100:])
+        return np.abs(np.asarray(idx._codes[100:]) * idx._scales - later).mean()
+
+    clipped = mean_error(index)
+    index.flush()
+    assert mean_error(index) < clipped / 10
+    assert index._calibrated_rows == 300
+
+    reopened = LocalVectorIndex(path, quantization={"type": "int8"})
+    assert reopened._calibrated_rows == 300
+    assert np.array_equal(reopened._scales, index._scales)
+
+
+@pytest.fixture
+def local_client(tmp_path, monkeypatch):
+    monkeypatch.setitem(CONFIG.retrieval_endpoints, "local_index_test", RetrievalProviderConfig(
+        database_path=str(tmp_path), index_name="test", db_type="local_index", enabled=True))
+    monkeypatch.setattr(local_index_client, "_indexes", {})
+
+    documents, vectors = make_documents(100)
+    embeddings = {f"query {i}": vectors[i].tolist() for i in range(len(vectors))}
+
+    async def fake_embedding(text, query_params=None, **kwargs):
+        return embeddings[text]
+
+    async def fake_batch_embeddings(texts, **kwargs):
+        return [embeddings[text] for text in texts]
+
+    monkeypatch.setattr(local_index_client, "get_embedding", fake_embedding)
+    monkeypatch.setattr(local_index_client, "batch_get_embeddings", fake_batch_embeddings)
+    return LocalIndexClient("local_index_test"), documents
+
+
+async def test_client_round_trip(local_client):
+    client, documents = local_client
+    assert await client.upload_documents(documents) == 100
+
+    results = await client.search("query 5", "site_a", num_results=3)
+    assert results[0] == [documents[5]["url"], documents[5]["schema_json"], "Item 5", "site_a"]
+    assert all(result[3] == "site_a" for result in results)
+
+    batch = await client.search_batch(["query 5", "query 6"], "all", num_results=1)
+    assert [results[0][0] for results in batch] == [documents[5]["url"], documents[6]["url"]]
+
+    assert (await client.search_by_url(documents[9]["url"]))[2] == "Item 9"
+    assert await client.search_by_url("https://example.com/missing") is None
+    assert await client.get_sites() == ["site_a", "site_b"]
+
+
+async def test_batch_search_embeds_with_the_request_query_params(local_client, monkeypatch):
+    client, documents = local_client
+    await client.upload_documents(documents)
+    seen = []
+
+    async def recording_batch_embeddings(texts, query_params=None, **kwargs):
+        seen.append(query_params)
+        return [documents[5]["embedding"] for _ in texts]
+
+    monkeypatch.setattr(local_index_client, "batch_get_embeddings", recording_batch_embeddings)
+    query_params = {"embedding_provider": "ollama"}
+    await client.search_batch(["query 5"], "all", num_results=1, query_params=query_params)
+    assert seen == [query_params]
+
+    assert await client.delete_documents_by_site("site_b") == 50
+    assert await client.get_sites() == ["site_a"]
@@ -0,0 +1,53 @@
+import json
+
+import core.description_cache as description_cache
+from core.description_cache import DescriptionCache
+from core.retriever import ResultAggregator
+from core.search_result import SearchResult, as_search_results
+
+
+def count_loads(monkeypatch):
+    calls = []
+    loads = json.loads
+
+    def counting_loads(*args, **kwargs):
+        calls.append(args[0])
+        return loads(*args, **kwargs)
+
+    monkeypatch.setattr(json, "loads", counting_loads)
+    monkeypatch.setattr(description_cache, "_description_cache", DescriptionCache(max_items=100))
+    return calls
+
+
+def test_record_behaves_like_the_list_row():
+    row = ["https://example.com/a", '{"name": "A"}', "A", "example"]
+    record = SearchResult.from_row(row)
+    url, json_str, name, site = record
+    assert (url, record[1], record.name, site) == ("https://example.com/a", '{"name": "A"}', "A", "example")
+    assert record == row and isinstance(record, list)
+    assert json.dumps([record]) == json.dumps([row])
+    assert SearchResult.from_row(record) is record
+    assert as_search_results([["too", "short"]]) == [["too", "short"]]
+
+
+def test_schema_is_decoded_once(monkeypatch):
+    calls = count_loads(monkeypatch)
+    record = SearchResult("https://example.com/a", '{"@type": "Recipe", "name": "A", "image": "a.jpg"}', "A", "x")
+    assert calls == []
+    assert record.schema_object["name"] == "A"
+    assert "image" not in record.description
+    assert description_cache.describe_item(record.url, record.json_str).parsed is record.schema
+    assert len(calls) == 1
+
+
+def test_merged_duplicates_are_not_decoded_again(monkeypatch):
+    aggregator = ResultAggregator()
+    aggregator.add("one", [["https://example.com/a", '{"name": "A", "cookTime": "PT5M"}', "A", "x"]])
+    aggregator.add("two", [["https://example.com/a", '{"name": "A", "prepTime": "PT1M"}', "A", "x"]])
+    calls = count_loads(monkeypatch)
+    [record] = aggregator.results()
+    merged_loads = len(calls)
+    assert json.loads(record.json_str) == record.schema
+    assert record.schema == {"name": "A", "cookTime": "PT5M", "prepTime": "PT1M"}
+    assert description_cache.describe_item(record.url, record.json_str).parsed is record.schema
+    assert len(calls) == merged_loads + 1  # only the explicit json.loads above
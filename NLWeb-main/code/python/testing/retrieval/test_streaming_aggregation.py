@@ -0,0 +1,34 @@
+import asyncio
+
+from core.config import CONFIG, RetrievalAggregationConfig
+from core.retriever import VectorDBClient
+
+
+def rows(endpoint, count):
+    return [[f"https://{endpoint}.com/{i}", "{}", f"{endpoint} {i}", "site"] for i in range(count)]
+
+
+async def answer_after(delay, endpoint):
+    await asyncio.sleep(delay)
+    return rows(endpoint, 3)
+
+
+async def test_deadline_runs_from_first_answer_and_late_rows_reach_callback(monkeypatch):
+    monkeypatch.setattr(CONFIG, "retrieval_aggregation",
+                        RetrievalAggregationConfig(mode="streaming", endpoint_deadline=0.1, min_endpoints=3))
+    client = VectorDBClient.__new__(VectorDBClient)
+    client._late_tasks = set()
+    late = []
+
+    # The first answer comes after the deadline would have passed if it ran from the start
+    tasks = [asyncio.create_task(answer_after(delay, name))
+             for delay, name in ((0.15, "a"), (0.2, "b"), (0.6, "c"))]
+    results, answered = await client._search_streaming(
+        tasks, ["a", "b", "c"], 50, lambda endpoint, new_rows: late.append((endpoint, new_rows)))
+
+    assert answered == 2
+    assert {row[0] for row in results} == {row[0] for row in rows("a", 3) + rows("b", 3)}
+    await asyncio.gather(*tasks)
+    await asyncio.sleep(0)
+    assert [(endpoint, [row[0] for row in new_rows]) for endpoint, new_rows in late] == \
+        [("c", [row[0] for row in rows("c", 3)])]
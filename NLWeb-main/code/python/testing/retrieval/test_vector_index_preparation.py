@@ -0,0 +1,16 @@
+import core.retriever as retriever
+
+
+class IndexedClient:
+    def __init__(self):
+        self.prepared = 0
+
+    async def prepare_vector_index(self):
+        self.prepared += 1
+
+
+async def test_only_clients_that_manage_indexes_are_prepared(monkeypatch):
+    indexed = IndexedClient()
+    monkeypatch.setattr(retriever, "_client_cache", {"postgres_pg": indexed, "qdrant_local": object()})
+    await retriever.prepare_vector_indexes()
+    assert indexed.prepared == 1
@@ -0,0 +1,115 @@
+import asyncio
+import time
+from types import SimpleNamespace
+
+import pytest
+
+from core import router, tool_routing
+from core.config import CONFIG, ToolRoutingConfig
+from core.router import Tool, ToolSelector
+from core.state import NLWebHandlerState
+from core.tool_routing import RoutingCache, ToolEmbeddingIndex
+
+VOCABULARY = ["find", "show", "recipes", "restaurants", "ingredients", "what", "compare", "vs"]
+
+TOOLS = [
+    Tool(name="search", path="", method="builtin", arguments={}, schema_type="Item",
+         examples=["Find Italian restaurants", "Show me vegetarian recipes"], prompt="search tool {request.query}"),
+    Tool(name="details", path="", method="extension", arguments={}, schema_type="Item",
+         examples=["What are the ingredients in Chicken Alfredo?"], prompt="details tool {request.query}"),
+    Tool(name="compare", path="", method="extension", arguments={}, schema_type="Item",
+         examples=["Compare pizza vs pasta"], prompt="compare tool {request.query}"),
+]
+
+
+def bag_of_words(text):
+    words = text.lower().replace("?", "").split()
+    return [float(words.count(term)) for term in VOCABULARY]
+
+
+@pytest.fixture
+def routing(monkeypatch):
+    calls = {"embed_batches": 0, "embed_queries": 0, "llm": []}
+
+    async def fake_batch_embeddings(texts, **kwargs):
+        calls["embed_batches"] += 1
+        return [bag_of_words(text) for text in texts]
+
+    async def fake_embedding(text, query_params=None, **kwargs):
+        calls["embed_queries"] += 1
+        return bag_of_words(text)
+
+    async def fake_ask_llm(prompt, schema, level="low", query_params=None):
+        calls["llm"].append(prompt)
+        return {"score": 95 if prompt.startswith("details") else 10, "item_name": "lasagna"}
+
+    monkeypatch.setattr(tool_routing, "batch_get_embeddings", fake_batch_embeddings)
+    monkeypatch.setattr(router, "get_embedding", fake_embedding)
+    monkeypatch.setattr(router, "ask_llm", fake_ask_llm)
+    monkeypatch.setattr(router, "fill_prompt", lambda prompt, handler: prompt)
+    monkeypatch.setattr(router, "_tool_index", ToolEmbeddingIndex())
+    monkeypatch.setattr(router, "_routing_cache", None)
+    monkeypatch.setattr(CONFIG, "tool_routing", ToolRoutingConfig(shortlist_size=2, min_similarity=0.45, margin=0.1))
+    monkeypatch.setattr(CONFIG, "is_tool_selection_enabled", lambda: True)
+    monkeypatch.setattr(ToolSelector, "get_tools_by_type", lambda self, schema_type: TOOLS)
+    return calls
+
+
+def make_handler(query):
+    async def send_message(message):
+        messages.append(message)
+
+    messages = []
+    handler = SimpleNamespace(query=query, decontextualized_query="", item_type="Item", generate_mode="none",
+                              query_params={}, init_time=time.time(), send_message=send_message,
+                              pre_checks_done_event=asyncio.Event(), abort_fast_track_event=asyncio.Event(),
+                              tool_routing_results=[], messages=messages)
+    handler.state = NLWebHandlerState(handler)
+    handler.state._decon_event.set()
+    return handler
+
+
+async def test_clear_search_query_routes_without_llm_and_is_cached(routing):
+    handler = make_handler("Find vegetarian recipes")
+    await ToolSelector(handler).do()
+
+    assert handler.tool_routing_results[0]["tool"].name == "search"
+    assert routing["llm"] == []
+    assert routing["embed_batches"] == 1
+
+    again = make_handler("  find VEGETARIAN recipes? ")
+    await ToolSelector(again).do()
+    assert again.tool_routing_results[0]["tool"].name == "search"
+    assert routing["embed_queries"] == 1
+    assert routing["embed_batches"] == 1
+
+
+async def test_tools_embedded_at_startup_are_not_embedded_again(routing, monkeypatch):
+    monkeypatch.setattr(router, "_tools_cache", {"tools.xml": TOOLS})
+    await router.embed_tools()
+    assert routing["embed_batches"] == 1
+
+    handler = make_handler("Find vegetarian recipes")
+    await ToolSelector(handler).do()
+    assert handler.tool_routing_results[0]["tool"].name == "search"
+    assert routing["embed_batches"] == 1
+
+
+async def test_ambiguous_query_scores_shortlist_with_llm(routing):
+    handler = make_handler("What are the ingredients in lasagna?")
+    await ToolSelector(handler).do()
+
+    assert handler.tool_routing_results[0]["tool"].name == "details"
+    assert handler.tool_routing_results[0]["result"]["item_name"] == "lasagna"
+    assert 1 <= len(routing["llm"]) <= 2
+    assert not any(prompt.startswith("compare") for prompt in routing["llm"])
+    assert handler.abort_fast_track_event.is_set()
+
+
+def test_routing_cache_expires():
+    cache = RoutingCache(ttl=0.01, max_size=2)
+    cache.put("Find Pasta", "Recipe", ["search"])
+    assert cache.get("find pasta", "Recipe") == ["search"]
+    assert cache.get("find pasta", "Movie") is None
+    time.sleep(0.02)
+    assert cache.get("find pasta", "Recipe") is None
@@ -0,0 +1,109 @@
+import asyncio
+
+import pytest
+
+pytest.importorskip("aiohttp", reason="the request logging middleware needs aiohttp")
+
+from aiohttp import web
+from aiohttp.test_utils import TestClient, TestServer
+
+import webserver.middleware.logging_middleware as logging_middleware
+from misc.logger.logger import LogLevel
+
+
+class RecordingLogger:
+    def __init__(self):
+        self.records = []
+
+    def get_level(self):
+        return LogLevel.DEBUG
+
+    def info(self, line):
+        self.records.append(("info", line))
+
+    def warning(self, line):
+        self.records.append(("warning", line))
+
+    def error(self, line):
+        self.records.append(("error", line))
+
+    def levels(self):
+        return [level for level, _ in self.records]
+
+
+@pytest.fixture
+def recorder(monkeypatch):
+    recorder = RecordingLogger()
+    monkeypatch.setattr(logging_middleware, "logger", recorder)
+    # Settings are cached per config object; start each test from its own config
+    monkeypatch.setattr(logging_middleware, "_settings", None)
+    return recorder
+
+
+async def fast(request):
+    return web.json_response({"ok": True})
+
+
+async def slow(request):
+    await asyncio.sleep(0.1)
+    return web.json_response({"ok": True})
+
+
+async def stream_then_wait(request):
+    response = web.StreamResponse()
+    await response.prepare(request)
+    await asyncio.sleep(0.1)
+    await response.write(b"data: done\n\n")
+    return response
+
+
+async def wait_then_stream(request):
+    await asyncio.sleep(0.1)
+    response = web.StreamResponse()
+    await response.prepare(request)
+    await response.write(b"data: done\n\n")
+    return response
+
+
+def make_app(sample_rate, slow_request_seconds=0.05):
+    app = web.Application(middlewares=[logging_middleware.logging_middleware])
+    app.on_response_prepare.append(logging_middleware.record_first_byte)
+    app['config'] = {'server': {'logging': {'requests': {
+        'sample_rate': sample_rate,
+        'slow_request_seconds': slow_request_seconds,
+    }}}}
+    for path, handler in (("/fast", fast), ("/slow", slow),
+                          ("/stream", stream_then_wait), ("/late-stream", wait_then_stream)):
+        app.router.add_get(path, handler)
+    return app
+
+
+async def request_all(app, path, times=1):
+    async with TestClient(TestServer(app)) as client:
+        for _ in range(times):
+            response = await client.get(path)
+            await response.read()
+
+
+async def test_fast_requests_follow_the_sample_rate(recorder, monkeypatch):
+    await request_all(make_app(sample_rate=0), "/fast", times=5)
+    assert recorder.records == []
+
+    monkeypatch.setattr(logging_middleware, "_settings", None)
+    monkeypatch.setattr(logging_middleware.random, "random", lambda: 0.3)
+    await request_all(make_app(sample_rate=0.5), "/fast", times=2)
+    assert recorder.levels() == ["info", "info"]
+
+
+async def test_slow_requests_are_always_logged_as_warnings(recorder):
+    await request_all(make_app(sample_rate=0), "/slow")
+    assert recorder.levels() == ["warning"]
+
+
+async def test_streams_are_timed_to_their_first_byte(recorder):
+    await request_all(make_app(sample_rate=0), "/stream")
+    assert recorder.records == []
+
+    await request_all(make_app(sample_rate=0), "/late-stream")
+    assert recorder.levels() == ["warning"]
+    assert '"first_byte_ms"' in recorder.records[0][1]
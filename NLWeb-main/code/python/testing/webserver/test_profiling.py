@@ -0,0 +1,73 @@
+import asyncio
+
+import pytest
+
+from webserver.profiler import run_with_cprofile
+
+try:
+    from aiohttp import web
+    from aiohttp.test_utils import TestClient, TestServer
+except ImportError:
+    web = None
+
+requires_aiohttp = pytest.mark.skipif(web is None, reason="the profiling routes need aiohttp")
+
+ADMIN_TOKEN = "test-admin-token"
+
+
+def busy_work():
+    return sum(i * i for i in range(20000))
+
+
+async def query():
+    await asyncio.sleep(0)
+    return busy_work()
+
+
+async def test_run_with_cprofile_returns_result_and_hotspots():
+    result, hotspots = await run_with_cprofile(query())
+    assert result == busy_work()
+    assert any("busy_work" in entry["function"] for entry in hotspots)
+
+
+def make_app():
+    from webserver.routes.profiling import setup_profiling_routes
+
+    app = web.Application()
+    app['config'] = {'server': {'profiling': {'enabled': True, 'admin_token_env': 'NLWEB_ADMIN_TOKEN'}}}
+    setup_profiling_routes(app)
+    return app
+
+
+@requires_aiohttp
+@pytest.mark.parametrize("value", ["", "no", "0", "false"])
+def test_ask_profile_flag_only_accepts_true(value):
+    from webserver.routes.api import should_profile
+
+    # The request is only consulted for admin auth once profiling was asked for
+    assert should_profile(None, {"profile": value}) is False
+    assert should_profile(None, {}) is False
+
+
+@requires_aiohttp
+async def test_profile_requires_admin_token(monkeypatch):
+    monkeypatch.setenv("NLWEB_ADMIN_TOKEN", ADMIN_TOKEN)
+    async with TestClient(TestServer(make_app())) as client:
+        response = await client.get("/admin/profile", params={"seconds": "0.1"})
+        assert response.status == 403
+        response = await client.get("/admin/profile", params={"seconds": "0.1"},
+                                    headers={"Authorization": "Bearer wrong-token"})
+        assert response.status == 403
+
+
+@requires_aiohttp
+async def test_profile_returns_hotspots_for_admin(monkeypatch):
+    monkeypatch.setenv("NLWEB_ADMIN_TOKEN", ADMIN_TOKEN)
+    async with TestClient(TestServer(make_app())) as client:
+        response = await client.get("/admin/profile",
+                                    params={"seconds": "0.1", "mode": "cprofile", "format": "json"},
+                                    headers={"X-Admin-Token": ADMIN_TOKEN})
+        assert response.status == 200
+        body = await response.json()
+        assert body["mode"] == "cprofile"
+        assert body["hotspots"]
@@ -128,11 +128,21 @@ class AioHTTPServer:
     
     async def _on_startup(self, app: web.Application):
         """Initialize resources on startup"""
-        import aiohttp
+        from core.http_client import get_http_client_manager
         
-        # Create shared client session
-        timeout = aiohttp.ClientTimeout(total=30)
-        app['client_session'] = aiohttp.ClientSession(timeout=timeout)
+        # Start the shared outgoing connection pools used by providers
+        http_clients = get_http_client_manager()
+        await http_clients.start()
+        app['client_session'] = await http_clients.get_aiohttp_session()
+        
+        # Build or verify ANN indexes in the background; searches use the
+        # table (or an existing index) until it is ready
+        from core.retriever import prepare_vector_indexes
+        app['vector_index_task'] = asyncio.create_task(prepare_vector_indexes())
+        
+        # Embed tool descriptions now rather than on the first routed query
+        from core.router import embed_tools
+        await embed_tools()
         
         logger.info(f"Server starting on {self.config['server']['host']}:{self.config['port']}")
         logger.info(f"Mode: {self.config['mode']}")
@@ -140,8 +150,17 @@ class AioHTTPServer:
     
     async def _on_cleanup(self, app: web.Application):
         """Cleanup resources"""
-        if app['client_session']:
-            await app['client_session'].close()
+        from core.http_client import close_http_clients
+        from core.keyword_index import save_keyword_indexes
+        from core import embedding
+        vector_index_task = app.get('vector_index_task')
+        if vector_index_task is not None and not vector_index_task.done():
+            vector_index_task.cancel()
+        await close_http_clients()
+        await embedding.close()
+        # Keep keyword index changes from uploads made through this server
+        save_keyword_indexes()
+        app['client_session'] = None
     
     async def _on_shutdown(self, app: web.Application):
         """Graceful shutdown"""
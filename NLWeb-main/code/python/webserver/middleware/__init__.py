@@ -2,7 +2,7 @@
 
 from .cors import cors_middleware
 from .error_handler import error_middleware
-from .logging_middleware import logging_middleware
+from .logging_middleware import logging_middleware, record_first_byte
 from .auth import auth_middleware
 from .streaming import streaming_middleware
 
@@ -16,6 +16,8 @@ def setup_middleware(app):
     app.middlewares.append(cors_middleware)
     app.middlewares.append(auth_middleware)
     app.middlewares.append(streaming_middleware)
+    # Lets the logging middleware time streamed responses to their first byte
+    app.on_response_prepare.append(record_first_byte)
 
 
 __all__ = [
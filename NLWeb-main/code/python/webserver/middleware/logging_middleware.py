@@ -1,97 +1,148 @@
-"""Logging middleware for aiohttp server"""
+"""Sampled request logging middleware for aiohttp server"""
 
 from aiohttp import web
-import logging
-import time
 import json
-from typing import Optional
+import random
+import time
+from typing import Any, Dict, FrozenSet, Optional
+from misc.logger.logger import LogLevel
+from misc.logger.logging_config_helper import get_configured_logger
 
-logger = logging.getLogger(__name__)
+# Writes go through the AsyncLogProcessor queue, never directly to disk
+logger = get_configured_logger("webserver_requests")
 
+# Headers that are never logged, even if allowlisted
+SENSITIVE_HEADERS: FrozenSet[str] = frozenset({'authorization', 'cookie', 'x-api-key', 'x-admin-token'})
 
-@web.middleware
-async def logging_middleware(request: web.Request, handler):
-    """Log all requests and responses"""
-    
-    start_time = time.time()
-    
-    # Extract request info
-    request_info = {
+DEFAULT_HEADER_ALLOWLIST = ('user-agent', 'referer', 'content-type', 'accept')
+
+
+class RequestLogSettings:
+    """Request logging settings read from the server.logging.requests config section"""
+
+    def __init__(self, config: Dict[str, Any]):
+        request_config = config.get('server', {}).get('logging', {}).get('requests', {}) or {}
+        self.sample_rate = float(request_config.get('sample_rate', 0.01))
+        self.slow_request_seconds = float(request_config.get('slow_request_seconds', 2.0))
+        self.error_status = int(request_config.get('error_status', 500))
+        allowlist = request_config.get('header_allowlist', DEFAULT_HEADER_ALLOWLIST) or ()
+        self.header_allowlist = tuple(h.lower() for h in allowlist if h.lower() not in SENSITIVE_HEADERS)
+
+
+# Settings are parsed once per config object rather than on every request
+_settings: Optional[RequestLogSettings] = None
+_settings_source: Optional[int] = None
+
+
+def _get_settings(app: web.Application) -> RequestLogSettings:
+    global _settings, _settings_source
+    config = app.get('config', {})
+    if _settings is None or _settings_source != id(config):
+        _settings = RequestLogSettings(config)
+        _settings_source = id(config)
+    return _settings
+
+
+def _build_log_line(request: web.Request, settings: RequestLogSettings, status: int,
+                    duration: float, response_size: int, error: Optional[BaseException],
+                    first_byte: Optional[float] = None) -> str:
+    """Build the single-line JSON record. Only called once a record will actually be written."""
+    record = {
         'method': request.method,
         'path': request.path,
-        'query': dict(request.query),
-        'headers': dict(request.headers),
+        'status': status,
+        'duration_ms': round(duration * 1000, 1),
+        'size': response_size,
         'remote': request.remote,
-        'scheme': request.scheme,
-        'host': request.host
     }
-    
-    # Log request (exclude sensitive headers)
-    safe_headers = {k: v for k, v in request_info['headers'].items() 
-                   if k.lower() not in ['authorization', 'cookie', 'x-api-key']}
-    
-    logger.info(f"Request: {request.method} {request.path}", extra={
-        'request_method': request.method,
-        'request_path': request.path,
-        'request_query': request_info['query'],
-        'request_headers': safe_headers,
-        'request_remote': request_info['remote']
-    })
-    
+    if first_byte is not None:
+        record['first_byte_ms'] = round(first_byte * 1000, 1)
+    if request.query_string:
+        record['query_keys'] = list(request.query.keys())
+    headers = request.headers
+    logged_headers = {name: headers[name] for name in settings.header_allowlist if name in headers}
+    if logged_headers:
+        record['headers'] = logged_headers
+    if error is not None:
+        record['error_type'] = type(error).__name__
+        record['error_message'] = str(error)
+    return json.dumps(record, separators=(',', ':'), default=str)
+
+
+def _log_request(request: web.Request, status: int, duration: float,
+                 response_size: int = 0, error: Optional[BaseException] = None,
+                 first_byte: Optional[float] = None):
+    """
+    Decide whether this request is logged, and at which level, before building anything.
+
+    For streamed responses first_byte is the time until the headers were sent;
+    it replaces the total duration in the slow-request rule, since a stream
+    stays open for as long as results keep arriving.
+    """
+    settings = _get_settings(request.app)
+    latency = duration if first_byte is None else first_byte
+
+    if error is not None or status >= settings.error_status:
+        level = LogLevel.ERROR
+    elif latency >= settings.slow_request_seconds:
+        level = LogLevel.WARNING
+    elif settings.sample_rate > 0 and random.random() < settings.sample_rate:
+        level = LogLevel.INFO
+    else:
+        return
+
+    if not LogLevel.level_matches(logger.get_level(), level):
+        return
+
+    line = _build_log_line(request, settings, status, duration, response_size, error, first_byte)
+    if level is LogLevel.ERROR:
+        logger.error(line)
+    elif level is LogLevel.WARNING:
+        logger.warning(line)
+    else:
+        logger.info(line)
+
+
+async def record_first_byte(request: web.Request, response: web.StreamResponse):
+    """on_response_prepare hook: note when the response headers go out."""
+    request.setdefault('first_byte_time', time.time())
+
+
+@web.middleware
+async def logging_middleware(request: web.Request, handler):
+    """
+    Log requests with sampling.
+
+    Errors and slow requests are always logged; other requests are logged
+    with probability sample_rate. Streamed responses count as slow only if
+    their first byte was slow. Records are single-line JSON, built only
+    when they will be written, and handed to the async log queue.
+    """
+    start_time = time.time()
+
     # Store request start time for use in handlers
     request['start_time'] = start_time
-    
+
     try:
-        # Process request
         response = await handler(request)
-        
-        # Calculate duration
-        duration = time.time() - start_time
-        
-        # Log response
-        logger.info(
-            f"Response: {request.method} {request.path} - {response.status} ({duration:.3f}s)",
-            extra={
-                'request_method': request.method,
-                'request_path': request.path,
-                'response_status': response.status,
-                'response_duration': duration,
-                'response_size': response.content_length or 0
-            }
-        )
-        
-        # Add timing header
-        response.headers['X-Response-Time'] = f"{duration:.3f}s"
-        
-        return response
-        
     except web.HTTPException as ex:
-        # Log HTTP exceptions
-        duration = time.time() - start_time
-        logger.warning(
-            f"HTTP Exception: {request.method} {request.path} - {ex.status} ({duration:.3f}s)",
-            extra={
-                'request_method': request.method,
-                'request_path': request.path,
-                'response_status': ex.status,
-                'response_duration': duration,
-                'error_reason': ex.reason
-            }
-        )
+        _log_request(request, ex.status, time.time() - start_time)
         raise
-        
     except Exception as e:
-        # Log other exceptions
-        duration = time.time() - start_time
-        logger.error(
-            f"Exception: {request.method} {request.path} - 500 ({duration:.3f}s)",
-            extra={
-                'request_method': request.method,
-                'request_path': request.path,
-                'response_status': 500,
-                'response_duration': duration,
-                'error_type': type(e).__name__,
-                'error_message': str(e)
-            }
-        )
-        raise
\ No newline at end of file
+        _log_request(request, 500, time.time() - start_time, error=e)
+        raise
+
+    duration = time.time() - start_time
+    first_byte = None
+    if response.prepared:
+        # Streamed by the handler; without the prepare hook the stream is not
+        # treated as slow at all
+        first_byte = request.get('first_byte_time', start_time) - start_time
+    _log_request(request, response.status, duration, response.content_length or 0,
+                 first_byte=first_byte)
+
+    # Add timing header (streamed responses have already sent their headers)
+    if not response.prepared:
+        response.headers['X-Response-Time'] = f"{duration:.3f}s"
+
+    return response
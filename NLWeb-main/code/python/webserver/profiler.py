@@ -0,0 +1,191 @@
+# Copyright (c) 2025 Microsoft Corporation.
+# Licensed under the MIT License
+
+"""
+On-demand profiling helpers for the aiohttp server.
+
+Two profilers are provided, both stdlib only:
+- StackSampler: a pure-Python sampling profiler that periodically snapshots
+  the stacks of every thread via sys._current_frames() and aggregates them
+  as collapsed stacks (the input format for flamegraph tools).
+- run_with_cprofile: runs a coroutine with cProfile enabled on the event loop
+  thread and returns the result together with the top hotspots.
+
+Only one profile can run at a time in the process, since cProfile cannot be
+stacked and concurrent samplers would skew each other.
+"""
+
+import asyncio
+import cProfile
+import io
+import os
+import pstats
+import sys
+import threading
+from collections import Counter
+from typing import Any, Awaitable, Dict, List, Optional, Tuple
+
+# Guards against concurrent profiling sessions in this process
+_profile_lock = threading.Lock()
+
+# Leaf frames in these modules mean the thread is blocked, not burning CPU
+_IDLE_MODULES = ("selectors.py", "threading.py", "queue.py")
+
+
+class ProfilerBusyError(RuntimeError):
+    """Raised when a profile is requested while another one is running."""
+
+
+class StackSampler:
+    """
+    Sampling profiler that collects collapsed stacks from all threads.
+
+    Sampling happens on a dedicated daemon thread so the event loop keeps
+    serving requests while it is being profiled.
+    """
+
+    def __init__(self, interval: float = 0.005, include_idle: bool = False):
+        self.interval = max(interval, 0.001)
+        self.include_idle = include_idle
+        self.stacks: Counter = Counter()
+        self.sample_count = 0
+        self._stop_event = threading.Event()
+        self._thread: Optional[threading.Thread] = None
+
+    def start(self):
+        if self._thread is not None:
+            return
+        self._thread = threading.Thread(target=self._run, name="nlweb-stack-sampler", daemon=True)
+        self._thread.start()
+
+    def stop(self):
+        if self._thread is None:
+            return
+        self._stop_event.set()
+        self._thread.join()
+        self._thread = None
+
+    def _run(self):
+        own_ident = threading.get_ident()
+        thread_names = {}
+        while not self._stop_event.wait(self.interval):
+            if len(thread_names) != threading.active_count():
+                thread_names = {t.ident: t.name for t in threading.enumerate()}
+            for ident, frame in sys._current_frames().items():
+                if ident == own_ident:
+                    continue
+                stack = self._collapse(frame)
+                if not self.include_idle and self._is_idle(stack):
+                    continue
+                thread_name = thread_names.get(ident, str(ident))
+                self.stacks[f"{thread_name};{stack}"] += 1
+            self.sample_count += 1
+
+    @staticmethod
+    def _collapse(frame) -> str:
+        parts = []
+        while frame is not None:
+            code = frame.f_code
+            parts.append(f"{code.co_name} ({os.path.basename(code.co_filename)}:{frame.f_lineno})")
+            frame = frame.f_back
+        parts.reverse()
+        return ";".join(parts)
+
+    @staticmethod
+    def _is_idle(stack: str) -> bool:
+        # The leaf frame tells us whether the thread was waiting rather than working
+        leaf = stack.rsplit(";", 1)[-1]
+        return any(f"({module}:" in leaf for module in _IDLE_MODULES)
+
+    def collapsed(self, limit: Optional[int] = None) -> str:
+        """Return samples in collapsed-stack format, one 'stack count' per line."""
+        lines = [f"{stack} {count}" for stack, count in self.stacks.most_common(limit)]
+        return "\n".join(lines)
+
+    def top_functions(self, limit: int = 20) -> List[Dict[str, Any]]:
+        """Return the leaf frames that were seen most often."""
+        leaves: Counter = Counter()
+        for stack, count in self.stacks.items():
+            leaves[stack.rsplit(";", 1)[-1]] += count
+        total = sum(leaves.values()) or 1
+        return [
+            {'function': leaf, 'samples': count, 'percent': round(100.0 * count / total, 2)}
+            for leaf, count in leaves.most_common(limit)
+        ]
+
+
+async def sample_process(seconds: float, interval: float = 0.005,
+                         include_idle: bool = False) -> StackSampler:
+    """Sample all threads of the running process for a fixed duration."""
+    if not _profile_lock.acquire(blocking=False):
+        raise ProfilerBusyError("A profile is already running")
+    sampler = StackSampler(interval=interval, include_idle=include_idle)
+    try:
+        sampler.start()
+        await asyncio.sleep(seconds)
+    finally:
+        sampler.stop()
+        _profile_lock.release()
+    return sampler
+
+
+async def profile_process(seconds: float) -> cProfile.Profile:
+    """Run cProfile on the event loop thread for a fixed duration."""
+    if not _profile_lock.acquire(blocking=False):
+        raise ProfilerBusyError("A profile is already running")
+    profiler = cProfile.Profile()
+    try:
+        profiler.enable()
+        await asyncio.sleep(seconds)
+    finally:
+        profiler.disable()
+        _profile_lock.release()
+    return profiler
+
+
+async def run_with_cprofile(awaitable: Awaitable, limit: int = 20) -> Tuple[Any, Optional[List[Dict[str, Any]]]]:
+    """
+    Await a coroutine with cProfile enabled and return (result, hotspots).
+
+    cProfile hooks the whole event loop thread, so work done by other requests
+    that interleave with this one is included. If another profile is already
+    running the coroutine is awaited unprofiled and hotspots is None.
+    """
+    if not _profile_lock.acquire(blocking=False):
+        return await awaitable, None
+    profiler = cProfile.Profile()
+    try:
+        profiler.enable()
+        try:
+            result = await awaitable
+        finally:
+            profiler.disable()
+    finally:
+        _profile_lock.release()
+    return result, hotspots(profiler, limit)
+
+
+def hotspots(profiler: cProfile.Profile, limit: int = 20, sort_by: str = "tottime") -> List[Dict[str, Any]]:
+    """Return the top functions of a cProfile run as JSON-friendly dicts."""
+    stats = pstats.Stats(profiler)
+    stats.sort_stats(sort_by)
+    entries = []
+    for func in stats.fcn_list[:limit]:
+        cc, nc, tt, ct, _callers = stats.stats[func]
+        filename, line, name = func
+        entries.append({
+            'function': f"{name} ({os.path.basename(filename)}:{line})",
+            'calls': nc,
+            'primitive_calls': cc,
+            'total_time': round(tt, 6),
+            'cumulative_time': round(ct, 6),
+        })
+    return entries
+
+
+def pstats_text(profiler: cProfile.Profile, limit: int = 50, sort_by: str = "cumulative") -> str:
+    """Render a cProfile run as the usual pstats text report."""
+    buffer = io.StringIO()
+    stats = pstats.Stats(profiler, stream=buffer)
+    stats.sort_stats(sort_by).print_stats(limit)
+    return buffer.getvalue()
@@ -4,6 +4,7 @@ from .static import setup_static_routes
 from .api import setup_api_routes
 from .health import setup_health_routes
 from .mcp import setup_mcp_routes
+from .profiling import setup_profiling_routes
 
 
 def setup_routes(app):
@@ -11,6 +12,7 @@ def setup_routes(app):
     setup_static_routes(app)
     setup_api_routes(app)
     setup_health_routes(app)
+    setup_profiling_routes(app)
     setup_mcp_routes(app)
     
     # TODO: Add these as we implement them
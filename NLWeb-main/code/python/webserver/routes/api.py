@@ -9,6 +9,8 @@ from methods.generate_answer import GenerateAnswer
 from webserver.aiohttp_streaming_wrapper import AioHttpStreamingWrapper
 from core.retriever import get_vector_db_client
 from core.utils.utils import get_param
+from webserver.profiler import run_with_cprofile
+from webserver.routes.profiling import is_admin_request
 
 logger = logging.getLogger(__name__)
 
@@ -79,11 +81,15 @@ async def handle_streaming_ask(request: web.Request, query_params: Dict[str, Any
         
         if generate_mode == 'generate':
             handler = GenerateAnswer(query_params, wrapper)
-            await handler.runQuery()
         else:
             # Use base NLWebHandler for other modes
             from core.baseHandler import NLWebHandler
             handler = NLWebHandler(query_params, wrapper)
+        
+        if should_profile(request, query_params):
+            _, profile_hotspots = await run_with_cprofile(handler.runQuery())
+            await wrapper.write_stream({"message_type": "profile", "hotspots": profile_hotspots})
+        else:
             await handler.runQuery()
         
         # Send completion message
@@ -112,7 +118,11 @@ async def handle_regular_ask(request: web.Request, query_params: Dict[str, Any])
             handler = NLWebHandler(query_params, None)
         
         # Run the query - it will return the complete response
-        result = await handler.runQuery()
+        if should_profile(request, query_params):
+            result, profile_hotspots = await run_with_cprofile(handler.runQuery())
+            result["profile"] = {"hotspots": profile_hotspots}
+        else:
+            result = await handler.runQuery()
         
         # Return the response directly
         return web.json_response(result)
@@ -125,6 +135,16 @@ async def handle_regular_ask(request: web.Request, query_params: Dict[str, Any])
         }, status=500)
 
 
+def should_profile(request: web.Request, query_params: Dict[str, Any]) -> bool:
+    """Whether this /ask request asked to be profiled and is allowed to be"""
+    if not get_param(query_params, "profile", bool, "false"):
+        return False
+    if not is_admin_request(request):
+        logger.warning("Ignoring profile flag on /ask without admin authentication")
+        return False
+    return True
+
+
 async def who_handler(request: web.Request) -> web.Response:
     """Handle /who endpoint"""
     
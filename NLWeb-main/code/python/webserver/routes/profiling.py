@@ -0,0 +1,106 @@
+"""On-demand profiling routes for aiohttp server"""
+
+from aiohttp import web
+import hmac
+import logging
+import os
+from datetime import datetime
+from webserver.profiler import ProfilerBusyError, sample_process, profile_process, pstats_text, hotspots
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_PROFILE_SECONDS = 10
+DEFAULT_MAX_PROFILE_SECONDS = 60
+
+
+def setup_profiling_routes(app: web.Application):
+    """Setup admin profiling routes"""
+    app.router.add_get('/admin/profile', profile_handler)
+
+
+def get_profiling_config(app: web.Application) -> dict:
+    """Get the profiling section of the webserver config"""
+    return app['config'].get('server', {}).get('profiling', {}) or {}
+
+
+def is_admin_request(request: web.Request) -> bool:
+    """
+    Check that the request carries the admin token.
+
+    The token is read from the environment variable named in the profiling
+    config. Profiling is disabled entirely when no token is configured.
+    """
+    profiling_config = get_profiling_config(request.app)
+    if not profiling_config.get('enabled', False):
+        return False
+
+    admin_token = os.environ.get(profiling_config.get('admin_token_env', 'NLWEB_ADMIN_TOKEN'))
+    if not admin_token:
+        return False
+
+    auth_header = request.headers.get('Authorization', '')
+    provided = auth_header[7:] if auth_header.startswith('Bearer ') else request.headers.get('X-Admin-Token', '')
+    if not provided:
+        return False
+    return hmac.compare_digest(provided.encode(), admin_token.encode())
+
+
+async def profile_handler(request: web.Request) -> web.Response:
+    """
+    Profile the running process for a bounded amount of time.
+
+    Query parameters:
+        seconds: duration of the profile (capped by max_seconds in config)
+        mode: 'sample' (stack sampler, default) or 'cprofile'
+        format: 'collapsed' (sample mode default), 'pstats' (cprofile mode default) or 'json'
+        interval: sampling interval in seconds for sample mode
+        include_idle: include threads parked in selectors/locks (sample mode)
+    """
+    if not is_admin_request(request):
+        return web.json_response({'error': 'Admin authentication required', 'type': 'auth_required'}, status=403)
+
+    profiling_config = get_profiling_config(request.app)
+    max_seconds = float(profiling_config.get('max_seconds', DEFAULT_MAX_PROFILE_SECONDS))
+
+    try:
+        seconds = float(request.query.get('seconds', DEFAULT_PROFILE_SECONDS))
+        interval = float(request.query.get('interval', 0.005))
+    except ValueError:
+        return web.json_response({'error': 'seconds and interval must be numbers'}, status=400)
+    seconds = min(max(seconds, 0.1), max_seconds)
+
+    mode = request.query.get('mode', 'sample')
+    if mode not in ('sample', 'cprofile'):
+        return web.json_response({'error': f"Unknown profile mode: {mode}"}, status=400)
+    output_format = request.query.get('format', 'collapsed' if mode == 'sample' else 'pstats')
+    include_idle = request.query.get('include_idle', 'false').lower() in ('true', '1')
+
+    logger.info(f"Starting {mode} profile for {seconds:.1f}s")
+    started_at = datetime.utcnow().isoformat()
+
+    try:
+        if mode == 'sample':
+            sampler = await sample_process(seconds, interval=interval, include_idle=include_idle)
+            if output_format == 'json':
+                return web.json_response({
+                    'mode': mode,
+                    'started_at': started_at,
+                    'duration_seconds': seconds,
+                    'samples': sampler.sample_count,
+                    'top_functions': sampler.top_functions(),
+                    'stacks': dict(sampler.stacks.most_common(500))
+                })
+            return web.Response(text=sampler.collapsed(), content_type='text/plain')
+
+        profiler = await profile_process(seconds)
+        if output_format == 'json':
+            return web.json_response({
+                'mode': mode,
+                'started_at': started_at,
+                'duration_seconds': seconds,
+                'hotspots': hotspots(profiler, limit=50)
+            })
+        return web.Response(text=pstats_text(profiler), content_type='text/plain')
+
+    except ProfilerBusyError as e:
+        return web.json_response({'error': str(e)}, status=409)
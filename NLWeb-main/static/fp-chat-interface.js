@@ -490,6 +490,7 @@ class ModernChatInterface {
     let firstResultShown = false;
     let messageContent = '';
     let allResults = [];
+    let streamedAnswer = '';
     
     // Clear debug messages for new request
     this.debugMessages = [];
@@ -637,6 +638,13 @@ class ModernChatInterface {
             console.log('key_name:', data.key_name, 'has value?', !!data.key_value);
           }
           
+        } else if (data.message_type === 'nlws_delta') {
+          // Partial answer text while the answer is being generated
+          if (typeof data.delta === 'string') {
+            streamedAnswer += data.delta;
+            textDiv.innerHTML = messageContent + streamedAnswer + '\n\n' + this.renderItems(allResults);
+          }
+          
         } else if (data.message_type === 'nlws') {
           // Handle NLWS message type (Natural Language Web Search synthesized response)
           
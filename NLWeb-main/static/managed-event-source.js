@@ -235,8 +235,17 @@ export class ManagedEventSource {
           chatInterface.resortResults();
         }
         break;
+      case "nlws_delta":
+        // Partial answer text while the answer is being generated
+        if (typeof data.delta === 'string') {
+          chatInterface.noResponse = false;
+          chatInterface.streamedAnswer = (chatInterface.streamedAnswer || '') + data.delta;
+          this.handleNLWS({answer: chatInterface.streamedAnswer, items: []}, chatInterface);
+        }
+        break;
       case "nlws":
         chatInterface.noResponse = false;
+        chatInterface.streamedAnswer = '';
         this.handleNLWS(data, chatInterface);
         break;
       case "compare_items":